@@ -24,14 +24,24 @@ library ieee;
 use ieee.std_logic_1164.all;
 use ieee.numeric_std.all;
 use work.SolverPkg.all;
+use work.ScheduledSerialPkg.all;
 
 entity HIL_TOP is
+    generic (
+        -- Rajada em BRAM a cada passo do solver, descarregada pela UART sob comando do host
+        -- ('hil_serial rajada'); desligada, a UART só leva o envio periódico de estados
+        USE_BURST_CAPTURE       : boolean := false;
+        -- Gatilho da rajada armada ('A'): Xvec(BURST_TRIGGER_STATE) passa a ser >= BURST_TRIGGER_LEVEL
+        BURST_TRIGGER_STATE     : natural := 2;       -- IL2
+        BURST_TRIGGER_LEVEL     : real    := 0.0
+    );
     port (
         SYSCLK_P                : in std_logic;
         SYSCLK_N                : in std_logic;
 
         -- Digital Input
         PMOD6_PIN1_R            : in std_logic;
+        FT4232_B_UART_TX        : in std_logic;
 
         -- Digital Output
         FT4232_B_UART_RX        : out std_logic;
@@ -63,11 +73,25 @@ architecture arch of HIL_TOP is
     constant START_PERIOD               : integer := integer(SIMUL_PERIOD * real(CLK_FREQ));
 
     constant SERIAL_BAUD_RATE           : integer := 3_000_000; 
+    -- Baud por acumulador (FracUartTX): necessário quando CLK_FREQ / SERIAL_BAUD_RATE não é inteiro,
+    -- ex. 12 Mbaud no FT4232 (20,83 ciclos; o divisor inteiro daria +4,2%). Ver 'hil_serial enlace'.
+    constant SERIAL_FRACTIONAL_BAUD     : boolean := false;
     constant USE_MULTI_STATE_SERIAL     : boolean := true; 
 
-    constant MULTI_STATE_INTERVAL_US    : integer := 150; 
+    constant MULTI_STATE_PACKED         : boolean := false; -- Quadro compactado: 28 bytes (~93 us a 3 Mbaud) em vez de 31
+    constant MULTI_STATE_INTERVAL_US    : integer := 150;   -- Com MULTI_STATE_PACKED pode cair para 100
     constant SINGLE_STATE_INTERVAL_US   : integer := 25;
     constant SINGLE_STATE_SENT          : integer := 4; 
+
+    -- Agenda por estado (tem prioridade sobre USE_MULTI_STATE_SERIAL): decimação 0 = não envia
+    constant USE_SCHEDULED_SERIAL       : boolean := false;
+    constant SCHEDULE_DECIMATION        : decimation_array_t := (0, 0, 1, 0, 6); -- IL1, ILd, IL2, VCf, VCd
+    constant SCHEDULE_INTERVAL_US       : integer := 60;   -- Maior quadro (IL2 + VCd): 15 bytes = 49,9 us a 3 Mbaud (50,1 us fracionário)
+
+    -- Rajada (USE_BURST_CAPTURE): profundidade e repouso da serial antes de trocar de fonte
+    constant BURST_DEPTH                : integer := 4096;  -- 409.6 us a 10 MHz (decimação 1)
+    constant BURST_IDLE_CYCLES          : integer := 12 * (CLK_FREQ / SERIAL_BAUD_RATE); -- > 1 byte 8N1
+    constant BURST_TRIGGER_FP           : signed(FP_TOTAL_BITS - 1 downto 0) := signed(to_fp(BURST_TRIGGER_LEVEL));
     constant PWM_RESOLUTION             : integer := 12;
     
     
@@ -81,6 +105,7 @@ architecture arch of HIL_TOP is
     constant Ld                         : real := 5.1e-3;
     constant Ts                         : real := SIMUL_PERIOD;
 
+    -- Euler explícito; ZOH/Tustin e outros Ts: scripts/simulation/src/discretization.py --vhdl
     constant a00                        : real := 1.0 - (R1/L1)*Ts; 
     constant a03                        : real := (-1.0/L1)*Ts; 
     constant a13                        : real := (1.0/Ld)*Ts;  
@@ -133,6 +158,13 @@ architecture arch of HIL_TOP is
 
     signal single_serial_out    : std_logic;
     signal multi_serial_out     : std_logic;
+    signal scheduled_serial_out : std_logic;
+    signal stream_serial_out    : std_logic;
+    signal burst_serial_out     : std_logic := '1';
+    signal burst_draining       : std_logic := '0';
+    signal burst_trigger        : std_logic := '0';
+    signal stream_idle_ctr      : integer range 0 to BURST_IDLE_CYCLES := 0;
+    signal uart_sel_burst       : std_logic := '0';
     signal pwm_out_vector       : std_logic_vector(0 to N_SS - 1);
 
 begin
@@ -230,12 +262,14 @@ begin
     --------------------------------------------------------------------------
     -- Serial Manager Generators 
     --------------------------------------------------------------------------
-    MultiStateSerial_Gen: if USE_MULTI_STATE_SERIAL generate
+    MultiStateSerial_Gen: if USE_MULTI_STATE_SERIAL and not USE_SCHEDULED_SERIAL generate
         MultiStateSerialManager_inst : entity work.MultiStateSerialManager
             generic map (
                 CLK_FREQ          => CLK_FREQ,
                 SEND_INTERVAL_US  => MULTI_STATE_INTERVAL_US,
-                BAUD_RATE         => SERIAL_BAUD_RATE    
+                BAUD_RATE         => SERIAL_BAUD_RATE,
+                PACKED_FRAME      => MULTI_STATE_PACKED,
+                FRACTIONAL_BAUD   => SERIAL_FRACTIONAL_BAUD
             )
             port map (
                 sysclk            => sysclk_250mhz,
@@ -244,12 +278,80 @@ begin
                 tx_o              => multi_serial_out
             );
     end generate MultiStateSerial_Gen;
-    SingleStateSerial_Gen: if not USE_MULTI_STATE_SERIAL generate
+    ScheduledSerial_Gen: if USE_SCHEDULED_SERIAL generate
+        ScheduledSerialManager_inst : entity work.ScheduledSerialManager
+            generic map (
+                CLK_FREQ          => CLK_FREQ,
+                SEND_INTERVAL_US  => SCHEDULE_INTERVAL_US,
+                BAUD_RATE         => SERIAL_BAUD_RATE,
+                STATE_DECIMATION  => SCHEDULE_DECIMATION,
+                FRACTIONAL_BAUD   => SERIAL_FRACTIONAL_BAUD
+            )
+            port map (
+                sysclk            => sysclk_250mhz,
+                reset_n           => reset_n,
+                states_data_i     => Xvec_current_o_sig,
+                tx_o              => scheduled_serial_out
+            );
+    end generate ScheduledSerial_Gen;
+    BurstCapture_Gen: if USE_BURST_CAPTURE generate
+        BurstCapture_inst : entity work.BurstCapture
+            generic map (
+                CLK_FREQ          => CLK_FREQ,
+                BAUD_RATE         => SERIAL_BAUD_RATE,
+                DEPTH             => BURST_DEPTH,
+                FRACTIONAL_BAUD   => SERIAL_FRACTIONAL_BAUD
+            )
+            port map (
+                sysclk            => sysclk_250mhz,
+                reset_n           => reset_n,
+                sample_i          => start_signal,
+                trigger_i         => burst_trigger,
+                states_data_i     => Xvec_current_o_sig,
+                rx_i              => FT4232_B_UART_TX,
+                tx_grant_i        => uart_sel_burst,
+                tx_o              => burst_serial_out,
+                draining_o        => burst_draining
+            );
+
+        -- Gatilho por limiar em um estado (a borda de subida é detectada no BurstCapture)
+        Burst_Trigger_Process: process (sysclk_250mhz)
+        begin
+            if rising_edge(sysclk_250mhz) then
+                if signed(Xvec_current_o_sig(BURST_TRIGGER_STATE)) >= BURST_TRIGGER_FP then
+                    burst_trigger <= '1';
+                else
+                    burst_trigger <= '0';
+                end if;
+            end if;
+        end process;
+
+        -- A UART só troca de fonte com a serial de estados em repouso por mais de um byte,
+        -- ou seja, entre quadros: nenhum byte em andamento é cortado na ida nem na volta.
+        -- Enquanto a rajada é descarregada, os quadros periódicos são descartados inteiros.
+        Uart_Select_Process: process (sysclk_250mhz)
+        begin
+            if rising_edge(sysclk_250mhz) then
+                if stream_serial_out = '0' then
+                    stream_idle_ctr <= 0;
+                elsif stream_idle_ctr < BURST_IDLE_CYCLES then
+                    stream_idle_ctr <= stream_idle_ctr + 1;
+                end if;
+                if reset_n = '0' then
+                    uart_sel_burst <= '0';
+                elsif stream_idle_ctr = BURST_IDLE_CYCLES and stream_serial_out = '1' then
+                    uart_sel_burst <= burst_draining;
+                end if;
+            end if;
+        end process;
+    end generate BurstCapture_Gen;
+    SingleStateSerial_Gen: if not USE_MULTI_STATE_SERIAL and not USE_SCHEDULED_SERIAL generate
         SerialManager_inst : entity work.SerialManager
             generic map (
                 CLK_FREQ          => CLK_FREQ,
                 SEND_INTERVAL_US  => SINGLE_STATE_INTERVAL_US,
-                BAUD_RATE         => SERIAL_BAUD_RATE
+                BAUD_RATE         => SERIAL_BAUD_RATE,
+                FRACTIONAL_BAUD   => SERIAL_FRACTIONAL_BAUD
             )
             port map (
                 sysclk            => sysclk_250mhz,
@@ -283,9 +385,13 @@ begin
     --------------------------------------------------------------------------
     GPIO_LED0 <= busy_o_sig;
 
-    FT4232_B_UART_RX <= multi_serial_out when USE_MULTI_STATE_SERIAL 
+    stream_serial_out <= scheduled_serial_out when USE_SCHEDULED_SERIAL
+                            else multi_serial_out when USE_MULTI_STATE_SERIAL 
                             else single_serial_out;
 
+    -- A descarga da rajada interrompe o envio periódico (troca só entre quadros, ver Uart_Select_Process)
+    FT4232_B_UART_RX <= burst_serial_out when uart_sel_burst = '1' else stream_serial_out;
+
     PMOD4_PIN1_R <= pwm_out_vector(0);
     PMOD4_PIN2_R <= pwm_out_vector(1);
     PMOD4_PIN3_R <= pwm_out_vector(2);
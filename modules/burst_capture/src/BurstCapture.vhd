@@ -0,0 +1,445 @@
+--! \file		BurstCapture.vhd
+--!
+--! \brief		Burst capture of the solver states in BRAM, drained over UART
+--!
+--! \author		Vinícius de Carvalho Monteiro Longo (longo.vinicius@gmail.com)
+--! \date       19-10-2026
+--!
+--! \version    1.0
+--!
+--! \copyright	Copyright (c) 2026 - All Rights reserved.
+--!
+--! \note		Target devices : No specific target
+--! \note		Tool versions  : No specific tool
+--! \note		Dependencies   : SolverPkg, UartTX, FracUartTX
+--!
+--! \ingroup	None
+--! \warning	None
+--!
+--! \note		Revisions:
+--!				- 1.0	19-10-2026	<longo.vinicius@gmail.com>
+--!				First revision.
+--!				- 1.1	19-10-2026	<longo.vinicius@gmail.com>
+--!				Comandos ignorados durante a descarga; tx_grant_i.
+--!
+--! Comandos recebidos do host (rx_i, 8N1 no mesmo BAUD_RATE):
+--!   'C' (0x43) + decimação : captura DEPTH amostras a partir de agora
+--!   'A' (0x41) + decimação : arma; a captura começa na próxima borda de subida de trigger_i
+--!   'D' (0x44)             : descarrega a rajada (pode ser repetido, a memória é mantida)
+--! Uma amostra é gravada a cada 'decimação' pulsos de sample_i (0 vale como 1).
+--! Durante uma descarga os comandos recebidos ('C', 'A', 'D' e o byte de
+--! decimação) são ignorados: a memória e o cabeçalho enviados não mudam até o CRC.
+--!
+--! Descarga (little-endian):
+--!   0xFE | 0xB5 | status | N | amostras (2 B) | decimação | id | amostras x N x 6 B | CRC-16
+--! status: 0 ociosa, 1 armada, 2 capturando, 3 pronta (só 'pronta' traz amostras).
+--! CRC-16/CCITT-FALSE (poly 0x1021, início 0xFFFF) de todos os bytes anteriores.
+--! draining_o fica em '1' durante a descarga para o HIL_TOP entregar a UART ao módulo;
+--! o primeiro byte só sai depois que tx_grant_i confirma a troca (HIL_TOP espera o
+--! fim do quadro periódico em andamento).
+
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+use work.SolverPkg.all;
+
+entity BurstCapture is
+    generic (
+        CLK_FREQ          : integer := 250_000_000;
+        BAUD_RATE         : integer := 3_000_000;
+        DEPTH             : integer := 4096;      -- Amostras por rajada (<= 65535)
+        FRACTIONAL_BAUD   : boolean := false      -- true: FracUartTX (baud exato por acumulador)
+    );
+    port (
+        sysclk            : in std_logic;
+        reset_n           : in std_logic;
+        sample_i          : in std_logic;         -- Pulso a cada passo do solver
+        trigger_i         : in std_logic;         -- Gatilho externo (já sincronizado)
+        states_data_i     : in vector_fp_t(0 to 4);
+        rx_i              : in std_logic;
+        tx_grant_i        : in std_logic := '1';  -- UART já entregue a este módulo
+        tx_o              : out std_logic;
+        draining_o        : out std_logic
+    );
+end entity BurstCapture;
+
+architecture rtl of BurstCapture is
+
+--------------------------------------------------------------------------
+-- Constants
+--------------------------------------------------------------------------
+    constant BIT_CYCLES           : integer := CLK_FREQ / BAUD_RATE;
+    constant BAUD_DIVISOR_C       : integer := BIT_CYCLES - 1;
+    -- RX amostra no meio do bit: arredondar mantém a deriva em 8 bits abaixo de meio bit
+    -- mesmo quando CLK_FREQ / BAUD_RATE não é inteiro (20,83 ciclos a 12 Mbaud)
+    constant RX_BIT_CYCLES        : integer := (CLK_FREQ + BAUD_RATE / 2) / BAUD_RATE;
+    constant GUARD_CYCLES         : integer := 20 * BIT_CYCLES;  -- Linha em repouso antes da descarga
+    constant N_STATES             : integer := 5;
+    constant STATE_BITS           : integer := 42;
+    constant SAMPLE_BITS          : integer := N_STATES * STATE_BITS;
+    constant SAMPLE_BYTES         : integer := N_STATES * 6;
+    constant HEADER_BYTES         : integer := 8;
+
+    constant CMD_CAPTURE          : std_logic_vector(7 downto 0) := x"43";  -- 'C'
+    constant CMD_ARM              : std_logic_vector(7 downto 0) := x"41";  -- 'A'
+    constant CMD_DRAIN            : std_logic_vector(7 downto 0) := x"44";  -- 'D'
+
+    constant ST_IDLE              : std_logic_vector(7 downto 0) := x"00";
+    constant ST_ARMED             : std_logic_vector(7 downto 0) := x"01";
+    constant ST_CAPTURING         : std_logic_vector(7 downto 0) := x"02";
+    constant ST_READY             : std_logic_vector(7 downto 0) := x"03";
+
+    function crc16_update(crc : std_logic_vector(15 downto 0);
+                          data : std_logic_vector(7 downto 0)) return std_logic_vector is
+        variable c : std_logic_vector(15 downto 0) := crc;
+    begin
+        c(15 downto 8) := c(15 downto 8) xor data;
+        for i in 0 to 7 loop
+            if c(15) = '1' then
+                c := (c(14 downto 0) & '0') xor x"1021";
+            else
+                c := c(14 downto 0) & '0';
+            end if;
+        end loop;
+        return c;
+    end function;
+
+--------------------------------------------------------------------------
+-- Signals
+--------------------------------------------------------------------------
+    -- Recepção de comandos
+    signal rx_s1, rx_s2           : std_logic := '1';
+    signal rx_busy                : std_logic := '0';
+    signal rx_ctr                 : integer range 0 to 2 * RX_BIT_CYCLES := 0;
+    signal rx_bit_idx             : integer range 0 to 8 := 0;
+    signal rx_shift               : std_logic_vector(7 downto 0) := (others => '0');
+    signal rx_valid               : std_logic := '0';
+    signal rx_data                : std_logic_vector(7 downto 0) := (others => '0');
+    signal cmd_pending            : std_logic_vector(7 downto 0) := (others => '0');
+    signal cmd_wait_arg           : std_logic := '0';
+    signal drain_req              : std_logic := '0';
+
+    -- Captura
+    type mem_t is array (0 to DEPTH - 1) of std_logic_vector(SAMPLE_BITS - 1 downto 0);
+    signal sample_mem             : mem_t;
+    attribute ram_style           : string;
+    attribute ram_style of sample_mem : signal is "block";
+
+    signal cap_status             : std_logic_vector(7 downto 0) := ST_IDLE;
+    signal decimation             : unsigned(7 downto 0) := to_unsigned(1, 8);
+    signal dec_ctr                : unsigned(7 downto 0) := (others => '0');
+    signal wr_addr                : integer range 0 to DEPTH - 1 := 0;
+    signal stored                 : integer range 0 to DEPTH := 0;
+    signal burst_id               : unsigned(7 downto 0) := (others => '0');
+    signal trigger_d              : std_logic := '0';
+
+    -- Descarga
+    type drain_t is (T_IDLE, T_GUARD, T_FETCH, T_SEND_BYTE, T_WAIT_DONE);
+    signal drain_state            : drain_t := T_IDLE;
+    type section_t is (SEC_HEADER, SEC_DATA, SEC_CRC);
+    signal section                : section_t := SEC_HEADER;
+    signal guard_ctr              : integer range 0 to GUARD_CYCLES := 0;
+    signal hdr_idx                : integer range 0 to HEADER_BYTES - 1 := 0;
+    signal sample_idx             : integer range 0 to DEPTH - 1 := 0;
+    signal sample_byte            : integer range 0 to SAMPLE_BYTES - 1 := 0;
+    signal crc_idx                : integer range 0 to 1 := 0;
+    signal drain_count            : integer range 0 to DEPTH := 0;
+    signal drain_status           : std_logic_vector(7 downto 0) := ST_IDLE;
+    signal rd_addr                : integer range 0 to DEPTH - 1 := 0;
+    signal rd_data                : std_logic_vector(SAMPLE_BITS - 1 downto 0) := (others => '0');
+    signal crc                    : std_logic_vector(15 downto 0) := x"FFFF";
+    signal byte_to_send           : std_logic_vector(7 downto 0);
+    signal uart_start             : std_logic := '0';
+    signal uart_done              : std_logic;
+    signal baud_divisor_sig       : std_logic_vector(15 downto 0);
+
+begin
+
+    baud_divisor_sig <= std_logic_vector(to_unsigned(BAUD_DIVISOR_C, 16));
+    draining_o <= '0' when drain_state = T_IDLE else '1';
+
+    --------------------------------------------------------------------------
+    -- Receptor UART dos comandos (amostra no meio de cada bit)
+    --------------------------------------------------------------------------
+    Uart_Rx_Process: process(sysclk)
+    begin
+        if rising_edge(sysclk) then
+            rx_s1 <= rx_i;
+            rx_s2 <= rx_s1;
+            rx_valid <= '0';
+            if reset_n = '0' then
+                rx_busy <= '0';
+            elsif rx_busy = '0' then
+                if rx_s2 = '0' then
+                    rx_busy <= '1';
+                    rx_ctr <= RX_BIT_CYCLES + RX_BIT_CYCLES / 2 - 1;  -- Meio do bit 0
+                    rx_bit_idx <= 0;
+                end if;
+            elsif rx_ctr > 0 then
+                rx_ctr <= rx_ctr - 1;
+            elsif rx_bit_idx < 8 then
+                rx_shift <= rx_s2 & rx_shift(7 downto 1);
+                rx_bit_idx <= rx_bit_idx + 1;
+                rx_ctr <= RX_BIT_CYCLES - 1;
+            else
+                rx_busy <= '0';
+                if rx_s2 = '1' then  -- Stop bit válido
+                    rx_valid <= '1';
+                    rx_data <= rx_shift;
+                end if;
+            end if;
+        end if;
+    end process;
+
+    --------------------------------------------------------------------------
+    -- Comandos e gravação das amostras na BRAM
+    --------------------------------------------------------------------------
+    Capture_Process: process(sysclk)
+        variable sample_word : std_logic_vector(SAMPLE_BITS - 1 downto 0);
+    begin
+        if rising_edge(sysclk) then
+            drain_req <= '0';
+            trigger_d <= trigger_i;
+            if reset_n = '0' then
+                cap_status <= ST_IDLE;
+                cmd_wait_arg <= '0';
+                stored <= 0;
+            else
+                -- Decodificação dos comandos (ignorados durante a descarga)
+                if rx_valid = '1' and drain_state /= T_IDLE then
+                    cmd_wait_arg <= '0';
+                elsif rx_valid = '1' then
+                    if cmd_wait_arg = '1' then
+                        cmd_wait_arg <= '0';
+                        if unsigned(rx_data) = 0 then
+                            decimation <= to_unsigned(1, 8);
+                        else
+                            decimation <= unsigned(rx_data);
+                        end if;
+                        wr_addr <= 0;
+                        stored <= 0;
+                        dec_ctr <= (others => '0');
+                        burst_id <= burst_id + 1;
+                        if cmd_pending = CMD_CAPTURE then
+                            cap_status <= ST_CAPTURING;
+                        else
+                            cap_status <= ST_ARMED;
+                        end if;
+                    elsif rx_data = CMD_CAPTURE or rx_data = CMD_ARM then
+                        cmd_pending <= rx_data;
+                        cmd_wait_arg <= '1';
+                    elsif rx_data = CMD_DRAIN then
+                        drain_req <= '1';
+                    end if;
+                end if;
+
+                -- Gatilho externo
+                if cap_status = ST_ARMED and trigger_i = '1' and trigger_d = '0' then
+                    cap_status <= ST_CAPTURING;
+                end if;
+
+                -- Gravação decimada
+                if cap_status = ST_CAPTURING and sample_i = '1' then
+                    if dec_ctr = 0 then
+                        for i in 0 to N_STATES - 1 loop
+                            sample_word(STATE_BITS * i + STATE_BITS - 1 downto STATE_BITS * i)
+                                := states_data_i(i)(STATE_BITS - 1 downto 0);
+                        end loop;
+                        sample_mem(wr_addr) <= sample_word;
+                        stored <= wr_addr + 1;
+                        dec_ctr <= decimation - 1;
+                        if wr_addr = DEPTH - 1 then
+                            cap_status <= ST_READY;
+                        else
+                            wr_addr <= wr_addr + 1;
+                        end if;
+                    else
+                        dec_ctr <= dec_ctr - 1;
+                    end if;
+                end if;
+            end if;
+        end if;
+    end process;
+
+    --------------------------------------------------------------------------
+    -- Leitura síncrona da BRAM
+    --------------------------------------------------------------------------
+    Read_Process: process(sysclk)
+    begin
+        if rising_edge(sysclk) then
+            rd_data <= sample_mem(rd_addr);
+        end if;
+    end process;
+
+    --------------------------------------------------------------------------
+    -- Máquina de estados da descarga
+    --------------------------------------------------------------------------
+    Drain_FSM: process(sysclk)
+    begin
+        if rising_edge(sysclk) then
+            if reset_n = '0' then
+                drain_state <= T_IDLE;
+                uart_start <= '0';
+            else
+                case drain_state is
+                    when T_IDLE =>
+                        uart_start <= '0';
+                        if drain_req = '1' then
+                            -- Só a rajada completa é enviada; nos outros estados vai só o cabeçalho
+                            drain_status <= cap_status;
+                            if cap_status = ST_READY then
+                                drain_count <= stored;
+                            else
+                                drain_count <= 0;
+                            end if;
+                            section <= SEC_HEADER;
+                            hdr_idx <= 0;
+                            sample_idx <= 0;
+                            sample_byte <= 0;
+                            crc_idx <= 0;
+                            rd_addr <= 0;
+                            crc <= x"FFFF";
+                            guard_ctr <= 0;
+                            drain_state <= T_GUARD;
+                        end if;
+
+                    when T_GUARD =>
+                        if guard_ctr < GUARD_CYCLES then
+                            guard_ctr <= guard_ctr + 1;
+                        elsif tx_grant_i = '1' then
+                            drain_state <= T_FETCH;
+                        end if;
+
+                    when T_FETCH =>
+                        -- Um ciclo para rd_data refletir rd_addr
+                        drain_state <= T_SEND_BYTE;
+
+                    when T_SEND_BYTE =>
+                        uart_start <= '1';
+                        if section /= SEC_CRC then
+                            crc <= crc16_update(crc, byte_to_send);
+                        end if;
+                        drain_state <= T_WAIT_DONE;
+
+                    when T_WAIT_DONE =>
+                        uart_start <= '0';
+                        if uart_done = '1' then
+                            drain_state <= T_FETCH;
+                            case section is
+                                when SEC_HEADER =>
+                                    if hdr_idx < HEADER_BYTES - 1 then
+                                        hdr_idx <= hdr_idx + 1;
+                                    elsif drain_count > 0 then
+                                        section <= SEC_DATA;
+                                    else
+                                        section <= SEC_CRC;
+                                    end if;
+                                when SEC_DATA =>
+                                    if sample_byte < SAMPLE_BYTES - 1 then
+                                        sample_byte <= sample_byte + 1;
+                                    elsif sample_idx < drain_count - 1 then
+                                        sample_byte <= 0;
+                                        sample_idx <= sample_idx + 1;
+                                        rd_addr <= sample_idx + 1;
+                                    else
+                                        section <= SEC_CRC;
+                                    end if;
+                                when SEC_CRC =>
+                                    if crc_idx = 0 then
+                                        crc_idx <= 1;
+                                    else
+                                        drain_state <= T_IDLE;
+                                    end if;
+                            end case;
+                        end if;
+                end case;
+            end if;
+        end if;
+    end process;
+
+    --------------------------------------------------------------------------
+    -- Seletor de bytes da descarga
+    --------------------------------------------------------------------------
+    Byte_Selector_Process: process(section, hdr_idx, sample_byte, crc_idx, rd_data, crc,
+                                   drain_status, drain_count, decimation, burst_id)
+        variable state_index : integer range 0 to N_STATES - 1;
+        variable byte_index  : integer range 0 to 5;
+        variable state_bits  : std_logic_vector(STATE_BITS - 1 downto 0);
+        variable count_slv   : std_logic_vector(15 downto 0);
+    begin
+        count_slv := std_logic_vector(to_unsigned(drain_count, 16));
+        byte_to_send <= (others => '0');
+        case section is
+            when SEC_HEADER =>
+                case hdr_idx is
+                    when 0 => byte_to_send <= x"FE";
+                    when 1 => byte_to_send <= x"B5";
+                    when 2 => byte_to_send <= drain_status;
+                    when 3 => byte_to_send <= std_logic_vector(to_unsigned(N_STATES, 8));
+                    when 4 => byte_to_send <= count_slv(7 downto 0);
+                    when 5 => byte_to_send <= count_slv(15 downto 8);
+                    when 6 => byte_to_send <= std_logic_vector(decimation);
+                    when others => byte_to_send <= std_logic_vector(burst_id);
+                end case;
+            when SEC_DATA =>
+                state_index := sample_byte / 6;
+                byte_index  := sample_byte mod 6;
+                state_bits  := rd_data(STATE_BITS * state_index + STATE_BITS - 1 downto STATE_BITS * state_index);
+                case byte_index is
+                    when 0 => byte_to_send <= state_bits(7 downto 0);
+                    when 1 => byte_to_send <= state_bits(15 downto 8);
+                    when 2 => byte_to_send <= state_bits(23 downto 16);
+                    when 3 => byte_to_send <= state_bits(31 downto 24);
+                    when 4 => byte_to_send <= state_bits(39 downto 32);
+                    when others => byte_to_send <= "000000" & state_bits(41 downto 40);
+                end case;
+            when SEC_CRC =>
+                if crc_idx = 0 then
+                    byte_to_send <= crc(7 downto 0);
+                else
+                    byte_to_send <= crc(15 downto 8);
+                end if;
+        end case;
+    end process;
+
+    --------------------------------------------------------------------------
+    -- Instância do transmissor UART
+    --------------------------------------------------------------------------
+    Int_Uart_Gen: if not FRACTIONAL_BAUD generate
+        uart_tx_inst : entity work.UartTX
+        generic map(
+            DATA_WIDTH      => 8,
+            START_BIT       => '0',
+            STOP_BIT        => '1'
+        )
+        port map(
+            sysclk          => sysclk,
+            reset_n         => reset_n,
+            start_i         => uart_start,
+            baudrate_i      => baud_divisor_sig,
+            data_i          => byte_to_send,
+            tx_o            => tx_o,
+            tx_done_o       => uart_done
+        );
+    end generate;
+
+    Frac_Uart_Gen: if FRACTIONAL_BAUD generate
+        uart_tx_inst : entity work.FracUartTX
+        generic map(
+            CLK_FREQ        => CLK_FREQ,
+            BAUD_RATE       => BAUD_RATE,
+            DATA_WIDTH      => 8,
+            START_BIT       => '0',
+            STOP_BIT        => '1'
+        )
+        port map(
+            sysclk          => sysclk,
+            reset_n         => reset_n,
+            start_i         => uart_start,
+            data_i          => byte_to_send,
+            tx_o            => tx_o,
+            tx_done_o       => uart_done
+        );
+    end generate;
+
+end architecture rtl;
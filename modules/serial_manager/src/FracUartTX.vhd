@@ -0,0 +1,118 @@
+--! \file		FracUartTX.vhd
+--!
+--! \brief		UART transmitter with a fractional (accumulator) baud generator
+--!
+--! \author		Vinícius de Carvalho Monteiro Longo (longo.vinicius@gmail.com)
+--! \date       19-10-2026
+--!
+--! \version    1.0
+--!
+--! \copyright	Copyright (c) 2026 - All Rights reserved.
+--!
+--! \note		Target devices : No specific target
+--! \note		Tool versions  : No specific tool
+--! \note		Dependencies   : No specific dependencies
+--!
+--! \ingroup	None
+--! \warning	None
+--!
+--! \note		Revisions:
+--!				- 1.0	19-10-2026	<longo.vinicius@gmail.com>
+--!				First revision.
+--!
+--! Mesma interface do UartTX, mas o período de bit vem de um acumulador:
+--! a cada clock soma BAUD_RATE e, ao passar de CLK_FREQ, subtrai CLK_FREQ e
+--! avança um bit. O período médio é exatamente CLK_FREQ / BAUD_RATE ciclos
+--! (ex.: 20,83 a 250 MHz / 12 Mbaud, alternando 20 e 21 ciclos), com erro
+--! instantâneo menor que 1 clock e sem erro acumulado ao longo do quadro.
+--! Com o divisor inteiro do UartTX, 12 Mbaud sairia a 12,5 Mbaud (+4,2%).
+
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+entity FracUartTX is
+    generic (
+        CLK_FREQ        : integer := 250_000_000;
+        BAUD_RATE       : integer := 12_000_000;
+        DATA_WIDTH      : integer := 8;
+        START_BIT       : std_logic := '0';
+        STOP_BIT        : std_logic := '1'
+    );
+    port (
+        sysclk          : in std_logic;
+        reset_n         : in std_logic;
+        start_i         : in std_logic;
+        data_i          : in std_logic_vector(DATA_WIDTH - 1 downto 0);
+        tx_o            : out std_logic;
+        tx_done_o       : out std_logic
+    );
+end entity FracUartTX;
+
+architecture rtl of FracUartTX is
+
+--------------------------------------------------------------------------
+-- Constants
+--------------------------------------------------------------------------
+    constant FRAME_BITS           : integer := DATA_WIDTH + 2;
+
+--------------------------------------------------------------------------
+-- Signals
+--------------------------------------------------------------------------
+    signal busy                   : std_logic := '0';
+    signal phase_acc              : integer range 0 to CLK_FREQ - 1 := 0;
+    signal bit_idx                : integer range 0 to FRAME_BITS - 1 := 0;
+    signal shift_reg              : std_logic_vector(FRAME_BITS - 1 downto 0) := (others => '1');
+    signal done                   : std_logic := '0';
+
+begin
+
+    assert BAUD_RATE < CLK_FREQ / 2
+        report "FracUartTX: BAUD_RATE deve ser menor que CLK_FREQ / 2" severity failure;
+
+    --------------------------------------------------------------------------
+    -- Serializador com gerador de baud por acumulador de fase
+    --------------------------------------------------------------------------
+    Tx_Process: process(sysclk)
+        variable next_acc : integer range 0 to CLK_FREQ + BAUD_RATE;
+    begin
+        if rising_edge(sysclk) then
+            if reset_n = '0' then
+                busy <= '0';
+                phase_acc <= 0;
+                bit_idx <= 0;
+                shift_reg <= (others => '1');
+                done <= '0';
+            else
+                done <= '0';
+                if busy = '0' then
+                    if start_i = '1' then
+                        shift_reg <= STOP_BIT & data_i & START_BIT;
+                        phase_acc <= 0;
+                        bit_idx <= 0;
+                        busy <= '1';
+                    end if;
+                else
+                    next_acc := phase_acc + BAUD_RATE;
+                    if next_acc >= CLK_FREQ then
+                        -- Fim do bit atual
+                        phase_acc <= next_acc - CLK_FREQ;
+                        shift_reg <= '1' & shift_reg(FRAME_BITS - 1 downto 1);
+                        if bit_idx = FRAME_BITS - 1 then
+                            busy <= '0';
+                            done <= '1';
+                        else
+                            bit_idx <= bit_idx + 1;
+                        end if;
+                    else
+                        phase_acc <= next_acc;
+                    end if;
+                end if;
+            end if;
+        end if;
+    end process;
+
+    tx_o      <= shift_reg(0) when busy = '1' else '1';
+    tx_done_o <= done;
+
+end architecture rtl;
@@ -18,7 +18,9 @@ entity MultiStateSerialManager is
     generic (
         CLK_FREQ          : integer := 200_000_000;
         SEND_INTERVAL_US  : integer := 500;
-        BAUD_RATE         : integer := 1_042_000
+        BAUD_RATE         : integer := 1_042_000;
+        PACKED_FRAME      : boolean := false; -- true: 5 x 42 bits contíguos em 27 bytes (header 0xFB)
+        FRACTIONAL_BAUD   : boolean := false  -- true: FracUartTX (baud exato por acumulador)
     );
     port (
         sysclk            : in std_logic;
@@ -30,13 +32,30 @@ end entity MultiStateSerialManager;
 
 architecture rtl of MultiStateSerialManager is
 
+--------------------------------------------------------------------------
+-- Functions
+--------------------------------------------------------------------------
+    function select_int(cond : boolean; if_true, if_false : integer) return integer is
+    begin
+        if cond then
+            return if_true;
+        end if;
+        return if_false;
+    end function;
+
 --------------------------------------------------------------------------
 -- Constants
 --------------------------------------------------------------------------
     constant SEND_INTERVAL_CYCLES : integer := (CLK_FREQ / 1_000_000) * SEND_INTERVAL_US;
     constant BAUD_DIVISOR_C       : integer := (CLK_FREQ / BAUD_RATE) - 1;
     constant HEADER_BYTE          : std_logic_vector(7 downto 0) := x"FA"; 
-    constant TOTAL_BYTES_TO_SEND  : integer := 31; -- 1 header + (5 states × 6 bytes each)
+    constant HEADER_PACKED_BYTE   : std_logic_vector(7 downto 0) := x"FB"; -- Identifica o quadro compactado no host
+    constant N_STATES             : integer := 5;
+    constant STATE_BITS           : integer := 42;
+    constant PACKED_BYTES         : integer := (N_STATES * STATE_BITS + 7) / 8; -- 210 bits -> 27 bytes
+    constant TOTAL_BYTES_TO_SEND  : integer := select_int(PACKED_FRAME,
+                                                          1 + PACKED_BYTES, -- 1 header + 27 bytes compactados
+                                                          31);              -- 1 header + (5 states × 6 bytes each)
 
 --------------------------------------------------------------------------
 -- Signals
@@ -47,6 +66,7 @@ architecture rtl of MultiStateSerialManager is
     signal timer_ctr              : integer range 0 to SEND_INTERVAL_CYCLES - 1 := 0;
     signal send_trigger           : std_logic := '0';
     signal latched_packets        : vector_fp_t(0 to 4);
+    signal packed_bits            : std_logic_vector(8 * PACKED_BYTES - 1 downto 0);
     signal tx_byte_counter        : integer range 0 to TOTAL_BYTES_TO_SEND - 1 := 0;
     signal byte_to_send           : std_logic_vector(7 downto 0);
     signal uart_start             : std_logic := '0';
@@ -120,16 +140,39 @@ begin
         end if;
     end process;
 
+    --------------------------------------------------------------------------
+    -- Quadro compactado: estado i nos bits 42*i .. 42*i+41, bits finais em zero
+    --------------------------------------------------------------------------
+    Packer_Process: process(latched_packets)
+    begin
+        packed_bits <= (others => '0');
+        for i in 0 to N_STATES - 1 loop
+            packed_bits(STATE_BITS * i + STATE_BITS - 1 downto STATE_BITS * i) <= latched_packets(i)(STATE_BITS - 1 downto 0);
+        end loop;
+    end process;
+
     --------------------------------------------------------------------------
     -- Seletor de bytes para transmissão
     --------------------------------------------------------------------------
-    Byte_Selector_Process: process(tx_byte_counter, latched_packets)
+    Byte_Selector_Process: process(tx_byte_counter, latched_packets, packed_bits)
         variable packet_index : integer range 0 to 4;
         variable byte_index   : integer range 0 to 5;
         variable current_packet : fixed_point_data_t;
     begin
         if tx_byte_counter = 0 then
-            byte_to_send <= HEADER_BYTE;  -- Primeiro byte é o header (0xFA)
+            if PACKED_FRAME then
+                byte_to_send <= HEADER_PACKED_BYTE;  -- Header do quadro compactado (0xFB)
+            else
+                byte_to_send <= HEADER_BYTE;  -- Primeiro byte é o header (0xFA)
+            end if;
+        elsif PACKED_FRAME then
+            -- Byte k do fluxo de bits, little-endian (bit 0 do estado 0 primeiro)
+            byte_to_send <= (others => '0');
+            for k in 0 to PACKED_BYTES - 1 loop
+                if tx_byte_counter - 1 = k then
+                    byte_to_send <= packed_bits(8 * k + 7 downto 8 * k);
+                end if;
+            end loop;
         else
             packet_index := (tx_byte_counter - 1) / 6;  -- Qual estado (0-4)
             byte_index   := (tx_byte_counter - 1) mod 6; -- Qual byte do estado (0-5)
@@ -150,20 +193,41 @@ begin
     --------------------------------------------------------------------------
     -- Instância do transmissor UART
     --------------------------------------------------------------------------
-    uart_tx_inst : entity work.UartTX
-    generic map(
-        DATA_WIDTH      => 8,
-        START_BIT       => '0',
-        STOP_BIT        => '1'
-    )
-    port map(
-        sysclk          => sysclk,
-        reset_n         => reset_n,
-        start_i         => uart_start,
-        baudrate_i      => baud_divisor_sig,
-        data_i          => byte_to_send,
-        tx_o            => tx_o,
-        tx_done_o       => uart_done
-    );
+    Int_Uart_Gen: if not FRACTIONAL_BAUD generate
+        uart_tx_inst : entity work.UartTX
+        generic map(
+            DATA_WIDTH      => 8,
+            START_BIT       => '0',
+            STOP_BIT        => '1'
+        )
+        port map(
+            sysclk          => sysclk,
+            reset_n         => reset_n,
+            start_i         => uart_start,
+            baudrate_i      => baud_divisor_sig,
+            data_i          => byte_to_send,
+            tx_o            => tx_o,
+            tx_done_o       => uart_done
+        );
+    end generate;
+
+    Frac_Uart_Gen: if FRACTIONAL_BAUD generate
+        uart_tx_inst : entity work.FracUartTX
+        generic map(
+            CLK_FREQ        => CLK_FREQ,
+            BAUD_RATE       => BAUD_RATE,
+            DATA_WIDTH      => 8,
+            START_BIT       => '0',
+            STOP_BIT        => '1'
+        )
+        port map(
+            sysclk          => sysclk,
+            reset_n         => reset_n,
+            start_i         => uart_start,
+            data_i          => byte_to_send,
+            tx_o            => tx_o,
+            tx_done_o       => uart_done
+        );
+    end generate;
 
 end architecture rtl;
\ No newline at end of file
@@ -0,0 +1,321 @@
+--! \file		ScheduledSerialManager.vhd
+--!
+--! \brief		Serial manager with a per-state send schedule (decimation)
+--!
+--! \author		Vinícius de Carvalho Monteiro Longo (longo.vinicius@gmail.com)
+--! \date       19-10-2026
+--!
+--! \version    1.1
+--!
+--! \copyright	Copyright (c) 2026 - All Rights reserved.
+--!
+--! \note		Target devices : No specific target
+--! \note		Tool versions  : No specific tool
+--! \note		Dependencies   : SolverPkg, UartTX, FracUartTX
+--!
+--! \ingroup	None
+--! \warning	None
+--!
+--! \note		Revisions:
+--!				- 1.0	19-10-2026	<longo.vinicius@gmail.com>
+--!				First revision.
+--!				- 1.1	19-10-2026	<longo.vinicius@gmail.com>
+--!				Byte 'disparo' no quadro de dados: seq só conta quadros enviados.
+--!
+--! Formato dos quadros (little-endian):
+--!   Dados     : 0xFC | seq | disparo | 6 bytes por estado agendado (42 bits + 6 zeros)
+--!   Descritor : 0xFD | N | decimação(0..N-1) | L | intervalo_us (2 bytes) | XOR dos bytes 1..N+4
+--! O estado i vai no quadro seq se STATE_DECIMATION(i) > 0 e seq mod STATE_DECIMATION(i) = 0.
+--! L = MMC das decimações não nulas e seq conta os quadros enviados, de 0 ao maior
+--! múltiplo de L que cabe em um byte: a agenda segue completa mesmo quando disparos
+--! chegam com o FSM ocupado (quadro mais longo que SEND_INTERVAL_US), e os saltos de
+--! seq no host são só quadros perdidos no enlace. 'disparo' conta todos os disparos de
+--! SEND_INTERVAL_US (mod 256), atendidos ou não, e dá a base de tempo do quadro.
+--! A cada DESCRIPTOR_INTERVAL quadros o descritor substitui o quadro de dados (seq
+--! avança do mesmo jeito), para o host poder sincronizar a qualquer momento.
+
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+package ScheduledSerialPkg is
+
+    constant SCHED_N_STATES : integer := 5;
+    type decimation_array_t is array (0 to SCHED_N_STATES - 1) of natural;
+
+    function schedule_length(decimation : decimation_array_t) return natural;
+
+end package ScheduledSerialPkg;
+
+package body ScheduledSerialPkg is
+
+    -- MMC das decimações não nulas (1 se nenhum estado for enviado)
+    function schedule_length(decimation : decimation_array_t) return natural is
+        variable length : natural := 1;
+        variable a, b, r : natural;
+    begin
+        for i in decimation'range loop
+            if decimation(i) > 0 then
+                a := length;
+                b := decimation(i);
+                while b /= 0 loop
+                    r := a mod b;
+                    a := b;
+                    b := r;
+                end loop;
+                length := (length / a) * decimation(i);
+            end if;
+        end loop;
+        return length;
+    end function;
+
+end package body ScheduledSerialPkg;
+
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+use work.SolverPkg.all;
+use work.ScheduledSerialPkg.all;
+
+entity ScheduledSerialManager is
+    generic (
+        CLK_FREQ            : integer := 200_000_000;
+        SEND_INTERVAL_US    : integer := 50;
+        BAUD_RATE           : integer := 1_042_000;
+        STATE_DECIMATION    : decimation_array_t := (1, 1, 1, 1, 1); -- 0 = estado não enviado
+        DESCRIPTOR_INTERVAL : integer := 1000;                     -- Disparos entre descritores
+        FRACTIONAL_BAUD     : boolean := false                     -- true: FracUartTX (baud exato por acumulador)
+    );
+    port (
+        sysclk              : in std_logic;
+        reset_n             : in std_logic;
+        states_data_i       : in vector_fp_t(0 to SCHED_N_STATES - 1);
+        tx_o                : out std_logic
+    );
+end entity ScheduledSerialManager;
+
+architecture rtl of ScheduledSerialManager is
+
+--------------------------------------------------------------------------
+-- Constants
+--------------------------------------------------------------------------
+    constant SEND_INTERVAL_CYCLES : integer := (CLK_FREQ / 1_000_000) * SEND_INTERVAL_US;
+    constant BAUD_DIVISOR_C       : integer := (CLK_FREQ / BAUD_RATE) - 1;
+    constant DATA_HEADER          : std_logic_vector(7 downto 0) := x"FC";
+    constant DESCRIPTOR_HEADER    : std_logic_vector(7 downto 0) := x"FD";
+    constant SCHEDULE_LEN         : natural := schedule_length(STATE_DECIMATION);
+    constant SEQUENCE_LEN         : natural := SCHEDULE_LEN * (256 / SCHEDULE_LEN);
+    constant DESCRIPTOR_BYTES     : integer := SCHED_N_STATES + 6;       -- 11 para 5 estados
+    constant DATA_BYTES_MAX       : integer := 3 + SCHED_N_STATES * 6;   -- 33 para 5 estados
+    constant FRAME_BYTES_MAX      : integer := DATA_BYTES_MAX;
+
+    type byte_array_t is array (0 to FRAME_BYTES_MAX - 1) of std_logic_vector(7 downto 0);
+
+    function byte_of(value : natural) return std_logic_vector is
+    begin
+        return std_logic_vector(to_unsigned(value mod 256, 8));
+    end function;
+
+    -- Descritor fixo, montado na elaboração
+    function build_descriptor return byte_array_t is
+        variable frame    : byte_array_t := (others => (others => '0'));
+        variable checksum : std_logic_vector(7 downto 0) := (others => '0');
+    begin
+        frame(0) := DESCRIPTOR_HEADER;
+        frame(1) := byte_of(SCHED_N_STATES);
+        for i in 0 to SCHED_N_STATES - 1 loop
+            frame(2 + i) := byte_of(STATE_DECIMATION(i));
+        end loop;
+        frame(SCHED_N_STATES + 2) := byte_of(SCHEDULE_LEN);
+        frame(SCHED_N_STATES + 3) := byte_of(SEND_INTERVAL_US);
+        frame(SCHED_N_STATES + 4) := byte_of(SEND_INTERVAL_US / 256);
+        for k in 1 to SCHED_N_STATES + 4 loop
+            checksum := checksum xor frame(k);
+        end loop;
+        frame(SCHED_N_STATES + 5) := checksum;
+        return frame;
+    end function;
+
+    constant DESCRIPTOR_C         : byte_array_t := build_descriptor;
+
+    -- Estado 'state' agendado no quadro 'seq'
+    function is_scheduled(seq : natural; state : natural) return boolean is
+    begin
+        if STATE_DECIMATION(state) = 0 then
+            return false;
+        end if;
+        return (seq mod STATE_DECIMATION(state)) = 0;
+    end function;
+
+--------------------------------------------------------------------------
+-- Signals
+--------------------------------------------------------------------------
+    type state_t is (S_IDLE, S_LATCH_DATA, S_SEND_BYTE, S_WAIT_DONE);
+    signal fsm_state              : state_t := S_IDLE;
+
+    signal timer_ctr              : integer range 0 to SEND_INTERVAL_CYCLES - 1 := 0;
+    signal send_trigger           : std_logic := '0';
+    signal trigger_ctr            : integer range 0 to 255 := 0;
+    signal seq_ctr                : integer range 0 to SEQUENCE_LEN - 1 := 0;
+    signal descriptor_ctr         : integer range 0 to DESCRIPTOR_INTERVAL - 1 := 0;  -- Quadros entre descritores
+    signal frame_buf              : byte_array_t := (others => (others => '0'));
+    signal frame_len              : integer range 1 to FRAME_BYTES_MAX := 1;
+    signal tx_byte_counter        : integer range 0 to FRAME_BYTES_MAX - 1 := 0;
+    signal byte_to_send           : std_logic_vector(7 downto 0);
+    signal uart_start             : std_logic := '0';
+    signal uart_done              : std_logic;
+    signal baud_divisor_sig       : std_logic_vector(15 downto 0);
+
+begin
+
+    assert SCHEDULE_LEN <= 255
+        report "ScheduledSerialManager: MMC das decimações deve caber em um byte" severity failure;
+    assert SEND_INTERVAL_US < 65536
+        report "ScheduledSerialManager: SEND_INTERVAL_US deve caber em 16 bits" severity failure;
+
+    baud_divisor_sig <= std_logic_vector(to_unsigned(BAUD_DIVISOR_C, 16));
+
+    --------------------------------------------------------------------------
+    -- Timer periódico para disparar transmissões
+    -- trigger_ctr conta todos os disparos, inclusive os que chegam com o FSM
+    -- ocupado; no S_LATCH_DATA ele já identifica o disparo atendido.
+    --------------------------------------------------------------------------
+    Periodic_Trigger_Process: process(sysclk)
+    begin
+        if rising_edge(sysclk) then
+            if reset_n = '0' then
+                timer_ctr <= 0;
+                send_trigger <= '0';
+                trigger_ctr <= 0;
+            else
+                send_trigger <= '0';
+                if timer_ctr < SEND_INTERVAL_CYCLES - 1 then
+                    timer_ctr <= timer_ctr + 1;
+                else
+                    timer_ctr <= 0;
+                    send_trigger <= '1';
+                    trigger_ctr <= (trigger_ctr + 1) mod 256;
+                end if;
+            end if;
+        end if;
+    end process;
+
+    --------------------------------------------------------------------------
+    -- Máquina de estados principal
+    --------------------------------------------------------------------------
+    Sequencer_FSM: process(sysclk)
+        variable idx : integer range 0 to FRAME_BYTES_MAX;
+    begin
+        if rising_edge(sysclk) then
+            if reset_n = '0' then
+                fsm_state <= S_IDLE;
+                tx_byte_counter <= 0;
+                uart_start <= '0';
+                seq_ctr <= 0;
+                descriptor_ctr <= 0;
+            else
+                case fsm_state is
+                    when S_IDLE =>
+                        uart_start <= '0';
+                        if send_trigger = '1' then
+                            fsm_state <= S_LATCH_DATA;
+                        end if;
+
+                    when S_LATCH_DATA =>
+                        if descriptor_ctr < DESCRIPTOR_INTERVAL - 1 then
+                            descriptor_ctr <= descriptor_ctr + 1;
+                        else
+                            descriptor_ctr <= 0;
+                        end if;
+
+                        if descriptor_ctr = 0 then
+                            -- Descritor no lugar do quadro de dados deste disparo
+                            frame_buf <= DESCRIPTOR_C;
+                            frame_len <= DESCRIPTOR_BYTES;
+                        else
+                            frame_buf(0) <= DATA_HEADER;
+                            frame_buf(1) <= byte_of(seq_ctr);
+                            frame_buf(2) <= byte_of(trigger_ctr);
+                            idx := 3;
+                            for i in 0 to SCHED_N_STATES - 1 loop
+                                if is_scheduled(seq_ctr, i) then
+                                    for b in 0 to 4 loop
+                                        frame_buf(idx + b) <= states_data_i(i)(8 * b + 7 downto 8 * b);
+                                    end loop;
+                                    frame_buf(idx + 5) <= "000000" & states_data_i(i)(41 downto 40);
+                                    idx := idx + 6;
+                                end if;
+                            end loop;
+                            frame_len <= idx;
+                        end if;
+
+                        if seq_ctr < SEQUENCE_LEN - 1 then
+                            seq_ctr <= seq_ctr + 1;
+                        else
+                            seq_ctr <= 0;
+                        end if;
+                        tx_byte_counter <= 0;
+                        fsm_state <= S_SEND_BYTE;
+
+                    when S_SEND_BYTE =>
+                        uart_start <= '1';
+                        fsm_state <= S_WAIT_DONE;
+
+                    when S_WAIT_DONE =>
+                        uart_start <= '0';
+                        if uart_done = '1' then
+                            if tx_byte_counter < frame_len - 1 then
+                                tx_byte_counter <= tx_byte_counter + 1;
+                                fsm_state <= S_SEND_BYTE;
+                            else
+                                fsm_state <= S_IDLE;
+                            end if;
+                        end if;
+                end case;
+            end if;
+        end if;
+    end process;
+
+    byte_to_send <= frame_buf(tx_byte_counter);
+
+    --------------------------------------------------------------------------
+    -- Instância do transmissor UART
+    --------------------------------------------------------------------------
+    Int_Uart_Gen: if not FRACTIONAL_BAUD generate
+        uart_tx_inst : entity work.UartTX
+        generic map(
+            DATA_WIDTH      => 8,
+            START_BIT       => '0',
+            STOP_BIT        => '1'
+        )
+        port map(
+            sysclk          => sysclk,
+            reset_n         => reset_n,
+            start_i         => uart_start,
+            baudrate_i      => baud_divisor_sig,
+            data_i          => byte_to_send,
+            tx_o            => tx_o,
+            tx_done_o       => uart_done
+        );
+    end generate;
+
+    Frac_Uart_Gen: if FRACTIONAL_BAUD generate
+        uart_tx_inst : entity work.FracUartTX
+        generic map(
+            CLK_FREQ        => CLK_FREQ,
+            BAUD_RATE       => BAUD_RATE,
+            DATA_WIDTH      => 8,
+            START_BIT       => '0',
+            STOP_BIT        => '1'
+        )
+        port map(
+            sysclk          => sysclk,
+            reset_n         => reset_n,
+            start_i         => uart_start,
+            data_i          => byte_to_send,
+            tx_o            => tx_o,
+            tx_done_o       => uart_done
+        );
+    end generate;
+
+end architecture rtl;
@@ -29,7 +29,8 @@ entity SerialManager is
     generic (
         CLK_FREQ          : integer := 100_000_000;
         SEND_INTERVAL_US  : integer := 200;
-        BAUD_RATE         : integer := 1_042_000
+        BAUD_RATE         : integer := 1_042_000;
+        FRACTIONAL_BAUD   : boolean := false  -- true: FracUartTX (baud exato por acumulador)
     );
     port (
         sysclk            : in std_logic;
@@ -138,20 +139,41 @@ begin
     --------------------------------------------------------------------------
     -- Uart TX Instantiation
     --------------------------------------------------------------------------
-    uart_tx_inst : entity work.UartTX
-    generic map(
-        DATA_WIDTH      => 8,
-        START_BIT       => '0',
-        STOP_BIT        => '1'
-    )
-    port map(
-        sysclk          => sysclk,
-        reset_n         => reset_n,
-        start_i         => uart_start,
-        baudrate_i      => baud_divisor_sig, 
-        data_i          => byte_to_send,
-        tx_o            => tx_o,
-        tx_done_o       => uart_done
-    );
+    Int_Uart_Gen: if not FRACTIONAL_BAUD generate
+        uart_tx_inst : entity work.UartTX
+        generic map(
+            DATA_WIDTH      => 8,
+            START_BIT       => '0',
+            STOP_BIT        => '1'
+        )
+        port map(
+            sysclk          => sysclk,
+            reset_n         => reset_n,
+            start_i         => uart_start,
+            baudrate_i      => baud_divisor_sig, 
+            data_i          => byte_to_send,
+            tx_o            => tx_o,
+            tx_done_o       => uart_done
+        );
+    end generate;
+
+    Frac_Uart_Gen: if FRACTIONAL_BAUD generate
+        uart_tx_inst : entity work.FracUartTX
+        generic map(
+            CLK_FREQ        => CLK_FREQ,
+            BAUD_RATE       => BAUD_RATE,
+            DATA_WIDTH      => 8,
+            START_BIT       => '0',
+            STOP_BIT        => '1'
+        )
+        port map(
+            sysclk          => sysclk,
+            reset_n         => reset_n,
+            start_i         => uart_start,
+            data_i          => byte_to_send,
+            tx_o            => tx_o,
+            tx_done_o       => uart_done
+        );
+    end generate;
 
 end architecture rtl;
\ No newline at end of file
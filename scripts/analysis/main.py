@@ -9,6 +9,13 @@ def get_script_directory():
     """
     return os.path.dirname(os.path.abspath(__file__))
 
+def _importar_src():
+    """Torna importáveis os módulos de analysis/src."""
+    import sys
+    src_dir = os.path.join(get_script_directory(), 'src')
+    if src_dir not in sys.path:
+        sys.path.insert(0, src_dir)
+
 def carregar_ajustes_fase():
     """
     Carrega os ajustes de fase salvos do arquivo ajustes_fase.txt
@@ -141,6 +148,13 @@ def sincronizar_e_interpolar(t_ref: np.ndarray, y_ref: np.ndarray,
     t_common = t_ref[mask_ref]
     y_ref_c = y_ref[mask_ref]
 
+    # Teste uniforme (FPGA): interpolação limitada em banda (atraso fracionário)
+    _importar_src()
+    from resampler import amostragem_uniforme, interpolar_sinc
+    uniforme = amostragem_uniforme(t_tst)
+    if uniforme is not None:
+        return t_common, y_ref_c, interpolar_sinc(uniforme[0], uniforme[1], y_tst, t_common)
+
     # Garante monotonicidade antes da interpolação
     order = np.argsort(t_tst)
     t_tst_sorted = t_tst[order]
@@ -250,11 +264,94 @@ def calcular_metricas(time_s: np.ndarray, ref: np.ndarray, tst: np.ndarray):
         'f0_est_hz': float(f0) if np.isfinite(f0) else np.nan,
     }
 
-def plotar_comparativo_lite():
+def carregar_dump_rtl(arquivo_rtl, taxa_amostragem):
+    """
+    Lê um dump da simulação RTL (GHDL) via src/rtl_dump.py e devolve
+    {variavel: DataFrame(Time, DadoReal)} no mesmo formato dos CSVs da FPGA.
+    """
+    _importar_src()
+    import rtl_dump
+
+    mapa_estados = {'il1': 'IL1', 'ild': 'ILd', 'il2': 'IL2', 'vcf': 'VCf', 'vcd': 'VCd'}
+    por_estado = rtl_dump.para_dataframes(arquivo_rtl, taxa_amostragem)
+    return {var: por_estado[nome] for var, nome in mapa_estados.items() if nome in por_estado}
+
+def _etapa_psim(psim_filename, colunas_psim, taxa_amostragem):
+    """
+    Leitura do PSIM, detecção do regime e subamostragem para a taxa da FPGA.
+    Retorna o PSIM subamostrado e as informações do regime (etapa 'psim' do cache).
+    """
+    _importar_src()
+    from steady_state import inicio_comum, segmentos_por_variavel
+    from resampler import decimar_para_intervalo
+
+    psim_df = carregar_dados_chunked(psim_filename)
+    if 'Time' not in psim_df.columns:
+        raise ValueError('Arquivo PSIM sem coluna Time.')
+    tempo_final_psim = float(psim_df['Time'].iloc[-1])
+    # Regime permanente detectado por ciclo; a janela comum começa quando todas as variáveis assentaram
+    colunas_psim = [c for c in colunas_psim if c in psim_df.columns]
+    segmentos_psim = segmentos_por_variavel(psim_df, colunas_psim)
+    tempo_inicio_ss = inicio_comum(segmentos_psim) if segmentos_psim else float(psim_df['Time'].iloc[0])
+    psim_ss_original = psim_df[psim_df['Time'] >= tempo_inicio_ss].copy().reset_index(drop=True)
+    del psim_df
+
+    # Subamostragem (FIR polifásico sem atraso; pandas só se o passo do PSIM não for uniforme)
+    colunas_dados = [c for c in psim_ss_original.columns if c != 'Time']
+    try:
+        t_dec, y_dec = decimar_para_intervalo(psim_ss_original['Time'].to_numpy(float),
+                                              psim_ss_original[colunas_dados].to_numpy(float),
+                                              taxa_amostragem)
+        psim_ss = pd.DataFrame(y_dec, columns=colunas_dados)
+        psim_ss.insert(0, 'Time', t_dec)
+    except ValueError as e:
+        print(f"  {e} Usando média por janela do pandas.")
+        psim_resample = psim_ss_original.copy()
+        psim_resample['Time'] = pd.to_timedelta(psim_resample['Time'], unit='s')
+        psim_resample = psim_resample.set_index('Time')
+        freq_str = f"{int(taxa_amostragem * 1e6)}us"  # ex: '25us'
+        psim_ss = psim_resample.resample(freq_str).mean().reset_index()
+        psim_ss['Time'] = psim_ss['Time'].dt.total_seconds()
+
+    return {
+        'psim_ss': psim_ss,
+        'tempo_inicio_ss': float(tempo_inicio_ss),
+        'tempo_final_psim': tempo_final_psim,
+        'pontos_originais': len(psim_ss_original),
+        'regimes': {c: {'t_inicio': float(seg.t_inicio), 'ciclos': int(seg.ciclos), 'convergiu': bool(seg.convergiu)}
+                    for c, seg in segmentos_psim.items()},
+    }
+
+def _etapa_fpga(df_fpga, var):
+    """Descarta o transitório inicial da captura (etapa 'fpga' do cache)."""
+    _importar_src()
+    from steady_state import detectar_estado_estacionario
+
+    if 'DadoReal' not in df_fpga.columns:
+        raise ValueError(f"Arquivo FPGA sem coluna 'DadoReal' para {var}.")
+    pontos = len(df_fpga)
+    seg_fpga = detectar_estado_estacionario(df_fpga['Time'].to_numpy(float), df_fpga['DadoReal'].to_numpy(float))
+    if seg_fpga.indice_inicio > 0:
+        df_fpga = df_fpga.iloc[seg_fpga.indice_inicio:].reset_index(drop=True)
+    return {
+        'dados': df_fpga[['Time', 'DadoReal']],
+        'pontos_originais': pontos,
+        'indice_inicio': int(seg_fpga.indice_inicio),
+        't_inicio': float(seg_fpga.t_inicio),
+    }
+
+def plotar_comparativo_lite(arquivo_rtl=None, usar_cache=True):
     """
     Versão lite que realiza subamostragem do PSIM para a taxa da FPGA,
     proporcionando comparação justa (mesmo passo temporal) e mostrando
     simultaneamente PSIM original, PSIM subamostrado e FPGA.
+
+    Com 'arquivo_rtl', os dados da FPGA vêm do dump da simulação RTL
+    (texto/binário/VCD) em vez dos CSVs capturados pela serial.
+
+    As etapas ficam no cache de src/stage_cache.py, chaveadas pelo conteúdo
+    dos arquivos e pelos parâmetros: sem mudanças, nada é recalculado; mudar
+    o ajuste de fase de uma variável refaz só a interpolação e as métricas dela.
     """
     # --- 1. Diretórios ---
     script_dir = get_script_directory()
@@ -268,12 +365,14 @@ def plotar_comparativo_lite():
     psim_filename = os.path.join(data_dir, 'psim_1us_sc.csv')
     variaveis = ['vcf', 'vcd', 'il1', 'il2', 'ild']
     taxa_amostragem_fpga = 25e-6  # 25 microsegundos
-    DURACAO_ESTADO_ESTACIONARIO = 0.08  # 80 ms finais
     mapa_colunas_psim = {'vcf': 'VCf', 'vcd': 'VCd', 'il1': 'IL1_1', 'il2': 'IL2_1', 'ild': 'ILd'}
     unidades = {'vcf': 'V', 'vcd': 'V', 'il1': 'A', 'il2': 'A', 'ild': 'A'}
 
     # --- 4. Verificação básica ---
-    arquivos_necessarios = [psim_filename] + [os.path.join(data_dir, f'dados_fpga_{v}_25us.csv') for v in variaveis]
+    if arquivo_rtl:
+        arquivos_necessarios = [psim_filename, arquivo_rtl]
+    else:
+        arquivos_necessarios = [psim_filename] + [os.path.join(data_dir, f'dados_fpga_{v}_25us.csv') for v in variaveis]
     faltantes = [a for a in arquivos_necessarios if not os.path.exists(a)]
     if faltantes:
         print('ERRO: Arquivos ausentes:')
@@ -282,34 +381,43 @@ def plotar_comparativo_lite():
         return
 
     # --- 5. Carregamento + Subamostragem do PSIM ---
+    _importar_src()
+    from stage_cache import CacheEtapas
+    arquivos_codigo = [os.path.abspath(__file__)] + [os.path.join(script_dir, 'src', m)
+                                                     for m in ('steady_state.py', 'resampler.py', 'rtl_dump.py')]
+    cache = CacheEtapas(ativo=usar_cache, arquivos_codigo=arquivos_codigo)
+    colunas_psim = [mapa_colunas_psim[v] for v in variaveis]
+
     print('\nCarregando dados PSIM (alta resolução)...')
     try:
-        psim_df = carregar_dados_chunked(psim_filename)
-        if 'Time' not in psim_df.columns:
-            print('ERRO: Arquivo PSIM sem coluna Time.')
-            return
-        tempo_final_psim = float(psim_df['Time'].iloc[-1])
-        tempo_inicio_ss = tempo_final_psim - DURACAO_ESTADO_ESTACIONARIO
-        psim_ss_original = psim_df[psim_df['Time'] >= tempo_inicio_ss].copy().reset_index(drop=True)
-        del psim_df
-        print(f"PSIM original carregado: {len(psim_ss_original)} pontos")
-
-        # Subamostragem
-        print(f"Subamostrando PSIM para passo {taxa_amostragem_fpga*1e6:.0f}µs ...")
-        psim_resample = psim_ss_original.copy()
-        psim_resample['Time'] = pd.to_timedelta(psim_resample['Time'], unit='s')
-        psim_resample = psim_resample.set_index('Time')
-        freq_str = f"{int(taxa_amostragem_fpga * 1e6)}us"  # ex: '25us'
-        psim_ss = psim_resample.resample(freq_str).mean().reset_index()
-        psim_ss['Time'] = psim_ss['Time'].dt.total_seconds()
-        print(f"PSIM subamostrado: {len(psim_ss)} pontos")
+        chave_psim = cache.chave('psim', cache.hash_arquivo(psim_filename), colunas_psim, taxa_amostragem_fpga)
+        etapa_psim = cache.obter(chave_psim, lambda: _etapa_psim(psim_filename, colunas_psim, taxa_amostragem_fpga))
+        for coluna, seg in etapa_psim['regimes'].items():
+            situacao = '' if seg['convergiu'] else ' (não assentou; janela final padrão)'
+            print(f"  Regime {coluna}: a partir de {seg['t_inicio']:.4f}s ({seg['ciclos']} ciclos){situacao}")
+        psim_ss = etapa_psim['psim_ss']
+        tempo_inicio_ss = etapa_psim['tempo_inicio_ss']
+        tempo_final_psim = etapa_psim['tempo_final_psim']
+        print(f"PSIM original carregado: {etapa_psim['pontos_originais']} pontos")
+        print(f"PSIM subamostrado para passo {taxa_amostragem_fpga*1e6:.0f}µs: {len(psim_ss)} pontos")
     except Exception as e:
         print(f"Erro ao carregar ou subamostrar PSIM: {e}")
         return
 
     # --- 6. Processamento das variáveis ---
     resultados_sync = {}
-    variaveis_processadas = [v for v in variaveis if os.path.exists(os.path.join(data_dir, f'dados_fpga_{v}_25us.csv')) and mapa_colunas_psim[v] in psim_ss.columns]
+    dados_rtl = None
+    if arquivo_rtl:
+        print(f"\nCarregando dump RTL: {arquivo_rtl}")
+        try:
+            chave_rtl = cache.chave('rtl', cache.hash_arquivo(arquivo_rtl), taxa_amostragem_fpga)
+            dados_rtl = cache.obter(chave_rtl, lambda: carregar_dump_rtl(arquivo_rtl, taxa_amostragem_fpga))
+        except Exception as e:
+            print(f"Erro ao carregar dump RTL: {e}")
+            return
+        variaveis_processadas = [v for v in variaveis if v in dados_rtl and mapa_colunas_psim[v] in psim_ss.columns]
+    else:
+        variaveis_processadas = [v for v in variaveis if os.path.exists(os.path.join(data_dir, f'dados_fpga_{v}_25us.csv')) and mapa_colunas_psim[v] in psim_ss.columns]
     if not variaveis_processadas:
         print('ERRO: Nenhuma variável válida encontrada.')
         return
@@ -323,34 +431,51 @@ def plotar_comparativo_lite():
     for i, var in enumerate(variaveis_processadas):
         print(f"\nProcessando '{var.upper()}' ...")
         try:
-            # Carrega FPGA
-            fpga_path = os.path.join(data_dir, f'dados_fpga_{var}_25us.csv')
-            df_fpga = carregar_dados_chunked(fpga_path, sep=';', decimal=',')
-            if 'DadoReal' not in df_fpga.columns:
-                print(f"  ERRO: Arquivo FPGA sem coluna 'DadoReal' para {var}.")
-                continue
-            df_fpga['Time'] = df_fpga.index * taxa_amostragem_fpga
-            print(f"  FPGA carregado: {len(df_fpga)} pontos")
+            # Carrega FPGA (CSV da serial ou dump RTL) e descarta o transitório inicial
+            coluna_psim = mapa_colunas_psim[var]
+            if dados_rtl is not None:
+                chave_fpga = cache.chave('fpga', chave_rtl, var)
+                carregar_fpga = lambda: _etapa_fpga(dados_rtl[var].copy(), var)
+            else:
+                fpga_path = os.path.join(data_dir, f'dados_fpga_{var}_25us.csv')
+                chave_fpga = cache.chave('fpga', cache.hash_arquivo(fpga_path), var, taxa_amostragem_fpga)
+
+                def carregar_fpga():
+                    df = carregar_dados_chunked(fpga_path, sep=';', decimal=',')
+                    df['Time'] = df.index * taxa_amostragem_fpga
+                    return _etapa_fpga(df, var)
+            etapa_fpga = cache.obter(chave_fpga, carregar_fpga)
+            df_fpga = etapa_fpga['dados'].copy()  # Não altera o valor guardado pela etapa
+            print(f"  FPGA carregado: {etapa_fpga['pontos_originais']} pontos")
+            if etapa_fpga['indice_inicio'] > 0:
+                print(f"  Regime FPGA a partir de {etapa_fpga['t_inicio']:.4f}s: {len(df_fpga)} pontos")
 
             # Referências para sincronização (PSIM subamostrado vs FPGA)
-            ref_psim = encontrar_pontos_referencia_simples(psim_ss['Time'], psim_ss[mapa_colunas_psim[var]])
-            ref_fpga = encontrar_pontos_referencia_simples(df_fpga['Time'], df_fpga['DadoReal'])
-            deslocamento_auto = ref_psim['tempo_zero'] - ref_fpga['tempo_zero'] if (ref_psim and ref_fpga) else 0.0
+            def buscar_referencias():
+                ref_psim = encontrar_pontos_referencia_simples(psim_ss['Time'], psim_ss[coluna_psim])
+                ref_fpga = encontrar_pontos_referencia_simples(df_fpga['Time'], df_fpga['DadoReal'])
+                return {'deslocamento_auto': float(ref_psim['tempo_zero'] - ref_fpga['tempo_zero'])
+                        if (ref_psim and ref_fpga) else 0.0}
+            chave_ref = cache.chave('referencias', chave_psim, chave_fpga, coluna_psim)
+            deslocamento_auto = cache.obter(chave_ref, buscar_referencias)['deslocamento_auto']
             ajuste_manual = ajustes_fase.get(var, 0.0)
             deslocamento_total = deslocamento_auto + ajuste_manual
             df_fpga['Time_Aligned'] = df_fpga['Time'] + deslocamento_total
 
             # Interpolação / Métricas (agora passos próximos/iguais)
-            t_common, y_ref_c, y_tst_i = sincronizar_e_interpolar(
-                psim_ss['Time'].to_numpy(float),
-                psim_ss[mapa_colunas_psim[var]].to_numpy(float),
-                df_fpga['Time_Aligned'].to_numpy(float),
-                df_fpga['DadoReal'].to_numpy(float)
-            )
-
-            metrics = None
-            if t_common is not None and len(t_common) > 1:
-                metrics = calcular_metricas(t_common, y_ref_c, y_tst_i)
+            def interpolar_e_medir():
+                t_common, y_ref_c, y_tst_i = sincronizar_e_interpolar(
+                    psim_ss['Time'].to_numpy(float),
+                    psim_ss[coluna_psim].to_numpy(float),
+                    df_fpga['Time_Aligned'].to_numpy(float),
+                    df_fpga['DadoReal'].to_numpy(float)
+                )
+                if t_common is None or len(t_common) <= 1:
+                    return {'metricas': None}
+                return {'metricas': calcular_metricas(t_common, y_ref_c, y_tst_i)}
+            chave_metricas = cache.chave('metricas', chave_psim, chave_fpga, coluna_psim, float(deslocamento_total))
+            metrics = cache.obter(chave_metricas, interpolar_e_medir)['metricas']
+            if metrics is not None:
                 print('  [Métricas (Subamostrado)]')
                 print(f"    NRMSE: {metrics['nrmse_pct']:.2f}% | Corr: {metrics['corr']:.4f} | Ganho: {metrics['amp_ratio']:.4f}")
                 print(f"    RMS (PSIM/FPGA): {metrics['rms_ref']:.3f}/{metrics['rms_tst']:.3f} {unidades.get(var,'')}")
@@ -421,6 +546,18 @@ def plotar_comparativo_lite():
             print('Falha ao salvar CSV:', e)
 
     print(f"\nGráfico salvo em: {out_png}")
+    print(cache.resumo().capitalize())
 
 if __name__ == '__main__':
-    plotar_comparativo_lite()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Comparativo PSIM vs FPGA (ou simulação RTL).')
+    parser.add_argument('--rtl', help='dump de estados da simulação RTL (texto, .npy/.bin ou .vcd) no lugar dos CSVs da FPGA')
+    parser.add_argument('--sem-cache', action='store_true', help='recalcula todas as etapas sem usar data/.cache')
+    parser.add_argument('--limpar-cache', action='store_true', help='apaga data/.cache antes de executar')
+    args = parser.parse_args()
+    if args.limpar_cache:
+        _importar_src()
+        from stage_cache import CacheEtapas
+        CacheEtapas().limpar()
+    plotar_comparativo_lite(args.rtl, usar_cache=not args.sem_cache)
@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+"""
+CATÁLOGO persistente (SQLite) das capturas da pasta data/.
+
+Indexa cada arquivo com seus metadados (variável, intervalo de amostragem,
+sessão, data, parâmetros do bitstream), estatísticas por estado e a localização
+de uma pirâmide min/max para visualização rápida. Assim, selecionar capturas
+por parâmetros ou data e comparar sessões não exige abrir todos os arquivos.
+
+Metadados vêm, em ordem de prioridade, de um arquivo lateral '<captura>.json',
+do nome do arquivo (dados_fpga_{var}_{N}us.csv) e da data de modificação.
+
+Exemplos:
+    python capture_catalog.py indexar
+    python capture_catalog.py indexar --hil-top ../../../HIL_TOP.vhd
+    python capture_catalog.py listar --variavel il2 --param SIMUL_PERIOD=1e-7
+    python capture_catalog.py comparar --variavel il2 --estatistica rms
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+
+import numpy as np
+
+BITS_FRACIONARIOS = 28
+FATOR_PIRAMIDE = 4          # Redução entre níveis da pirâmide min/max
+MIN_PONTOS_PIRAMIDE = 1024  # Último nível tem no máximo este número de pontos
+EXTENSOES_CAPTURA = ('.csv', '.hilz')
+PADRAO_NOME_FPGA = re.compile(r'dados_fpga_(?P<var>[a-z0-9]+)_(?P<us>\d+)us', re.IGNORECASE)
+COLUNAS_TEMPO = ('Time', 'Tempo_s')
+COLUNAS_IGNORADAS = COLUNAS_TEMPO + ('DadoBrutoInt_ComSinal',)
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS capturas (
+    id              INTEGER PRIMARY KEY,
+    caminho         TEXT UNIQUE NOT NULL,
+    tamanho         INTEGER,
+    mtime           REAL,
+    formato         TEXT,
+    variavel        TEXT,
+    num_estados     INTEGER,
+    num_amostras    INTEGER,
+    intervalo_s     REAL,
+    sessao          TEXT,
+    data_captura    TEXT,
+    piramide        TEXT,
+    indexado_em     TEXT
+);
+CREATE TABLE IF NOT EXISTS estatisticas (
+    captura_id      INTEGER REFERENCES capturas(id) ON DELETE CASCADE,
+    estado          TEXT,
+    minimo          REAL,
+    maximo          REAL,
+    media           REAL,
+    rms             REAL,
+    desvio          REAL,
+    p2p             REAL
+);
+CREATE TABLE IF NOT EXISTS parametros (
+    captura_id      INTEGER REFERENCES capturas(id) ON DELETE CASCADE,
+    chave           TEXT,
+    valor           TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_capturas_variavel ON capturas(variavel);
+CREATE INDEX IF NOT EXISTS idx_capturas_data ON capturas(data_captura);
+CREATE INDEX IF NOT EXISTS idx_estatisticas_captura ON estatisticas(captura_id);
+CREATE INDEX IF NOT EXISTS idx_parametros_chave ON parametros(chave, valor);
+"""
+
+
+def get_script_directory():
+    """
+    Retorna o diretório onde está localizado este script
+    """
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def parametros_hil_top(caminho_vhd):
+    """
+    Extrai as constantes numéricas do HIL_TOP.vhd (CLK_FREQ, SIMUL_PERIOD,
+    SERIAL_BAUD_RATE, L1, Cf, ...) para registrar com que bitstream a
+    captura foi feita.
+    """
+    padrao = re.compile(r'^\s*constant\s+(\w+)\s*:\s*(integer|real|boolean)\s*:=\s*([^;]+);', re.IGNORECASE)
+    parametros = {}
+    with open(caminho_vhd, 'r', encoding='utf-8', errors='replace') as f:
+        for linha in f:
+            m = padrao.match(linha.split('--')[0])
+            if not m:
+                continue
+            nome, tipo, valor = m.group(1), m.group(2).lower(), m.group(3).strip()
+            valor = valor.replace('_', '') if tipo == 'integer' else valor
+            if re.fullmatch(r'[-+]?[\d.]+(e[-+]?\d+)?|true|false', valor, re.IGNORECASE):
+                parametros[nome] = valor.lower() if tipo == 'boolean' else valor
+    return parametros
+
+
+def normalizar_valor(valor):
+    """Representação canônica de um parâmetro (1e-7 e 1.0e-7 viram o mesmo texto)."""
+    try:
+        return repr(float(valor))
+    except (TypeError, ValueError):
+        return str(valor).lower()
+
+
+def construir_piramide(dados):
+    """
+    Pirâmide min/max: cada nível reduz por FATOR_PIRAMIDE guardando o mínimo e
+    o máximo de cada grupo, para plotar capturas longas sem perder picos.
+    Retorna um dicionário {'n{nivel}_min': array, 'n{nivel}_max': array}.
+    """
+    niveis = {}
+    minimos = maximos = dados
+    nivel = 0
+    while minimos.shape[0] > MIN_PONTOS_PIRAMIDE:
+        n = (minimos.shape[0] // FATOR_PIRAMIDE) * FATOR_PIRAMIDE
+        if n == 0:
+            break
+        minimos = minimos[:n].reshape(-1, FATOR_PIRAMIDE, dados.shape[1]).min(axis=1)
+        maximos = maximos[:n].reshape(-1, FATOR_PIRAMIDE, dados.shape[1]).max(axis=1)
+        nivel += 1
+        niveis[f'n{nivel}_min'] = minimos
+        niveis[f'n{nivel}_max'] = maximos
+    return niveis
+
+
+def _importar_storage():
+    """Importa o módulo de armazenamento compactado (.hilz) do pacote hil_serial."""
+    pasta = os.path.join(os.path.dirname(os.path.dirname(get_script_directory())), 'serial_reader', 'src')
+    if pasta not in sys.path:
+        sys.path.insert(0, pasta)
+    from hil_serial import storage
+    return storage
+
+
+def ler_captura(caminho):
+    """
+    Lê uma captura e retorna (nomes_estados, dados[amostras x estados], intervalo_s).
+    O intervalo vem da coluna de tempo (ou do cabeçalho .hilz), quando existir.
+    """
+    import pandas as pd
+
+    if caminho.lower().endswith('.hilz'):
+        with _importar_storage().LeitorCompactado(caminho) as leitor:
+            dados = leitor.ler() / 2**BITS_FRACIONARIOS
+            nomes = leitor.metadados.get('estados') or [f'Estado_{i}' for i in range(leitor.num_estados)]
+            return nomes, dados, leitor.intervalo_s
+
+    with open(caminho, 'r', encoding='utf-8', errors='replace') as f:
+        cabecalho = f.readline()
+    opcoes = {'sep': ';', 'decimal': ','} if ';' in cabecalho else {}
+    df = pd.read_csv(caminho, **opcoes)
+
+    intervalo_s = None
+    for coluna in COLUNAS_TEMPO:
+        if coluna in df.columns and len(df) > 1:
+            intervalo_s = float(np.median(np.diff(df[coluna].to_numpy(float))))
+            break
+
+    if 'DadoBrutoInt_ComSinal' in df.columns:
+        nomes = ['DadoReal']
+        dados = df[['DadoBrutoInt_ComSinal']].to_numpy(np.int64) / 2**BITS_FRACIONARIOS
+    else:
+        colunas = [c for c in df.columns if c not in COLUNAS_IGNORADAS]
+        dados = df[colunas].to_numpy(float)
+        nomes = [c[:-len('_Real')] if c.endswith('_Real') else c for c in colunas]
+    return nomes, dados, intervalo_s
+
+
+class CatalogoCapturas:
+    """
+    Índice SQLite das capturas de um diretório.
+    """
+
+    def __init__(self, caminho_db=None, pasta_dados=None):
+        script_dir = get_script_directory()
+        self.pasta_dados = pasta_dados or os.path.join(os.path.dirname(script_dir), 'data')
+        self.caminho_db = caminho_db or os.path.join(self.pasta_dados, 'catalogo.sqlite')
+        self.pasta_piramides = os.path.join(self.pasta_dados, '.piramides')
+        self.conn = sqlite3.connect(self.caminho_db)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.executescript(ESQUEMA)
+
+    def fechar(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    # --- Indexação ---
+    def _metadados(self, caminho):
+        """Combina o arquivo lateral .json, o nome do arquivo e a data de modificação."""
+        meta = {}
+        lateral = os.path.splitext(caminho)[0] + '.json'
+        if os.path.exists(lateral):
+            with open(lateral, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+        m = PADRAO_NOME_FPGA.search(os.path.basename(caminho))
+        if m:
+            meta.setdefault('variavel', m.group('var').lower())
+            meta.setdefault('intervalo_s', int(m.group('us')) * 1e-6)
+        meta.setdefault('data', datetime.fromtimestamp(os.path.getmtime(caminho)).isoformat(timespec='seconds'))
+        meta.setdefault('sessao', meta['data'][:10])
+        return meta
+
+    def _salvar_piramide(self, caminho, dados):
+        niveis = construir_piramide(dados)
+        if not niveis:
+            return None
+        os.makedirs(self.pasta_piramides, exist_ok=True)
+        relativo = os.path.relpath(caminho, self.pasta_dados)
+        nome = re.sub(r'[^\w.-]', '_', relativo) + '.npz'
+        destino = os.path.join(self.pasta_piramides, nome)
+        np.savez(destino, fator=FATOR_PIRAMIDE, **niveis)
+        return os.path.relpath(destino, self.pasta_dados)
+
+    def indexar_arquivo(self, caminho, parametros_extra=None, forcar=False):
+        """
+        Indexa (ou re-indexa, se o arquivo mudou) uma captura. parametros_extra
+        vale para qualquer captura; os 'parametros' do .json lateral sobrescrevem.
+        Retorna True se o arquivo foi processado.
+        """
+        caminho = os.path.abspath(caminho)
+        relativo = os.path.relpath(caminho, self.pasta_dados)
+        info = os.stat(caminho)
+        linha = self.conn.execute('SELECT id, tamanho, mtime FROM capturas WHERE caminho = ?',
+                                  (relativo,)).fetchone()
+        if linha and not forcar and linha['tamanho'] == info.st_size and linha['mtime'] == info.st_mtime:
+            return False
+
+        meta = self._metadados(caminho)
+        nomes, dados, intervalo_coluna = ler_captura(caminho)
+        intervalo_s = meta.get('intervalo_s') or intervalo_coluna
+        parametros = dict(parametros_extra or {})
+        parametros.update(meta.get('parametros', {}))
+
+        with self.conn:
+            if linha:
+                self.conn.execute('DELETE FROM capturas WHERE id = ?', (linha['id'],))
+            cur = self.conn.execute(
+                'INSERT INTO capturas (caminho, tamanho, mtime, formato, variavel, num_estados, '
+                'num_amostras, intervalo_s, sessao, data_captura, piramide, indexado_em) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (relativo, info.st_size, info.st_mtime, os.path.splitext(caminho)[1].lstrip('.'),
+                 meta.get('variavel'), dados.shape[1], dados.shape[0], intervalo_s,
+                 meta['sessao'], meta['data'], self._salvar_piramide(caminho, dados),
+                 datetime.now().isoformat(timespec='seconds')))
+            captura_id = cur.lastrowid
+
+            if dados.shape[0]:
+                minimo, maximo = dados.min(axis=0), dados.max(axis=0)
+                media, desvio = dados.mean(axis=0), dados.std(axis=0)
+                rms = np.sqrt(np.mean(dados**2, axis=0))
+                nomes_estados = nomes
+                if len(nomes) == 1 and meta.get('variavel'):
+                    nomes_estados = [meta['variavel']]
+                self.conn.executemany(
+                    'INSERT INTO estatisticas VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    [(captura_id, nomes_estados[i], float(minimo[i]), float(maximo[i]), float(media[i]),
+                      float(rms[i]), float(desvio[i]), float(maximo[i] - minimo[i]))
+                     for i in range(dados.shape[1])])
+            self.conn.executemany('INSERT INTO parametros VALUES (?, ?, ?)',
+                                  [(captura_id, k, normalizar_valor(v)) for k, v in parametros.items()])
+        return True
+
+    def indexar_pasta(self, pasta=None, parametros_extra=None, forcar=False):
+        """Indexa recursivamente a pasta e remove do catálogo arquivos que sumiram."""
+        pasta = pasta or self.pasta_dados
+        vistos, processados = set(), 0
+        for raiz, dirs, arquivos in os.walk(pasta):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for nome in sorted(arquivos):
+                if not nome.lower().endswith(EXTENSOES_CAPTURA):
+                    continue
+                caminho = os.path.join(raiz, nome)
+                vistos.add(os.path.relpath(caminho, self.pasta_dados))
+                try:
+                    if self.indexar_arquivo(caminho, parametros_extra, forcar):
+                        processados += 1
+                        print(f"  Indexado: {os.path.relpath(caminho, self.pasta_dados)}")
+                except Exception as e:
+                    print(f"  ERRO ao indexar {nome}: {e}")
+
+        removidos = [r['caminho'] for r in self.conn.execute('SELECT caminho FROM capturas')
+                     if r['caminho'] not in vistos
+                     and not os.path.exists(os.path.join(self.pasta_dados, r['caminho']))]
+        with self.conn:
+            self.conn.executemany('DELETE FROM capturas WHERE caminho = ?', [(c,) for c in removidos])
+        return processados, len(removidos)
+
+    # --- Consultas ---
+    def buscar(self, variavel=None, sessao=None, desde=None, ate=None, intervalo_s=None, parametros=None):
+        """
+        Seleciona capturas por metadados e parâmetros do bitstream sem abrir os arquivos.
+        'desde' e 'ate' são datas ISO (ex.: '2025-08-01').
+        """
+        sql = ['SELECT * FROM capturas c WHERE 1 = 1']
+        args = []
+        if variavel:
+            sql.append('AND c.variavel = ?')
+            args.append(variavel.lower())
+        if sessao:
+            sql.append('AND c.sessao = ?')
+            args.append(sessao)
+        if desde:
+            sql.append('AND c.data_captura >= ?')
+            args.append(desde)
+        if ate:
+            sql.append('AND c.data_captura <= ?')
+            args.append(ate if 'T' in ate else ate + 'T23:59:59')
+        if intervalo_s:
+            sql.append('AND abs(c.intervalo_s - ?) < 1e-12')
+            args.append(float(intervalo_s))
+        for chave, valor in (parametros or {}).items():
+            sql.append('AND EXISTS (SELECT 1 FROM parametros p WHERE p.captura_id = c.id '
+                       'AND p.chave = ? AND p.valor = ?)')
+            args += [chave, normalizar_valor(valor)]
+        sql.append('ORDER BY c.data_captura, c.caminho')
+        return [dict(r) for r in self.conn.execute(' '.join(sql), args)]
+
+    def estatisticas(self, captura_id):
+        return [dict(r) for r in self.conn.execute(
+            'SELECT estado, minimo, maximo, media, rms, desvio, p2p FROM estatisticas WHERE captura_id = ?',
+            (captura_id,))]
+
+    def parametros(self, captura_id):
+        return {r['chave']: r['valor'] for r in self.conn.execute(
+            'SELECT chave, valor FROM parametros WHERE captura_id = ?', (captura_id,))}
+
+    def comparar_sessoes(self, variavel, estatistica='rms'):
+        """
+        Compara uma estatística de uma variável entre sessões usando apenas o índice.
+        Retorna lista de (sessao, numero_de_capturas, media, minimo, maximo).
+        """
+        if estatistica not in ('minimo', 'maximo', 'media', 'rms', 'desvio', 'p2p'):
+            raise ValueError(f"Estatística '{estatistica}' inválida.")
+        sql = (f'SELECT c.sessao, count(*) AS n, avg(e.{estatistica}) AS media, '
+               f'min(e.{estatistica}) AS minimo, max(e.{estatistica}) AS maximo '
+               'FROM capturas c JOIN estatisticas e ON e.captura_id = c.id '
+               'WHERE (c.num_estados = 1 AND c.variavel = ?) OR lower(e.estado) = ? '
+               'GROUP BY c.sessao ORDER BY c.sessao')
+        return [tuple(r) for r in self.conn.execute(sql, (variavel.lower(), variavel.lower()))]
+
+    def carregar_piramide(self, captura, nivel):
+        """Carrega (min, max) de um nível da pirâmide de uma captura do catálogo."""
+        if not captura.get('piramide'):
+            return None
+        with np.load(os.path.join(self.pasta_dados, captura['piramide'])) as npz:
+            return npz[f'n{nivel}_min'], npz[f'n{nivel}_max']
+
+
+def _parse_parametros(pares):
+    parametros = {}
+    for par in pares or []:
+        chave, _, valor = par.partition('=')
+        parametros[chave.strip()] = valor.strip()
+    return parametros
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Catálogo SQLite das capturas.')
+    parser.add_argument('--db', help='arquivo do catálogo (padrão: data/catalogo.sqlite)')
+    parser.add_argument('--pasta', help='pasta de dados (padrão: ../data)')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_idx = sub.add_parser('indexar', help='indexa as capturas novas ou modificadas')
+    p_idx.add_argument('--hil-top', help='HIL_TOP.vhd cujos parâmetros serão associados a todas as capturas '
+                                         '(os do .json lateral têm prioridade)')
+    p_idx.add_argument('--forcar', action='store_true', help='re-indexa mesmo sem mudanças')
+
+    p_lst = sub.add_parser('listar', help='lista capturas por metadados/parâmetros')
+    p_lst.add_argument('--variavel')
+    p_lst.add_argument('--sessao')
+    p_lst.add_argument('--desde')
+    p_lst.add_argument('--ate')
+    p_lst.add_argument('--param', action='append', help='CHAVE=VALOR (pode repetir)')
+
+    p_cmp = sub.add_parser('comparar', help='compara uma estatística entre sessões')
+    p_cmp.add_argument('--variavel', required=True)
+    p_cmp.add_argument('--estatistica', default='rms')
+
+    args = parser.parse_args()
+    with CatalogoCapturas(args.db, args.pasta) as catalogo:
+        if args.comando == 'indexar':
+            extra = parametros_hil_top(args.hil_top) if args.hil_top else None
+            processados, removidos = catalogo.indexar_pasta(parametros_extra=extra, forcar=args.forcar)
+            print(f"{processados} captura(s) indexada(s), {removidos} removida(s) do catálogo.")
+        elif args.comando == 'listar':
+            for c in catalogo.buscar(args.variavel, args.sessao, args.desde, args.ate,
+                                     parametros=_parse_parametros(args.param)):
+                print(f"{c['caminho']}: {c['variavel'] or '-'} | {c['num_amostras']} amostras x "
+                      f"{c['num_estados']} | dt={c['intervalo_s']} s | sessão {c['sessao']}")
+                for e in catalogo.estatisticas(c['id']):
+                    print(f"    {e['estado']}: RMS={e['rms']:.4g} P2P={e['p2p']:.4g} "
+                          f"min/max={e['minimo']:.4g}/{e['maximo']:.4g}")
+        else:
+            print(f"{'Sessão':<12} {'N':>3} {'Média':>12} {'Mín':>12} {'Máx':>12}")
+            for sessao, n, media, minimo, maximo in catalogo.comparar_sessoes(args.variavel, args.estatistica):
+                print(f"{sessao:<12} {n:>3} {media:>12.5g} {minimo:>12.5g} {maximo:>12.5g}")
@@ -0,0 +1,628 @@
+# -*- coding: utf-8 -*-
+"""
+RESPOSTA EM FREQUÊNCIA da planta estimada das capturas x funções de
+transferência analíticas do LCL.
+
+Estimativa (Welch, por blocos): os sinais são cortados em segmentos com
+sobreposição, com janela de Hann e média removida; os espectros cruzados
+Suu, Syy e Suy de todos os segmentos de um bloco saem de uma única rfft
+vetorizada e são somados num EstimadorWelch (memória constante, combinável
+entre partes do arquivo). Resultado: H1 = Suy/Suu e a coerência
+|Suy|²/(Suu·Syy) de cada estado.
+
+Entrada da planta: as capturas do HIL só trazem os estados. Sem --entrada, a
+tensão do inversor é reconstruída pelo ramo de L1, integrado em cada
+intervalo T da captura:
+    u_rec[n] = L1·(IL1[n+1] - IL1[n])/T + R1·IL1_m[n] + VCf_m[n]
+(x_m = média de x[n] e x[n+1]; as saídas também são as médias x_m), que é a
+média de u no intervalo, um anti-aliasing natural da entrada chaveada. As
+curvas analíticas passam pelo mesmo operador:
+    H_rec = M·H_y / ((L1·D + R1·M)·H_IL1 + M·H_VCf),
+    D = (e^{jωT} - 1)/T,  M = (1 + e^{jωT})/2,
+que tende a H_y/u para f << 1/T. Com --entrada, u é a coluna indicada e a
+comparação é direta.
+
+Modelos analíticos (com os parâmetros do HIL_TOP):
+  - contínuo   : (sI - Ac)^-1 Bc,  s = jω
+  - euler      : (zI - A)^-1 B,    z = e^{jωTs}, A e B de matrizes_hil
+  - euler_q    : idem com A e B quantizados em Q14.28 (o que a FPGA usa)
+Para cada um: frequência e amortecimento do polo ressonante e o pico de
+|H_saida| na faixa; da captura, o pico medido (só bins com coerência
+suficiente) e o erro de módulo/fase contra cada modelo. O desvio do euler e
+do euler_q em relação ao contínuo é o efeito da discretização e do ponto
+fixo; o da captura em relação ao euler_q é o que sobra para o RTL.
+
+Capturas sem decimação (dumps RTL, rajadas) são as mais fiéis: com a taxa da
+serial (25 µs) a ondulação da portadora dobra para a faixa útil e a
+coerência cai, e os bins afetados ficam de fora da comparação. Sem coluna de
+tempo, o intervalo vem do nome do arquivo ('_25us') ou de --intervalo-us. Os
+CSVs de um estado só (dados_fpga_<estado>_25us.csv, coluna DadoReal) não são
+suportados: cada um vem de uma captura separada, sem IL1 e VCf da mesma
+janela para reconstruir a entrada.
+
+--sintetico gera uma captura com a planta discreta (ou, com --ponto-fixo, o
+ModeloLSM) excitada pelo comparador do SPWM_TOP (pwm_edges.padrao_spwm) com
+um nível aleatório a cada período da triangular, para conferir a cadeia sem
+hardware.
+
+Exemplos:
+    python frequency_response.py ../data/captura.hilz --saida IL2
+    python frequency_response.py ../data/tb_hil_top_dump.txt --decimacao 10 --grafico bode.png
+    python frequency_response.py ../data/psim.csv --entrada Vinv --intervalo-us 0.1
+    python frequency_response.py --sintetico 0.5 --decimacao-sintetica 10
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# --- Bloco de Configuração ---
+AMOSTRAS_POR_BLOCO = 1_000_000
+AMOSTRAS_POR_SEGMENTO = 1 << 15      # Resolução = 1 / (segmento · intervalo)
+SOBREPOSICAO = 0.5
+SEGMENTOS_POR_FFT = 16               # Segmentos transformados de uma vez (limita a memória)
+COERENCIA_MINIMA = 0.9
+FAIXA_RESSONANCIA_HZ = (1000.0, 10000.0)
+PONTOS_FAIXA_ANALITICA = 20001       # Grade fina para o pico das curvas analíticas
+LARGURA_PICO_DB = 0.5                # Bins usados no ajuste do pico (abaixo do máximo)
+BITS_FRACIONARIOS = 28
+NOMES_ESTADOS_HIL = ('IL1', 'ILd', 'IL2', 'VCf', 'VCd')
+SAIDA_PADRAO = 'IL2'
+ALIASES_COLUNAS = {'IL1_1': 'IL1', 'IL2_1': 'IL2'}   # Nomes do PSIM
+COLUNAS_TEMPO = ('Time', 'Tempo_s')
+COLUNA_POR_ESTADO = 'DadoReal'       # CSV de um estado só (dados_fpga_<estado>_25us.csv)
+PADRAO_INTERVALO_ARQUIVO = re.compile(r'_(\d+(?:\.\d+)?)us$')
+
+# Captura sintética
+DECIMACAO_SINTETICA = 10             # 100 ns -> 1 µs
+NIVEIS_SINTETICOS = (13, 243)        # Faixa dos níveis sorteados (~5% a 95% do período em alto)
+PASSOS_SIMULACAO_POR_BLOCO = 1 << 16
+
+# --- Fim do Bloco de Configuração ---
+
+MODELOS = ('continuo', 'euler', 'euler_q')
+
+
+def get_script_directory():
+    """
+    Retorna o diretório onde está localizado este script
+    """
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def _importar_simulacao():
+    """Torna importáveis os modelos de scripts/simulation/src."""
+    pasta = os.path.join(os.path.dirname(os.path.dirname(get_script_directory())), 'simulation', 'src')
+    if pasta not in sys.path:
+        sys.path.insert(0, pasta)
+
+
+def _importar_storage():
+    """Importa o módulo de armazenamento compactado (.hilz) do pacote hil_serial."""
+    pasta = os.path.join(os.path.dirname(os.path.dirname(get_script_directory())), 'serial_reader', 'src')
+    if pasta not in sys.path:
+        sys.path.insert(0, pasta)
+    from hil_serial import storage
+    return storage
+
+
+# --- Estimativa ---
+class EstimadorWelch:
+    """
+    Espectros cruzados entrada x saídas acumulados bloco a bloco (Welch).
+    A cauda que não fecha um segmento fica guardada para o próximo bloco, então
+    o resultado não depende do tamanho dos blocos.
+    """
+
+    def __init__(self, intervalo_s, num_saidas, amostras_por_segmento=AMOSTRAS_POR_SEGMENTO,
+                 sobreposicao=SOBREPOSICAO):
+        if not 0.0 <= sobreposicao < 1.0:
+            raise ValueError('A sobreposição deve estar em [0, 1).')
+        self.intervalo_s = intervalo_s
+        self.n = int(amostras_por_segmento)
+        self.passo = max(1, int(round(self.n * (1.0 - sobreposicao))))
+        self.janela = np.hanning(self.n + 1)[:-1]   # Hann periódica
+        num_bins = self.n // 2 + 1
+        self.suu = np.zeros(num_bins)
+        self.syy = np.zeros((num_saidas, num_bins))
+        self.suy = np.zeros((num_saidas, num_bins), dtype=complex)
+        self.medias = 0
+        self.amostras = 0
+        self._cauda = np.empty((1 + num_saidas, 0))
+
+    def atualizar(self, u, y):
+        """Soma os segmentos completos de u (amostras,) e y (amostras, saídas)."""
+        # Canais nas linhas: cada segmento fica contíguo na memória para a janela e a rfft
+        dados = np.empty((self._cauda.shape[0], self._cauda.shape[1] + len(u)))
+        dados[:, :self._cauda.shape[1]] = self._cauda
+        dados[0, self._cauda.shape[1]:] = u
+        dados[1:, self._cauda.shape[1]:] = np.asarray(y).T
+        self.amostras += len(u)
+        total = dados.shape[1]
+        num_segmentos = (total - self.n) // self.passo + 1 if total >= self.n else 0
+        if num_segmentos:
+            janelas = sliding_window_view(dados, self.n, axis=1)[:, ::self.passo]   # (canais, seg, n)
+            for a in range(0, num_segmentos, SEGMENTOS_POR_FFT):
+                seg = janelas[:, a:min(a + SEGMENTOS_POR_FFT, num_segmentos)]
+                seg = (seg - seg.mean(axis=-1, keepdims=True)) * self.janela
+                espectro = np.fft.rfft(seg, axis=-1)
+                U, Y = espectro[0], espectro[1:]
+                self.suu += np.sum(U.real ** 2 + U.imag ** 2, axis=0)
+                self.syy += np.sum(Y.real ** 2 + Y.imag ** 2, axis=1)
+                self.suy += np.einsum('sf,ksf->kf', U.conj(), Y)
+            self.medias += num_segmentos
+        self._cauda = dados[:, num_segmentos * self.passo:].copy()
+        return self
+
+    def combinar(self, outro):
+        """Soma os espectros de outro estimador (trechos disjuntos do mesmo sinal)."""
+        if (outro.n, outro.passo) != (self.n, self.passo):
+            raise ValueError('Estimadores com segmentação diferente não podem ser combinados.')
+        self.suu += outro.suu
+        self.syy += outro.syy
+        self.suy += outro.suy
+        self.medias += outro.medias
+        self.amostras += outro.amostras
+        return self
+
+    def resultado(self):
+        """(f_hz, H1 (saídas, bins), coerência (saídas, bins))."""
+        if not self.medias:
+            raise ValueError(f'Captura curta: são necessárias ao menos {self.n} amostras (--segmento).')
+        f = np.fft.rfftfreq(self.n, self.intervalo_s)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            h = self.suy / self.suu
+            coerencia = np.abs(self.suy) ** 2 / (self.suu * self.syy)
+        return f, h, np.nan_to_num(coerencia)
+
+
+def _decimar(blocos, decimacao):
+    """Mantém uma amostra a cada 'decimacao', contínuo entre blocos."""
+    fase = 0
+    for bloco in blocos:
+        if decimacao > 1:
+            saida = bloco[fase::decimacao]
+            fase = (fase - len(bloco)) % decimacao
+            bloco = saida
+        if len(bloco):
+            yield bloco
+
+
+def _reconstruir_entrada(blocos, parametros, intervalo_s):
+    """
+    (u_rec, y_m) por blocos a partir de blocos [IL1, VCf, saídas...]
+    (ver o topo do módulo); guarda a última amostra para o próximo bloco.
+    """
+    anterior = None
+    for bloco in blocos:
+        if anterior is not None:
+            bloco = np.concatenate([anterior, bloco])
+        anterior = bloco[-1:]
+        if len(bloco) < 2:
+            continue
+        medio = 0.5 * (bloco[1:] + bloco[:-1])
+        u = (parametros.l1 * np.diff(bloco[:, 0]) / intervalo_s
+             + parametros.r1 * medio[:, 0] + medio[:, 1])
+        yield u, medio[:, 2:]
+
+
+def estimar(blocos, intervalo_s, num_saidas, amostras_por_segmento=AMOSTRAS_POR_SEGMENTO,
+            sobreposicao=SOBREPOSICAO):
+    """Consome (u, y) por blocos e retorna o EstimadorWelch."""
+    estimador = EstimadorWelch(intervalo_s, num_saidas, amostras_por_segmento, sobreposicao)
+    for u, y in blocos:
+        estimador.atualizar(u, y)
+    return estimador
+
+
+# --- Leitura das capturas ---
+def _nome_coluna(nome):
+    nome = str(nome).strip()
+    if nome.endswith('_Real'):
+        nome = nome[:-len('_Real')]
+    return ALIASES_COLUNAS.get(nome, nome)
+
+
+def abrir_captura(caminho, intervalo_s=None, amostras_por_bloco=AMOSTRAS_POR_BLOCO):
+    """
+    (nomes, intervalo_s, blocos) de uma captura .hilz, CSV (da serial ou do
+    PSIM) ou dump RTL (rtl_dump); blocos() gera arrays float (amostras x nomes).
+    """
+    ext = os.path.splitext(caminho)[1].lower()
+    if ext == '.hilz':
+        storage = _importar_storage()
+        with storage.LeitorCompactado(caminho) as leitor:
+            nomes = leitor.metadados.get('estados') or (
+                list(NOMES_ESTADOS_HIL) if leitor.num_estados == len(NOMES_ESTADOS_HIL)
+                else [f'Estado_{i}' for i in range(leitor.num_estados)])
+            intervalo_s = intervalo_s or leitor.intervalo_s
+
+        def blocos():
+            with storage.LeitorCompactado(caminho) as leitor:
+                for bloco in leitor.blocos():
+                    yield bloco / 2**BITS_FRACIONARIOS
+        return [_nome_coluna(n) for n in nomes], intervalo_s, blocos
+
+    if ext == '.csv':
+        import pandas as pd
+
+        with open(caminho, 'r', encoding='utf-8', errors='replace') as f:
+            cabecalho = f.readline()
+        opcoes = {'sep': ';', 'decimal': ','} if ';' in cabecalho else {}
+        amostra = pd.read_csv(caminho, nrows=1000, **opcoes)
+        if COLUNA_POR_ESTADO in amostra.columns:
+            raise ValueError(f"'{os.path.basename(caminho)}' traz um estado só ({COLUNA_POR_ESTADO}); "
+                             f"a reconstrução da entrada precisa de IL1 e VCf da mesma captura "
+                             f"(.hilz, CSV com todos os estados ou dump RTL).")
+        tempo = next((c for c in COLUNAS_TEMPO if c in amostra.columns), None)
+        if intervalo_s is None and tempo is not None and len(amostra) > 1:
+            intervalo_s = float(np.median(np.diff(amostra[tempo].to_numpy(float))))
+        sufixo = PADRAO_INTERVALO_ARQUIVO.search(os.path.splitext(os.path.basename(caminho))[0])
+        if intervalo_s is None and sufixo:
+            intervalo_s = float(sufixo.group(1)) * 1e-6
+        colunas = [c for c in amostra.columns if c != tempo and pd.api.types.is_numeric_dtype(amostra[c])]
+
+        def blocos():
+            for bloco in pd.read_csv(caminho, usecols=colunas, chunksize=amostras_por_bloco, **opcoes):
+                yield bloco[colunas].to_numpy(float)
+        return [_nome_coluna(c) for c in colunas], intervalo_s, blocos
+
+    import rtl_dump
+
+    def blocos():
+        for _, valores, _ in rtl_dump.ler_em_blocos(caminho, linhas_por_bloco=amostras_por_bloco):
+            yield np.asarray(valores) / 2**BITS_FRACIONARIOS
+    return list(rtl_dump.NOMES_ESTADOS), intervalo_s or rtl_dump.PERIODO_PASSO_S, blocos
+
+
+def captura_sintetica(duracao_s, decimacao=DECIMACAO_SINTETICA, ponto_fixo=False, semente=0,
+                      niveis=NIVEIS_SINTETICOS):
+    """
+    (nomes, intervalo_s, blocos) de uma captura simulada: o comparador do
+    SPWM_TOP com um nível sorteado em 'niveis' a cada período da triangular
+    (excitação de banda larga), lido como no HIL (pwm_edges.padrao_spwm), e os
+    estados amostrados a cada 'decimacao' passos como no decimador do HIL.
+    """
+    _importar_simulacao()
+    from plant_model import SIMUL_PERIOD, PlantaLCL, para_q
+    from pwm_converter_model import recorrencia_afim
+    from pwm_edges import ParametrosEntradaHIL, padrao_spwm
+    from spwm_model import TRI_PERIODO_PASSOS, ParametrosSPWM
+
+    hil = ParametrosEntradaHIL(ciclo_primeiro_passo=0)
+    spwm = ParametrosSPWM(clk_freq=hil.clk_freq)
+    passos_portadora = int(round(spwm.clk_por_passo * TRI_PERIODO_PASSOS / hil.periodo_passo))
+    padroes = np.array([padrao_spwm(spwm, hil, n, passos_portadora) for n in range(niveis[0], niveis[1] + 1)])
+    num_passos = int(round(duracao_s / SIMUL_PERIOD))
+    passos_bloco = PASSOS_SIMULACAO_POR_BLOCO - PASSOS_SIMULACAO_POR_BLOCO % passos_portadora
+
+    def entrada(rng, n):
+        return padroes[rng.integers(0, len(padroes), size=n // passos_portadora)].ravel()
+
+    def blocos():
+        rng = np.random.default_rng(semente)
+        if ponto_fixo:
+            from lsm_model import ModeloLSM
+            modelo = ModeloLSM()
+            fonte = (modelo.avancar(para_q(entrada(rng, passos_bloco))) / 2**BITS_FRACIONARIOS
+                     for _ in range(0, num_passos, passos_bloco))
+        else:
+            planta = PlantaLCL()
+            A = para_q(planta.A) / 2**BITS_FRACIONARIOS
+            B = para_q(planta.B) / 2**BITS_FRACIONARIOS
+
+            def gerar():
+                x = np.zeros(A.shape[0])
+                for _ in range(0, num_passos, passos_bloco):
+                    u = entrada(rng, passos_bloco)
+                    estados = recorrencia_afim(A, np.outer(u, B[:, 0]), x)
+                    x = A @ estados[-1] + B[:, 0] * u[-1]
+                    yield estados
+            fonte = gerar()
+        yield from _decimar(fonte, decimacao)
+
+    return list(NOMES_ESTADOS_HIL), SIMUL_PERIOD * decimacao, blocos
+
+
+# --- Modelos analíticos ---
+def _resposta_continua(Ac, b, f):
+    s = 2j * np.pi * f
+    matrizes = s[:, None, None] * np.eye(len(Ac)) - Ac
+    return np.linalg.solve(matrizes, np.broadcast_to(b, (len(f), len(b)))[..., None])[..., 0].T
+
+
+def _resposta_discreta(A, b, f, ts):
+    z = np.exp(2j * np.pi * f * ts)
+    matrizes = z[:, None, None] * np.eye(len(A)) - A
+    return np.linalg.solve(matrizes, np.broadcast_to(b, (len(f), len(b)))[..., None])[..., 0].T
+
+
+def modelos_analiticos(parametros=None):
+    """{modelo: (matriz de estados, entrada, ts)}; ts None = contínuo."""
+    _importar_simulacao()
+    from plant_model import ParametrosLCL, matrizes_continuas, matrizes_hil, para_q
+
+    p = parametros or ParametrosLCL()
+    Ac, Bc = matrizes_continuas(p)
+    A, B = matrizes_hil(p)
+    escala = 2.0 ** -BITS_FRACIONARIOS
+    return {
+        'continuo': (Ac, Bc[:, 0], None),
+        'euler': (A, B[:, 0], p.ts),
+        'euler_q': (para_q(A) * escala, para_q(B)[:, 0] * escala, p.ts),
+    }
+
+
+def resposta_analitica(modelo, f, parametros=None, intervalo_s=None, reconstruida=True):
+    """
+    H de cada estado (estados, bins). Com reconstruida=True, relativa à entrada
+    reconstruída com o intervalo da captura (mesmo operador aplicado aos dados).
+    """
+    _importar_simulacao()
+    from plant_model import ParametrosLCL
+
+    p = parametros or ParametrosLCL()
+    matriz, b, ts = modelos_analiticos(p)[modelo]
+    f = np.asarray(f, dtype=float)
+    h = _resposta_continua(matriz, b, f) if ts is None else _resposta_discreta(matriz, b, f, ts)
+    if not reconstruida:
+        return h
+    z = np.exp(2j * np.pi * f * intervalo_s)
+    D, M = (z - 1.0) / intervalo_s, 0.5 * (1.0 + z)
+    i_il1, i_vcf = NOMES_ESTADOS_HIL.index('IL1'), NOMES_ESTADOS_HIL.index('VCf')
+    ganho_entrada = (p.l1 * D + p.r1 * M) * h[i_il1] + M * h[i_vcf]
+    return M * h / ganho_entrada
+
+
+def polo_ressonante(modelo, parametros=None):
+    """(frequência Hz, amortecimento) do par de polos complexos de maior frequência."""
+    matriz, _, ts = modelos_analiticos(parametros)[modelo]
+    autovalores = np.linalg.eigvals(matriz).astype(complex)
+    s = autovalores if ts is None else np.log(autovalores) / ts
+    s = s[np.abs(s.imag) > 0]
+    polo = s[np.argmax(np.abs(s.imag))]
+    return float(np.abs(polo) / (2 * np.pi)), float(-polo.real / np.abs(polo))
+
+
+def pico(f, modulo, faixa=FAIXA_RESSONANCIA_HZ, validos=None, largura_db=LARGURA_PICO_DB):
+    """
+    (frequência, módulo) do máximo de |H| na faixa. O máximo é refinado por
+    uma parábola em dB ajustada (mínimos quadrados) aos bins contíguos até
+    'largura_db' abaixo dele: a ressonância do LCL é larga e o bin mais alto
+    sozinho oscila com o ruído da estimativa. 'validos' restringe os bins.
+    """
+    selecao = (f >= faixa[0]) & (f <= faixa[1])
+    if validos is not None:
+        selecao &= validos
+    indices = np.flatnonzero(selecao)
+    if not indices.size:
+        return np.nan, np.nan
+    k = int(indices[np.argmax(modulo[indices])])
+    db = 20 * np.log10(np.maximum(modulo, 1e-300))
+    a = b = k
+    while a > 0 and selecao[a - 1] and db[a - 1] >= db[k] - largura_db:
+        a -= 1
+    while b < len(f) - 1 and selecao[b + 1] and db[b + 1] >= db[k] - largura_db:
+        b += 1
+    if b - a >= 2 and a < k < b:
+        centro, escala = f[k], f[b] - f[a]
+        c2, c1, c0 = np.polyfit((f[a:b + 1] - centro) / escala, db[a:b + 1], 2)
+        if c2 < 0:
+            x = -c1 / (2 * c2)
+            if abs(x) <= 0.5:
+                return float(centro + x * escala), float(10 ** ((c0 - c1 ** 2 / (4 * c2)) / 20))
+    return float(f[k]), float(modulo[k])
+
+
+# --- Comparação ---
+class ComparacaoFrequencia:
+    """Estimativa da captura e curvas analíticas nos mesmos bins."""
+
+    def __init__(self, estimador, nomes_saidas, parametros=None, reconstruida=True, saida=SAIDA_PADRAO,
+                 coerencia_minima=COERENCIA_MINIMA, faixa=FAIXA_RESSONANCIA_HZ):
+        self.f, self.h, self.coerencia = estimador.resultado()
+        self.estimador = estimador
+        self.nomes = list(nomes_saidas)
+        self.parametros = parametros
+        self.reconstruida = reconstruida
+        self.coerencia_minima = coerencia_minima
+        self.faixa = faixa
+        if saida not in self.nomes:
+            raise ValueError(f"Saída '{saida}' ausente da captura ({', '.join(self.nomes)}).")
+        self.saida = saida
+        # Os modelos dão todos os estados; guarda só os que a captura tem
+        self._indices_modelo = [NOMES_ESTADOS_HIL.index(n) if n in NOMES_ESTADOS_HIL else None
+                                for n in self.nomes]
+        self.analiticas = {m: self._analitica(m, self.f) for m in MODELOS}
+
+    def _analitica(self, modelo, f):
+        h = resposta_analitica(modelo, f, self.parametros, self.estimador.intervalo_s, self.reconstruida)
+        return np.array([h[i] if i is not None else np.full(len(f), np.nan, complex)
+                         for i in self._indices_modelo])
+
+    def validos(self, k):
+        """Bins com coerência suficiente, acima de DC e abaixo de 90% de Nyquist."""
+        nyquist = 0.5 / self.estimador.intervalo_s
+        return (self.coerencia[k] >= self.coerencia_minima) & (self.f > 0) & (self.f < 0.9 * nyquist)
+
+    def ressonancias(self):
+        """{modelo|'captura': {'f_hz', 'modulo', 'polo_hz', 'amortecimento', ...}} para a saída."""
+        k = self.nomes.index(self.saida)
+        faixa = (self.faixa[0], min(self.faixa[1], 0.45 / self.estimador.intervalo_s))
+        fina = np.linspace(faixa[0], faixa[1], PONTOS_FAIXA_ANALITICA)
+        resultado = {}
+        for modelo in MODELOS:
+            f_pico, modulo = pico(fina, np.abs(self._analitica(modelo, fina)[k]), faixa)
+            f_polo, zeta = polo_ressonante(modelo, self.parametros)
+            resultado[modelo] = {'f_hz': f_pico, 'modulo': modulo, 'polo_hz': f_polo, 'amortecimento': zeta}
+        validos = self.validos(k)
+        f_pico, modulo = pico(self.f, np.abs(self.h[k]), faixa, validos)
+        perto = np.argmin(np.abs(self.f - f_pico)) if np.isfinite(f_pico) else None
+        resultado['captura'] = {'f_hz': f_pico, 'modulo': modulo,
+                                'coerencia': float(self.coerencia[k, perto]) if perto is not None else np.nan,
+                                'resolucao_hz': float(self.f[1])}
+        return resultado
+
+    def erros(self):
+        """{saida: {modelo: (bins, mediana |erro| dB, máx |erro| dB, mediana |erro| graus)}}."""
+        tabela = {}
+        for k, nome in enumerate(self.nomes):
+            validos = self.validos(k)
+            tabela[nome] = {}
+            for modelo in MODELOS:
+                ref = self.analiticas[modelo][k, validos]
+                if not validos.any() or not np.all(np.isfinite(ref)):
+                    tabela[nome][modelo] = (0, np.nan, np.nan, np.nan)
+                    continue
+                razao = self.h[k, validos] / ref
+                erro_db = np.abs(20 * np.log10(np.abs(razao)))
+                erro_fase = np.abs(np.degrees(np.angle(razao)))
+                tabela[nome][modelo] = (int(validos.sum()), float(np.median(erro_db)), float(erro_db.max()),
+                                        float(np.median(erro_fase)))
+        return tabela
+
+    def relatorio(self):
+        est = self.estimador
+        linhas = [f"Captura: {est.amostras:,} amostras de {est.intervalo_s * 1e6:.4g} µs "
+                  f"({est.amostras * est.intervalo_s:.3f} s), {est.medias} segmentos de {est.n} "
+                  f"(resolução {self.f[1]:.3f} Hz)",
+                  f"Entrada: {'reconstruída pelo ramo de L1' if self.reconstruida else 'coluna da captura'}",
+                  '', f"Ressonância de |H_{self.saida}| na faixa {self.faixa[0]:.0f}-{self.faixa[1]:.0f} Hz:",
+                  f"  {'modelo':>9} | {'pico (Hz)':>12} | {'|H| pico':>11} | {'polo (Hz)':>12} | "
+                  f"{'amort.':>8} | {'desvio do contínuo':>22}"]
+        ressonancias = self.ressonancias()
+        base = ressonancias['continuo']
+        for modelo, r in ressonancias.items():
+            desvio = r['f_hz'] - base['f_hz']
+            texto_desvio = f"{desvio:+10.4f} Hz ({desvio / base['f_hz']:+.4%})" if np.isfinite(desvio) else 'n/d'
+            if modelo == 'captura':
+                linhas.append(f"  {modelo:>9} | {r['f_hz']:12.4f} | {r['modulo']:11.5g} | "
+                              f"{'coer. ' + format(r['coerencia'], '.3f'):>12} | {'':>8} | {texto_desvio:>22}")
+            else:
+                linhas.append(f"  {modelo:>9} | {r['f_hz']:12.4f} | {r['modulo']:11.5g} | {r['polo_hz']:12.4f} | "
+                              f"{r['amortecimento']:8.5f} | {texto_desvio:>22}")
+        linhas.append(f"  (pico da captura: resolução de {ressonancias['captura']['resolucao_hz']:.3f} Hz, "
+                      f"refinado por ajuste parabólico)")
+
+        linhas += ['', f"Erro da captura contra cada modelo (bins com coerência >= {self.coerencia_minima}):",
+                   f"  {'saída':>6} | {'modelo':>9} | {'bins':>6} | {'mediana dB':>10} | {'máx dB':>8} | "
+                   f"{'mediana graus':>13}"]
+        for nome, por_modelo in self.erros().items():
+            for modelo, (bins, mediana, maximo, fase) in por_modelo.items():
+                linhas.append(f"  {nome:>6} | {modelo:>9} | {bins:6d} | {mediana:10.4f} | {maximo:8.3f} | "
+                              f"{fase:13.3f}")
+        return '\n'.join(linhas)
+
+    def grafico(self, caminho):
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        k = self.nomes.index(self.saida)
+        selecao = (self.f > 0) & (self.f < 0.5 / self.estimador.intervalo_s)
+        f = self.f[selecao]
+        fig, (ax_mod, ax_fase, ax_coer) = plt.subplots(3, 1, sharex=True, figsize=(10, 9))
+        ax_mod.semilogx(f, 20 * np.log10(np.abs(self.h[k, selecao])), '.', ms=2, color='0.4', label='captura')
+        ax_fase.semilogx(f, np.degrees(np.angle(self.h[k, selecao])), '.', ms=2, color='0.4')
+        for modelo, estilo in zip(MODELOS, ('-', '--', ':')):
+            h = self.analiticas[modelo][k, selecao]
+            ax_mod.semilogx(f, 20 * np.log10(np.abs(h)), estilo, label=modelo)
+            ax_fase.semilogx(f, np.degrees(np.angle(h)), estilo)
+        ax_coer.semilogx(f, self.coerencia[k, selecao], color='0.4')
+        ax_coer.axhline(self.coerencia_minima, color='r', lw=0.8)
+        ax_mod.set_ylabel(f'|H_{self.saida}| (dB)')
+        ax_fase.set_ylabel('fase (graus)')
+        ax_coer.set_ylabel('coerência')
+        ax_coer.set_xlabel('frequência (Hz)')
+        ax_mod.legend()
+        for ax in (ax_mod, ax_fase, ax_coer):
+            ax.grid(True, which='both', alpha=0.3)
+        fig.tight_layout()
+        fig.savefig(caminho, dpi=150)
+        plt.close(fig)
+
+
+def analisar(nomes, intervalo_s, blocos, entrada=None, saida=SAIDA_PADRAO, decimacao=1,
+             amostras_por_segmento=AMOSTRAS_POR_SEGMENTO, sobreposicao=SOBREPOSICAO, parametros=None,
+             coerencia_minima=COERENCIA_MINIMA, faixa=FAIXA_RESSONANCIA_HZ):
+    """Estimativa por blocos + comparação com os modelos. Retorna a ComparacaoFrequencia."""
+    _importar_simulacao()
+    from plant_model import ParametrosLCL
+
+    parametros = parametros or ParametrosLCL()
+    if intervalo_s is None:
+        raise ValueError('Intervalo de amostragem desconhecido: informe --intervalo-us.')
+    intervalo_s *= decimacao
+    saidas = [n for n in nomes if n in NOMES_ESTADOS_HIL]
+    indices_saidas = [nomes.index(n) for n in saidas]
+
+    if entrada is None:
+        faltando = [n for n in ('IL1', 'VCf') if n not in nomes]
+        if faltando:
+            raise ValueError(f"Reconstrução da entrada precisa de {', '.join(faltando)} na captura; "
+                             f"ou informe --entrada.")
+        indices = [nomes.index('IL1'), nomes.index('VCf')] + indices_saidas
+        pares = _reconstruir_entrada((b[:, indices] for b in _decimar(blocos(), decimacao)), parametros,
+                                     intervalo_s)
+    else:
+        if entrada not in nomes:
+            raise ValueError(f"Coluna de entrada '{entrada}' ausente da captura ({', '.join(nomes)}).")
+        indices = [nomes.index(entrada)] + indices_saidas
+        pares = ((b[:, 0], b[:, 1:]) for b in
+                 (b[:, indices] for b in _decimar(blocos(), decimacao)))
+
+    estimador = estimar(pares, intervalo_s, len(saidas), amostras_por_segmento, sobreposicao)
+    return ComparacaoFrequencia(estimador, saidas, parametros, entrada is None, saida, coerencia_minima, faixa)
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Resposta em frequência (Welch) das capturas x funções de transferência do LCL.')
+    parser.add_argument('captura', nargs='?', help='.hilz, CSV (serial ou PSIM) ou dump RTL')
+    parser.add_argument('--saida', default=SAIDA_PADRAO, help='estado usado na busca da ressonância')
+    parser.add_argument('--entrada', help='coluna com a tensão do inversor (padrão: reconstruída pelo ramo de L1)')
+    parser.add_argument('--intervalo-us', type=float, help='intervalo entre amostras (se não vier da captura)')
+    parser.add_argument('--decimacao', type=int, default=1, help='usa uma amostra a cada N da captura')
+    parser.add_argument('--segmento', type=int, default=AMOSTRAS_POR_SEGMENTO, help='amostras por segmento')
+    parser.add_argument('--sobreposicao', type=float, default=SOBREPOSICAO)
+    parser.add_argument('--coerencia', type=float, default=COERENCIA_MINIMA, help='coerência mínima dos bins')
+    parser.add_argument('--faixa', type=float, nargs=2, default=FAIXA_RESSONANCIA_HZ, metavar=('F_MIN', 'F_MAX'),
+                        help='faixa de busca da ressonância (Hz)')
+    parser.add_argument('--grafico', help='grava o Bode da saída (PNG)')
+    parser.add_argument('--sintetico', type=float, metavar='SEGUNDOS',
+                        help='usa uma captura simulada com PWM aleatório em vez de um arquivo')
+    parser.add_argument('--decimacao-sintetica', type=int, default=DECIMACAO_SINTETICA)
+    parser.add_argument('--ponto-fixo', action='store_true', help='captura sintética pelo ModeloLSM (lento)')
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    if not args.sintetico and not args.captura:
+        parser.error('informe a captura ou --sintetico')
+
+    t = time.perf_counter()
+    try:
+        if args.sintetico:
+            nomes, intervalo_s, blocos = captura_sintetica(args.sintetico, args.decimacao_sintetica,
+                                                           args.ponto_fixo, args.semente)
+        else:
+            nomes, intervalo_s, blocos = abrir_captura(
+                args.captura, args.intervalo_us * 1e-6 if args.intervalo_us else None)
+        comparacao = analisar(nomes, intervalo_s, blocos, args.entrada, args.saida, args.decimacao,
+                              args.segmento, args.sobreposicao, coerencia_minima=args.coerencia,
+                              faixa=tuple(args.faixa))
+    except ValueError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    dt = time.perf_counter() - t
+    print(comparacao.relatorio())
+    amostras = comparacao.estimador.amostras
+    print(f"\n{amostras:,} amostras em {dt:.2f} s ({amostras / max(dt, 1e-9) / 1e6:.1f} M amostras/s)")
+    if args.grafico:
+        comparacao.grafico(args.grafico)
+        print(f"Bode gravado em '{args.grafico}'.")
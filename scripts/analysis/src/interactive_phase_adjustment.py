@@ -3,6 +3,9 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider, Button
 import os
+
+from steady_state import detectar_estado_estacionario, inicio_comum, segmentos_por_variavel
+
 PHASE_STEP = 1e-5
 
 # Variáveis globais para os dados
@@ -159,7 +162,6 @@ def plotar_comparativo_interativo():
     psim_filename = os.path.join(data_dir, 'psim_1us_sc.csv')
     variaveis = ['vcf', 'vcd', 'il1', 'il2', 'ild']
     taxa_amostragem_fpga = 25e-6
-    DURACAO_ESTADO_ESTACIONARIO = 0.08
     
     mapa_colunas_psim = {'vcf': 'VCf', 'vcd': 'VCd', 'il1': 'IL1_1', 'il2': 'IL2_1', 'ild': 'ILd'}
     
@@ -197,7 +199,9 @@ def plotar_comparativo_interativo():
         # Carrega PSIM
         psim_df = carregar_dados_chunked(psim_filename)
         tempo_final_psim = psim_df['Time'].iloc[-1]
-        tempo_inicio_ss = tempo_final_psim - DURACAO_ESTADO_ESTACIONARIO
+        colunas_psim = [mapa_colunas_psim[v] for v in variaveis if mapa_colunas_psim[v] in psim_df.columns]
+        segmentos_psim = segmentos_por_variavel(psim_df, colunas_psim)
+        tempo_inicio_ss = inicio_comum(segmentos_psim) if segmentos_psim else psim_df['Time'].iloc[0]
         psim_ss = psim_df[psim_df['Time'] >= tempo_inicio_ss].copy().reset_index(drop=True)
         del psim_df
         
@@ -213,6 +217,11 @@ def plotar_comparativo_interativo():
                 print(f"Carregando {v.upper()}...")
                 df_fpga = carregar_dados_chunked(fpga_filename, sep=';', decimal=',')
                 
+                # Descarta o transitório inicial da captura antes de reduzir
+                seg_fpga = detectar_estado_estacionario(np.arange(len(df_fpga)) * taxa_amostragem_fpga,
+                                                        df_fpga['DadoReal'].to_numpy(float))
+                df_fpga = df_fpga.iloc[seg_fpga.indice_inicio:].reset_index(drop=True)
+
                 # Reduz dados se muito grande
                 if len(df_fpga) > 50000:
                     print(f"  Reduzindo dados de {len(df_fpga)} para 50000 pontos")
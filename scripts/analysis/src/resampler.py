@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+REAMOSTRAGEM dos sinais de referência (PSIM 1 µs) para a taxa da FPGA (25 µs).
+
+Substitui o resample('25us').mean() do pandas, que é uma média de caixa
+(filtro fraco contra aliasing) rotulada no início da janela, ou seja, atrasa a
+referência em meia janela (12 µs em 25 µs), e o np.interp linear no alinhamento.
+
+  - decimação polifásica: FIR passa-baixas de fase linear (sinc com janela de
+    Kaiser) quebrado em fases de 'fator' coeficientes; só as saídas mantidas
+    são calculadas (custo ~ taps/fator multiplicações por amostra de entrada)
+    e o atraso de grupo é compensado, então a amostra m da saída corresponde
+    exatamente ao instante t0 + m * fator * dt
+  - processamento em blocos (DecimadorPolifasico.processar), com o histórico
+    do filtro guardado entre blocos, para referências longas
+  - interpolação limitada em banda (sinc com janela) para levar um sinal
+    uniforme a outra grade de tempo, inclusive deslocada de uma fração de amostra
+
+Exemplos:
+    python resampler.py ../data/psim_1us_sc.csv --intervalo-us 25 --saida psim_25us.csv
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+# --- Bloco de Configuração ---
+FRACAO_BANDA_PASSANTE = 0.8      # Banda passante / Nyquist da saída
+ATENUACAO_DB = 80.0              # Rejeição do que dobraria sobre a banda passante
+AMOSTRAS_POR_BLOCO = 1 << 20
+TAPS_INTERPOLADOR = 32           # Sinc com janela usado na interpolação fracionária
+BETA_INTERPOLADOR = 8.0
+TOLERANCIA_UNIFORME = 1e-3       # Desvio relativo de dt aceito como uniforme (tempos arredondados no CSV)
+
+# --- Fim do Bloco de Configuração ---
+
+
+def projetar_passa_baixas(fator, fracao_banda=FRACAO_BANDA_PASSANTE, atenuacao_db=ATENUACAO_DB):
+    """
+    FIR de fase linear (comprimento ímpar, ganho DC 1) para decimar por 'fator':
+    banda passante até fracao_banda * Nyquist da saída e rejeição 'atenuacao_db'
+    a partir de onde o espectro dobraria sobre ela.
+    """
+    if fator < 1:
+        raise ValueError('O fator de decimação deve ser >= 1.')
+    if fator == 1:
+        return np.ones(1)
+    passante = fracao_banda * 0.5 / fator
+    rejeicao = 1.0 / fator - passante
+    transicao = rejeicao - passante
+    # Fórmulas de Kaiser para comprimento e beta
+    beta = 0.1102 * (atenuacao_db - 8.7) if atenuacao_db > 50 else 0.5842 * (atenuacao_db - 21) ** 0.4 + 0.07886 * (atenuacao_db - 21)
+    taps = int(np.ceil((atenuacao_db - 7.95) / (2.285 * 2 * np.pi * transicao))) + 1
+    taps += 1 - taps % 2
+    n = np.arange(taps) - (taps - 1) / 2
+    corte = (passante + rejeicao) / 2
+    h = 2 * corte * np.sinc(2 * corte * n) * np.kaiser(taps, beta)
+    return h / np.sum(h)
+
+
+class DecimadorPolifasico:
+    """
+    Decimação por um fator inteiro, em blocos, sem atraso: a saída m é o sinal
+    filtrado no instante da entrada m * fator. As bordas são estendidas com a
+    primeira/última amostra (sem transitório de partida).
+    """
+
+    def __init__(self, fator, h=None):
+        self.fator = int(fator)
+        self.h = projetar_passa_baixas(self.fator) if h is None else np.asarray(h, dtype=float)
+        self.atraso_grupo = (len(self.h) - 1) // 2
+        # Coeficientes completados com zeros até múltiplo do fator: fases[q, p] = h[q*fator + p]
+        self.num_fases = -(-len(self.h) // self.fator)
+        h_completo = np.zeros(self.num_fases * self.fator)
+        h_completo[:len(self.h)] = self.h
+        self.fases = h_completo.reshape(self.num_fases, self.fator)
+        self.reiniciar()
+
+    def reiniciar(self):
+        self._pendente = None       # Entrada estendida ainda não consumida (começa em múltiplo do fator)
+        self._entradas = 0
+        self._saidas = 0
+
+    def _filtrar(self, z):
+        """Saídas completas de z (linhas alinhadas ao fator) e quantas amostras foram consumidas."""
+        D, Q = self.fator, self.num_fases
+        linhas = len(z) // D
+        saidas = linhas - Q + 1
+        if saidas <= 0:
+            return z[:0], 0
+        Z = z[:linhas * D].reshape((linhas, D) + z.shape[1:])
+        # P[l, q] = fase q aplicada à linha l; y[m] = soma_q P[m + q, q]
+        P = np.tensordot(Z, self.fases, axes=([1], [1]))
+        if P.ndim == 3:
+            P = np.moveaxis(P, 2, 1)        # (linhas, Q, colunas)
+        y = P[0:saidas, 0].copy()
+        for q in range(1, Q):
+            y += P[q:q + saidas, q]
+        return y, saidas * D
+
+    def processar(self, bloco):
+        """Filtra e decima um bloco (1-D ou [amostras, colunas]); devolve as saídas prontas."""
+        bloco = np.asarray(bloco, dtype=float)
+        if bloco.shape[0] == 0:
+            return bloco[:0]
+        if self._pendente is None:
+            # Extensão à esquerda: z[j] = x[j - atraso_grupo], com x[<0] = x[0]
+            self._pendente = np.repeat(bloco[:1], self.atraso_grupo, axis=0)
+        self._entradas += bloco.shape[0]
+        z = np.concatenate((self._pendente, bloco))
+        y, consumidas = self._filtrar(z)
+        # Não gera saídas além da última entrada real (as restantes saem em finalizar)
+        limite = (self._entradas - 1) // self.fator + 1 - self._saidas
+        if len(y) > limite:
+            y = y[:limite]
+            consumidas = limite * self.fator
+        self._pendente = z[consumidas:]
+        self._saidas += len(y)
+        return y
+
+    def finalizar(self):
+        """Saídas restantes, estendendo a entrada com a última amostra."""
+        if self._pendente is None or self._entradas == 0:
+            return np.zeros(0)
+        faltam = (self._entradas - 1) // self.fator + 1 - self._saidas
+        if faltam <= 0:
+            return self._pendente[:0]
+        extensao = np.repeat(self._pendente[-1:], self.num_fases * self.fator + self.fator, axis=0)
+        y, _ = self._filtrar(np.concatenate((self._pendente, extensao)))
+        self._saidas += faltam
+        self._pendente = None
+        return y[:faltam]
+
+
+def decimar(x, fator, amostras_por_bloco=AMOSTRAS_POR_BLOCO):
+    """Decima um vetor (ou matriz [amostras, colunas]) inteiro, em blocos."""
+    decimador = DecimadorPolifasico(fator)
+    partes = [decimador.processar(x[i:i + amostras_por_bloco]) for i in range(0, len(x), amostras_por_bloco)]
+    partes.append(decimador.finalizar())
+    return np.concatenate(partes)
+
+
+def amostragem_uniforme(tempo, tolerancia=TOLERANCIA_UNIFORME):
+    """(t0, dt) se os instantes forem igualmente espaçados, senão None."""
+    tempo = np.asarray(tempo, dtype=float)
+    if len(tempo) < 2:
+        return None
+    dt = (tempo[-1] - tempo[0]) / (len(tempo) - 1)
+    if dt <= 0 or np.max(np.abs(np.diff(tempo) - dt)) > tolerancia * dt + 1e-15:
+        return None
+    return float(tempo[0]), float(dt)
+
+
+def decimar_para_intervalo(tempo, dados, intervalo_s):
+    """
+    Leva (tempo, dados[amostras, ...]) uniformes ao intervalo 'intervalo_s'
+    (múltiplo inteiro do dt). Retorna (tempo_saida, dados_saida).
+    """
+    uniforme = amostragem_uniforme(tempo)
+    if uniforme is None:
+        raise ValueError('Amostragem não uniforme: use a interpolação (interpolar_sinc) antes de decimar.')
+    t0, dt = uniforme
+    fator = int(round(intervalo_s / dt))
+    if fator < 1 or abs(fator * dt - intervalo_s) > TOLERANCIA_UNIFORME * intervalo_s + 1e-12:
+        raise ValueError(f"Intervalo de {intervalo_s:g} s não é múltiplo inteiro de dt = {dt:g} s.")
+    y = decimar(np.asarray(dados, dtype=float), fator)
+    return t0 + np.arange(len(y)) * fator * dt, y
+
+
+def interpolar_sinc(t0, dt, y, t_novo, taps=TAPS_INTERPOLADOR, beta=BETA_INTERPOLADOR,
+                    amostras_por_bloco=AMOSTRAS_POR_BLOCO // 8):
+    """
+    Valores do sinal uniforme y (y[k] em t0 + k*dt) nos instantes t_novo, por sinc
+    com janela de Kaiser de 'taps' coeficientes (interpolação limitada em banda;
+    um deslocamento constante vira um atraso fracionário). Bordas repetem o extremo.
+    """
+    y = np.asarray(y, dtype=float)
+    t_novo = np.asarray(t_novo, dtype=float)
+    meio = taps // 2
+    saida = np.empty(t_novo.shape)
+    for i in range(0, len(t_novo), amostras_por_bloco):
+        posicao = (t_novo[i:i + amostras_por_bloco] - t0) / dt
+        base = np.floor(posicao).astype(np.int64)
+        fracao = posicao - base
+        k = np.arange(-meio + 1, meio + 1)
+        distancia = fracao[:, None] - k[None, :]
+        janela = np.i0(beta * np.sqrt(np.clip(1 - (distancia / meio) ** 2, 0, None))) / np.i0(beta)
+        pesos = np.sinc(distancia) * janela
+        pesos /= np.sum(pesos, axis=1, keepdims=True)
+        indices = np.clip(base[:, None] + k[None, :], 0, len(y) - 1)
+        saida[i:i + amostras_por_bloco] = np.sum(pesos * y[indices], axis=1)
+    return saida
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Decimação polifásica de referências (PSIM) para a taxa da FPGA.')
+    parser.add_argument('arquivo', help="CSV com coluna 'Time' (PSIM)")
+    parser.add_argument('--intervalo-us', type=float, default=25.0)
+    parser.add_argument('--saida', help='CSV decimado')
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    df = pd.read_csv(args.arquivo)
+    colunas = [c for c in df.columns if c != 'Time']
+    inicio = time.perf_counter()
+    t_dec, y_dec = decimar_para_intervalo(df['Time'].to_numpy(float), df[colunas].to_numpy(float),
+                                          args.intervalo_us * 1e-6)
+    print(f"{len(df):,} -> {len(t_dec):,} amostras em {time.perf_counter() - inicio:.2f} s")
+    saida = pd.DataFrame(y_dec, columns=colunas)
+    saida.insert(0, 'Time', t_dec)
+    if args.saida:
+        saida.to_csv(args.saida, index=False)
+        print(f"Salvo em {args.saida}")
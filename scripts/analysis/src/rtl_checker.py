@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+VERIFICAÇÃO BIT A BIT da simulação RTL contra o modelo em ponto fixo.
+
+Lê o dump de Xvec_current_o (rtl_dump.ler_em_blocos) e, em blocos alinhados,
+compara cada estado de cada passo com a referência:
+  - o modelo do LinearSolverManager (scripts/simulation/src/lsm_model.py),
+    alimentado pelo SPWM_TOP do tb_HIL_TOP, ou
+  - outro dump (--referencia), por exemplo de uma versão anterior do RTL.
+
+Para no primeiro passo divergente e mostra o passo, os estados envolvidos
+(valor RTL, valor de referência e diferença em LSB) e os passos ao redor.
+Um passo com bits indefinidos (X/U/Z/W) no dump também é divergência, mesmo
+que o valor lido (0) coincida com a referência; numa referência em dump, o
+passo indefinido interrompe a verificação com erro.
+A memória é constante: só o bloco atual e o final do anterior ficam guardados,
+então dezenas de milhões de passos passam sem carregar o dump inteiro.
+
+O passo 'k' do dump corresponde ao passo 'k + deslocamento' do modelo
+(x[0] = Xvec_initial). A aritmética do modelo é uma suposição (ver
+lsm_model.py); as opções --acumulacao/--arredondamento trocam as variantes.
+
+Exemplos:
+    python rtl_checker.py hil_states.txt
+    python rtl_checker.py hil_states.txt --deslocamento 1 --contexto 8
+    python rtl_checker.py hil_states.txt --referencia hil_states_v1.txt
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from rtl_dump import FP_TOTAL_BITS, BITS_FRACIONARIOS, NOMES_ESTADOS, ler_em_blocos
+
+# --- Bloco de Configuração ---
+CONTEXTO_PASSOS = 5          # Passos mostrados antes e depois da divergência
+PASSOS_POR_COMPARACAO = 65536
+
+# --- Fim do Bloco de Configuração ---
+
+
+def get_script_directory():
+    """
+    Retorna o diretório onde está localizado este script
+    """
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def _importar_simulacao():
+    """Torna importáveis os modelos de scripts/simulation/src."""
+    pasta = os.path.join(os.path.dirname(os.path.dirname(get_script_directory())), 'simulation', 'src')
+    if pasta not in sys.path:
+        sys.path.insert(0, pasta)
+
+
+class ReferenciaModelo:
+    """Estados do modelo em ponto fixo, gerados sob demanda em ordem crescente de passo."""
+
+    def __init__(self, modelo, entradas):
+        self.modelo = modelo
+        self.entradas = entradas
+
+    @property
+    def passo(self):
+        return self.modelo.passo
+
+    def estados(self, passo_inicial, n):
+        """x[passo_inicial .. +n) (passo_inicial >= passo atual; o trecho anterior é descartado)."""
+        while self.modelo.passo < passo_inicial:
+            pular = min(PASSOS_POR_COMPARACAO, passo_inicial - self.modelo.passo)
+            self.modelo.avancar(self.entradas(self.modelo.passo, pular))
+        if self.modelo.passo != passo_inicial:
+            raise ValueError(f"Referência já passou do passo {passo_inicial} (dump fora de ordem?).")
+        return self.modelo.avancar(self.entradas(passo_inicial, n))
+
+
+class ReferenciaDump:
+    """Estados de outro dump, lidos em fluxo e indexados pelo número do passo."""
+
+    def __init__(self, caminho, **opcoes):
+        self._blocos = ler_em_blocos(caminho, **opcoes)
+        self._passos = np.zeros(0, dtype=np.int64)
+        self._valores = np.zeros((0, len(NOMES_ESTADOS)), dtype=np.int64)
+        self._indefinidos = np.zeros(0, dtype=bool)
+        self.passo = 0
+
+    def estados(self, passo_inicial, n):
+        partes, fim = [], passo_inicial + n
+        while passo_inicial < fim:
+            if self._passos.size == 0 or self._passos[-1] < passo_inicial:
+                try:
+                    self._passos, self._valores, self._indefinidos = next(self._blocos)
+                except StopIteration:
+                    raise ValueError(f"Referência terminou antes do passo {passo_inicial}.") from None
+                continue
+            i = np.searchsorted(self._passos, passo_inicial)
+            j = min(len(self._passos), i + fim - passo_inicial)
+            if i == len(self._passos) or self._passos[i] != passo_inicial or \
+                    self._passos[j - 1] - self._passos[i] != j - 1 - i:
+                raise ValueError(f"Referência sem o passo {passo_inicial} (buraco no dump).")
+            if self._indefinidos[i:j].any():
+                passo = int(self._passos[i + np.argmax(self._indefinidos[i:j])])
+                raise ValueError(f"Referência com valores indefinidos (X/U) no passo {passo}.")
+            partes.append(self._valores[i:j])
+            passo_inicial += j - i
+        self.passo = fim
+        return np.concatenate(partes) if len(partes) > 1 else partes[0]
+
+
+class Divergencia:
+    """Primeiro passo em que o RTL difere da referência."""
+
+    def __init__(self, passo, estados, rtl, referencia, contexto, indefinido=False):
+        self.passo = passo
+        self.estados = estados            # índices dos estados divergentes
+        self.indefinido = indefinido      # passo com bits X/U/Z no dump RTL
+        self.rtl = rtl
+        self.referencia = referencia
+        self.contexto = contexto          # (passos, rtl[n, N], referencia[n, N])
+
+    def relatorio(self, nomes=NOMES_ESTADOS):
+        escala = 2.0**BITS_FRACIONARIOS
+        if self.indefinido:
+            linhas = [f"DIVERGÊNCIA no passo {self.passo}: valores indefinidos (X/U/Z) no dump RTL (lidos como 0)"]
+        else:
+            linhas = [f"DIVERGÊNCIA no passo {self.passo}: {', '.join(nomes[i] for i in self.estados)}"]
+        for i in self.estados:
+            dif = int(self.rtl[i]) - int(self.referencia[i])
+            linhas.append(f"  {nomes[i]:>4}: RTL {int(self.rtl[i]):+d} ({self.rtl[i] / escala:+.9f}), "
+                          f"referência {int(self.referencia[i]):+d} ({self.referencia[i] / escala:+.9f}), "
+                          f"diferença {dif:+d} LSB")
+        passos, rtl, ref = self.contexto
+        linhas.append("  Contexto (RTL / referência, '*' = diferente):")
+        linhas.append("    " + f"{'passo':>10}" + ''.join(f"  {n:>29}" for n in nomes[:rtl.shape[1]]))
+        for p, a, b in zip(passos, rtl, ref):
+            celulas = ''.join(f"  {'*' if x != y else ' '}{x / escala:+13.9f}/{y / escala:+13.9f}"
+                              for x, y in zip(a, b))
+            linhas.append(f"  {'>' if p == self.passo else ' '} {p:>10}{celulas}")
+        return '\n'.join(linhas)
+
+
+class ResultadoVerificacao:
+    def __init__(self, passos_verificados, divergencia, primeiro_passo, ultimo_passo):
+        self.passos_verificados = passos_verificados
+        self.divergencia = divergencia
+        self.primeiro_passo = primeiro_passo
+        self.ultimo_passo = ultimo_passo
+
+    @property
+    def ok(self):
+        return self.divergencia is None
+
+
+def _segmentos_continuos(passos):
+    """Fatias [i, j) do bloco em que os passos são consecutivos."""
+    cortes = np.flatnonzero(np.diff(passos) != 1) + 1
+    limites = np.concatenate(([0], cortes, [len(passos)]))
+    return zip(limites[:-1], limites[1:])
+
+
+def verificar(blocos_rtl, referencia, deslocamento=0, contexto=CONTEXTO_PASSOS, max_passos=None,
+              largura_bits=FP_TOTAL_BITS):
+    """
+    Compara os blocos (passos, valores, indefinidos) do RTL com a referência e
+    para na primeira divergência (valor diferente ou passo indefinido).
+    Retorna um ResultadoVerificacao.
+    """
+    _importar_simulacao()
+    from lsm_model import ajustar_largura
+
+    verificados, primeiro, ultimo = 0, None, None
+    # Final do trecho anterior (para o contexto antes da divergência)
+    anterior = (np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.int64), np.zeros((0, 0), dtype=np.int64))
+
+    for passos_bloco, valores_bloco, indefinidos_bloco in blocos_rtl:
+        passos_bloco = np.asarray(passos_bloco, dtype=np.int64)
+        indefinidos_bloco = np.asarray(indefinidos_bloco, dtype=bool)
+        for i, j in _segmentos_continuos(passos_bloco):
+            # Passos do dump sem correspondente no modelo (deslocamento negativo) são ignorados
+            i += max(0, int(-(passos_bloco[i] + deslocamento)))
+            for a in range(i, j, PASSOS_POR_COMPARACAO):
+                b = min(j, a + PASSOS_POR_COMPARACAO)
+                if max_passos is not None:
+                    b = min(b, a + max_passos - verificados)
+                if b <= a:
+                    break
+                passos = passos_bloco[a:b]
+                rtl = ajustar_largura(valores_bloco[a:b], largura_bits)
+                ref = ajustar_largura(referencia.estados(int(passos[0]) + deslocamento, b - a), largura_bits)
+                primeiro = int(passos[0]) if primeiro is None else primeiro
+                diferentes = rtl != ref
+                indefinidos = indefinidos_bloco[a:b]
+                linhas = np.flatnonzero(diferentes.any(axis=1) | indefinidos)
+                if linhas.size:
+                    r = int(linhas[0])
+                    p_ant, rtl_ant, ref_ant = anterior
+                    if rtl_ant.shape[1] != rtl.shape[1]:
+                        p_ant, rtl_ant, ref_ant = p_ant[:0], rtl[:0], ref[:0]
+                    ctx = slice(max(0, r - contexto), r + contexto + 1)
+                    falta = contexto - min(r, contexto)
+                    ctx_passos = np.concatenate((p_ant[len(p_ant) - falta:] if falta else p_ant[:0], passos[ctx]))
+                    ctx_rtl = np.vstack((rtl_ant[len(rtl_ant) - falta:] if falta else rtl_ant[:0], rtl[ctx]))
+                    ctx_ref = np.vstack((ref_ant[len(ref_ant) - falta:] if falta else ref_ant[:0], ref[ctx]))
+                    div = Divergencia(int(passos[r]), np.flatnonzero(diferentes[r]), rtl[r], ref[r],
+                                      (ctx_passos, ctx_rtl, ctx_ref), bool(indefinidos[r]))
+                    return ResultadoVerificacao(verificados + r, div, primeiro, int(passos[r]))
+                verificados += b - a
+                ultimo = int(passos[-1])
+                anterior = (passos[-contexto:], rtl[-contexto:], ref[-contexto:]) if contexto else anterior
+            if max_passos is not None and verificados >= max_passos:
+                return ResultadoVerificacao(verificados, None, primeiro, ultimo)
+    return ResultadoVerificacao(verificados, None, primeiro, ultimo)
+
+
+if __name__ == '__main__':
+    _importar_simulacao()
+    from lsm_model import (ACUMULACAO, ARREDONDAMENTO, CICLO_PRIMEIRO_PASSO, DEFASAGEM_SPWM_CICLOS,
+                           MODOS_ACUMULACAO, MODOS_ARREDONDAMENTO, ModeloLSM, entradas_spwm)
+    from pwm_edges import ParametrosEntradaHIL
+
+    parser = argparse.ArgumentParser(description='Verificação bit a bit do dump RTL contra o modelo em ponto fixo.')
+    parser.add_argument('dump', help='dump do tb_HIL_TOP (texto, .npy/.bin)')
+    parser.add_argument('--formato', choices=('texto', 'binario', 'vcd'))
+    parser.add_argument('--base', choices=('hex', 'dec', 'bin'))
+    parser.add_argument('--referencia', help='compara com outro dump em vez do modelo')
+    parser.add_argument('--deslocamento', type=int, default=0, help='passo do modelo = passo do dump + deslocamento')
+    parser.add_argument('--max-passos', type=int)
+    parser.add_argument('--contexto', type=int, default=CONTEXTO_PASSOS)
+    parser.add_argument('--acumulacao', choices=MODOS_ACUMULACAO, default=ACUMULACAO)
+    parser.add_argument('--arredondamento', choices=MODOS_ARREDONDAMENTO, default=ARREDONDAMENTO)
+    parser.add_argument('--ciclo-primeiro-passo', type=int, default=CICLO_PRIMEIRO_PASSO,
+                        help='clock do HIL_TOP em que o passo 0 lê Uvector')
+    parser.add_argument('--defasagem-spwm', type=int, default=DEFASAGEM_SPWM_CICLOS,
+                        help='clocks entre o início da simulação e a saída de reset do SPWM_TOP')
+    args = parser.parse_args()
+
+    if args.referencia:
+        referencia = ReferenciaDump(args.referencia, base=args.base)
+        descricao = args.referencia
+    else:
+        modelo = ModeloLSM(acumulacao=args.acumulacao, arredondamento=args.arredondamento)
+        hil = ParametrosEntradaHIL(ciclo_primeiro_passo=args.ciclo_primeiro_passo)
+        referencia = ReferenciaModelo(modelo, entradas_spwm(hil=hil, defasagem_ciclos=args.defasagem_spwm))
+        descricao = f"modelo ({args.acumulacao}, {args.arredondamento})"
+
+    t = time.perf_counter()
+    try:
+        resultado = verificar(ler_em_blocos(args.dump, args.formato, args.base), referencia,
+                              args.deslocamento, args.contexto, args.max_passos)
+    except ValueError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    dt = time.perf_counter() - t
+    print(f"{args.dump} vs {descricao}: {resultado.passos_verificados:,} passos idênticos em {dt:.2f} s")
+    if resultado.ok:
+        if resultado.passos_verificados:
+            print(f"OK: passos {resultado.primeiro_passo} a {resultado.ultimo_passo} bit a bit iguais.")
+        else:
+            print("Nenhum passo comparado (dump vazio ou fora do alcance do deslocamento).")
+    else:
+        print(resultado.divergencia.relatorio())
+        sys.exit(1)
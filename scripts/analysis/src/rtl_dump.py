@@ -0,0 +1,538 @@
+# -*- coding: utf-8 -*-
+"""
+LEITURA dos dumps da simulação RTL (GHDL) para a análise.
+
+Formatos aceitos:
+  - texto (.txt/.dat): uma linha por passo do solver, 'passo x0 x1 ... xN',
+    com os estados em hexadecimal (complemento de 2, como o hwrite do
+    tb_HIL_TOP), decimal ou binário; linhas iniciadas por '#' são
+    comentários e o cabeçalho indica a base ('hex', 'dec' ou 'bin')
+  - binário (.bin/.npy): registros int64 little-endian [passo, x0 ... xN]
+  - VCD (.vcd): trocas de valor dos sinais escolhidos, amostradas com retenção
+    a cada período do solver
+
+GHW não é lido diretamente: gere VCD (--vcd=arquivo.vcd) ou use o dump em
+texto do testbench.
+
+A leitura é feita em blocos de bytes e cada bloco é convertido de uma vez com
+NumPy (tokens -> matriz de bytes -> dígitos), sem laço Python por linha. O
+resultado vai para um arquivo lateral '<dump>.cache.npy' (+ '.json'), que é
+reaproveitado enquanto o dump não mudar.
+
+Bits indefinidos (X/U/Z/W/-) valem 0 nos valores, mas cada passo que os tem é
+marcado na máscara 'indefinidos' devolvida junto (texto e VCD; no VCD, também
+os instantes antes da primeira troca de algum sinal). Quem compara valores
+(rtl_checker) deve tratar esses passos antes de comparar.
+
+Exemplos:
+    python rtl_dump.py hil_states.txt
+    python rtl_dump.py tb_HIL_TOP.vcd --sinais xvec0 xvec1 xvec2 xvec3 xvec4 --periodo-ns 100
+    python rtl_dump.py hil_states.txt --sem-cache
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+BITS_FRACIONARIOS = 28
+FP_TOTAL_BITS = 42
+PERIODO_PASSO_S = 1.0e-7          # SIMUL_PERIOD do HIL_TOP
+TAMANHO_BLOCO_BYTES = 32 * 1024 * 1024
+LINHAS_POR_BLOCO = 1 << 20         # Blocos de ler_em_blocos para binário/cache
+NOMES_ESTADOS = ['IL1', 'ILd', 'IL2', 'VCf', 'VCd']
+VERSAO_CACHE = 2                   # 2: máscara de indefinidos na última coluna
+
+EXTENSOES_TEXTO = ('.txt', '.dat', '.log')
+EXTENSOES_BINARIO = ('.bin', '.npy')
+EXTENSOES_VCD = ('.vcd',)
+
+_BASES = {'hex': 16, 'dec': 10, 'bin': 2}
+_ESCALAS_VCD = {'s': 1.0, 'ms': 1e-3, 'us': 1e-6, 'ns': 1e-9, 'ps': 1e-12, 'fs': 1e-15}
+
+# Valor de cada byte como dígito (-1 = não é dígito). X/U/Z/W/- (indefinidos) valem 0.
+_DIGITOS = np.full(256, -1, dtype=np.int8)
+for _i, _c in enumerate('0123456789abcdef'):
+    _DIGITOS[ord(_c)] = _i
+    _DIGITOS[ord(_c.upper())] = _i
+_INDEFINIDOS = np.zeros(256, dtype=bool)
+for _c in 'xXuUzZwW-':
+    _DIGITOS[ord(_c)] = 0
+    _INDEFINIDOS[ord(_c)] = True
+
+
+def _so_digitos(matriz, base):
+    """True se todos os bytes são dígitos da base (caminho rápido, sem tabela)."""
+    numerico = (matriz - np.uint8(ord('0'))) < min(base, 10)
+    if base <= 10:
+        return bool(numerico.all())
+    letra = ((matriz | np.uint8(0x20)) - np.uint8(ord('a'))) < base - 10
+    return bool((numerico | letra).all())
+
+
+def _decodificar_digitos(matriz, base, comprimento=None, largura_bits=None):
+    """
+    Converte uma matriz de bytes (linhas = tokens alinhados à esquerda) em
+    inteiros com sinal. 'comprimento' limita os dígitos de cada linha; sem ele,
+    o token termina no primeiro byte que não é dígito.
+    O sinal vem do bit mais alto de 'largura_bits' (padrão: todos os dígitos
+    do token, como em um hwrite/write de std_logic_vector).
+    Retorna (valores int64, indefinido bool).
+    """
+    n, colunas = matriz.shape
+    valores = np.zeros(n, dtype=np.int64)
+    if comprimento is not None and _so_digitos(matriz, base):
+        # Caso comum (campos de largura fixa): Horner direto nos bytes
+        digitos = (matriz & np.uint8(0x0F)) + np.uint8(9) * (matriz >> np.uint8(6))
+        for j in range(colunas):
+            valores *= base
+            valores += digitos[:, j]
+        validos = None
+        indefinido = np.zeros(n, dtype=bool)
+        num_digitos = np.full(n, colunas)
+    else:
+        digitos = _DIGITOS[matriz]
+        validos = digitos >= 0
+        if comprimento is None:
+            # Só o prefixo contínuo de dígitos conta
+            validos = np.cumprod(validos, axis=1, dtype=bool)
+        else:
+            validos &= np.arange(colunas) < np.asarray(comprimento)[:, None]
+        for j in range(colunas):
+            valores = np.where(validos[:, j], valores * base + digitos[:, j].astype(np.int64), valores)
+        indefinido = np.any(_INDEFINIDOS[matriz] & validos, axis=1)
+        num_digitos = validos.sum(axis=1)
+
+    if base != 10:
+        bits_por_digito = int(np.log2(base))
+        largura = num_digitos * bits_por_digito if largura_bits is None else largura_bits
+        largura = np.minimum(largura, 63)
+        limite = np.left_shift(np.int64(1), np.maximum(largura - 1, 0))
+        valores = np.where(valores >= limite, valores - 2 * limite, valores)
+    return valores, indefinido
+
+
+def _matriz_de_tokens(tokens):
+    """Lista de bytes -> matriz (n, maior_token) de uint8 preenchida com zeros à direita."""
+    arr = np.array(tokens)
+    largura = arr.dtype.itemsize
+    return arr.view(np.uint8).reshape(len(tokens), largura)
+
+
+def _blocos_de_linhas(caminho, tamanho_bloco=TAMANHO_BLOCO_BYTES, inicio=0):
+    """Blocos de bytes terminados em fim de linha (o resto passa para o próximo bloco)."""
+    with open(caminho, 'rb') as f:
+        f.seek(inicio)
+        resto = b''
+        while True:
+            dados = f.read(tamanho_bloco)
+            if not dados:
+                if resto.strip():
+                    yield resto
+                return
+            dados = resto + dados
+            corte = dados.rfind(b'\n') + 1
+            if corte == 0:
+                resto = dados
+                continue
+            resto = dados[corte:]
+            yield dados[:corte]
+
+
+# --- Texto ---
+
+def detectar_base(caminho):
+    """Base dos estados pelo cabeçalho (palavras 'hex'/'dec'/'bin'); padrão hex."""
+    with open(caminho, 'rb') as f:
+        for linha in f:
+            linha = linha.strip().lower()
+            if not linha.startswith(b'#'):
+                break
+            for nome in _BASES:
+                if nome.encode() in linha:
+                    return nome
+    return 'hex'
+
+
+def _campos_largura_fixa(bloco, num_colunas):
+    """
+    Se todas as linhas do bloco têm o mesmo tamanho (caso do write/hwrite com
+    largura fixa do testbench), devolve as matrizes de bytes de cada coluna
+    direto do buffer, sem separar tokens. Caso contrário, None.
+    """
+    largura = bloco.find(b'\n') + 1
+    if largura < 2 or len(bloco) % largura:
+        return None
+    dados = np.frombuffer(bloco, dtype=np.uint8)
+    if not np.all(dados[largura - 1::largura] == ord('\n')):
+        return None
+    matriz = dados.reshape(-1, largura)[:, :largura - 1]
+    # Colunas de separação: espaço (ou tab) em todas as linhas
+    separador = np.all((matriz == ord(' ')) | (matriz == ord('\t')), axis=0)
+    transicoes = np.diff(np.concatenate(([0], (~separador).astype(np.int8), [0])))
+    inicios, fins = np.flatnonzero(transicoes == 1), np.flatnonzero(transicoes == -1)
+    campos = [matriz[:, a:b] for a, b in zip(inicios, fins)]
+    return campos if len(campos) == num_colunas else None
+
+
+def _campos_por_token(bloco, num_colunas, caminho):
+    tokens = bloco.split()
+    if len(tokens) % num_colunas:
+        raise ValueError(f"'{caminho}': linhas com número de colunas diferente de {num_colunas}.")
+    matriz = _matriz_de_tokens(tokens).reshape(len(tokens) // num_colunas, num_colunas, -1)
+    return [matriz[:, c, :] for c in range(num_colunas)]
+
+
+def _decodificar_campo(campo, base):
+    """Coluna de texto -> inteiros; espaços de alinhamento são ignorados e '-' no decimal é sinal."""
+    # Alinhamento à direita (write com 'right') = zeros à esquerda
+    espacos = campo == ord(' ')
+    if espacos.any():
+        campo = np.where(espacos, np.uint8(ord('0')), campo)
+    negativos = None
+    if base == 10:
+        sinais = campo == ord('-')
+        negativos = sinais.any(axis=1)
+        if negativos.any():
+            campo = np.where(sinais, np.uint8(ord('0')), campo)
+    valores, indefinidos = _decodificar_digitos(campo, base, np.full(campo.shape[0], campo.shape[1]))
+    if negativos is not None:
+        valores = np.where(negativos, -valores, valores)
+    return valores, indefinidos
+
+
+def ler_texto_em_blocos(caminho, base=None, tamanho_bloco=TAMANHO_BLOCO_BYTES):
+    """
+    Gera (passos, valores[n, estados], indefinidos) por bloco de um dump em texto.
+    A primeira coluna (passo) é sempre decimal.
+    """
+    base = _BASES[base or detectar_base(caminho)]
+    comentario = re.compile(rb'(?m)^[ \t]*#[^\n]*\n?')
+    num_colunas = None
+    for bloco in _blocos_de_linhas(caminho, tamanho_bloco):
+        if b'#' in bloco:
+            bloco = comentario.sub(b'', bloco)
+        if b'\r' in bloco:
+            bloco = bloco.replace(b'\r', b'')
+        if num_colunas is None:
+            primeira = next((l for l in bloco.splitlines() if l.strip()), None)
+            if primeira is None:
+                continue
+            num_colunas = len(primeira.split())
+        if not bloco.strip():
+            continue
+        campos = _campos_largura_fixa(bloco, num_colunas) or _campos_por_token(bloco, num_colunas, caminho)
+        passos, _ = _decodificar_campo(campos[0], 10)
+        colunas = [_decodificar_campo(c, base) for c in campos[1:]]
+        yield (passos, np.column_stack([v for v, _ in colunas]),
+               np.any(np.column_stack([ind for _, ind in colunas]), axis=1))
+
+
+# --- Binário ---
+
+def ler_binario(caminho, num_colunas=1 + len(NOMES_ESTADOS)):
+    """Registros int64 [passo, estados...]; .npy é mapeado em memória sem cópia."""
+    if caminho.lower().endswith('.npy'):
+        dados = np.load(caminho, mmap_mode='r')
+    else:
+        dados = np.memmap(caminho, dtype='<i8', mode='r').reshape(-1, num_colunas)
+    return dados[:, 0], dados[:, 1:]
+
+
+# --- VCD ---
+
+class CabecalhoVcd:
+    """Declarações ($var) e escala de tempo de um VCD; 'inicio_corpo' é o byte após $enddefinitions."""
+
+    def __init__(self, caminho):
+        self.escala_s = 1e-15
+        self.variaveis = []   # (id, largura, nome completo)
+        escopo = []
+        texto = b''
+        with open(caminho, 'rb') as f:
+            while b'$enddefinitions' not in texto:
+                parte = f.read(1 << 20)
+                if not parte:
+                    raise ValueError(f"'{caminho}' sem $enddefinitions (não é VCD?).")
+                texto += parte
+        fim = texto.index(b'$enddefinitions')
+        self.inicio_corpo = texto.index(b'$end', fim + len(b'$enddefinitions')) + len(b'$end')
+        palavras = texto[:fim].decode('ascii', errors='replace').split()
+        i = 0
+        while i < len(palavras):
+            p = palavras[i]
+            if p == '$timescale':
+                valor = ''.join(palavras[i + 1:palavras.index('$end', i)])
+                m = re.fullmatch(r'(\d+)\s*([a-z]+)', valor)
+                self.escala_s = int(m.group(1)) * _ESCALAS_VCD[m.group(2)]
+            elif p == '$scope':
+                escopo.append(palavras[i + 2])
+            elif p == '$upscope':
+                escopo.pop()
+            elif p == '$var':
+                fim_var = palavras.index('$end', i)
+                largura, ident, nome = int(palavras[i + 2]), palavras[i + 3], palavras[i + 4]
+                self.variaveis.append((ident, largura, '.'.join(escopo + [nome])))
+                i = fim_var
+            i += 1
+
+    def procurar(self, nome):
+        """(id, largura, nome completo) pelo nome completo ou pelo final do caminho (sem diferenciar caixa)."""
+        nome = nome.lower()
+        for var in self.variaveis:
+            completo = var[2].lower()
+            if completo == nome or completo.endswith('.' + nome):
+                return var
+        raise KeyError(f"Sinal '{nome}' não encontrado no VCD.")
+
+
+def _chave_id(matriz, inicio, comprimento):
+    """Identificador VCD (até 8 bytes) de cada linha como um inteiro, para comparar vetorizado."""
+    n, colunas = matriz.shape
+    chave = np.zeros(n, dtype=np.uint64)
+    for k in range(8):
+        pos = inicio + k
+        dentro = (k < comprimento) & (pos < colunas)
+        byte = matriz[np.arange(n), np.minimum(pos, colunas - 1)].astype(np.uint64)
+        chave |= np.where(dentro, byte, 0).astype(np.uint64) << np.uint64(8 * k)
+    return chave
+
+
+def _chave_texto(ident):
+    return np.uint64(sum(b << (8 * k) for k, b in enumerate(ident.encode()[:8])))
+
+
+def ler_vcd(caminho, sinais, tamanho_bloco=TAMANHO_BLOCO_BYTES):
+    """
+    Trocas de valor dos sinais pedidos. Retorna (nomes_completos, trocas, escala_s),
+    com trocas[i] = (tempos, valores int64, indefinidos bool) do sinal i e os
+    tempos inteiros em unidades do $timescale (escala_s segundos cada).
+    """
+    cab = CabecalhoVcd(caminho)
+    declarados = [cab.procurar(s) for s in sinais]
+    chaves = np.array([_chave_texto(v[0]) for v in declarados], dtype=np.uint64)
+    larguras = np.array([v[1] for v in declarados], dtype=np.int64)
+    partes = [([], [], []) for _ in declarados]
+    tempo_atual = 0
+
+    for bloco in _blocos_de_linhas(caminho, tamanho_bloco, inicio=cab.inicio_corpo):
+        if b'\r' in bloco:
+            bloco = bloco.replace(b'\r', b'')
+        # Linhas vazias viram linhas de zeros, ignoradas pela classificação abaixo
+        matriz = _matriz_de_tokens(bloco.split(b'\n'))
+        comprimentos = np.count_nonzero(matriz, axis=1)
+        primeiro = matriz[:, 0]
+
+        # Tempo de cada linha = último '#t' visto (inclusive de blocos anteriores)
+        eh_tempo = primeiro == ord('#')
+        tempos_linha, _ = _decodificar_digitos(matriz[eh_tempo, 1:], 10, comprimentos[eh_tempo] - 1)
+        tempos = np.concatenate(([tempo_atual], tempos_linha))
+        posicao = np.cumsum(eh_tempo)  # 0 = antes do primeiro '#' do bloco
+        tempo_de = tempos[posicao]
+        if tempos_linha.size:
+            tempo_atual = int(tempos_linha[-1])
+
+        # Vetores: 'b<bits> <id>'; escalares: '<0|1|x|z><id>'
+        eh_vetor = primeiro == ord('b')
+        eh_escalar = np.isin(primeiro, np.frombuffer(b'01xzXZuU', dtype=np.uint8))
+        espaco = np.argmax(matriz == ord(' '), axis=1)
+        inicio_id = np.where(eh_vetor, espaco + 1, 1)
+        chave = _chave_id(matriz, inicio_id, comprimentos - inicio_id)
+
+        for i, (ch, largura) in enumerate(zip(chaves, larguras)):
+            sel = (eh_vetor | eh_escalar) & (chave == ch)
+            if not np.any(sel):
+                continue
+            vetor = eh_vetor[sel]
+            valores_vetor, indefinido_vetor = _decodificar_digitos(
+                matriz[sel, 1:], 2, espaco[sel] - 1, largura_bits=np.full(np.count_nonzero(sel), largura))
+            valores = np.where(vetor, valores_vetor, (matriz[sel, 0] == ord('1')).astype(np.int64))
+            partes[i][0].append(tempo_de[sel])
+            partes[i][1].append(valores)
+            partes[i][2].append(np.where(vetor, indefinido_vetor, _INDEFINIDOS[matriz[sel, 0]]))
+
+    trocas = []
+    for tempos, valores, indefinidos in partes:
+        t = np.concatenate(tempos) if tempos else np.zeros(0, dtype=np.int64)
+        v = np.concatenate(valores) if valores else np.zeros(0, dtype=np.int64)
+        ind = np.concatenate(indefinidos) if indefinidos else np.zeros(0, dtype=bool)
+        trocas.append((t, v, ind))
+    return [v[2] for v in declarados], trocas, cab.escala_s
+
+
+def amostrar_trocas(trocas, instantes, valor_inicial=0):
+    """
+    Valor de cada sinal nos instantes pedidos, na unidade dos tempos das trocas
+    (retenção do último valor). Retorna (valores [instantes, sinais], indefinidos
+    [instantes]): um instante é indefinido se algum sinal tem bits X/U/Z nele ou
+    ainda não tinha nenhuma troca.
+    """
+    colunas = []
+    indefinidos = np.zeros(len(instantes), dtype=bool)
+    for tempos, valores, indefinido in trocas:
+        idx = np.searchsorted(tempos, instantes, side='right') - 1
+        colunas.append(np.where(idx >= 0, valores[np.maximum(idx, 0)], valor_inicial))
+        if tempos.size:
+            indefinidos |= (idx < 0) | indefinido[np.maximum(idx, 0)]
+        else:
+            indefinidos[:] = True
+    return np.column_stack(colunas), indefinidos
+
+
+# --- Cache e interface única ---
+
+def _caminhos_cache(caminho):
+    return caminho + '.cache.npy', caminho + '.cache.json'
+
+
+def _assinatura(caminho, opcoes):
+    st = os.stat(caminho)
+    return {'versao': VERSAO_CACHE, 'tamanho': st.st_size, 'mtime_ns': st.st_mtime_ns, 'opcoes': opcoes}
+
+
+def _ler_cache(caminho, opcoes):
+    """Dados do cache lateral (mapeados em memória) e info, ou None se ausente/desatualizado."""
+    arq_npy, arq_json = _caminhos_cache(caminho)
+    if not (os.path.exists(arq_npy) and os.path.exists(arq_json)):
+        return None
+    with open(arq_json, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('assinatura') != _assinatura(caminho, opcoes):
+        return None
+    return np.load(arq_npy, mmap_mode='r'), meta['info']
+
+
+def _formato(caminho, formato):
+    ext = os.path.splitext(caminho)[1].lower()
+    return formato or ('vcd' if ext in EXTENSOES_VCD else 'binario' if ext in EXTENSOES_BINARIO else 'texto')
+
+
+def carregar_dump(caminho, formato=None, sinais=None, periodo_s=PERIODO_PASSO_S, base=None, usar_cache=True):
+    """
+    Lê qualquer formato e retorna (passos int64, valores int64 [passos, estados],
+    indefinidos bool [passos], info). 'info' traz nomes, periodo_s e o número
+    de passos com valores indefinidos (o binário não tem como marcá-los).
+    """
+    formato = _formato(caminho, formato)
+    if formato == 'binario':
+        passos, valores = ler_binario(caminho)
+        return (passos, valores, np.zeros(len(passos), dtype=bool),
+                {'nomes': NOMES_ESTADOS[:valores.shape[1]], 'periodo_s': periodo_s, 'indefinidos': 0})
+
+    opcoes = {'formato': formato, 'sinais': sinais, 'periodo_s': periodo_s, 'base': base}
+    arq_npy, arq_json = _caminhos_cache(caminho)
+    assinatura = _assinatura(caminho, opcoes)
+    cache = _ler_cache(caminho, opcoes) if usar_cache else None
+    if cache is not None:
+        dados, info = cache
+        return dados[:, 0], dados[:, 1:-1], dados[:, -1].astype(bool), info
+
+    if formato == 'vcd':
+        if not sinais:
+            cab = CabecalhoVcd(caminho)
+            sinais = [v[2] for v in cab.variaveis if v[1] == FP_TOTAL_BITS]
+        nomes, trocas, escala_s = ler_vcd(caminho, sinais)
+        # Instantes de amostragem em unidades inteiras do VCD (sem erro de ponto flutuante)
+        periodo = int(round(periodo_s / escala_s))
+        fim = max((int(t[-1]) for t, _, _ in trocas if t.size), default=0)
+        instantes = np.arange(fim // periodo + 1, dtype=np.int64) * periodo
+        valores, indefinidos = amostrar_trocas(trocas, instantes)
+        passos = np.arange(len(instantes), dtype=np.int64)
+        info = {'nomes': nomes, 'periodo_s': periodo_s}
+    else:
+        partes_p, partes_v, partes_i = [], [], []
+        for p, v, ind in ler_texto_em_blocos(caminho, base):
+            partes_p.append(p)
+            partes_v.append(v)
+            partes_i.append(ind)
+        passos = np.concatenate(partes_p) if partes_p else np.zeros(0, dtype=np.int64)
+        valores = np.concatenate(partes_v) if partes_v else np.zeros((0, len(NOMES_ESTADOS)), dtype=np.int64)
+        indefinidos = np.concatenate(partes_i) if partes_i else np.zeros(0, dtype=bool)
+        info = {'nomes': NOMES_ESTADOS[:valores.shape[1]] if valores.shape[1] <= len(NOMES_ESTADOS)
+                else [f'Estado_{i}' for i in range(valores.shape[1])],
+                'periodo_s': periodo_s}
+    info['indefinidos'] = int(np.count_nonzero(indefinidos))
+
+    if usar_cache:
+        try:
+            np.save(arq_npy, np.column_stack([passos, valores, indefinidos]))
+            with open(arq_json, 'w', encoding='utf-8') as f:
+                json.dump({'assinatura': assinatura, 'info': info}, f, indent=2)
+        except OSError as e:
+            print(f"Aviso: cache não gravado ({e}).")
+    return passos, valores, indefinidos, info
+
+
+def ler_em_blocos(caminho, formato=None, base=None, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Gera (passos, valores, indefinidos) em blocos com memória limitada, para
+    dumps que não cabem na memória: usa o cache lateral ou o binário mapeado em
+    memória quando existirem; senão lê o texto em blocos (sem gravar cache).
+    VCD não é lido em fluxo: é carregado inteiro por carregar_dump.
+    """
+    formato = _formato(caminho, formato)
+    if formato == 'texto':
+        cache = _ler_cache(caminho, {'formato': formato, 'sinais': None, 'periodo_s': PERIODO_PASSO_S, 'base': base})
+        if cache is None:
+            yield from ler_texto_em_blocos(caminho, base)
+            return
+        dados = cache[0]
+        passos, valores, indefinidos = dados[:, 0], dados[:, 1:-1], dados[:, -1]
+    elif formato == 'binario':
+        passos, valores = ler_binario(caminho)
+        indefinidos = None
+    else:
+        passos, valores, indefinidos, _ = carregar_dump(caminho, formato)
+    for inicio in range(0, len(passos), linhas_por_bloco):
+        fim = min(inicio + linhas_por_bloco, len(passos))
+        yield (np.asarray(passos[inicio:fim]), np.asarray(valores[inicio:fim]),
+               np.zeros(fim - inicio, dtype=bool) if indefinidos is None
+               else np.asarray(indefinidos[inicio:fim]).astype(bool))
+
+
+def para_dataframes(caminho, intervalo_saida_s=None, **opcoes):
+    """
+    Dump -> {nome_estado: DataFrame(Time, DadoReal)} no formato dos CSVs da FPGA,
+    opcionalmente decimado para 'intervalo_saida_s' (ex.: 25 µs da serial).
+    """
+    import pandas as pd
+
+    passos, valores, _, info = carregar_dump(caminho, **opcoes)
+    if info['indefinidos']:
+        print(f"Aviso: '{caminho}' tem {info['indefinidos']} passo(s) com bits indefinidos (X/U), lidos como 0.")
+    periodo = info['periodo_s']
+    decimacao = max(1, int(round(intervalo_saida_s / periodo))) if intervalo_saida_s else 1
+    passos = np.asarray(passos[::decimacao])
+    reais = np.asarray(valores[::decimacao]) / 2**BITS_FRACIONARIOS
+    tempo = (passos - passos[0]) * periodo if passos.size else passos.astype(float)
+    return {nome: pd.DataFrame({'Time': tempo, 'DadoReal': reais[:, i]}) for i, nome in enumerate(info['nomes'])}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Leitura de dumps da simulação RTL (texto, binário, VCD).')
+    parser.add_argument('arquivo')
+    parser.add_argument('--formato', choices=('texto', 'binario', 'vcd'))
+    parser.add_argument('--base', choices=tuple(_BASES), help='base dos estados no dump em texto')
+    parser.add_argument('--sinais', nargs='+', help='sinais do VCD (nome ou final do caminho hierárquico)')
+    parser.add_argument('--periodo-ns', type=float, default=PERIODO_PASSO_S * 1e9,
+                        help='período do passo do solver (amostragem do VCD)')
+    parser.add_argument('--sem-cache', action='store_true')
+    args = parser.parse_args()
+
+    t = time.perf_counter()
+    passos, valores, indefinidos, info = carregar_dump(args.arquivo, args.formato, args.sinais, args.periodo_ns * 1e-9,
+                                          args.base, usar_cache=not args.sem_cache)
+    dt = time.perf_counter() - t
+    print(f"{args.arquivo}: {len(passos):,} passos x {valores.shape[1]} estados em {dt:.2f} s")
+    if info['indefinidos']:
+        print(f"  {info['indefinidos']} passo(s) com bits indefinidos (X/U) lidos como 0; "
+              f"primeiro: passo {passos[np.argmax(indefinidos)]}")
+    if len(passos):
+        reais = np.asarray(valores) / 2**BITS_FRACIONARIOS
+        print(f"  passos {passos[0]} a {passos[-1]} ({len(passos) * info['periodo_s'] * 1e3:.3f} ms)")
+        for nome, coluna in zip(info['nomes'], reais.T):
+            print(f"  {nome:>24}: min {coluna.min():+.5g} | max {coluna.max():+.5g} | "
+                  f"RMS {np.sqrt(np.mean(coluna ** 2)):.5g}")
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+CACHE DE ETAPAS da análise, endereçado pelo conteúdo.
+
+Cada etapa (leitura + regime + subamostragem do PSIM, leitura da FPGA,
+busca dos pontos de referência, interpolação + métricas) é guardada em disco
+com uma chave SHA-256 de tudo o que define o resultado:
+  - o conteúdo dos arquivos de entrada (hash_arquivo, memorizado por
+    caminho/tamanho/mtime para não reler CSVs grandes a cada execução);
+  - os parâmetros da etapa (taxa, coluna, deslocamento...);
+  - as chaves das etapas anteriores de que ela depende;
+  - o código das etapas (main.py e os módulos de src usados).
+Assim, mudar o ajuste de fase de uma variável muda só a chave das etapas
+dessa variável a partir do alinhamento; o resto vem do cache.
+
+Os valores podem ser arrays NumPy, DataFrames, dicionários serializáveis em
+JSON (métricas) ou dicionários com esses tipos, gravados em .npz sem pickle:
+colunas e arrays de objetos viram numéricos (se todos os valores forem) ou
+texto. Quando o total passa de LIMITE_BYTES, as entradas usadas há mais tempo
+(mtime, renovado a cada acerto) são apagadas, exceto a que acabou de ser gravada.
+
+Exemplos:
+    python stage_cache.py --resumo
+    python stage_cache.py --limpar
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+
+import numpy as np
+
+# --- Bloco de Configuração ---
+PASTA_CACHE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', '.cache')
+LIMITE_BYTES = 512 * 1024**2
+ARQUIVO_INDICE_HASH = 'hashes.json'
+BLOCO_HASH = 1 << 20
+
+# --- Fim do Bloco de Configuração ---
+
+
+def _digest(*partes):
+    h = hashlib.sha256()
+    for parte in partes:
+        if isinstance(parte, np.ndarray):
+            h.update(str(parte.dtype).encode() + str(parte.shape).encode())
+            h.update(np.ascontiguousarray(parte).tobytes())
+        elif isinstance(parte, float):
+            h.update(repr(parte).encode())  # repr é exato para floats
+        elif isinstance(parte, dict):
+            h.update(json.dumps(parte, sort_keys=True, default=repr).encode())
+        else:
+            h.update(repr(parte).encode())
+        h.update(b'\x00')
+    return h.hexdigest()
+
+
+# --- Serialização sem pickle ---
+def _sem_objetos(array):
+    """
+    Array de dtype object (que o np.load sem pickle recusaria) como numérico,
+    se todos os valores não nulos forem números, ou como texto.
+    """
+    import pandas as pd
+
+    if array.dtype != object:
+        return array
+    serie = pd.Series(array.ravel())
+    numerica = pd.to_numeric(serie, errors='coerce')
+    if numerica.notna().sum() == serie.notna().sum():
+        return numerica.to_numpy().reshape(array.shape)
+    return array.astype(str)
+
+
+def _achatar(valor, prefixo, arrays):
+    """Separa os arrays (vão para o .npz) do resto (vai para o JSON de metadados)."""
+    import pandas as pd
+
+    if isinstance(valor, pd.DataFrame):
+        colunas = [str(c) for c in valor.columns]
+        for i, c in enumerate(valor.columns):
+            arrays[f'{prefixo}|{i}'] = _sem_objetos(valor[c].to_numpy())
+        return {'__dataframe__': colunas}
+    if isinstance(valor, np.ndarray):
+        arrays[prefixo] = _sem_objetos(valor)
+        return {'__array__': prefixo}
+    if isinstance(valor, dict):
+        return {str(k): _achatar(v, f'{prefixo}|{k}', arrays) for k, v in valor.items()}
+    if isinstance(valor, (np.floating, np.integer)):
+        valor = valor.item()
+    if isinstance(valor, float) and not np.isfinite(valor):
+        return {'__float__': repr(valor)}  # NaN/inf não são JSON válido
+    return valor
+
+
+def _montar(meta, prefixo, arrays):
+    import pandas as pd
+
+    if isinstance(meta, dict):
+        if '__dataframe__' in meta:
+            return pd.DataFrame({c: arrays[f'{prefixo}|{i}'] for i, c in enumerate(meta['__dataframe__'])})
+        if '__array__' in meta:
+            return arrays[meta['__array__']]
+        if '__float__' in meta:
+            return float(meta['__float__'])
+        return {k: _montar(v, f'{prefixo}|{k}', arrays) for k, v in meta.items()}
+    return meta
+
+
+class CacheEtapas:
+    """
+    Cache em disco das etapas da análise. ativo=False recalcula tudo sem
+    ler nem gravar (mantém as estatísticas, para comparar tempos).
+    """
+
+    def __init__(self, pasta=PASTA_CACHE, limite_bytes=LIMITE_BYTES, ativo=True, arquivos_codigo=()):
+        self.pasta = pasta
+        self.limite_bytes = limite_bytes
+        self.ativo = ativo
+        self.acertos = 0
+        self.faltas = 0
+        self.tempo_economizado_s = 0.0
+        self._indice_hash = None
+        self._versao_codigo = _digest(*[self.hash_arquivo(c) for c in arquivos_codigo])
+
+    # --- Hash dos arquivos de entrada ---
+    def _carregar_indice(self):
+        if self._indice_hash is None:
+            self._indice_hash = {}
+            caminho = os.path.join(self.pasta, ARQUIVO_INDICE_HASH)
+            if os.path.exists(caminho):
+                try:
+                    with open(caminho, encoding='utf-8') as f:
+                        self._indice_hash = json.load(f)
+                except (OSError, ValueError):
+                    pass
+        return self._indice_hash
+
+    def hash_arquivo(self, caminho):
+        """SHA-256 do conteúdo; só relê o arquivo se o tamanho ou o mtime mudaram."""
+        caminho = os.path.abspath(caminho)
+        st = os.stat(caminho)
+        assinatura = [st.st_size, st.st_mtime_ns]
+        indice = self._carregar_indice()
+        registro = indice.get(caminho)
+        if registro and registro[:2] == assinatura:
+            return registro[2]
+
+        h = hashlib.sha256()
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(BLOCO_HASH), b''):
+                h.update(bloco)
+        indice[caminho] = assinatura + [h.hexdigest()]
+        if self.ativo:
+            os.makedirs(self.pasta, exist_ok=True)
+            with open(os.path.join(self.pasta, ARQUIVO_INDICE_HASH), 'w', encoding='utf-8') as f:
+                json.dump(indice, f)
+        return indice[caminho][2]
+
+    def chave(self, etapa, *partes):
+        """Chave da etapa: nome, versão do código e as partes (hashes, parâmetros, chaves anteriores)."""
+        return f'{etapa}-{_digest(etapa, self._versao_codigo, *partes)[:32]}'
+
+    # --- Leitura/gravação ---
+    def _caminho(self, chave):
+        return os.path.join(self.pasta, chave + '.npz')
+
+    def _gravar(self, chave, valor, duracao_s):
+        arrays = {}
+        meta = {'valor': _achatar(valor, 'v', arrays), 'duracao_s': duracao_s}
+        os.makedirs(self.pasta, exist_ok=True)
+        buffer = io.BytesIO()
+        np.savez(buffer, __meta__=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+                 **arrays)
+        temporario = self._caminho(chave) + '.tmp'
+        with open(temporario, 'wb') as f:
+            f.write(buffer.getvalue())
+        os.replace(temporario, self._caminho(chave))  # Gravação atômica
+        self.despejar(manter=self._caminho(chave))
+
+    def obter(self, chave, calcular):
+        """Valor da etapa 'chave' do disco ou, se ausente, calcular() (e grava o resultado)."""
+        if self.ativo:
+            caminho = self._caminho(chave)
+            if os.path.exists(caminho):
+                try:
+                    with np.load(caminho, allow_pickle=False) as npz:
+                        arrays = {k: npz[k] for k in npz.files if k != '__meta__'}
+                        meta = json.loads(npz['__meta__'].tobytes().decode('utf-8'))
+                    os.utime(caminho)  # Renova a posição na ordem LRU
+                    self.acertos += 1
+                    self.tempo_economizado_s += meta.get('duracao_s', 0.0)
+                    return _montar(meta['valor'], 'v', arrays)
+                except (OSError, ValueError, KeyError):
+                    pass  # Entrada corrompida: recalcula e sobrescreve
+
+        self.faltas += 1
+        inicio = time.perf_counter()
+        valor = calcular()
+        if self.ativo and valor is not None:
+            self._gravar(chave, valor, time.perf_counter() - inicio)
+        return valor
+
+    # --- Manutenção ---
+    def entradas(self):
+        """[(caminho, bytes, mtime)] das entradas, da menos para a mais recentemente usada."""
+        if not os.path.isdir(self.pasta):
+            return []
+        lista = []
+        for nome in os.listdir(self.pasta):
+            if nome.endswith('.npz'):
+                caminho = os.path.join(self.pasta, nome)
+                st = os.stat(caminho)
+                lista.append((caminho, st.st_size, st.st_mtime))
+        return sorted(lista, key=lambda e: e[2])
+
+    def despejar(self, manter=None):
+        """Apaga as entradas menos usadas (exceto 'manter') até o total caber em limite_bytes."""
+        entradas = self.entradas()
+        total = sum(e[1] for e in entradas)
+        for caminho, tamanho, _ in entradas:
+            if total <= self.limite_bytes:
+                break
+            if caminho == manter:
+                continue
+            os.remove(caminho)
+            total -= tamanho
+
+    def limpar(self):
+        for caminho, _, _ in self.entradas():
+            os.remove(caminho)
+        indice = os.path.join(self.pasta, ARQUIVO_INDICE_HASH)
+        if os.path.exists(indice):
+            os.remove(indice)
+        self._indice_hash = None
+
+    def resumo(self):
+        return (f"cache: {self.acertos} acerto(s), {self.faltas} falta(s), "
+                f"~{self.tempo_economizado_s:.2f} s economizados")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cache de etapas da análise (data/.cache).')
+    parser.add_argument('--pasta', default=PASTA_CACHE, help='pasta do cache')
+    parser.add_argument('--limpar', action='store_true', help='apaga todas as entradas')
+    parser.add_argument('--resumo', action='store_true', help='lista o uso por etapa')
+    args = parser.parse_args()
+
+    cache = CacheEtapas(args.pasta)
+    if args.limpar:
+        cache.limpar()
+        print(f"Cache em '{args.pasta}' apagado.")
+        return
+    por_etapa = {}
+    for caminho, tamanho, _ in cache.entradas():
+        etapa = os.path.basename(caminho).rsplit('-', 1)[0]
+        n, total = por_etapa.get(etapa, (0, 0))
+        por_etapa[etapa] = (n + 1, total + tamanho)
+    for etapa, (n, total) in sorted(por_etapa.items()):
+        print(f"  {etapa:>12}: {n:4d} entrada(s), {total / 1024**2:8.2f} MB")
+    total = sum(t for _, t in por_etapa.values())
+    print(f"Total: {total / 1024**2:.2f} MB de {LIMITE_BYTES / 1024**2:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
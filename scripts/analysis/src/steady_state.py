@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+DETECÇÃO DO ESTADO ESTACIONÁRIO por ciclo da fundamental.
+
+Em vez de assumir que os últimos 80 ms são regime permanente, calcula em uma
+única passada vetorizada (np.add.reduceat / np.maximum.reduceat) o RMS, a
+média e o pico de cada ciclo completo e procura o primeiro ciclo a partir do
+qual a variação ciclo a ciclo fica abaixo da tolerância até o fim do registro:
+
+    variação[k] = max(|ΔRMS| / RMS, |Δmédia| / RMS, |Δpico| / pico)
+
+O segmento estacionário vai do início desse ciclo até o fim dos dados. Se o
+sinal não assentar (ou tiver poucos ciclos), volta para a janela fixa final
+(DURACAO_PADRAO_S) e marca 'convergiu' = False.
+
+Exemplos:
+    python steady_state.py ../data/psim_1us_sc.csv --colunas VCf IL2_1
+    python steady_state.py ../data/dados_fpga_vcf_25us.csv --intervalo-us 25 --tolerancia 0.02
+"""
+
+import argparse
+
+import numpy as np
+
+# --- Bloco de Configuração ---
+FREQ_FUNDAMENTAL_PADRAO = 50.0   # Usada quando o sinal não tem componente alternada clara
+TOLERANCIA_RELATIVA = 0.01       # Variação ciclo a ciclo aceita como regime (1%)
+CICLOS_ESTAVEIS_MINIMOS = 3      # Ciclos estáveis exigidos no final do registro
+DURACAO_PADRAO_S = 0.08          # Janela usada quando o regime não é detectado
+RELACAO_PICO_MINIMA = 20.0       # Pico do espectro / mediana para aceitar a frequência estimada
+
+# --- Fim do Bloco de Configuração ---
+
+
+class SegmentoEstacionario:
+    """Trecho em regime de uma variável: [t_inicio, t_fim] e o índice da 1ª amostra."""
+
+    def __init__(self, t_inicio, t_fim, indice_inicio, freq, ciclos, convergiu):
+        self.t_inicio = t_inicio
+        self.t_fim = t_fim
+        self.indice_inicio = indice_inicio
+        self.freq = freq
+        self.ciclos = ciclos              # ciclos completos dentro do segmento
+        self.convergiu = convergiu
+
+    @property
+    def duracao(self):
+        return self.t_fim - self.t_inicio
+
+    def __repr__(self):
+        return (f"SegmentoEstacionario({self.t_inicio:.6f}s a {self.t_fim:.6f}s, {self.ciclos} ciclos "
+                f"de {self.freq:.3f} Hz, convergiu={self.convergiu})")
+
+
+def estimar_frequencia(tempo, dados, freq_padrao=FREQ_FUNDAMENTAL_PADRAO):
+    """
+    Frequência dominante na metade final do registro (pico do espectro com janela
+    de Hann e interpolação parabólica). Sem componente alternada relevante,
+    devolve freq_padrao.
+    """
+    tempo, dados = np.asarray(tempo, dtype=float), np.asarray(dados, dtype=float)
+    meio = len(dados) // 2
+    x = dados[meio:] - np.mean(dados[meio:])
+    if x.size < 8:
+        return freq_padrao
+    dt = (tempo[-1] - tempo[meio]) / (x.size - 1)
+    espectro = np.abs(np.fft.rfft(x * np.hanning(x.size)))
+    espectro[0] = 0.0
+    k = int(np.argmax(espectro))
+    if k == 0 or k == espectro.size - 1 or espectro[k] < RELACAO_PICO_MINIMA * np.median(espectro):
+        return freq_padrao
+    a, b, c = np.log(espectro[k - 1:k + 2] + np.finfo(float).tiny)
+    delta = 0.5 * (a - c) / (a - 2 * b + c) if (a - 2 * b + c) != 0 else 0.0
+    return (k + delta) / (x.size * dt)
+
+
+def metricas_por_ciclo(tempo, dados, freq, t0=None):
+    """
+    RMS, média e pico de cada ciclo completo a partir de t0 (padrão: início dos dados).
+    Retorna (inicios_indices, rms, media, pico); os ciclos cobrem [inicio[k], inicio[k+1]).
+    """
+    tempo, dados = np.asarray(tempo, dtype=float), np.asarray(dados, dtype=float)
+    t0 = tempo[0] if t0 is None else t0
+    num_ciclos = int(np.floor((tempo[-1] - t0) * freq))
+    vazio = np.zeros(0)
+    if num_ciclos < 1:
+        return np.zeros(0, dtype=np.int64), vazio, vazio, vazio
+    fronteiras = np.searchsorted(tempo, t0 + np.arange(num_ciclos + 1) / freq)
+    inicios = fronteiras[:-1]
+    contagem = np.diff(fronteiras)
+    validos = contagem > 0
+    inicios, contagem = inicios[validos], contagem[validos]
+    fim = fronteiras[-1]
+    # reduceat soma de inicio[k] até inicio[k+1]; o último ciclo termina em 'fim'
+    soma = np.add.reduceat(dados[:fim], inicios)
+    soma_quad = np.add.reduceat(dados[:fim] ** 2, inicios)
+    pico = np.maximum.reduceat(np.abs(dados[:fim]), inicios)
+    media = soma / contagem
+    rms = np.sqrt(soma_quad / contagem)
+    return inicios, rms, media, pico
+
+
+def variacao_por_ciclo(rms, media, pico):
+    """Variação relativa de cada ciclo em relação ao anterior (o 1º ciclo recebe inf)."""
+    if rms.size == 0:
+        return np.zeros(0)
+    escala_rms = np.maximum(rms[1:], np.finfo(float).tiny)
+    escala_pico = np.maximum(pico[1:], np.finfo(float).tiny)
+    variacao = np.maximum.reduce([np.abs(np.diff(rms)) / escala_rms,
+                                  np.abs(np.diff(media)) / escala_rms,
+                                  np.abs(np.diff(pico)) / escala_pico])
+    return np.concatenate(([np.inf], variacao))
+
+
+def detectar_estado_estacionario(tempo, dados, freq=None, tolerancia=TOLERANCIA_RELATIVA,
+                                 ciclos_minimos=CICLOS_ESTAVEIS_MINIMOS, duracao_padrao=DURACAO_PADRAO_S):
+    """Segmento estacionário de uma variável (SegmentoEstacionario)."""
+    tempo, dados = np.asarray(tempo, dtype=float), np.asarray(dados, dtype=float)
+    freq = freq or estimar_frequencia(tempo, dados)
+    t_fim = float(tempo[-1])
+
+    # Ciclos alinhados ao final do registro, para o último ciclo ser completo
+    t0 = t_fim - np.floor((t_fim - tempo[0]) * freq) / freq
+    inicios, rms, media, pico = metricas_por_ciclo(tempo, dados, freq, t0)
+    instavel = ~(variacao_por_ciclo(rms, media, pico) < tolerancia)
+    ultimo_instavel = np.flatnonzero(instavel)
+    primeiro_estavel = int(ultimo_instavel[-1]) + 1 if ultimo_instavel.size else 0
+    # O ciclo anterior ao primeiro estável também já está em regime (a variação compara os dois)
+    ciclo_inicio = max(primeiro_estavel - 1, 0)
+    ciclos = len(inicios) - ciclo_inicio
+
+    if len(inicios) and len(inicios) - primeiro_estavel >= ciclos_minimos:
+        i = int(inicios[ciclo_inicio])
+        return SegmentoEstacionario(float(tempo[i]), t_fim, i, freq, ciclos, True)
+
+    i = int(np.searchsorted(tempo, t_fim - duracao_padrao))
+    return SegmentoEstacionario(float(tempo[i]), t_fim, i, freq, int((t_fim - tempo[i]) * freq), False)
+
+
+def segmentos_por_variavel(df, colunas, coluna_tempo='Time', **opcoes):
+    """{coluna: SegmentoEstacionario} para as colunas de um DataFrame."""
+    tempo = df[coluna_tempo].to_numpy(float)
+    return {c: detectar_estado_estacionario(tempo, df[c].to_numpy(float), **opcoes) for c in colunas}
+
+
+def inicio_comum(segmentos):
+    """Instante a partir do qual todas as variáveis estão em regime."""
+    return max(s.t_inicio for s in segmentos.values())
+
+
+if __name__ == '__main__':
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='Detecta o estado estacionário de capturas/simulações.')
+    parser.add_argument('arquivo', help="CSV com coluna 'Time' (PSIM) ou 'DadoReal' (FPGA)")
+    parser.add_argument('--colunas', nargs='+', help='colunas analisadas (padrão: todas menos Time)')
+    parser.add_argument('--intervalo-us', type=float, help="intervalo de amostragem quando não há 'Time'")
+    parser.add_argument('--freq', type=float, help='frequência fundamental (padrão: estimada)')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_RELATIVA)
+    parser.add_argument('--ciclos-minimos', type=int, default=CICLOS_ESTAVEIS_MINIMOS)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.arquivo, sep=None, engine='python', decimal=',' if args.intervalo_us else '.')
+    if 'Time' not in df.columns:
+        if not args.intervalo_us:
+            parser.error("arquivo sem coluna 'Time': informe --intervalo-us")
+        df['Time'] = np.arange(len(df)) * args.intervalo_us * 1e-6
+    colunas = args.colunas or [c for c in df.columns if c != 'Time' and pd.api.types.is_numeric_dtype(df[c])]
+    segmentos = segmentos_por_variavel(df, colunas, freq=args.freq, tolerancia=args.tolerancia,
+                                       ciclos_minimos=args.ciclos_minimos)
+    for nome, seg in segmentos.items():
+        situacao = 'regime detectado' if seg.convergiu else f'NÃO assentou (janela final de {DURACAO_PADRAO_S * 1e3:g} ms)'
+        print(f"{nome:>10}: {seg.t_inicio:.6f}s a {seg.t_fim:.6f}s ({seg.duracao * 1e3:.1f} ms, "
+              f"{seg.ciclos} ciclos de {seg.freq:.3f} Hz) - {situacao}")
+    print(f"Início comum do regime: {inicio_comum(segmentos):.6f}s")
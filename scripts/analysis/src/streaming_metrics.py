@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+MÉTRICAS DE COMPARAÇÃO INCREMENTAIS (PSIM/modelo vs FPGA/RTL) por blocos.
+
+MetricasIncrementais acumula, bloco a bloco, os momentos necessários para as
+mesmas chaves de calcular_metricas (main.py): médias, variâncias e covariância
+pelo método de Welford/Chan (cada bloco é resumido com NumPy e combinado ao
+acumulado sem perda de precisão), extremos, erro absoluto e quadrático e os
+cruzamentos por zero para f0. Dois acumuladores podem ser combinados
+(combinar / +), então partes de um arquivo podem ser processadas em blocos,
+em processos separados ou durante a aquisição.
+
+A defasagem (phase_lag_*) depende da correlação cruzada do registro inteiro e
+não é acumulável: fica NaN aqui e continua sendo calculada por
+calcular_metricas quando os dados cabem na memória.
+
+Exemplos:
+    python streaming_metrics.py ref.csv tst.csv --coluna DadoReal --intervalo-us 25
+    python streaming_metrics.py ref.npy tst.npy --intervalo-us 25 --processos 4
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# --- Bloco de Configuração ---
+AMOSTRAS_POR_BLOCO = 1_000_000
+CHAVES_METRICAS = ('duration_s', 'dt_s', 'mae', 'rmse', 'nrmse_pct', 'corr', 'mean_ref', 'mean_tst',
+                   'rms_ref', 'rms_tst', 'crest_ref', 'crest_tst', 'p2p_ref', 'p2p_tst', 'amp_ratio',
+                   'offset', 'phase_lag_s', 'phase_lag_ms', 'phase_lag_deg', 'f0_est_hz')
+
+# --- Fim do Bloco de Configuração ---
+
+
+class _Momentos:
+    """n, médias e somas dos desvios (M2 de cada série e co-momento ref x tst)."""
+
+    def __init__(self, n=0, media_ref=0.0, media_tst=0.0, m2_ref=0.0, m2_tst=0.0, co=0.0):
+        self.n = n
+        self.media_ref, self.media_tst = media_ref, media_tst
+        self.m2_ref, self.m2_tst, self.co = m2_ref, m2_tst, co
+
+    @classmethod
+    def de_bloco(cls, ref, tst):
+        media_ref, media_tst = float(np.mean(ref)), float(np.mean(tst))
+        d_ref, d_tst = ref - media_ref, tst - media_tst
+        return cls(ref.size, media_ref, media_tst, float(np.dot(d_ref, d_ref)), float(np.dot(d_tst, d_tst)),
+                   float(np.dot(d_ref, d_tst)))
+
+    def combinar(self, outro):
+        """Fórmula de Chan et al. para juntar dois conjuntos disjuntos."""
+        if outro.n == 0:
+            return self
+        if self.n == 0:
+            return _Momentos(outro.n, outro.media_ref, outro.media_tst, outro.m2_ref, outro.m2_tst, outro.co)
+        n = self.n + outro.n
+        d_ref = outro.media_ref - self.media_ref
+        d_tst = outro.media_tst - self.media_tst
+        peso = self.n * outro.n / n
+        return _Momentos(n,
+                         self.media_ref + d_ref * outro.n / n,
+                         self.media_tst + d_tst * outro.n / n,
+                         self.m2_ref + outro.m2_ref + d_ref * d_ref * peso,
+                         self.m2_tst + outro.m2_tst + d_tst * d_tst * peso,
+                         self.co + outro.co + d_ref * d_tst * peso)
+
+
+class MetricasIncrementais:
+    """
+    Acumulador das métricas ref (referência) x tst (teste), atualizado por blocos.
+    Os blocos devem chegar em ordem de tempo; para combinar (processos/partes),
+    'outro' deve conter amostras posteriores às deste acumulador.
+    """
+
+    def __init__(self):
+        self.momentos = _Momentos()
+        self.erro = _Momentos()            # erro = tst - ref (só média_tst/m2_tst são usados)
+        self.media_abs_erro = 0.0
+        self.max_ref = self.max_tst = -np.inf
+        self.min_ref = self.min_tst = np.inf
+        self.pico_ref = self.pico_tst = 0.0
+        self.t_inicio = self.t_fim = np.nan
+        # Cruzamentos ascendentes por zero de ref (mesma regra de _zero_cross_freq)
+        self.cruzamentos = 0
+        self.t_primeiro_cruzamento = self.t_ultimo_cruzamento = np.nan
+        self.sinal_inicial = self.sinal_final = 0
+
+    @property
+    def n(self):
+        return self.momentos.n
+
+    def atualizar(self, tempo, ref, tst):
+        """Acrescenta um bloco (tempos em s e amostras alinhadas de ref e tst)."""
+        outro = MetricasIncrementais.de_bloco(tempo, ref, tst)
+        self.combinar(outro)
+        return self
+
+    @classmethod
+    def de_bloco(cls, tempo, ref, tst):
+        m = min(len(tempo), len(ref), len(tst))
+        tempo = np.asarray(tempo[:m], dtype=float)
+        ref = np.asarray(ref[:m], dtype=float)
+        tst = np.asarray(tst[:m], dtype=float)
+        acc = cls()
+        if m == 0:
+            return acc
+        erro = tst - ref
+        acc.momentos = _Momentos.de_bloco(ref, tst)
+        acc.erro = _Momentos.de_bloco(erro, erro)
+        acc.media_abs_erro = float(np.mean(np.abs(erro)))
+        acc.max_ref, acc.min_ref = float(np.max(ref)), float(np.min(ref))
+        acc.max_tst, acc.min_tst = float(np.max(tst)), float(np.min(tst))
+        acc.pico_ref = max(abs(acc.max_ref), abs(acc.min_ref))
+        acc.pico_tst = max(abs(acc.max_tst), abs(acc.min_tst))
+        acc.t_inicio, acc.t_fim = float(tempo[0]), float(tempo[-1])
+
+        s = np.where(ref >= 0, 1, -1)
+        subidas = np.flatnonzero((s[:-1] <= 0) & (s[1:] > 0))   # índice da amostra antes da subida
+        acc.cruzamentos = subidas.size
+        if subidas.size:
+            acc.t_primeiro_cruzamento = float(tempo[subidas[0]])
+            acc.t_ultimo_cruzamento = float(tempo[subidas[-1]])
+        acc.sinal_inicial, acc.sinal_final = int(s[0]), int(s[-1])
+        return acc
+
+    def combinar(self, outro):
+        """Junta 'outro' (amostras posteriores) a este acumulador, no lugar."""
+        if outro.n == 0:
+            return self
+        if self.n == 0:
+            self.__dict__.update(outro.__dict__)
+            return self
+        self.momentos = self.momentos.combinar(outro.momentos)
+        self.erro = self.erro.combinar(outro.erro)
+        self.media_abs_erro += (outro.media_abs_erro - self.media_abs_erro) * outro.n / self.n
+        self.max_ref, self.min_ref = max(self.max_ref, outro.max_ref), min(self.min_ref, outro.min_ref)
+        self.max_tst, self.min_tst = max(self.max_tst, outro.max_tst), min(self.min_tst, outro.min_tst)
+        self.pico_ref, self.pico_tst = max(self.pico_ref, outro.pico_ref), max(self.pico_tst, outro.pico_tst)
+
+        # Cruzamento na emenda entre o último ponto deste e o primeiro do outro
+        cruzamentos = [(self.cruzamentos, self.t_primeiro_cruzamento, self.t_ultimo_cruzamento)]
+        if self.sinal_final <= 0 < outro.sinal_inicial:
+            cruzamentos.append((1, self.t_fim, self.t_fim))
+        cruzamentos.append((outro.cruzamentos, outro.t_primeiro_cruzamento, outro.t_ultimo_cruzamento))
+        cruzamentos = [c for c in cruzamentos if c[0]]
+        if cruzamentos:
+            self.cruzamentos = sum(c[0] for c in cruzamentos)
+            self.t_primeiro_cruzamento, self.t_ultimo_cruzamento = cruzamentos[0][1], cruzamentos[-1][2]
+        self.sinal_final = outro.sinal_final
+        self.t_fim = outro.t_fim
+        return self
+
+    def __add__(self, outro):
+        resultado = MetricasIncrementais()
+        resultado.combinar(self)
+        return resultado.combinar(outro)
+
+    def resultado(self):
+        """Dicionário com as chaves de calcular_metricas."""
+        if self.n == 0:
+            return {chave: np.nan for chave in CHAVES_METRICAS}
+        n, mom = self.n, self.momentos
+        var_ref, var_tst, cov = mom.m2_ref / n, mom.m2_tst / n, mom.co / n
+        mse = self.erro.m2_tst / n + self.erro.media_tst ** 2
+        rmse = float(np.sqrt(mse))
+        p2p_ref = self.max_ref - self.min_ref
+        nrmse = rmse / p2p_ref if p2p_ref > 0 else np.nan
+        rms_ref = float(np.sqrt(var_ref + mom.media_ref ** 2))
+        rms_tst = float(np.sqrt(var_tst + mom.media_tst ** 2))
+        denom = np.sqrt(var_ref * var_tst)
+        corr = float(cov / denom) if denom > 0 else np.nan
+        if var_ref > 0:
+            amp_ratio = float(cov / var_ref)
+            offset = float(mom.media_tst - amp_ratio * mom.media_ref)
+        else:
+            amp_ratio, offset = np.nan, np.nan
+        if self.cruzamentos >= 2:
+            f0 = (self.cruzamentos - 1) / (self.t_ultimo_cruzamento - self.t_primeiro_cruzamento)
+        else:
+            f0 = np.nan
+
+        return {
+            'duration_s': float(self.t_fim - self.t_inicio) if n > 1 else 0.0,
+            'dt_s': float((self.t_fim - self.t_inicio) / (n - 1)) if n > 1 else np.nan,
+            'mae': float(self.media_abs_erro),
+            'rmse': rmse,
+            'nrmse_pct': float(nrmse * 100.0) if np.isfinite(nrmse) else np.nan,
+            'corr': corr,
+            'mean_ref': float(mom.media_ref),
+            'mean_tst': float(mom.media_tst),
+            'rms_ref': rms_ref,
+            'rms_tst': rms_tst,
+            'crest_ref': float(self.pico_ref / rms_ref) if rms_ref > 0 else np.nan,
+            'crest_tst': float(self.pico_tst / rms_tst) if rms_tst > 0 else np.nan,
+            'p2p_ref': float(p2p_ref),
+            'p2p_tst': float(self.max_tst - self.min_tst),
+            'amp_ratio': amp_ratio,
+            'offset': offset,
+            'phase_lag_s': np.nan,
+            'phase_lag_ms': np.nan,
+            'phase_lag_deg': np.nan,
+            'f0_est_hz': float(f0) if np.isfinite(f0) else np.nan,
+        }
+
+
+def metricas_em_blocos(blocos):
+    """Consome um iterável de (tempo, ref, tst) e retorna o acumulador."""
+    acc = MetricasIncrementais()
+    for tempo, ref, tst in blocos:
+        acc.atualizar(tempo, ref, tst)
+    return acc
+
+
+def _metricas_fatia(args):
+    caminho_ref, caminho_tst, inicio, fim, intervalo_s = args
+    ref = np.load(caminho_ref, mmap_mode='r')
+    tst = np.load(caminho_tst, mmap_mode='r')
+    acc = MetricasIncrementais()
+    for a in range(inicio, fim, AMOSTRAS_POR_BLOCO):
+        b = min(fim, a + AMOSTRAS_POR_BLOCO)
+        acc.atualizar(np.arange(a, b) * intervalo_s, ref[a:b], tst[a:b])
+    return acc
+
+
+def metricas_em_paralelo(caminho_ref, caminho_tst, intervalo_s, processos=None):
+    """Métricas de dois .npy (1-D, mesmo intervalo) divididos em fatias entre processos."""
+    n = min(len(np.load(caminho_ref, mmap_mode='r')), len(np.load(caminho_tst, mmap_mode='r')))
+    processos = processos or os.cpu_count() or 1
+    limites = np.linspace(0, n, processos + 1).astype(np.int64)
+    tarefas = [(caminho_ref, caminho_tst, int(a), int(b), intervalo_s)
+               for a, b in zip(limites[:-1], limites[1:]) if b > a]
+    acc = MetricasIncrementais()
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        for parcial in executor.map(_metricas_fatia, tarefas):   # em ordem de tempo
+            acc.combinar(parcial)
+    return acc
+
+
+def _blocos_csv(caminho_ref, caminho_tst, coluna, intervalo_s, chunksize=AMOSTRAS_POR_BLOCO):
+    """Lê dois CSVs da FPGA (sep ';', decimal ',') em paralelo, bloco a bloco."""
+    import pandas as pd
+
+    leitor_ref = pd.read_csv(caminho_ref, sep=';', decimal=',', usecols=[coluna], chunksize=chunksize)
+    leitor_tst = pd.read_csv(caminho_tst, sep=';', decimal=',', usecols=[coluna], chunksize=chunksize)
+    inicio = 0
+    for bloco_ref, bloco_tst in zip(leitor_ref, leitor_tst):
+        m = min(len(bloco_ref), len(bloco_tst))
+        yield (np.arange(inicio, inicio + m) * intervalo_s, bloco_ref[coluna].to_numpy(float)[:m],
+               bloco_tst[coluna].to_numpy(float)[:m])
+        inicio += m
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Métricas de comparação por blocos (memória constante).')
+    parser.add_argument('referencia', help='CSV da FPGA (;) ou .npy 1-D')
+    parser.add_argument('teste', help='CSV da FPGA (;) ou .npy 1-D')
+    parser.add_argument('--coluna', default='DadoReal', help='coluna dos CSVs')
+    parser.add_argument('--intervalo-us', type=float, default=25.0)
+    parser.add_argument('--processos', type=int, help='processos para .npy (padrão: sequencial)')
+    args = parser.parse_args()
+
+    intervalo_s = args.intervalo_us * 1e-6
+    t = time.perf_counter()
+    if args.referencia.endswith('.npy') and args.teste.endswith('.npy'):
+        if args.processos:
+            acc = metricas_em_paralelo(args.referencia, args.teste, intervalo_s, args.processos)
+        else:
+            acc = _metricas_fatia((args.referencia, args.teste, 0,
+                                   min(len(np.load(args.referencia, mmap_mode='r')),
+                                       len(np.load(args.teste, mmap_mode='r'))), intervalo_s))
+    else:
+        acc = metricas_em_blocos(_blocos_csv(args.referencia, args.teste, args.coluna, intervalo_s))
+    dt = time.perf_counter() - t
+
+    print(f"{acc.n:,} amostras em {dt:.2f} s")
+    for chave, valor in acc.resultado().items():
+        if not chave.startswith('phase_lag'):
+            print(f"  {chave:>10}: {valor:.6g}")
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""Deixa os módulos de scripts/analysis/src (e o main.py da análise) importáveis nos testes."""
+
+import os
+import sys
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _caminho in (_RAIZ, os.path.join(_RAIZ, 'src')):
+    if _caminho not in sys.path:
+        sys.path.insert(0, _caminho)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Decimação polifásica em blocos vs bloco único, e interpolação fracionária."""
+
+import numpy as np
+import pytest
+
+import resampler
+
+DT, FATOR = 1e-6, 25
+MIOLO = slice(100, -100)
+
+
+def _limpo(t):
+    return 100 * np.sin(2 * np.pi * 50 * t) + 5 * np.sin(2 * np.pi * 550 * t + 0.3)
+
+
+def _sinal(duracao_s=0.1):
+    t = np.arange(0, duracao_s, DT)
+    # Ripple acima do Nyquist da saída (20 kHz), que o FIR deve rejeitar
+    return t, _limpo(t) + 20 * np.sin(2 * np.pi * 30e3 * t)
+
+
+def _rms(x):
+    return float(np.sqrt(np.mean(x ** 2)))
+
+
+@pytest.mark.parametrize('semente', [0, 1, 2])
+def test_blocos_irregulares_iguais_ao_bloco_unico(semente):
+    t, sinal = _sinal()
+    _, y_unico = resampler.decimar_para_intervalo(t, sinal, FATOR * DT)
+
+    decimador = resampler.DecimadorPolifasico(FATOR)
+    cortes = np.sort(np.random.default_rng(semente).choice(len(t), 50, replace=False))
+    partes = [decimador.processar(p) for p in np.split(sinal, cortes)] + [decimador.finalizar()]
+
+    np.testing.assert_allclose(np.concatenate(partes), y_unico, rtol=0, atol=1e-9)
+
+
+def test_blocos_menores_que_o_filtro_e_varias_colunas():
+    t, sinal = _sinal(0.02)
+    dados = np.column_stack([sinal, -2 * sinal])
+    unico = resampler.decimar(dados, FATOR)
+
+    em_blocos = resampler.decimar(dados, FATOR, amostras_por_bloco=3)
+
+    assert unico.shape == (-(-len(t) // FATOR), 2)
+    np.testing.assert_allclose(em_blocos, unico, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(unico[:, 1], -2 * unico[:, 0], rtol=0, atol=1e-9)
+
+
+def test_saida_alinhada_sem_atraso_e_sem_ripple():
+    t, sinal = _sinal()
+
+    t_dec, y_dec = resampler.decimar_para_intervalo(t, sinal, FATOR * DT)
+
+    np.testing.assert_allclose(t_dec, t[::FATOR])
+    # Média de caixa (resample().mean()) deixaria ~12 µs de atraso e parte do ripple
+    assert _rms(y_dec[MIOLO] - _limpo(t_dec[MIOLO])) < 0.05
+
+
+def test_intervalo_nao_multiplo_de_dt():
+    t, sinal = _sinal(0.001)
+    with pytest.raises(ValueError):
+        resampler.decimar_para_intervalo(t, sinal, 2.5 * DT)
+
+
+def test_atraso_fracionario_sinc_melhor_que_linear():
+    t_dec = np.arange(0, 0.1, FATOR * DT)
+    atraso = 7.3e-6
+    alvo = t_dec[MIOLO] - atraso
+
+    y_sinc = resampler.interpolar_sinc(t_dec[0], FATOR * DT, _limpo(t_dec), alvo)
+    y_lin = np.interp(alvo, t_dec, _limpo(t_dec))
+
+    erro_sinc = _rms(y_sinc - _limpo(alvo))
+    assert erro_sinc < 1e-3
+    assert erro_sinc < _rms(y_lin - _limpo(alvo)) / 5
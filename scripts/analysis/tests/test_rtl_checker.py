@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Verificação bit a bit: dump sintético gerado pelo modelo com um erro de 1 LSB injetado."""
+
+import numpy as np
+import pytest
+
+import rtl_checker
+from rtl_dump import ler_em_blocos
+
+rtl_checker._importar_simulacao()
+from lsm_model import ModeloLSM  # noqa: E402
+
+NUM_PASSOS = 3000
+
+
+def _entradas(passo_inicial, n):
+    # Onda quadrada de +-400 V em Q14.28, trocando a cada 37 passos
+    passos = passo_inicial + np.arange(n, dtype=np.int64)
+    return np.where((passos // 37) % 2 == 0, 400, -400).astype(np.int64) << 28
+
+
+def _gravar_dump(caminho, estados, linhas_indefinidas=()):
+    # Como o tb_HIL_TOP: Q14.28 estendido com sinal para 44 bits (11 dígitos hex)
+    linhas = ['# hex']
+    for passo, linha in enumerate(estados):
+        campos = [format(int(v) & ((1 << 44) - 1), '011x') for v in linha]
+        if passo in linhas_indefinidas:
+            campos[0] = 'XXXXXXXXXXX'
+        linhas.append(' '.join([str(passo)] + campos))
+    caminho.write_text('\n'.join(linhas) + '\n', encoding='ascii')
+    return str(caminho)
+
+
+def _referencia():
+    return rtl_checker.ReferenciaModelo(ModeloLSM(), _entradas)
+
+
+@pytest.fixture(scope='module')
+def estados():
+    return ModeloLSM().avancar(_entradas(0, NUM_PASSOS))
+
+
+def test_dump_igual_ao_modelo(tmp_path, estados):
+    caminho = _gravar_dump(tmp_path / 'estados.txt', estados)
+
+    resultado = rtl_checker.verificar(ler_em_blocos(caminho, linhas_por_bloco=700), _referencia())
+
+    assert resultado.ok
+    assert resultado.passos_verificados == NUM_PASSOS
+    assert (resultado.primeiro_passo, resultado.ultimo_passo) == (0, NUM_PASSOS - 1)
+
+
+@pytest.mark.parametrize('passo, estado', [(0, 0), (1234, 2), (NUM_PASSOS - 1, 4)])
+def test_primeiro_passo_divergente(tmp_path, estados, passo, estado):
+    corrompidos = estados.copy()
+    corrompidos[passo, estado] += 1
+    if passo < NUM_PASSOS - 1:
+        corrompidos[-1, 3] -= 1    # Só a primeira divergência é relatada
+    caminho = _gravar_dump(tmp_path / 'estados.txt', corrompidos)
+
+    resultado = rtl_checker.verificar(ler_em_blocos(caminho, linhas_por_bloco=700), _referencia(), contexto=3)
+
+    div = resultado.divergencia
+    assert div.passo == passo and resultado.passos_verificados == passo
+    np.testing.assert_array_equal(div.estados, [estado])
+    assert int(div.rtl[estado]) - int(div.referencia[estado]) == 1
+    assert not div.indefinido
+    # Contexto contínuo ao redor do passo, atravessando o limite dos blocos lidos
+    passos_ctx, rtl_ctx, ref_ctx = div.contexto
+    np.testing.assert_array_equal(passos_ctx, np.arange(max(0, passo - 3), min(NUM_PASSOS, passo + 4)))
+    np.testing.assert_array_equal(ref_ctx, estados[passos_ctx])
+    assert 'diferença +1 LSB' in div.relatorio()
+
+
+def test_passo_indefinido_e_divergencia(tmp_path, estados):
+    caminho = _gravar_dump(tmp_path / 'estados.txt', estados, linhas_indefinidas=(1500,))
+
+    resultado = rtl_checker.verificar(ler_em_blocos(caminho), _referencia())
+
+    assert resultado.divergencia.passo == 1500 and resultado.divergencia.indefinido
+
+
+def test_referencia_em_dump(tmp_path, estados):
+    corrompidos = estados.copy()
+    corrompidos[2000, 1] -= 1
+    referencia = rtl_checker.ReferenciaDump(_gravar_dump(tmp_path / 'referencia.txt', estados))
+    caminho = _gravar_dump(tmp_path / 'estados.txt', corrompidos)
+
+    resultado = rtl_checker.verificar(ler_em_blocos(caminho), referencia)
+
+    assert resultado.divergencia.passo == 2000
+    assert int(resultado.divergencia.rtl[1]) - int(resultado.divergencia.referencia[1]) == -1
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""Leitura dos dumps RTL: texto (hex/dec), VCD e máscara de valores indefinidos."""
+
+import numpy as np
+
+import rtl_dump
+
+
+def _hex44(valor):
+    # Como o tb_HIL_TOP: Q14.28 estendido com sinal para 44 bits (11 dígitos)
+    return format(valor & ((1 << 44) - 1), '011x')
+
+
+def _gravar(caminho, texto):
+    caminho.write_text(texto, encoding='ascii')
+    return str(caminho)
+
+
+def test_texto_hex_complemento_de_2_e_indefinidos(tmp_path):
+    valores = np.array([[1, -1, 1 << 28, -(1 << 40), 0],
+                        [2, -2, 3, 4, 5],
+                        [7, 8, 9, 10, 11]], dtype=np.int64)
+    linhas = ['# hex']
+    for passo, linha in enumerate(valores):
+        campos = [_hex44(v) for v in linha]
+        if passo == 1:
+            campos[2] = 'XXXXXXXXXXX'
+        linhas.append(' '.join([str(passo)] + campos))
+    caminho = _gravar(tmp_path / 'estados.txt', '\n'.join(linhas) + '\n')
+
+    passos, lidos, indefinidos, info = rtl_dump.carregar_dump(caminho, usar_cache=False)
+
+    np.testing.assert_array_equal(passos, [0, 1, 2])
+    np.testing.assert_array_equal(lidos[[0, 2]], valores[[0, 2]])
+    assert lidos[1, 2] == 0
+    np.testing.assert_array_equal(indefinidos, [False, True, False])
+    assert info['indefinidos'] == 1
+    assert info['nomes'] == rtl_dump.NOMES_ESTADOS
+
+
+def test_texto_decimal_com_sinal_e_larguras_variaveis(tmp_path):
+    caminho = _gravar(tmp_path / 'estados.txt',
+                      '# dec\n0 -5 12 0 -1 3\n1 7 -123456789 u 2 1\n')
+
+    passos, lidos, indefinidos, _ = rtl_dump.carregar_dump(caminho, usar_cache=False)
+
+    np.testing.assert_array_equal(passos, [0, 1])
+    np.testing.assert_array_equal(lidos, [[-5, 12, 0, -1, 3], [7, -123456789, 0, 2, 1]])
+    np.testing.assert_array_equal(indefinidos, [False, True])
+
+
+def test_cache_preserva_indefinidos(tmp_path):
+    caminho = _gravar(tmp_path / 'estados.txt', '# dec\n0 1 2 3 4 5\n1 1 z 3 4 5\n')
+
+    primeiro = rtl_dump.carregar_dump(caminho)
+    segundo = rtl_dump.carregar_dump(caminho)
+
+    for a, b in zip(primeiro[:3], segundo[:3]):
+        np.testing.assert_array_equal(a, b)
+    np.testing.assert_array_equal(segundo[2], [False, True])
+    blocos = list(rtl_dump.ler_em_blocos(caminho, linhas_por_bloco=1))
+    assert [len(b) for b in blocos] == [3, 3]
+    np.testing.assert_array_equal(np.concatenate([b[2] for b in blocos]), [False, True])
+
+
+VCD = """$timescale 1ns $end
+$scope module tb $end
+$scope module dut $end
+$var wire 4 ! xvec0 $end
+$var wire 1 " clk $end
+$upscope $end
+$upscope $end
+$enddefinitions $end
+#0
+bx01 !
+0"
+#100
+b1111 !
+1"
+#250
+b0101 !
+#300
+x"
+"""
+
+
+def test_vcd_trocas_com_bits_indefinidos(tmp_path):
+    caminho = _gravar(tmp_path / 'tb.vcd', VCD)
+
+    nomes, trocas, escala_s = rtl_dump.ler_vcd(caminho, ['xvec0', 'clk'])
+
+    assert nomes == ['tb.dut.xvec0', 'tb.dut.clk']
+    assert escala_s == 1e-9
+    tempos, valores, indefinidos = trocas[0]
+    np.testing.assert_array_equal(tempos, [0, 100, 250])
+    np.testing.assert_array_equal(valores, [1, -1, 5])     # 'x01' -> 0b001; 1111 em 4 bits = -1
+    np.testing.assert_array_equal(indefinidos, [True, False, False])
+    np.testing.assert_array_equal(trocas[1][2], [False, False, True])
+
+
+def test_vcd_amostrado_por_periodo_marca_indefinidos(tmp_path):
+    caminho = _gravar(tmp_path / 'tb.vcd', VCD)
+
+    passos, valores, indefinidos, info = rtl_dump.carregar_dump(
+        caminho, sinais=['xvec0'], periodo_s=100e-9, usar_cache=False)
+
+    np.testing.assert_array_equal(passos, [0, 1, 2])
+    np.testing.assert_array_equal(valores[:, 0], [1, -1, -1])
+    np.testing.assert_array_equal(indefinidos, [True, False, False])
+    assert info['indefinidos'] == 1
+
+
+def test_amostrar_trocas_antes_da_primeira_troca_e_indefinido():
+    trocas = [(np.array([10]), np.array([3]), np.array([False])),
+              (np.array([0]), np.array([4]), np.array([False]))]
+
+    valores, indefinidos = rtl_dump.amostrar_trocas(trocas, np.array([0, 10, 20]))
+
+    np.testing.assert_array_equal(valores, [[0, 4], [3, 4], [3, 4]])
+    np.testing.assert_array_equal(indefinidos, [True, False, False])
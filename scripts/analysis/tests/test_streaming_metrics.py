@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""MetricasIncrementais por blocos vs calcular_metricas (main.py) no registro inteiro."""
+
+import numpy as np
+import pytest
+
+import main
+import streaming_metrics as sm
+
+INTERVALO_S = 25e-6
+# phase_lag_* não é acumulável (fica NaN) e dt_s de main é a mediana dos intervalos
+CHAVES_COMPARADAS = [c for c in sm.CHAVES_METRICAS if not c.startswith('phase_lag') and c != 'dt_s']
+
+
+def _sinais(n=20_000, semente=7):
+    rng = np.random.default_rng(semente)
+    tempo = np.arange(n) * INTERVALO_S
+    ref = 10.0 * np.sin(2 * np.pi * 50.0 * tempo) + 0.3
+    tst = 0.98 * ref + 0.05 + rng.normal(0.0, 0.1, n)
+    return tempo, ref, tst
+
+
+def _em_blocos(tempo, ref, tst, tamanho):
+    for a in range(0, len(tempo), tamanho):
+        yield tempo[a:a + tamanho], ref[a:a + tamanho], tst[a:a + tamanho]
+
+
+def _comparar(obtido, esperado):
+    for chave in CHAVES_COMPARADAS:
+        assert obtido[chave] == pytest.approx(esperado[chave], rel=1e-9, abs=1e-12), chave
+
+
+@pytest.mark.parametrize('tamanho', [1, 7, 401, 20_000])
+def test_blocos_iguais_ao_registro_inteiro(tamanho):
+    tempo, ref, tst = _sinais(n=4_000 if tamanho == 1 else 20_000)
+
+    obtido = sm.metricas_em_blocos(_em_blocos(tempo, ref, tst, tamanho)).resultado()
+
+    _comparar(obtido, main.calcular_metricas(tempo, ref, tst))
+    assert obtido['dt_s'] == pytest.approx(INTERVALO_S)
+    assert all(np.isnan(obtido[c]) for c in sm.CHAVES_METRICAS if c.startswith('phase_lag'))
+
+
+def test_combinar_fora_de_ordem_de_processamento():
+    tempo, ref, tst = _sinais()
+    partes = [sm.MetricasIncrementais.de_bloco(*b) for b in _em_blocos(tempo, ref, tst, 3_333)]
+
+    # Soma em árvore (como em processos separados), mantendo a ordem temporal
+    esquerda = sum(partes[1:3], partes[0])
+    direita = sum(partes[4:], partes[3])
+
+    _comparar((esquerda + direita).resultado(), main.calcular_metricas(tempo, ref, tst))
+
+
+def test_em_paralelo_com_npy(tmp_path):
+    tempo, ref, tst = _sinais()
+    np.save(tmp_path / 'ref.npy', ref)
+    np.save(tmp_path / 'tst.npy', tst)
+
+    acc = sm.metricas_em_paralelo(str(tmp_path / 'ref.npy'), str(tmp_path / 'tst.npy'), INTERVALO_S, processos=3)
+
+    assert acc.n == len(ref)
+    _comparar(acc.resultado(), main.calcular_metricas(tempo, ref, tst))
+
+
+def test_sem_amostras_da_nan():
+    resultado = sm.MetricasIncrementais().resultado()
+    assert set(resultado) == set(sm.CHAVES_METRICAS)
+    assert all(np.isnan(v) for v in resultado.values())
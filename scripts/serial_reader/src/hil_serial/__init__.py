@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Pacote de leitura serial do HIL.
+
+Módulos:
+  - config    : porta, baud rate e perfis de pacote (sem valores fixos no código)
+  - transport : abertura da serial/replay e leitura em blocos
+  - decoder   : decodificação vetorizada dos pacotes Q14.28 (quadro padrão ou compacto)
+  - buffers   : buffers circulares em NumPy
+  - sinks     : gravadores .bin/.csv/.hilz
+  - renderers : visualizador matplotlib e resumo em texto
+  - trigger   : captura com gatilho e buffer pré-gatilho
+  - schedule  : quadros com agenda por estado (descritor + decimação)
+  - burst     : rajada em BRAM na taxa do solver (comando, descarga e CRC)
+  - profiling : métricas por estágio (tempos, histogramas, taxas) com overlay e log JSON
+  - link      : orçamento do enlace (baud FPGA x FT4232, quadros/s) e validação da leitura
+  - replay    : fonte que emula a serial a partir de uma captura
+  - storage   : formato compactado .hilz
+  - cli       : ponto de entrada (python -m hil_serial)
+
+matplotlib e pandas só são importados pelos módulos que os usam, no momento
+do uso, para que a captura sem tela inicie rapidamente.
+"""
+
+from .buffers import BufferCircular
+from .burst import Rajada, ReceptorRajada, solicitar_rajada
+from .config import Configuracao, carregar_configuracao
+from .decoder import (FATOR_CONVERSAO, DecodificadorPacotes, bits_para_inteiros, bytes_para_inteiros,
+                      detectar_formato)
+from .schedule import DemultiplexadorAgenda, DescritorAgenda
+from .link import OrcamentoEnlace
+from .profiling import Metricas, RegistroMetricas
+from .transport import LeitorEmSegundoPlano, abrir_fonte, ler_amostras, ler_blocos
+
+__all__ = [
+    'BufferCircular',
+    'Rajada',
+    'ReceptorRajada',
+    'solicitar_rajada',
+    'Configuracao',
+    'carregar_configuracao',
+    'FATOR_CONVERSAO',
+    'DecodificadorPacotes',
+    'bytes_para_inteiros',
+    'bits_para_inteiros',
+    'detectar_formato',
+    'DescritorAgenda',
+    'DemultiplexadorAgenda',
+    'OrcamentoEnlace',
+    'Metricas',
+    'RegistroMetricas',
+    'LeitorEmSegundoPlano',
+    'abrir_fonte',
+    'ler_amostras',
+    'ler_blocos',
+]
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Permite executar o pacote com: python -m hil_serial <subcomando>."""
+
+from .cli import main
+
+main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+BUFFERS circulares em NumPy para as amostras decodificadas.
+
+Substituem os deques de floats dos visualizadores: blocos inteiros entram com
+uma cópia vetorizada e a janela sai em ordem cronológica sem laço Python.
+"""
+
+import numpy as np
+
+
+class BufferCircular:
+    """
+    Guarda as últimas 'capacidade' amostras (amostras x num_estados);
+    capacidade deve ser >= 1.
+    """
+
+    def __init__(self, capacidade, num_estados, dtype=np.float64):
+        self.capacidade = int(capacidade)
+        if self.capacidade < 1:
+            raise ValueError(f"Capacidade do buffer deve ser >= 1 (recebido {capacidade}).")
+        self.num_estados = num_estados
+        self._dados = np.zeros((self.capacidade, num_estados), dtype=dtype)
+        self._pos = 0
+        self._cheio = 0
+        self.total_recebido = 0
+
+    def __len__(self):
+        return self._cheio
+
+    def adicionar(self, bloco):
+        """Acrescenta um bloco (amostras x num_estados), sobrescrevendo as mais antigas."""
+        n_total = bloco.shape[0]
+        self.total_recebido += n_total
+        if n_total == 0:
+            return
+
+        bloco = bloco[-self.capacidade:]
+        n = bloco.shape[0]
+        fim = self._pos + n
+        if fim <= self.capacidade:
+            self._dados[self._pos:fim] = bloco
+        else:
+            corte = self.capacidade - self._pos
+            self._dados[self._pos:] = bloco[:corte]
+            self._dados[:n - corte] = bloco[corte:]
+        self._pos = fim % self.capacidade
+        self._cheio = min(self.capacidade, self._cheio + n)
+
+    def dados(self):
+        """Cópia das amostras guardadas em ordem cronológica."""
+        if self._cheio < self.capacidade:
+            return self._dados[:self._cheio].copy()
+        return np.concatenate((self._dados[self._pos:], self._dados[:self._pos]))
+
+    def ultima(self):
+        """Última amostra recebida (ou None se vazio)."""
+        if self._cheio == 0:
+            return None
+        return self._dados[(self._pos - 1) % self.capacidade].copy()
+
+    def limpar(self):
+        self._pos = 0
+        self._cheio = 0
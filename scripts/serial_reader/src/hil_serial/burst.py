@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+RAJADA EM BRAM: captura na taxa do solver (BurstCapture no HIL_TOP).
+
+A FPGA grava BURST_DEPTH amostras seguidas de Xvec_current_o (uma a cada
+'decimação' passos de 100 ns) e só depois descarrega pela UART, então o host
+enxerga o ripple de chaveamento a 10 MHz sem um link mais rápido.
+
+Protocolo (mesmo baud rate da serial de estados):
+  host -> FPGA: 'C' + decimação (captura já), 'A' + decimação (arma no gatilho
+                por limiar do HIL_TOP: BURST_TRIGGER_STATE >= BURST_TRIGGER_LEVEL),
+                'D' (descarrega; pode ser repetido)
+  FPGA -> host: 0xFE 0xB5 | status | N | amostras (2 B) | decimação | id |
+                amostras x N x 6 B | CRC-16/CCITT-FALSE de todos os bytes anteriores
+O BurstCapture só existe com o generic USE_BURST_CAPTURE do HIL_TOP ligado.
+Durante a descarga o envio periódico de estados é interrompido (a troca
+acontece entre quadros); os bytes dele que chegam antes do cabeçalho são
+ignorados, assim como os comandos que a FPGA recebe no meio da descarga.
+"""
+
+import time
+
+import numpy as np
+
+from .decoder import BYTES_POR_ESTADO, bytes_para_inteiros
+
+# --- Configurações da Rajada ---
+CMD_CAPTURAR = 0x43            # 'C' + decimação
+CMD_ARMAR = 0x41               # 'A' + decimação
+CMD_DESCARREGAR = 0x44         # 'D'
+HEADER_RAJADA = bytes([0xFE, 0xB5])
+BYTES_CABECALHO = 8
+BYTES_CRC = 2
+PASSO_SOLVER_S = 1e-7          # START_PERIOD / CLK_FREQ do HIL_TOP
+PROFUNDIDADE_RAJADA = 4096     # BURST_DEPTH do HIL_TOP: maior N de amostras aceito no cabeçalho
+TIMEOUT_RAJADA_S = 2.0         # 4096 amostras x 30 B levam ~0.41 s a 3 Mbaud
+TENTATIVAS = 3
+
+STATUS_OCIOSA, STATUS_ARMADA, STATUS_CAPTURANDO, STATUS_PRONTA = range(4)
+NOMES_STATUS = ('ociosa', 'armada', 'capturando', 'pronta')
+
+
+def _tabela_crc16():
+    tabela = []
+    for b in range(256):
+        c = b << 8
+        for _ in range(8):
+            c = ((c << 1) ^ 0x1021) if c & 0x8000 else (c << 1)
+        tabela.append(c & 0xFFFF)
+    return tabela
+
+
+_TABELA_CRC16 = _tabela_crc16()
+
+
+def crc16_ccitt(dados, crc=0xFFFF):
+    """CRC-16/CCITT-FALSE (o mesmo crc16_update do BurstCapture)."""
+    tabela = _TABELA_CRC16
+    for b in bytes(dados):
+        crc = ((crc << 8) & 0xFFFF) ^ tabela[(crc >> 8) ^ b]
+    return crc
+
+
+class Rajada:
+    """Uma rajada descarregada: inteiros Q14.28 (amostras x estados) e metadados."""
+
+    def __init__(self, valores, status, decimacao, identificador, passo_s=PASSO_SOLVER_S):
+        self.valores = valores
+        self.status = status
+        self.decimacao = max(1, decimacao)
+        self.identificador = identificador
+        self.passo_s = passo_s
+
+    @property
+    def pronta(self):
+        return self.status == STATUS_PRONTA
+
+    @property
+    def intervalo_s(self):
+        return self.passo_s * self.decimacao
+
+    @property
+    def tempos(self):
+        """Tempo de cada amostra a partir do início da rajada (s)."""
+        return np.arange(self.valores.shape[0]) * self.intervalo_s
+
+    def __repr__(self):
+        return (f"Rajada(id={self.identificador}, status={NOMES_STATUS[self.status]!r}, "
+                f"amostras={self.valores.shape[0]}, intervalo={self.intervalo_s * 1e9:g} ns)")
+
+
+def codificar_rajada(valores_int, decimacao=1, identificador=0, status=STATUS_PRONTA):
+    """Bytes da descarga do BurstCapture para os inteiros dados (amostras x estados)."""
+    from .replay import codificar_pacotes
+
+    valores = np.asarray(valores_int, dtype=np.int64)
+    num_amostras, num_estados = valores.shape
+    cabecalho = HEADER_RAJADA + bytes([status, num_estados, num_amostras & 0xFF, num_amostras >> 8,
+                                       decimacao, identificador & 0xFF])
+    corpo = cabecalho
+    if num_amostras:
+        # Mesmo layout do quadro padrão, sem o header de cada amostra
+        pacotes = np.frombuffer(codificar_pacotes(valores), dtype=np.uint8).reshape(num_amostras, -1)
+        corpo += pacotes[:, 1:].tobytes()
+    crc = crc16_ccitt(corpo)
+    return corpo + bytes([crc & 0xFF, crc >> 8])
+
+
+class ReceptorRajada:
+    """
+    Procura e verifica rajadas em um fluxo de bytes (que pode conter quadros
+    do envio periódico antes do cabeçalho). alimentar() devolve as rajadas
+    completas com CRC correto; as corrompidas só incrementam 'crc_invalidos'.
+    Um 0xFE 0xB5 no meio dos estados só é esperado como rajada se o cabeçalho
+    for coerente com o BurstCapture (até 'profundidade' amostras, e amostras só
+    com status pronta); senão a busca continua no byte seguinte, sem esperar
+    o tamanho que o cabeçalho falso anuncia.
+    """
+
+    def __init__(self, num_estados, passo_s=PASSO_SOLVER_S, profundidade=PROFUNDIDADE_RAJADA):
+        self.num_estados = num_estados
+        self.passo_s = passo_s
+        self.profundidade = profundidade
+        self.crc_invalidos = 0
+        self._pendente = b''
+
+    def _cabecalho_valido(self, cabecalho):
+        num_amostras = cabecalho[4] | cabecalho[5] << 8
+        if cabecalho[3] != self.num_estados or cabecalho[2] >= len(NOMES_STATUS):
+            return False
+        return num_amostras <= self.profundidade and (num_amostras == 0 or cabecalho[2] == STATUS_PRONTA)
+
+    def _tamanho(self, cabecalho):
+        num_amostras = cabecalho[4] | cabecalho[5] << 8
+        return BYTES_CABECALHO + num_amostras * cabecalho[3] * BYTES_POR_ESTADO + BYTES_CRC
+
+    def alimentar(self, novos_bytes):
+        dados = self._pendente + bytes(novos_bytes)
+        rajadas = []
+        pos = 0
+        while True:
+            inicio = dados.find(HEADER_RAJADA, pos)
+            if inicio < 0:
+                pos = max(pos, len(dados) - 1)   # O último byte pode ser o início do header
+                break
+            if inicio + BYTES_CABECALHO > len(dados):
+                pos = inicio
+                break
+            cabecalho = dados[inicio:inicio + BYTES_CABECALHO]
+            if not self._cabecalho_valido(cabecalho):
+                pos = inicio + 1
+                continue
+            fim = inicio + self._tamanho(cabecalho)
+            if fim > len(dados):
+                pos = inicio
+                break
+            quadro = dados[inicio:fim]
+            if crc16_ccitt(quadro[:-BYTES_CRC]) != (quadro[-2] | quadro[-1] << 8):
+                self.crc_invalidos += 1
+                pos = inicio + 1
+                continue
+            num_amostras = cabecalho[4] | cabecalho[5] << 8
+            payload = np.frombuffer(quadro[BYTES_CABECALHO:-BYTES_CRC], dtype=np.uint8)
+            payload = payload.reshape(num_amostras, self.num_estados * BYTES_POR_ESTADO)
+            valores = bytes_para_inteiros(payload, self.num_estados)
+            rajadas.append(Rajada(valores, cabecalho[2], cabecalho[6], cabecalho[7], self.passo_s))
+            pos = fim
+        self._pendente = dados[pos:]
+        return rajadas
+
+
+def _comando(fonte, *valores):
+    fonte.write(bytes(valores))
+    if hasattr(fonte, 'flush'):
+        fonte.flush()
+
+
+def _receber(fonte, receptor, timeout_s):
+    """Primeira rajada válida que chegar em até timeout_s (ou None)."""
+    limite = time.perf_counter() + timeout_s
+    while time.perf_counter() < limite:
+        dados = fonte.read(max(1, fonte.in_waiting))
+        if not dados:
+            if getattr(fonte, 'fim', False):
+                return None
+            continue
+        rajadas = receptor.alimentar(dados)
+        if rajadas:
+            return rajadas[0]
+    return None
+
+
+def solicitar_rajada(fonte, num_estados, decimacao=1, armar=False, timeout_s=TIMEOUT_RAJADA_S,
+                     tentativas=TENTATIVAS, espera_gatilho_s=10.0, passo_s=PASSO_SOLVER_S,
+                     profundidade=PROFUNDIDADE_RAJADA):
+    """
+    Dispara (ou arma) a captura, espera a rajada ficar pronta e descarrega,
+    repetindo a descarga se o CRC falhar. Retorna a Rajada ou levanta TimeoutError.
+    """
+    if not 1 <= decimacao <= 255:
+        raise ValueError('A decimação da rajada vai de 1 a 255.')
+    receptor = ReceptorRajada(num_estados, passo_s, profundidade)
+    _comando(fonte, CMD_ARMAR if armar else CMD_CAPTURAR, decimacao)
+
+    limite_gatilho = time.perf_counter() + espera_gatilho_s
+    falhas = 0
+    while True:
+        _comando(fonte, CMD_DESCARREGAR)
+        rajada = _receber(fonte, receptor, timeout_s)
+        if rajada is not None and rajada.pronta:
+            return rajada
+        if rajada is None:
+            falhas += 1
+            if falhas >= tentativas:
+                raise TimeoutError(f"Rajada não recebida após {tentativas} tentativa(s) "
+                                   f"({receptor.crc_invalidos} com CRC inválido).")
+        elif time.perf_counter() > limite_gatilho:
+            raise TimeoutError(f"Rajada ainda {NOMES_STATUS[rajada.status]} após {espera_gatilho_s:g} s.")
+        else:
+            time.sleep(0.05)          # Armada ou capturando: consulta de novo
@@ -0,0 +1,528 @@
+# -*- coding: utf-8 -*-
+"""
+Ponto de entrada único da leitura serial do HIL.
+
+Subcomandos:
+    live     visualizador em tempo real (gráfico ou --texto), com --gravar opcional
+    capture  captura sem tela para .csv/.hilz/.bin (N amostras, duração ou gatilho)
+    replay   reproduz uma captura gravada pelo mesmo caminho da leitura ao vivo
+    bench    mede a vazão do decodificador e dos gravadores e o tempo de partida
+    agenda   captura o fluxo do ScheduledSerialManager em séries por estado (.npz)
+    rajada   dispara a captura em BRAM (BurstCapture) e descarrega a 10 MHz de amostragem
+    enlace   orçamento do enlace (baud, erro, quadros/s) e validação da leitura sem perdas
+
+Exemplos (a partir de scripts/serial_reader/src):
+    python -m hil_serial live --porta /dev/ttyUSB1
+    python -m hil_serial live --perfil single --gravar sessao.bin
+    python -m hil_serial capture --saida rede.hilz --duracao 10
+    python -m hil_serial capture --gatilho subida --estado 0 --limiar 10 --capturas 3
+    python -m hil_serial replay sessao.bin -v 4
+    python -m hil_serial live --metricas --log-metricas metricas.jsonl
+    python -m hil_serial bench
+    python -m hil_serial agenda --perfil agenda --duracao 5 --saida il2_vcd.npz
+    python -m hil_serial rajada --armar --saida ripple.hilz
+    python -m hil_serial enlace --perfil rapido --validar
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from .config import PERFIS, carregar_configuracao
+from .decoder import FORMATO_AUTO, FORMATOS
+from .link import CAPACIDADE_RX_PADRAO, CLK_FREQ_HZ, DURACAO_VALIDACAO_S, PAUSA_CONSUMIDOR_S, PERIODO_PAUSA_S
+from .profiling import INTERVALO_REGISTRO_S
+from .trigger import TIPOS_GATILHO
+
+PREFIXO_CAPTURA = 'captura'
+PREFIXO_GATILHO = 'captura_gatilho'
+PREFIXO_AGENDA = 'captura_agenda'
+PREFIXO_RAJADA = 'captura_rajada'
+PRE_AMOSTRAS = 1000
+POS_AMOSTRAS = 2000
+AMOSTRAS_BENCH = 200000
+
+
+def _configuracao(args):
+    return carregar_configuracao(args.config, args.perfil, porta=args.porta, baud_rate=args.baud,
+                                 formato_pacote=args.quadro)
+
+
+def _abrir(config, args, velocidade, repetir=False):
+    from .transport import abrir_fonte, descrever_fonte
+
+    try:
+        fonte = abrir_fonte(config, replay=args.replay, velocidade=velocidade, repetir=repetir)
+    except Exception as e:
+        print(f"Erro ao abrir a fonte de dados: {e}")
+        sys.exit(1)
+    print(f"Conectado: {descrever_fonte(fonte, config)}.")
+    return fonte
+
+
+# --- live / replay ---
+def comando_live(args):
+    from .profiling import SEM_METRICAS, Metricas, RegistroMetricas
+    from .renderers import RenderizadorTexto, VisualizadorTempoReal
+    from .sinks import abrir_gravador
+
+    config = _configuracao(args)
+    fonte = _abrir(config, args, args.velocidade, args.repetir)
+    gravador = abrir_gravador(args.gravar, config) if args.gravar else None
+    metricas, registro = SEM_METRICAS, None
+    if args.metricas or args.log_metricas:
+        metricas = Metricas()
+        if args.log_metricas:
+            registro = RegistroMetricas(args.log_metricas, metricas, args.intervalo_metricas)
+    if args.texto:
+        renderizador = RenderizadorTexto(fonte, config, gravador, janela=args.janela,
+                                         metricas=metricas, registro=registro)
+    else:
+        renderizador = VisualizadorTempoReal(fonte, config, gravador, janela=args.janela, decimacao=args.decimacao,
+                                             metricas=metricas, registro=registro)
+    try:
+        renderizador.executar()
+    except KeyboardInterrupt:
+        print("\nVisualizador interrompido pelo usuário.")
+    finally:
+        renderizador.parar()
+        fonte.close()
+        if gravador:
+            gravador.fechar()
+            print(f"{gravador.amostras} amostras gravadas em '{args.gravar}'.")
+        print("Fonte de dados fechada.")
+
+
+# --- capture ---
+def _capturar_continuo(args, config, fonte, decodificador):
+    from .sinks import abrir_gravador
+    from .transport import ler_blocos
+
+    saida = args.saida or f"{PREFIXO_CAPTURA}_{datetime.now():%Y%m%d_%H%M%S}.{args.formato}"
+    limite = args.amostras
+    if args.duracao:
+        limite = int(round(args.duracao / config.intervalo_s))
+
+    gravador = abrir_gravador(saida, config)
+    ao_receber = gravador.escrever_bytes if gravador.bruto else None
+    print(f"Gravando em '{saida}'" + (f" ({limite} amostras)..." if limite else " até Ctrl+C..."))
+    try:
+        for bloco in ler_blocos(fonte, decodificador, ao_receber=ao_receber,
+                                em_segundo_plano=config.leitura_em_segundo_plano):
+            if limite:
+                bloco = bloco[:limite - gravador.amostras]
+            gravador.escrever(bloco)
+            if limite and gravador.amostras >= limite:
+                break
+    finally:
+        gravador.fechar()
+        print(f"{gravador.amostras} amostras salvas em '{saida}'.")
+
+
+def _nome_captura_gatilho(saida, indice, capturas, formato):
+    """--saida com várias capturas vira base_0.ext, base_1.ext, ...; sem --saida, nome com data e hora."""
+    if not saida:
+        return f'{PREFIXO_GATILHO}_{datetime.now():%Y%m%d_%H%M%S}_{indice}.{formato}'
+    if capturas == 1:
+        return saida
+    base, extensao = os.path.splitext(saida)
+    return f'{base}_{indice}{extensao}'
+
+
+def _capturar_gatilho(args, config, fonte, decodificador):
+    from .transport import ler_blocos
+    from .trigger import CondicaoGatilho, MotorGatilho, salvar_captura_csv, salvar_captura_hilz
+
+    minimo, maximo = args.faixa if args.faixa else (None, None)
+    condicao = CondicaoGatilho(args.estado, args.gatilho, limiar=args.limiar,
+                               minimo=minimo, maximo=maximo, intervalo_amostra_s=config.intervalo_s)
+    motor = MotorGatilho(condicao, config.num_estados, args.pre, args.pos, rearmar=args.capturas > 1)
+    salvar = salvar_captura_hilz if args.formato == 'hilz' else salvar_captura_csv
+
+    print(f"Aguardando gatilho '{args.gatilho}' no estado {config.nomes[args.estado]} "
+          f"(pré={args.pre}, pós={args.pos} amostras)...")
+    salvas = 0
+    for bloco in ler_blocos(fonte, decodificador, em_segundo_plano=config.leitura_em_segundo_plano):
+        for valores, indice_gatilho, amostra in motor.processar(bloco):
+            nome = _nome_captura_gatilho(args.saida, salvas, args.capturas, args.formato)
+            salvar(nome, valores, indice_gatilho, config.intervalo_s, config.nomes)
+            salvas += 1
+            print(f"Gatilho na amostra {amostra}: {len(valores)} amostras salvas em '{nome}'.")
+            if salvas >= args.capturas:
+                return
+    print("Fim do replay sem novos disparos.")
+
+
+def comando_capture(args):
+    from .decoder import DecodificadorPacotes
+
+    config = _configuracao(args)
+    if args.gatilho and not 0 <= args.estado < config.num_estados:
+        print(f"Estado {args.estado} inválido para o perfil '{config.perfil}'.")
+        sys.exit(1)
+    if args.saida:
+        args.formato = os.path.splitext(args.saida)[1].lstrip('.').lower() or args.formato
+    if args.gatilho and args.formato not in ('csv', 'hilz'):
+        print("Capturas com gatilho são salvas em .csv ou .hilz.")
+        sys.exit(1)
+
+    fonte = _abrir(config, args, args.velocidade)
+    decodificador = DecodificadorPacotes(config.num_estados, config.formato_pacote)
+    try:
+        if args.gatilho:
+            _capturar_gatilho(args, config, fonte, decodificador)
+        else:
+            _capturar_continuo(args, config, fonte, decodificador)
+    except KeyboardInterrupt:
+        print("\nCaptura interrompida pelo usuário.")
+    finally:
+        fonte.close()
+        print(f"Pacotes válidos: {decodificador.pacotes_validos} | "
+              f"bytes descartados: {decodificador.bytes_descartados} | "
+              f"quadro: {decodificador.formato or 'não detectado'}")
+
+
+# --- bench ---
+def _medir(funcao, repeticoes=3):
+    """Menor tempo de 'repeticoes' execuções (s)."""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        t = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - t)
+    return melhor
+
+
+def comando_bench(args):
+    import tempfile
+
+    import numpy as np
+
+    from .decoder import DecodificadorPacotes, tamanho_pacote
+    from .profiling import Metricas
+    from .replay import codificar_pacotes
+    from .sinks import abrir_gravador
+
+    config = _configuracao(args)
+    n = args.amostras
+    k = config.num_estados
+    print(f"Perfil '{config.perfil}': {k} estado(s), pacote de {config.tamanho_pacote} B a cada "
+          f"{config.intervalo_us:g} µs ({1 / config.intervalo_s:,.0f} amostras/s).")
+
+    if args.replay:
+        from .replay import FonteReplay
+        fonte = FonteReplay(args.replay, k, config.intervalo_s, velocidade=0, formato=config.formato_pacote)
+        fluxo = fonte.read(fonte.in_waiting)
+        formato = fonte.formato
+    else:
+        t = np.arange(n) * config.intervalo_s
+        fases = np.arange(k)[None, :] * 2 * np.pi / max(k, 1)
+        valores = np.rint(300 * np.sin(2 * np.pi * 60 * t[:, None] + fases) * 2**28).astype(np.int64)
+        formato = 'padrao' if config.formato_pacote == FORMATO_AUTO else config.formato_pacote
+        fluxo = codificar_pacotes(valores, formato)
+
+    blocos = [fluxo[i:i + args.bloco] for i in range(0, len(fluxo), args.bloco)]
+
+    def decodificar():
+        dec = DecodificadorPacotes(k, config.formato_pacote)
+        return [dec.decodificar(b) for b in blocos]
+
+    amostras = np.concatenate(decodificar())
+    n = amostras.shape[0]
+
+    metricas = Metricas()
+    dec = DecodificadorPacotes(k, config.formato_pacote, metricas)
+    for b in blocos:
+        dec.decodificar(b)
+    taxa_aquisicao = 1 / config.intervalo_s
+    taxa_linha = config.baud_rate / 10 / tamanho_pacote(k, formato)  # 8N1: 10 bits por byte
+
+    print(f"\n{n} amostras, blocos de {args.bloco} B, quadro {formato} ({tamanho_pacote(k, formato)} B):")
+    dt = _medir(decodificar)
+    print(f"  decodificação : {n / dt:14,.0f} amostras/s ({n / dt / taxa_aquisicao:6.0f}x a aquisição, "
+          f"{n / dt / taxa_linha:5.0f}x o limite da linha a {config.baud_rate} baud)")
+    for estagio, e in metricas.resumo()['estagios'].items():
+        print(f"    {estagio:>13}: média {e['media_us']:8.1f} µs/bloco | p95 {e['p95_us']:6.0f} µs | "
+              f"{e['chamadas']} chamadas")
+
+    pedacos = np.array_split(amostras, max(1, len(blocos)))
+    with tempfile.TemporaryDirectory() as pasta:
+        for extensao in ('.bin', '.csv', '.hilz'):
+            caminho = os.path.join(pasta, 'bench' + extensao)
+
+            def gravar():
+                gravador = abrir_gravador(caminho, config)
+                for i, pedaco in enumerate(pedacos):
+                    if gravador.bruto:
+                        gravador.escrever_bytes(blocos[i])
+                    gravador.escrever(pedaco)
+                gravador.fechar()
+
+            dt = _medir(gravar, repeticoes=1 if extensao == '.csv' else 3)
+            print(f"  gravação {extensao:5}: {n / dt:14,.0f} amostras/s ({n / dt / taxa_aquisicao:6.0f}x a aquisição, "
+                  f"{os.path.getsize(caminho) / n:5.1f} B/amostra)")
+
+    # Partida a frio do caminho sem tela (o que 'capture' importa antes de abrir a porta)
+    codigo = 'import hil_serial.cli, hil_serial.transport, hil_serial.sinks, hil_serial.trigger'
+    pasta_pacote = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    t = time.perf_counter()
+    subprocess.run([sys.executable, '-c', codigo], cwd=pasta_pacote, check=True)
+    partida = time.perf_counter() - t
+    pesados = subprocess.run([sys.executable, '-c', f'{codigo}; import sys; '
+                              'print(",".join(m for m in ("matplotlib", "pandas") if m in sys.modules))'],
+                             cwd=pasta_pacote, check=True, capture_output=True, text=True).stdout.strip()
+    print(f"\nPartida do caminho sem tela: {partida * 1000:.0f} ms "
+          f"(matplotlib/pandas carregados: {pesados or 'nenhum'})")
+
+
+# --- agenda ---
+def comando_agenda(args):
+    import numpy as np
+
+    from .decoder import FATOR_CONVERSAO
+    from .schedule import DemultiplexadorAgenda
+    from .transport import TAMANHO_BLOCO_LEITURA
+
+    config = _configuracao(args)
+    saida = args.saida or f"{PREFIXO_AGENDA}_{datetime.now():%Y%m%d_%H%M%S}.npz"
+    fonte = _abrir(config, args, args.velocidade)
+    demux = DemultiplexadorAgenda(config.num_estados)
+    partes = {i: [] for i in range(config.num_estados)}
+    print(f"Gravando em '{saida}'" + (f" ({args.duracao:g} s)..." if args.duracao else " até Ctrl+C..."))
+    try:
+        while True:
+            dados = fonte.read(max(1, min(fonte.in_waiting, TAMANHO_BLOCO_LEITURA)))
+            if not dados:
+                if getattr(fonte, 'fim', False):
+                    break
+                continue
+            for i, serie in demux.decodificar(dados).items():
+                partes[i].append(serie)
+            if args.duracao and demux.descritor and demux.disparo * demux.descritor.intervalo_s >= args.duracao:
+                break
+    except KeyboardInterrupt:
+        print("\nCaptura interrompida pelo usuário.")
+    finally:
+        fonte.close()
+
+    if demux.descritor is None:
+        print("Nenhum descritor de agenda recebido: confira USE_SCHEDULED_SERIAL no HIL_TOP.")
+        sys.exit(1)
+
+    series = {}
+    print(f"{demux.descritor} | quadros válidos: {demux.pacotes_validos} | "
+          f"quadros perdidos: {demux.quadros_perdidos} | bytes descartados: {demux.bytes_descartados}")
+    if demux.perdas_indeterminadas:
+        print(f"Aviso: {demux.perdas_indeterminadas} lacuna(s) de tamanho desconhecido (bytes perdidos antes "
+              f"do demultiplexador); quadros perdidos é só o mínimo e os tempos depois de cada lacuna "
+              f"são exatos apenas dentro do segmento ('descontinuidades' no .npz).")
+    series['descontinuidades'] = demux.tempos(np.asarray(demux.descontinuidades, dtype=np.int64))
+    for i in demux.descritor.estados_enviados:
+        nome = config.nomes[i]
+        disparos = np.concatenate([d for d, _ in partes[i]]) if partes[i] else np.empty(0, dtype=np.int64)
+        valores = np.concatenate([v for _, v in partes[i]]) if partes[i] else np.empty(0, dtype=np.int64)
+        series[f't_{nome}'] = demux.tempos(disparos)
+        series[nome] = valores / FATOR_CONVERSAO
+        periodo_us = demux.descritor.decimacoes[i] * demux.descritor.intervalo_us
+        print(f"  {nome:>4}: {len(valores):9d} amostras a cada {periodo_us} µs")
+    np.savez(saida, **series)
+    print(f"Séries salvas em '{saida}'.")
+
+
+# --- rajada ---
+def _rajada_gravada(caminho, num_estados):
+    """Última rajada pronta em um .bin gravado da serial."""
+    from .burst import ReceptorRajada
+
+    with open(caminho, 'rb') as f:
+        rajadas = [r for r in ReceptorRajada(num_estados).alimentar(f.read()) if r.pronta]
+    if not rajadas:
+        raise ValueError(f"nenhuma rajada pronta com CRC válido em '{caminho}'")
+    return rajadas[-1]
+
+
+def comando_rajada(args):
+    from .burst import solicitar_rajada
+    from .trigger import salvar_captura_csv, salvar_captura_hilz
+
+    config = _configuracao(args)
+    try:
+        if args.replay:
+            rajada = _rajada_gravada(args.replay, config.num_estados)
+        else:
+            fonte = _abrir(config, args, 0.0)
+            try:
+                print('Aguardando o gatilho externo...' if args.armar else 'Capturando...')
+                rajada = solicitar_rajada(fonte, config.num_estados, args.decimacao, armar=args.armar,
+                                          espera_gatilho_s=args.espera)
+            finally:
+                fonte.close()
+    except (TimeoutError, ValueError) as e:
+        print(f"Erro na rajada: {e}")
+        sys.exit(1)
+
+    print(rajada)
+    saida = args.saida or f"{PREFIXO_RAJADA}_{datetime.now():%Y%m%d_%H%M%S}_{rajada.identificador}.{args.formato}"
+    salvar = salvar_captura_hilz if saida.endswith('.hilz') else salvar_captura_csv
+    salvar(saida, rajada.valores, 0, rajada.intervalo_s, config.nomes)
+    print(f"Rajada salva em '{saida}'.")
+
+
+# --- enlace ---
+def comando_enlace(args):
+    from .link import OrcamentoEnlace, validar_leitura
+
+    config = _configuracao(args)
+    geradores = {'inteiro': (False,), 'fracionario': (True,), 'ambos': (False, True)}[args.gerador]
+    print(f"Perfil '{config.perfil}': {config.num_estados} estado(s) a cada {config.intervalo_us:g} µs, "
+          f"{config.baud_rate:,} baud nominais.\n")
+    try:
+        orcamentos = [OrcamentoEnlace(config.baud_rate, args.clk, fracionario, config.num_estados,
+                                      config.intervalo_us, getattr(config, 'decimacoes', None))
+                      for fracionario in geradores]
+    except ValueError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    for orcamento in orcamentos:
+        print(orcamento.relatorio() + '\n')
+
+    if not args.validar:
+        return
+    orcamento = orcamentos[-1]
+    print(f"Validando a leitura: {args.duracao:g} s no ritmo da linha, buffer do driver de "
+          f"{args.capacidade_rx} B, consumidor parado {args.pausa * 1000:g} ms a cada {args.periodo:g} s...")
+    resultados = validar_leitura(config, orcamento, args.duracao, args.pausa, args.periodo, args.capacidade_rx)
+    falhou = False
+    for modo, (esperadas, recebidas, perdidos, integras) in resultados.items():
+        print(f"  {modo:>13}: {recebidas:9d}/{esperadas} amostras, {perdidos:8d} B perdidos no driver -> "
+              f"{'sem perdas' if integras else 'COM PERDAS'}")
+        falhou |= modo == 'segundo_plano' and not integras
+    if falhou:
+        sys.exit(1)
+
+
+# --- Linha de comando ---
+def _argumentos_comuns(parser):
+    parser.add_argument('--config', help='arquivo JSON de configuração (padrão: ./hil_serial.json)')
+    parser.add_argument('--perfil', choices=sorted(PERFIS),
+                        help='perfil do pacote (multi = 5 estados, compacto = 5 em quadro compactado, '
+                             'agenda = quadro com decimação por estado, rapido = compacto a 12 Mbaud, '
+                             'single = 1)')
+    parser.add_argument('--porta', help='porta serial (sobrescreve a configuração)')
+    parser.add_argument('--baud', type=int, help='baud rate (sobrescreve a configuração)')
+    parser.add_argument('--quadro', choices=(FORMATO_AUTO,) + FORMATOS,
+                        help='formato do quadro: padrao (0xFA), compacto (0xFB) ou auto (detecta no fluxo)')
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog='hil_serial', description='Leitura serial do HIL (FPGA).')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_live = sub.add_parser('live', help='visualizador em tempo real')
+    p_live.add_argument('--replay', help='captura (.bin, .csv ou .hilz) usada no lugar da serial')
+    p_live.add_argument('-v', '--velocidade', type=float, default=1.0,
+                        help='velocidade do replay (1 = tempo real, 0 = máxima)')
+    p_live.add_argument('--repetir', action='store_true', help='reinicia o replay ao chegar no fim')
+    p_live.add_argument('--gravar', help='grava o fluxo recebido (.bin bruto, .csv ou .hilz)')
+
+    p_replay = sub.add_parser('replay', help='reproduz uma captura gravada')
+    p_replay.add_argument('replay', help='captura (.bin, .csv ou .hilz)')
+    p_replay.add_argument('-v', '--velocidade', type=float, default=1.0,
+                          help='velocidade do replay (1 = tempo real, 0 = máxima)')
+    p_replay.add_argument('--repetir', action='store_true', help='reinicia o replay ao chegar no fim')
+    p_replay.set_defaults(gravar=None)
+
+    for p in (p_live, p_replay):
+        _argumentos_comuns(p)
+        p.add_argument('--texto', action='store_true', help='resumo no terminal em vez do gráfico')
+        p.add_argument('--janela', type=int, default=1000, help='amostras visíveis no gráfico')
+        p.add_argument('--decimacao', type=int, default=1, help='plota 1 a cada N amostras')
+        p.add_argument('--metricas', action='store_true',
+                       help='tempo por estágio (leitura, sincronismo, decodificação, buffer, desenho) na tela')
+        p.add_argument('--log-metricas', help='grava as métricas em JSON, uma linha por intervalo (.jsonl)')
+        p.add_argument('--intervalo-metricas', type=float, default=INTERVALO_REGISTRO_S,
+                       help='segundos entre linhas do --log-metricas')
+        p.set_defaults(funcao=comando_live)
+
+    p_cap = sub.add_parser('capture', help='captura sem tela para arquivo')
+    _argumentos_comuns(p_cap)
+    p_cap.add_argument('--saida', help='arquivo de saída; a extensão define o formato '
+                                       '(com --capturas > 1: <nome>_0.<ext>, <nome>_1.<ext>, ...)')
+    p_cap.add_argument('--formato', default='csv', choices=('csv', 'hilz', 'bin'),
+                       help='formato quando --saida não é dado')
+    p_cap.add_argument('--amostras', type=int, help='número de amostras a gravar')
+    p_cap.add_argument('--duracao', type=float, help='duração da captura em segundos')
+    p_cap.add_argument('--replay', help='captura usada como fonte no lugar da serial')
+    p_cap.add_argument('-v', '--velocidade', type=float, default=0.0,
+                       help='velocidade do replay (1 = tempo real, 0 = máxima)')
+    gatilho = p_cap.add_argument_group('gatilho (grava só a janela em torno do evento)')
+    gatilho.add_argument('--gatilho', '--tipo', dest='gatilho',
+                         choices=TIPOS_GATILHO)
+    gatilho.add_argument('--estado', type=int, default=0, help='índice do estado monitorado')
+    gatilho.add_argument('--limiar', type=float, default=0.0,
+                         help='nível do gatilho (para "taxa", em unidades por segundo)')
+    gatilho.add_argument('--faixa', type=float, nargs=2, metavar=('MIN', 'MAX'),
+                         help='faixa permitida para o gatilho "fora_faixa"')
+    gatilho.add_argument('--pre', type=int, default=PRE_AMOSTRAS, help='amostras antes do gatilho')
+    gatilho.add_argument('--pos', type=int, default=POS_AMOSTRAS, help='amostras a partir do gatilho')
+    gatilho.add_argument('--capturas', type=int, default=1, help='número de eventos a gravar')
+    p_cap.set_defaults(funcao=comando_capture)
+
+    p_bench = sub.add_parser('bench', help='mede a vazão do decodificador e dos gravadores')
+    _argumentos_comuns(p_bench)
+    p_bench.add_argument('--amostras', type=int, default=AMOSTRAS_BENCH, help='amostras sintéticas')
+    p_bench.add_argument('--bloco', type=int, default=65536, help='bytes por leitura simulada')
+    p_bench.add_argument('--replay', help='usa uma captura gravada em vez de dados sintéticos')
+    p_bench.set_defaults(funcao=comando_bench)
+
+    p_agenda = sub.add_parser('agenda', help='séries por estado do quadro com agenda (USE_SCHEDULED_SERIAL)')
+    _argumentos_comuns(p_agenda)
+    p_agenda.add_argument('--saida', help='arquivo .npz com t_<estado> e <estado> para cada estado enviado '
+                               'e o início (s) de cada segmento depois de uma lacuna em descontinuidades')
+    p_agenda.add_argument('--duracao', type=float, help='duração da captura em segundos')
+    p_agenda.add_argument('--replay', help='captura .bin usada como fonte no lugar da serial')
+    p_agenda.add_argument('-v', '--velocidade', type=float, default=0.0,
+                          help='velocidade do replay (1 = tempo real, 0 = máxima)')
+    p_agenda.set_defaults(funcao=comando_agenda)
+
+    p_rajada = sub.add_parser('rajada', help='captura em BRAM na taxa do solver (USE_BURST_CAPTURE)')
+    _argumentos_comuns(p_rajada)
+    p_rajada.add_argument('--decimacao', type=int, default=1,
+                          help='grava 1 a cada N passos de 100 ns (1 a 255)')
+    p_rajada.add_argument('--armar', action='store_true',
+                          help='espera o gatilho por limiar do HIL_TOP em vez de capturar já')
+    p_rajada.add_argument('--espera', type=float, default=10.0,
+                          help='segundos aguardando o gatilho antes de desistir')
+    p_rajada.add_argument('--saida', help='arquivo de saída (.csv ou .hilz)')
+    p_rajada.add_argument('--formato', default='csv', choices=('csv', 'hilz'),
+                          help='formato quando --saida não é dado')
+    p_rajada.add_argument('--replay', help='.bin gravado da serial contendo a descarga')
+    p_rajada.set_defaults(funcao=comando_rajada)
+
+    p_enlace = sub.add_parser('enlace', help='orçamento do enlace e validação da leitura na taxa da linha')
+    _argumentos_comuns(p_enlace)
+    p_enlace.add_argument('--clk', type=int, default=CLK_FREQ_HZ, help='CLK_FREQ do HIL_TOP (Hz)')
+    p_enlace.add_argument('--gerador', default='ambos', choices=('inteiro', 'fracionario', 'ambos'),
+                          help='gerador de baud da FPGA (SERIAL_FRACTIONAL_BAUD)')
+    p_enlace.add_argument('--validar', action='store_true',
+                          help='passa um fluxo sintético na taxa da linha pelo leitor do host')
+    p_enlace.add_argument('--duracao', type=float, default=DURACAO_VALIDACAO_S, help='duração da validação (s)')
+    p_enlace.add_argument('--pausa', type=float, default=PAUSA_CONSUMIDOR_S,
+                          help='pausa do consumidor simulando o redesenho do gráfico (s)')
+    p_enlace.add_argument('--periodo', type=float, default=PERIODO_PAUSA_S, help='intervalo entre pausas (s)')
+    p_enlace.add_argument('--capacidade-rx', type=int, default=CAPACIDADE_RX_PADRAO,
+                          help='buffer de recepção do driver emulado (bytes)')
+    p_enlace.set_defaults(funcao=comando_enlace)
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    args.funcao(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+CONFIGURAÇÃO da leitura serial (porta, baud rate, perfil de pacote).
+
+Os valores padrão ficam no bloco de configuração abaixo e podem ser
+sobrescritos, nesta ordem de prioridade crescente, por:
+  1. arquivo JSON (--config, variável HIL_SERIAL_CONFIG ou ./hil_serial.json)
+  2. variáveis de ambiente HIL_SERIAL_PORTA e HIL_SERIAL_BAUD
+  3. opções de linha de comando (--porta, --baud, ...)
+
+Exemplo de hil_serial.json:
+    {"porta": "/dev/ttyUSB1", "perfis": {"multi": {"intervalo_us": 150}}}
+    {"formato_pacote": "compacto", "perfis": {"multi": {"intervalo_us": 100}}}
+    {"perfil": "rapido", "porta": "/dev/ttyUSB1"}
+"""
+
+import json
+import os
+
+from .decoder import FORMATO_AUTO, tamanho_pacote
+
+# --- Bloco de Configuração ---
+PORTA_SERIAL = 'COM4'
+BAUD_RATE = 3000000
+TIMEOUT_S = 0.1
+BUFFER_RX_BYTES = 1048576
+ESPERA_ABERTURA_S = 1.0   # Tempo para a FPGA/driver estabilizarem antes de limpar o buffer
+LEITURA_EM_SEGUNDO_PLANO = False  # Thread de leitura/decodificação (transport.LeitorEmSegundoPlano)
+
+ARQUIVO_CONFIG_PADRAO = 'hil_serial.json'
+PERFIL_PADRAO = 'multi'
+FORMATO_PACOTE = FORMATO_AUTO   # 'auto' | 'padrao' (0xFA, 6 B/estado) | 'compacto' (0xFB, 42 bits/estado)
+
+# Perfis de pacote do HIL_TOP (MULTI_STATE_INTERVAL_US / SINGLE_STATE_INTERVAL_US)
+PERFIS = {
+    'multi': {
+        'num_estados': 5,
+        'intervalo_us': 150,
+        'nomes_estados': ['IL1', 'ILd', 'IL2', 'VCf', 'VCd'],
+        'rotulos': ['Corrente L1', 'Corrente Ld', 'Corrente L2', 'Tensão Cf', 'Tensão Cd'],
+    },
+    'single': {
+        'num_estados': 1,
+        'intervalo_us': 25,
+        'nomes_estados': ['Estado_0'],
+        'rotulos': ['Valor Real'],
+    },
+}
+# MULTI_STATE_PACKED = true no HIL_TOP: 28 B por quadro cabem em 100 µs a 3 Mbaud
+PERFIS['compacto'] = {**PERFIS['multi'], 'intervalo_us': 100, 'formato_pacote': 'compacto'}
+# USE_SCHEDULED_SERIAL = true: o descritor no fluxo define estados e decimações; 'decimacoes'
+# (SCHEDULE_DECIMATION do HIL_TOP) só dimensiona o maior quadro no orçamento do enlace
+PERFIS['agenda'] = {**PERFIS['multi'], 'intervalo_us': 60, 'decimacoes': [0, 0, 1, 0, 6]}
+# SERIAL_BAUD_RATE = 12 Mbaud com SERIAL_FRACTIONAL_BAUD = true: 28 B em 23,3 µs
+PERFIS['rapido'] = {**PERFIS['compacto'], 'intervalo_us': 25, 'baud_rate': 12000000,
+                    'leitura_em_segundo_plano': True}
+
+# --- Fim do Bloco de Configuração ---
+
+
+class Configuracao:
+    """
+    Parâmetros de transporte e do perfil de pacote usados por todos os
+    subcomandos. Valores None nas sobrescritas são ignorados.
+    """
+
+    def __init__(self, perfil=PERFIL_PADRAO, perfis=None, **sobrescritas):
+        perfis = perfis or PERFIS
+        if perfil not in perfis:
+            raise ValueError(f"Perfil '{perfil}' desconhecido. Opções: {', '.join(perfis)}")
+
+        self.perfil = perfil
+        self.porta = PORTA_SERIAL
+        self.baud_rate = BAUD_RATE
+        self.timeout_s = TIMEOUT_S
+        self.buffer_rx_bytes = BUFFER_RX_BYTES
+        self.espera_abertura_s = ESPERA_ABERTURA_S
+        self.formato_pacote = FORMATO_PACOTE
+        self.leitura_em_segundo_plano = LEITURA_EM_SEGUNDO_PLANO
+
+        valores = dict(perfis[perfil])
+        valores.update({k: v for k, v in sobrescritas.items() if v is not None})
+        for chave, valor in valores.items():
+            setattr(self, chave, valor)
+
+    @property
+    def intervalo_s(self):
+        return self.intervalo_us * 1e-6
+
+    @property
+    def tamanho_pacote(self):
+        """Bytes por quadro; no modo 'auto' assume o formato padrão (o maior)."""
+        formato = 'padrao' if self.formato_pacote == FORMATO_AUTO else self.formato_pacote
+        return tamanho_pacote(self.num_estados, formato)
+
+    @property
+    def nomes(self):
+        """Nomes dos estados, completados com Estado_i se a lista for curta."""
+        nomes = list(self.nomes_estados)[:self.num_estados]
+        return nomes + [f'Estado_{i}' for i in range(len(nomes), self.num_estados)]
+
+    def __repr__(self):
+        return (f"Configuracao(perfil={self.perfil!r}, porta={self.porta!r}, baud_rate={self.baud_rate}, "
+                f"num_estados={self.num_estados}, intervalo_us={self.intervalo_us})")
+
+
+def carregar_configuracao(caminho=None, perfil=None, **sobrescritas):
+    """
+    Monta a Configuracao combinando padrões, arquivo JSON, ambiente e as
+    sobrescritas explícitas (normalmente vindas da linha de comando).
+    """
+    caminho = caminho or os.environ.get('HIL_SERIAL_CONFIG')
+    if not caminho and os.path.exists(ARQUIVO_CONFIG_PADRAO):
+        caminho = ARQUIVO_CONFIG_PADRAO
+
+    arquivo = {}
+    if caminho:
+        with open(caminho, encoding='utf-8') as f:
+            arquivo = json.load(f)
+
+    perfis = {nome: dict(valores) for nome, valores in PERFIS.items()}
+    for nome, valores in arquivo.pop('perfis', {}).items():
+        perfis.setdefault(nome, {}).update(valores)
+
+    ambiente = {
+        'porta': os.environ.get('HIL_SERIAL_PORTA'),
+        'baud_rate': int(os.environ['HIL_SERIAL_BAUD']) if os.environ.get('HIL_SERIAL_BAUD') else None,
+    }
+
+    perfil = perfil or arquivo.pop('perfil', PERFIL_PADRAO)
+    arquivo.pop('perfil', None)
+    valores = {**arquivo, **{k: v for k, v in ambiente.items() if v is not None}}
+    valores.update({k: v for k, v in sobrescritas.items() if v is not None})
+    return Configuracao(perfil, perfis=perfis, **valores)
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Decodificador VETORIZADO dos pacotes enviados pela FPGA.
+
+Em vez de processar byte a byte, recebe blocos inteiros da serial e converte
+todos os pacotes alinhados de uma vez com NumPy. A ressincronização no header
+só é feita quando um pacote inválido é encontrado.
+
+Dois formatos de quadro (generic PACKED_FRAME do MultiStateSerialManager):
+  - 'padrao'  : header 0xFA + 6 bytes little-endian por estado (31 B para 5 estados)
+  - 'compacto': header 0xFB + os 42 bits de cada estado em sequência, do bit 0
+                do estado 0 em diante (27 + 1 = 28 B para 5 estados)
+Com formato='auto' o decodificador identifica o formato pelo header e só o
+fixa depois de QUADROS_CONFIRMACAO quadros válidos consecutivos.
+"""
+
+import numpy as np
+
+from .profiling import SEM_METRICAS
+
+# --- Configurações do Pacote de Dados ---
+HEADER_BYTE_INT = 0xFA
+HEADER_COMPACTO_INT = 0xFB
+BYTES_POR_ESTADO = 6
+
+FORMATOS = ('padrao', 'compacto')
+FORMATO_AUTO = 'auto'
+HEADERS = {'padrao': HEADER_BYTE_INT, 'compacto': HEADER_COMPACTO_INT}
+QUADROS_CONFIRMACAO = 3         # Quadros válidos seguidos para fixar o formato no modo 'auto'
+
+# --- Configurações do Formato Ponto Fixo (Q14.28) ---
+TOTAL_BITS = 42
+BITS_FRACIONARIOS = 28
+FATOR_CONVERSAO = 2**BITS_FRACIONARIOS
+
+
+def tamanho_pacote(num_estados, formato='padrao'):
+    """Bytes por quadro (header incluso) no formato dado."""
+    if formato == 'compacto':
+        return 1 + (num_estados * TOTAL_BITS + 7) // 8
+    if formato == 'padrao':
+        return 1 + num_estados * BYTES_POR_ESTADO
+    raise ValueError(f"Formato de pacote '{formato}' inválido; use um de {FORMATOS}.")
+
+
+def _estender_sinal(valores):
+    """Extensão de sinal de 42 bits (complemento de dois)."""
+    bit_sinal = np.int64(1 << (TOTAL_BITS - 1))
+    return (valores ^ bit_sinal) - bit_sinal
+
+
+def bytes_para_inteiros(payload, num_estados):
+    """
+    Converte uma matriz de payloads (pacotes x num_estados*6 bytes) nos inteiros
+    Q14.28 com sinal (pacotes x num_estados).
+    """
+    num_pacotes = payload.shape[0]
+    estados = payload.reshape(num_pacotes, num_estados, BYTES_POR_ESTADO)
+
+    # Completa cada estado para 8 bytes e reinterpreta como uint64 little-endian
+    palavras = np.zeros((num_pacotes, num_estados, 8), dtype=np.uint8)
+    palavras[:, :, :BYTES_POR_ESTADO] = estados
+    palavras[:, :, BYTES_POR_ESTADO - 1] &= 0x03
+    valores = palavras.view('<u8')[:, :, 0].astype(np.int64)
+    return _estender_sinal(valores)
+
+
+def bits_para_inteiros(payload, num_estados):
+    """
+    Converte payloads compactados (pacotes x ceil(42*num_estados/8) bytes) nos
+    inteiros Q14.28 com sinal (pacotes x num_estados).
+
+    O estado i começa no bit 42*i: lê de uma vez, para todos os pacotes, a
+    janela de 8 bytes que começa no byte 42*i // 8, desloca 42*i % 8 bits e
+    mascara 42 bits (deslocamento <= 6, então 42 + 6 bits cabem na janela).
+    """
+    num_pacotes, num_bytes = payload.shape
+    inicio_bits = np.arange(num_estados) * TOTAL_BITS
+    inicio_bytes = inicio_bits // 8
+
+    # Zeros no final para que a janela do último estado não passe do quadro
+    estendido = np.zeros((num_pacotes, int(inicio_bytes[-1]) + 8), dtype=np.uint8)
+    estendido[:, :num_bytes] = payload
+    janelas = estendido[:, inicio_bytes[:, None] + np.arange(8)]   # (pacotes, estados, 8)
+    palavras = np.ascontiguousarray(janelas).view('<u8')[:, :, 0]
+
+    mascara = np.uint64((1 << TOTAL_BITS) - 1)
+    valores = ((palavras >> (inicio_bits % 8).astype(np.uint64)) & mascara).astype(np.int64)
+    return _estender_sinal(valores)
+
+
+def _mascara_preenchimento(num_estados, formato):
+    """Bits do último byte de cada estado/quadro que precisam vir em zero."""
+    if formato == 'padrao':
+        return 0xFC
+    bits_usados = num_estados * TOTAL_BITS % 8
+    return (0xFF << bits_usados) & 0xFF if bits_usados else 0
+
+
+def _quadros_validos(quadros, num_estados, formato):
+    """Máscara de pacotes com header correto e bits de preenchimento em zero."""
+    ok = quadros[:, 0] == HEADERS[formato]
+    mascara = _mascara_preenchimento(num_estados, formato)
+    if formato == 'padrao':
+        ultimos_bytes = quadros[:, BYTES_POR_ESTADO::BYTES_POR_ESTADO]
+        return ok & np.all((ultimos_bytes & mascara) == 0, axis=1)
+    return ok & ((quadros[:, -1] & mascara) == 0)
+
+
+def _candidatos(buf, inicio, num_estados, quadros):
+    """
+    Gera (formato, posição) em ordem de posição para cada header a partir de
+    'inicio' seguido de 'quadros' pacotes válidos no mesmo formato.
+    """
+    headers = np.flatnonzero(np.isin(buf[inicio:], list(HEADERS.values()))) + inicio
+    for pos in headers:
+        formato = 'padrao' if buf[pos] == HEADER_BYTE_INT else 'compacto'
+        tam = tamanho_pacote(num_estados, formato)
+        fim = pos + quadros * tam
+        if fim > len(buf):
+            continue
+        if _quadros_validos(buf[pos:fim].reshape(quadros, tam), num_estados, formato).all():
+            yield formato, int(pos)
+
+
+def detectar_formato(dados, num_estados, quadros=QUADROS_CONFIRMACAO):
+    """
+    Formato ('padrao'/'compacto') do fluxo de bytes, ou None se nenhum dos dois
+    tiver 'quadros' pacotes válidos consecutivos em algum ponto de 'dados'.
+    """
+    buf = np.frombuffer(bytes(dados), dtype=np.uint8)
+    for formato, _ in _candidatos(buf, 0, num_estados, quadros):
+        return formato
+    return None
+
+
+class DecodificadorPacotes:
+    """
+    Decodifica um fluxo contínuo de bytes em blocos de amostras inteiras.
+
+    Guarda internamente os bytes de um pacote incompleto entre chamadas e
+    contabiliza pacotes válidos e bytes descartados na ressincronização.
+    Com 'metricas' (profiling.Metricas) cronometra o sincronismo e a
+    decodificação e conta os quadros decodificados e descartados.
+    """
+
+    def __init__(self, num_estados, formato=FORMATO_AUTO, metricas=SEM_METRICAS):
+        if formato != FORMATO_AUTO and formato not in FORMATOS:
+            raise ValueError(f"Formato de pacote '{formato}' inválido; use '{FORMATO_AUTO}' ou um de {FORMATOS}.")
+        self.num_estados = num_estados
+        self.auto = formato == FORMATO_AUTO
+        self.formato = None if self.auto else formato
+        self.pacotes_validos = 0
+        self.bytes_descartados = 0
+        self.metricas = metricas
+        self._pendente = b''
+
+    @property
+    def tamanho_pacote(self):
+        """Bytes por quadro do formato atual (o padrão enquanto não detectado)."""
+        return tamanho_pacote(self.num_estados, self.formato or 'padrao')
+
+    def _pacotes_validos(self, quadros):
+        return _quadros_validos(quadros, self.num_estados, self.formato)
+
+    def _detectar(self, buf, inicio):
+        """
+        Modo 'auto': fixa o formato no primeiro header seguido de
+        QUADROS_CONFIRMACAO pacotes válidos. Retorna a posição ou None.
+        """
+        for formato, pos in _candidatos(buf, inicio, self.num_estados, QUADROS_CONFIRMACAO):
+            self.formato = formato
+            return pos
+        return None
+
+    def _proximo_header(self, buf, inicio):
+        """Primeira posição >= inicio que começa um pacote válido (ou None)."""
+        if self.formato is None:
+            return self._detectar(buf, inicio)
+        candidatos = np.flatnonzero(buf[inicio:] == HEADERS[self.formato]) + inicio
+        for pos in candidatos:
+            if pos + self.tamanho_pacote > len(buf):
+                return int(pos)  # Pacote incompleto: decide na próxima chamada
+            if self._pacotes_validos(buf[None, pos:pos + self.tamanho_pacote])[0]:
+                return int(pos)
+        return None
+
+    def decodificar(self, novos_bytes):
+        """
+        Processa os bytes recebidos e retorna um array int64 (amostras x estados)
+        com todos os pacotes completos encontrados.
+        """
+        buf = np.frombuffer(self._pendente + bytes(novos_bytes), dtype=np.uint8)
+        blocos = []
+        pos = 0
+        metricas = self.metricas
+        validos_antes, descartados_antes = self.pacotes_validos, self.bytes_descartados
+        # Cauda que ainda pode conter o início de QUADROS_CONFIRMACAO quadros
+        guardar = QUADROS_CONFIRMACAO * max(tamanho_pacote(self.num_estados, f) for f in FORMATOS)
+
+        while True:
+            with metricas.medir('sincronismo'):
+                inicio = self._proximo_header(buf, pos)
+            if inicio is None:
+                if self.auto and self.formato is not None and len(buf) - pos >= guardar:
+                    # Nenhum quadro válido no formato fixado: a FPGA pode ter sido
+                    # reprogramada com o outro formato, então volta a detectar
+                    self.formato = None
+                    continue
+                if self.formato is None:
+                    novo_pos = max(pos, len(buf) - guardar)
+                    self.bytes_descartados += novo_pos - pos
+                    pos = novo_pos
+                    break
+                self.bytes_descartados += len(buf) - pos
+                pos = len(buf)
+                break
+            self.bytes_descartados += inicio - pos
+            pos = inicio
+            tam = self.tamanho_pacote
+
+            num_quadros = (len(buf) - pos) // tam
+            if num_quadros == 0:
+                break
+            with metricas.medir('decodificacao'):
+                quadros = buf[pos:pos + num_quadros * tam].reshape(num_quadros, tam)
+                validos = self._pacotes_validos(quadros)
+                n_ok = num_quadros if validos.all() else int(np.argmin(validos))
+
+                if n_ok:
+                    conversao = bits_para_inteiros if self.formato == 'compacto' else bytes_para_inteiros
+                    blocos.append(conversao(quadros[:n_ok, 1:], self.num_estados))
+                    self.pacotes_validos += n_ok
+            pos += n_ok * tam
+            if n_ok == num_quadros:
+                break
+            # Pacote inválido: descarta o header falso e procura o próximo
+            pos += 1
+            self.bytes_descartados += 1
+
+        self._pendente = buf[pos:].tobytes()
+        if metricas.ativo:
+            # Quadros perdidos estimados pelos bytes descartados na ressincronização
+            descartados = self.bytes_descartados - descartados_antes
+            metricas.contar(quadros=self.pacotes_validos - validos_antes,
+                            descartados=-(-descartados // self.tamanho_pacote))
+        if not blocos:
+            return np.empty((0, self.num_estados), dtype=np.int64)
+        return np.concatenate(blocos) if len(blocos) > 1 else blocos[0]
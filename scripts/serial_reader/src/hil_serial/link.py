@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+ORÇAMENTO DO ENLACE serial FPGA -> FT4232 -> host.
+
+Para os generics do HIL_TOP (CLK_FREQ, SERIAL_BAUD_RATE, SERIAL_FRACTIONAL_BAUD,
+intervalo de envio e formato do quadro) calcula:
+  - o baud realmente gerado pela FPGA (divisor inteiro do UartTX ou acumulador
+    do FracUartTX) e o baud mais próximo que o FT4232 consegue receber;
+  - o erro de cada lado e a diferença entre os dois, que é o que o receptor vê;
+  - o tempo de cada quadro na linha, o menor SEND_INTERVAL_US possível e a taxa
+    de amostras efetiva (o FSM ignora disparos enquanto ainda transmite).
+
+validar_leitura() passa um fluxo sintético, no ritmo da linha, pelo caminho de
+leitura do host com pausas periódicas do consumidor e um buffer de driver
+limitado, e conta as amostras perdidas com e sem a leitura em segundo plano.
+"""
+
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from .decoder import BYTES_POR_ESTADO, FORMATO_AUTO, DecodificadorPacotes, tamanho_pacote
+from .schedule import BYTES_CABECALHO_DADOS
+
+# --- Configurações do Enlace ---
+CLK_FREQ_HZ = 250_000_000       # CLK_FREQ do HIL_TOP
+BITS_POR_BYTE = 10              # 8N1
+CICLOS_EXTRA_POR_BYTE = 2       # S_SEND_BYTE -> S_WAIT_DONE dos serial managers
+CICLOS_EXTRA_POR_QUADRO = 2     # S_IDLE -> S_LATCH_DATA
+BAUD_MAX_FT4232 = 12_000_000    # FT4232H: 12 MHz / divisor (passos de 1/8; 0 -> 12M, 1 -> 8M)
+ERRO_RECOMENDADO = 0.02         # Diferença FPGA x FTDI com folga para ruído e bordas lentas
+AMOSTRAGEM_FTDI = 16            # Incerteza de 1/16 de bit no ponto de amostragem do receptor
+BYTES_DESCRITOR_EXTRA = 6       # Descritor da agenda: N + 6 bytes (DESCRIPTOR_BYTES do ScheduledSerialManager)
+
+# Validação da leitura no host
+CAPACIDADE_RX_PADRAO = 65536    # Buffer típico do driver (ftdi_sio/tty no Linux)
+DURACAO_VALIDACAO_S = 2.0
+PAUSA_CONSUMIDOR_S = 0.1        # Ex.: redesenho do gráfico ou fsync do gravador
+PERIODO_PAUSA_S = 0.5
+
+# Tolerância teórica: o stop bit é amostrado em 9,5 bits; a deriva acumulada
+# mais a incerteza da amostragem tem de ficar abaixo de meio bit
+ERRO_MAXIMO = (0.5 - 1 / AMOSTRAGEM_FTDI) / (BITS_POR_BYTE - 0.5)
+
+
+def ciclos_por_bit(clk_hz, baud, fracionario):
+    """Ciclos de clock por bit na FPGA (média, no caso do acumulador)."""
+    if fracionario:
+        return clk_hz / baud
+    return clk_hz // baud  # UartTX com divisor CLK_FREQ / BAUD_RATE - 1
+
+
+def baud_ft4232(baud):
+    """Baud mais próximo de 'baud' que o FT4232H gera (12 MHz / (n + k/8), n >= 2)."""
+    if baud >= BAUD_MAX_FT4232:
+        return float(BAUD_MAX_FT4232)
+    oitavos = max(16, round(8 * BAUD_MAX_FT4232 / baud))
+    candidatos = (BAUD_MAX_FT4232, 8_000_000, 8 * BAUD_MAX_FT4232 / oitavos,
+                  8 * BAUD_MAX_FT4232 / (oitavos + 1))
+    return float(min(candidatos, key=lambda b: abs(b - baud)))
+
+
+def bytes_por_quadro(num_estados, decimacoes=None):
+    """
+    Tamanho de cada quadro do HIL_TOP para 'num_estados' estados. Na agenda
+    vale o maior quadro: o de seq 0, com todos os estados de decimação não nula
+    ('decimacoes' = SCHEDULE_DECIMATION; None = todos), ou o descritor se for maior.
+    """
+    agendados = num_estados if decimacoes is None else sum(1 for d in decimacoes if d)
+    return {
+        'padrao': tamanho_pacote(num_estados, 'padrao'),
+        'compacto': tamanho_pacote(num_estados, 'compacto'),
+        'agenda': max(BYTES_CABECALHO_DADOS + agendados * BYTES_POR_ESTADO, num_estados + BYTES_DESCRITOR_EXTRA),
+    }
+
+
+class OrcamentoEnlace:
+    """Baud efetivo, erros e taxa de quadros para um conjunto de generics."""
+
+    def __init__(self, baud, clk_hz=CLK_FREQ_HZ, fracionario=False, num_estados=5, intervalo_us=None,
+                 decimacoes=None):
+        if baud >= clk_hz / 2:
+            raise ValueError(f"Baud {baud} alto demais para o clock de {clk_hz / 1e6:g} MHz.")
+        self.baud = baud
+        self.clk_hz = clk_hz
+        self.fracionario = fracionario
+        self.num_estados = num_estados
+        self.intervalo_us = intervalo_us
+        self.decimacoes = decimacoes
+
+        self.ciclos_bit = ciclos_por_bit(clk_hz, baud, fracionario)
+        self.baud_fpga = clk_hz / self.ciclos_bit
+        self.baud_ftdi = baud_ft4232(baud)
+        self.erro_fpga = self.baud_fpga / baud - 1
+        self.erro_ftdi = self.baud_ftdi / baud - 1
+        self.erro_enlace = self.baud_fpga / self.baud_ftdi - 1
+
+    @property
+    def situacao(self):
+        erro = abs(self.erro_enlace)
+        if erro <= ERRO_RECOMENDADO:
+            return 'ok'
+        return 'marginal' if erro < ERRO_MAXIMO else 'falha'
+
+    def tempo_quadro_s(self, num_bytes):
+        """Tempo do FSM para transmitir um quadro de 'num_bytes' bytes."""
+        ciclos = num_bytes * (BITS_POR_BYTE * self.ciclos_bit + CICLOS_EXTRA_POR_BYTE) + CICLOS_EXTRA_POR_QUADRO
+        return ciclos / self.clk_hz
+
+    def quadros(self):
+        """
+        Para cada formato: (bytes, tempo na linha em s, menor SEND_INTERVAL_US,
+        amostras/s com intervalo_us ou None).
+        """
+        resultado = {}
+        for formato, num_bytes in bytes_por_quadro(self.num_estados, self.decimacoes).items():
+            tempo = self.tempo_quadro_s(num_bytes)
+            intervalo_minimo = math.ceil(tempo * 1e6)
+            taxa = None
+            if self.intervalo_us:
+                # Disparos que chegam com o FSM ocupado são perdidos
+                disparos = max(1, math.ceil(tempo * 1e6 / self.intervalo_us))
+                taxa = 1e6 / (disparos * self.intervalo_us)
+            resultado[formato] = (num_bytes, tempo, intervalo_minimo, taxa)
+        return resultado
+
+    def relatorio(self):
+        gerador = 'acumulador (FracUartTX)' if self.fracionario else 'divisor inteiro (UartTX)'
+        linhas = [
+            f"Gerador {gerador}: {self.ciclos_bit:.3f} ciclos/bit a {self.clk_hz / 1e6:g} MHz",
+            f"  FPGA   : {self.baud_fpga:14,.0f} baud ({self.erro_fpga:+.3%} do nominal {self.baud:,})",
+            f"  FT4232 : {self.baud_ftdi:14,.0f} baud ({self.erro_ftdi:+.3%})",
+            f"  Enlace : {self.erro_enlace:+.3%} -> {self.situacao} "
+            f"(recomendado <= {ERRO_RECOMENDADO:.0%}, limite {ERRO_MAXIMO:.1%})",
+            f"  {'quadro':>9} {'bytes':>6} {'linha (µs)':>11} {'mín. intervalo':>15} {'quadros/s máx':>14}"
+            + (f" {'amostras/s a ' + str(self.intervalo_us) + ' µs':>20}" if self.intervalo_us else ''),
+        ]
+        for formato, (num_bytes, tempo, intervalo_minimo, taxa) in self.quadros().items():
+            linha = (f"  {formato:>9} {num_bytes:6d} {tempo * 1e6:11.2f} {intervalo_minimo:12d} µs "
+                     f"{1 / tempo:14,.0f}")
+            if taxa is not None:
+                linha += f" {taxa:20,.0f}"
+            linhas.append(linha)
+        return '\n'.join(linhas)
+
+    def __repr__(self):
+        return (f"OrcamentoEnlace(baud={self.baud}, fracionario={self.fracionario}, "
+                f"baud_fpga={self.baud_fpga:.0f}, erro_enlace={self.erro_enlace:+.3%})")
+
+
+def _consumir(fonte, config, em_segundo_plano, pausa_s, periodo_pausa_s):
+    """Lê a fonte até o fim, parando 'pausa_s' a cada 'periodo_pausa_s' como um consumidor lento."""
+    from .transport import ler_blocos
+
+    decodificador = DecodificadorPacotes(config.num_estados, config.formato_pacote)
+    blocos = []
+    proxima_pausa = time.perf_counter() + periodo_pausa_s
+    for bloco in ler_blocos(fonte, decodificador, em_segundo_plano=em_segundo_plano):
+        blocos.append(bloco)
+        if pausa_s and time.perf_counter() >= proxima_pausa:
+            time.sleep(pausa_s)
+            proxima_pausa = time.perf_counter() + periodo_pausa_s
+    if not blocos:
+        return np.empty((0, config.num_estados), dtype=np.int64)
+    return np.concatenate(blocos)
+
+
+def validar_leitura(config, orcamento, duracao_s=DURACAO_VALIDACAO_S, pausa_s=PAUSA_CONSUMIDOR_S,
+                    periodo_pausa_s=PERIODO_PAUSA_S, capacidade_rx=CAPACIDADE_RX_PADRAO):
+    """
+    Envia 'duracao_s' de quadros no ritmo do enlace (o maior entre o intervalo
+    do perfil e o tempo do quadro na linha) por uma FonteReplay com buffer de
+    'capacidade_rx' bytes e lê com e sem a thread de leitura.
+
+    Retorna {modo: (amostras esperadas, recebidas, bytes perdidos no driver, íntegras)}.
+    """
+    from .replay import FonteReplay, codificar_pacotes
+
+    formato = 'padrao' if config.formato_pacote == FORMATO_AUTO else config.formato_pacote
+    num_bytes = tamanho_pacote(config.num_estados, formato)
+    intervalo_s = max(config.intervalo_s, orcamento.tempo_quadro_s(num_bytes))
+    n = int(duracao_s / intervalo_s)
+    t = np.arange(n) * intervalo_s
+    fases = np.arange(config.num_estados)[None, :] * 2 * np.pi / config.num_estados
+    valores = np.rint(300 * np.sin(2 * np.pi * 60 * t[:, None] + fases) * 2**28).astype(np.int64)
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'enlace.bin')
+        with open(caminho, 'wb') as f:
+            f.write(codificar_pacotes(valores, formato))
+        for modo, em_segundo_plano in (('direta', False), ('segundo_plano', True)):
+            fonte = FonteReplay(caminho, config.num_estados, intervalo_s, velocidade=1.0,
+                                timeout=config.timeout_s, formato=formato, capacidade_rx=capacidade_rx)
+            try:
+                recebidas = _consumir(fonte, config, em_segundo_plano, pausa_s, periodo_pausa_s)
+            finally:
+                fonte.close()
+            integras = recebidas.shape == valores.shape and np.array_equal(recebidas, valores)
+            resultados[modo] = (n, recebidas.shape[0], fonte.bytes_perdidos, integras)
+    return resultados
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+MÉTRICAS por estágio da cadeia de aquisição.
+
+Quando o visualizador atrasa, mostra qual estágio está consumindo o tempo:
+  - leitura       : fonte.read() (inclui a espera pelo driver)
+  - sincronismo   : busca do header no decodificador
+  - decodificacao : validação e conversão dos quadros
+  - buffer        : cópia para o buffer circular e gravadores
+  - renderizacao  : atualização das curvas até o fim do desenho do matplotlib
+Além dos tempos (total, média e histograma por estágio), conta bytes
+recebidos, quadros decodificados, quadros descartados e a fila do driver
+(fonte.in_waiting) antes de cada leitura.
+
+Uso:
+    metricas = Metricas()
+    with metricas.medir('decodificacao'):
+        bloco = decodificador.decodificar(dados)
+    print(metricas.resumo())
+
+Desativadas (SEM_METRICAS, o padrão do decodificador e dos leitores), medir()
+devolve sempre o mesmo contexto vazio e contar() retorna de imediato.
+"""
+
+import bisect
+import contextlib
+import json
+import threading
+import time
+
+# --- Configurações das Métricas ---
+ESTAGIOS = ('leitura', 'sincronismo', 'decodificacao', 'buffer', 'renderizacao')
+# Limites superiores dos intervalos do histograma (µs); o último intervalo é aberto
+LIMITES_HISTOGRAMA_US = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000,
+                         10000, 20000, 50000, 100000, 200000, 500000)
+INTERVALO_REGISTRO_S = 1.0
+
+_CONTEXTO_VAZIO = contextlib.nullcontext()
+
+
+class _Medicao:
+    """Contexto que cronometra um estágio."""
+
+    __slots__ = ('_metricas', '_estagio', '_inicio')
+
+    def __init__(self, metricas, estagio):
+        self._metricas = metricas
+        self._estagio = estagio
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metricas.registrar(self._estagio, time.perf_counter() - self._inicio)
+        return False
+
+
+class Metricas:
+    """Acumula tempos por estágio e contadores do fluxo (seguro entre threads)."""
+
+    def __init__(self, ativo=True, limites_us=LIMITES_HISTOGRAMA_US):
+        self.ativo = ativo
+        self.limites_us = tuple(limites_us)
+        self._trava = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self._trava:
+            self.inicio = time.perf_counter()
+            self.chamadas = {e: 0 for e in ESTAGIOS}
+            self.tempo_s = {e: 0.0 for e in ESTAGIOS}
+            self.maximo_s = {e: 0.0 for e in ESTAGIOS}
+            self.histogramas = {e: [0] * (len(self.limites_us) + 1) for e in ESTAGIOS}
+            self.bytes_recebidos = 0
+            self.quadros = 0
+            self.descartados = 0
+            self.fila_driver = 0
+            self.fila_driver_max = 0
+
+    # --- Coleta ---
+    def medir(self, estagio):
+        """Context manager que soma o tempo do bloco 'with' ao estágio."""
+        if not self.ativo:
+            return _CONTEXTO_VAZIO
+        return _Medicao(self, estagio)
+
+    def registrar(self, estagio, duracao_s):
+        if not self.ativo:
+            return
+        indice = bisect.bisect_left(self.limites_us, duracao_s * 1e6)
+        with self._trava:
+            if estagio not in self.chamadas:
+                self.chamadas[estagio] = 0
+                self.tempo_s[estagio] = 0.0
+                self.maximo_s[estagio] = 0.0
+                self.histogramas[estagio] = [0] * (len(self.limites_us) + 1)
+            self.chamadas[estagio] += 1
+            self.tempo_s[estagio] += duracao_s
+            if duracao_s > self.maximo_s[estagio]:
+                self.maximo_s[estagio] = duracao_s
+            self.histogramas[estagio][indice] += 1
+
+    def contar(self, bytes_recebidos=0, quadros=0, descartados=0, fila_driver=None):
+        if not self.ativo:
+            return
+        with self._trava:
+            self.bytes_recebidos += bytes_recebidos
+            self.quadros += quadros
+            self.descartados += descartados
+            if fila_driver is not None:
+                self.fila_driver = fila_driver
+                self.fila_driver_max = max(self.fila_driver_max, fila_driver)
+
+    # --- Consulta ---
+    def _percentil_us(self, estagio, fracao):
+        """Limite superior do intervalo do histograma que contém o percentil."""
+        histograma = self.histogramas[estagio]
+        alvo = fracao * sum(histograma)
+        acumulado = 0
+        for i, contagem in enumerate(histograma):
+            acumulado += contagem
+            if contagem and acumulado >= alvo:
+                maximo_us = self.maximo_s[estagio] * 1e6
+                return min(self.limites_us[i], maximo_us) if i < len(self.limites_us) else maximo_us
+        return 0.0
+
+    def instantaneo(self):
+        """Contadores acumulados, para calcular taxas entre dois instantes."""
+        with self._trava:
+            return {'t': time.perf_counter(), 'bytes': self.bytes_recebidos, 'quadros': self.quadros,
+                    'descartados': self.descartados, 'tempo_s': dict(self.tempo_s)}
+
+    def resumo(self, anterior=None):
+        """
+        Dicionário serializável em JSON com as taxas (desde 'anterior', um
+        instantaneo(), ou desde o início) e as estatísticas de cada estágio.
+        """
+        agora = self.instantaneo()
+        base = anterior or {'t': self.inicio, 'bytes': 0, 'quadros': 0, 'descartados': 0,
+                            'tempo_s': {e: 0.0 for e in agora['tempo_s']}}
+        janela = max(agora['t'] - base['t'], 1e-9)
+        with self._trava:
+            estagios = {}
+            for estagio, chamadas in self.chamadas.items():
+                if not chamadas:
+                    continue
+                estagios[estagio] = {
+                    'chamadas': chamadas,
+                    'media_us': self.tempo_s[estagio] / chamadas * 1e6,
+                    'p50_us': self._percentil_us(estagio, 0.50),
+                    'p95_us': self._percentil_us(estagio, 0.95),
+                    'max_us': self.maximo_s[estagio] * 1e6,
+                    'ocupacao': (agora['tempo_s'][estagio] - base['tempo_s'].get(estagio, 0.0)) / janela,
+                    'histograma': list(self.histogramas[estagio]),
+                }
+            return {
+                'janela_s': janela,
+                'bytes_s': (agora['bytes'] - base['bytes']) / janela,
+                'quadros_s': (agora['quadros'] - base['quadros']) / janela,
+                'descartados': self.descartados,
+                'fila_driver': self.fila_driver,
+                'fila_driver_max': self.fila_driver_max,
+                'estagios': estagios,
+            }
+
+    def texto(self, anterior=None):
+        """Resumo em poucas linhas, para o overlay do gráfico e o modo texto."""
+        r = self.resumo(anterior)
+        linhas = [f"{r['bytes_s'] / 1e3:8.1f} kB/s | {r['quadros_s']:8.0f} quadros/s | "
+                  f"descartados {r['descartados']} | fila driver {r['fila_driver']} B (máx {r['fila_driver_max']})"]
+        for estagio, e in r['estagios'].items():
+            linhas.append(f"{estagio:>13}: {e['ocupacao']:6.1%} | média {e['media_us']:8.1f} µs | "
+                          f"p95 {e['p95_us']:8.0f} µs | máx {e['max_us']:8.0f} µs")
+        return '\n'.join(linhas)
+
+
+SEM_METRICAS = Metricas(ativo=False)
+
+
+class RegistroMetricas:
+    """
+    Grava metricas.resumo() como uma linha JSON a cada 'intervalo_s'
+    (chamar talvez_gravar() no laço de leitura).
+    """
+
+    def __init__(self, caminho, metricas, intervalo_s=INTERVALO_REGISTRO_S):
+        self.caminho = caminho
+        self.metricas = metricas
+        self.intervalo_s = intervalo_s
+        self._arquivo = open(caminho, 'w', encoding='utf-8')
+        self._anterior = metricas.instantaneo()
+
+    def talvez_gravar(self):
+        if time.perf_counter() - self._anterior['t'] >= self.intervalo_s:
+            self.gravar()
+
+    def gravar(self):
+        resumo = self.metricas.resumo(self._anterior)
+        resumo['tempo_unix'] = time.time()
+        self._arquivo.write(json.dumps(resumo) + '\n')
+        self._arquivo.flush()
+        self._anterior = self.metricas.instantaneo()
+
+    def fechar(self):
+        if not self._arquivo.closed:
+            self.gravar()
+            self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+RENDERIZADORES da leitura contínua.
+
+  - VisualizadorTempoReal: gráfico matplotlib com botão de pausa (os antigos
+    multi_state_real_time.py / single_state_real_time.py)
+  - RenderizadorTexto: resumo periódico no terminal, para uso sem tela (SSH)
+
+Com métricas ativas (profiling.Metricas) os dois mostram o tempo de cada
+estágio: o gráfico num quadro sobre as curvas, o texto junto do resumo.
+O matplotlib só é importado quando o visualizador gráfico é executado.
+"""
+
+import time
+
+import numpy as np
+
+from .buffers import BufferCircular
+from .decoder import FATOR_CONVERSAO, DecodificadorPacotes
+from .profiling import SEM_METRICAS
+from .transport import TAMANHO_BLOCO_LEITURA, LeitorEmSegundoPlano
+
+# --- Configurações de Gráfico ---
+FIG_WIDTH_INCHES = 14
+FIG_HEIGHT_INCHES = 7
+JANELA_GRAFICO = 1000           # Quantos pontos de dados mostrar no eixo X
+INTERVALO_ATUALIZACAO_MS = 100
+DECIMACAO = 1                   # Mostra apenas 1 a cada N pontos
+
+# Controle do Eixo Y (o "zoom"); None = auto-ajuste
+LIMITES_Y = None
+
+FONTSIZE_TITLE = 20
+FONTSIZE_LABELS = 16
+FONTSIZE_LEGEND = 14
+
+INTERVALO_TEXTO_S = 1.0
+INTERVALO_OVERLAY_S = 0.5       # Atualização do quadro de métricas sobre o gráfico
+FONTSIZE_OVERLAY = 9
+
+
+class _LeitorContinuo:
+    """
+    Lê tudo o que estiver disponível na fonte, grava e guarda no buffer.
+    'registro' (profiling.RegistroMetricas) grava as métricas periodicamente.
+    """
+
+    def __init__(self, fonte, config, capacidade, gravador=None, metricas=SEM_METRICAS, registro=None):
+        self.fonte = fonte
+        self.config = config
+        self.gravador = gravador
+        self.metricas = metricas
+        self.registro = registro
+        self.decodificador = DecodificadorPacotes(config.num_estados, config.formato_pacote, metricas)
+        self.buffer = BufferCircular(capacidade, config.num_estados)
+        # Com a thread, o redesenho do gráfico não segura a leitura da porta
+        self.leitor = None
+        if getattr(config, 'leitura_em_segundo_plano', False):
+            self.leitor = LeitorEmSegundoPlano(fonte, self.decodificador, TAMANHO_BLOCO_LEITURA * 16).iniciar()
+
+    def _receber(self, dados, bloco):
+        with self.metricas.medir('buffer'):
+            if self.gravador:
+                if self.gravador.bruto:
+                    self.gravador.escrever_bytes(dados)
+                self.gravador.escrever(bloco)
+            self.buffer.adicionar(bloco / FATOR_CONVERSAO)
+        return bloco.shape[0]
+
+    @property
+    def fim(self):
+        if self.leitor is not None:
+            return self.leitor.fim
+        return getattr(self.fonte, 'fim', False)
+
+    def ler_disponivel(self):
+        """Retorna o número de amostras novas."""
+        if self.registro:
+            self.registro.talvez_gravar()
+        if self.leitor is not None:
+            return sum(self._receber(dados, bloco) for dados, bloco in self.leitor.obter())
+        disponivel = self.fonte.in_waiting
+        self.metricas.contar(fila_driver=max(0, disponivel))
+        if disponivel <= 0:
+            return 0
+        with self.metricas.medir('leitura'):
+            dados = self.fonte.read(min(disponivel, TAMANHO_BLOCO_LEITURA * 16))
+        self.metricas.contar(bytes_recebidos=len(dados))
+        return self._receber(dados, self.decodificador.decodificar(dados))
+
+    def parar(self):
+        """Encerra a thread de leitura (antes de fechar a fonte) e o registro de métricas."""
+        if self.leitor is not None:
+            self.leitor.parar()
+        if self.registro:
+            self.registro.fechar()
+
+
+class VisualizadorTempoReal(_LeitorContinuo):
+    """Gráfico em tempo real de todos os estados do perfil, com botão de pausa."""
+
+    def __init__(self, fonte, config, gravador=None, janela=JANELA_GRAFICO, decimacao=DECIMACAO,
+                 limites_y=LIMITES_Y, intervalo_ms=INTERVALO_ATUALIZACAO_MS, metricas=SEM_METRICAS, registro=None):
+        super().__init__(fonte, config, janela * decimacao, gravador, metricas, registro)
+        self.decimacao = max(1, decimacao)
+        self.limites_y = limites_y
+        self.intervalo_ms = intervalo_ms
+        self.pausado = False
+        self._inicio_quadro = None
+        self._overlay = None
+        self._anterior = metricas.instantaneo()
+
+    def _fim_desenho(self, event):
+        """draw_event: fecha a medição de renderização aberta em _atualizar."""
+        if self._inicio_quadro is not None:
+            self.metricas.registrar('renderizacao', time.perf_counter() - self._inicio_quadro)
+            self._inicio_quadro = None
+
+    def _atualizar_overlay(self):
+        if time.perf_counter() - self._anterior['t'] < INTERVALO_OVERLAY_S:
+            return
+        self._overlay.set_text(self.metricas.texto(self._anterior))
+        self._anterior = self.metricas.instantaneo()
+
+    def _alternar_pausa(self, event):
+        self.pausado = not self.pausado
+        self._botao.label.set_text('Retomar' if self.pausado else 'Pausar')
+        print("Visualizador PAUSADO" if self.pausado else "Visualizador RETOMADO")
+
+    def _atualizar(self, frame):
+        if not self.pausado:
+            self.ler_disponivel()
+        if self.metricas.ativo:
+            # Vai até o draw_event: o desenho acontece depois deste callback
+            self._inicio_quadro = time.perf_counter()
+            self._atualizar_overlay()
+
+        dados = self.buffer.dados()[::self.decimacao]
+        tempo_ms = np.arange(dados.shape[0]) * self.decimacao * self.config.intervalo_us / 1000
+        for i, linha in enumerate(self._linhas):
+            linha.set_data(tempo_ms, dados[:, i])
+
+        titulo = 'Visualizador em Tempo Real' + (' - PAUSADO' if self.pausado else '')
+        self._ax.set_title(titulo, fontsize=FONTSIZE_TITLE, fontweight='bold')
+        if self.limites_y is None:
+            self._ax.relim()
+            self._ax.autoscale_view(True, True, True)
+        return self._linhas
+
+    def executar(self):
+        """Abre a janela e bloqueia até ela ser fechada."""
+        import matplotlib.animation as animation
+        import matplotlib.pyplot as plt
+        from matplotlib.widgets import Button
+
+        fig, self._ax = plt.subplots(figsize=(FIG_WIDTH_INCHES, FIG_HEIGHT_INCHES))
+        plt.subplots_adjust(bottom=0.15)
+
+        self._linhas = [self._ax.plot([], [], label=rotulo)[0]
+                        for rotulo in self.config.rotulos[:self.config.num_estados]]
+        self._ax.set_xlabel('Tempo (ms)', fontsize=FONTSIZE_LABELS, fontweight='bold')
+        self._ax.set_ylabel('Corrente(A)/Tensão(V)', fontsize=FONTSIZE_LABELS, fontweight='bold')
+        self._ax.legend(loc='upper right', fontsize=FONTSIZE_LEGEND)
+        self._ax.grid(True)
+        self._ax.set_xlim(0, self.buffer.capacidade * self.config.intervalo_us / 1000)
+        if self.limites_y is not None:
+            self._ax.set_ylim(*self.limites_y)
+
+        if self.metricas.ativo:
+            self._overlay = self._ax.text(0.01, 0.99, '', transform=self._ax.transAxes, va='top',
+                                          family='monospace', fontsize=FONTSIZE_OVERLAY,
+                                          bbox={'facecolor': 'white', 'alpha': 0.8})
+            fig.canvas.mpl_connect('draw_event', self._fim_desenho)
+
+        self._botao = Button(plt.axes([0.45, 0.02, 0.1, 0.05]), 'Pausar')
+        self._botao.on_clicked(self._alternar_pausa)
+
+        # A referência à animação precisa existir enquanto a janela estiver aberta
+        self._animacao = animation.FuncAnimation(fig, self._atualizar, interval=self.intervalo_ms,
+                                                 blit=False, cache_frame_data=False)
+        print("Iniciando visualizador... Feche a janela do gráfico para parar.")
+        print("Use o botão 'Pausar' para congelar a imagem.")
+        plt.show()
+
+
+class RenderizadorTexto(_LeitorContinuo):
+    """Imprime, a cada intervalo, a taxa de pacotes e o último valor/RMS de cada estado."""
+
+    def __init__(self, fonte, config, gravador=None, janela=JANELA_GRAFICO, intervalo_s=INTERVALO_TEXTO_S,
+                 metricas=SEM_METRICAS, registro=None):
+        super().__init__(fonte, config, janela, gravador, metricas, registro)
+        self.intervalo_s = intervalo_s
+
+    def executar(self):
+        """Roda até Ctrl+C (ou até o fim do replay)."""
+        ultimo = time.perf_counter()
+        novas = 0
+        anterior = self.metricas.instantaneo()
+        while not self.fim:
+            novas += self.ler_disponivel()
+            agora = time.perf_counter()
+            if agora - ultimo < self.intervalo_s:
+                time.sleep(0.005)
+                continue
+
+            dados = self.buffer.dados()
+            if dados.shape[0]:
+                rms = np.sqrt(np.mean(dados ** 2, axis=0))
+                resumo = ' | '.join(f'{nome}={v:+.4g} (rms {r:.4g})'
+                                    for nome, v, r in zip(self.config.nomes, dados[-1], rms))
+                print(f"{novas / (agora - ultimo):8.0f} amostras/s | {resumo}")
+            else:
+                print("Aguardando pacotes...")
+            if self.metricas.ativo:
+                print(self.metricas.texto(anterior))
+                anterior = self.metricas.instantaneo()
+            ultimo, novas = agora, 0
+        print(f"Fim do replay: {self.buffer.total_recebido} amostras recebidas.")
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Fonte de REPLAY para os visualizadores em tempo real.
+
+Emula a interface da porta serial usada pelos leitores (in_waiting, read,
+reset_input_buffer, close) a partir de uma captura gravada. Assim os pacotes
+passam exatamente pelo mesmo caminho de decodificação, buffer e renderização
+da leitura ao vivo, em 1x, Nx ou velocidade máxima.
+
+Formatos aceitos:
+  - .bin : bytes brutos da serial, gravados pelos visualizadores (--gravar)
+  - .csv : capturas salvas pelos scripts *_save_img.py (re-codificadas em pacotes)
+  - .hilz: capturas compactadas (storage.py), re-codificadas em pacotes
+Os .bin podem estar em qualquer um dos formatos de quadro (padrão ou compacto);
+as capturas .csv/.hilz são re-codificadas no formato pedido (padrão se 'auto').
+"""
+
+import os
+import time
+
+import numpy as np
+
+from .decoder import (BITS_FRACIONARIOS, BYTES_POR_ESTADO, FORMATO_AUTO, HEADERS, TOTAL_BITS,
+                      detectar_formato, tamanho_pacote)
+
+
+def codificar_pacotes(valores_int, formato='padrao'):
+    """
+    Codifica uma matriz de inteiros com sinal (amostras x estados) no mesmo
+    formato enviado pela FPGA:
+      - 'padrao'  : header 0xFA seguido de 6 bytes little-endian por estado
+                    (42 bits úteis, 6 bits superiores em zero)
+      - 'compacto': header 0xFB seguido dos 42 bits de cada estado em sequência
+    Retorna os bytes de todos os pacotes concatenados.
+    """
+    valores = np.asarray(valores_int, dtype=np.int64)
+    if valores.ndim == 1:
+        valores = valores[:, None]
+    num_amostras, num_estados = valores.shape
+
+    mascara = np.int64((1 << TOTAL_BITS) - 1)
+    brutos = np.ascontiguousarray((valores & mascara).astype('<u8'))
+    bytes_valores = brutos.view(np.uint8).reshape(num_amostras, num_estados, 8)
+
+    pacotes = np.zeros((num_amostras, tamanho_pacote(num_estados, formato)), dtype=np.uint8)
+    pacotes[:, 0] = HEADERS[formato]
+    if formato == 'compacto':
+        # 42 bits de cada estado, concatenados a partir do bit 0 do estado 0
+        bits = np.unpackbits(bytes_valores, axis=2, bitorder='little')[:, :, :TOTAL_BITS]
+        pacotes[:, 1:] = np.packbits(bits.reshape(num_amostras, -1), axis=1, bitorder='little')
+    else:
+        # 8 bytes por valor -> mantém apenas os 6 menos significativos
+        pacotes[:, 1:] = bytes_valores[:, :, :BYTES_POR_ESTADO].reshape(num_amostras, -1)
+    return pacotes.tobytes()
+
+
+def carregar_captura_csv(caminho):
+    """
+    Carrega um CSV salvo pelos scripts de captura e retorna os valores
+    inteiros (Q14.28) com shape (amostras, estados).
+    """
+    import pandas as pd
+
+    df = pd.read_csv(caminho, sep=';', decimal=',')
+    if 'DadoBrutoInt_ComSinal' in df.columns:
+        return df[['DadoBrutoInt_ComSinal']].to_numpy(np.int64)
+
+    colunas_reais = [c for c in df.columns if c.endswith('_Real')]
+    if not colunas_reais and 'DadoReal' in df.columns:
+        colunas_reais = ['DadoReal']
+    if not colunas_reais:
+        raise ValueError(f"CSV '{caminho}' sem colunas de dados reconhecidas.")
+
+    # Os valores reais vieram de inteiros / 2^28, então a volta é exata
+    return np.rint(df[colunas_reais].to_numpy(float) * 2**BITS_FRACIONARIOS).astype(np.int64)
+
+
+class FonteReplay:
+    """
+    Substituto da serial.Serial que entrega os bytes de uma captura gravada
+    no ritmo original da aquisição (ou acelerado).
+
+    velocidade: 1.0 = tempo real, N = N vezes mais rápido, 0 = máxima velocidade.
+    capacidade_rx: emula o buffer de recepção do driver; os bytes que passarem
+    dele sem serem lidos são perdidos e contados em 'bytes_perdidos'.
+    """
+
+    def __init__(self, caminho, num_estados, intervalo_amostra_s,
+                 velocidade=1.0, repetir=False, timeout=None, formato=FORMATO_AUTO, capacidade_rx=None):
+        if not os.path.exists(caminho):
+            raise FileNotFoundError(f"Captura '{caminho}' não encontrada.")
+
+        if caminho.lower().endswith(('.csv', '.hilz')):
+            if caminho.lower().endswith('.hilz'):
+                from .storage import LeitorCompactado
+                with LeitorCompactado(caminho) as leitor:
+                    valores = leitor.ler()
+            else:
+                valores = carregar_captura_csv(caminho)
+            if valores.shape[1] != num_estados:
+                raise ValueError(f"Captura com {valores.shape[1]} estado(s), esperado {num_estados}.")
+            self.formato = 'padrao' if formato == FORMATO_AUTO else formato
+            self._dados = codificar_pacotes(valores, self.formato)
+        else:
+            with open(caminho, 'rb') as f:
+                self._dados = f.read()
+            # O ritmo de entrega depende do tamanho do quadro gravado
+            self.formato = detectar_formato(self._dados, num_estados) or 'padrao'
+
+        self.port = caminho
+        self.timeout = timeout
+        self.velocidade = velocidade
+        self.repetir = repetir
+        self.tamanho_pacote = tamanho_pacote(num_estados, self.formato)
+        self.bytes_por_segundo = self.tamanho_pacote / intervalo_amostra_s
+        self.is_open = True
+        self.capacidade_rx = capacidade_rx
+        self.bytes_perdidos = 0
+
+        self._posicao = 0
+        self._inicio = time.perf_counter()
+
+    # --- Ritmo de entrega ---
+    def _bytes_liberados(self):
+        """Total de bytes que a 'linha' já teria entregue até agora."""
+        if not self.velocidade:
+            return len(self._dados)
+        decorrido = time.perf_counter() - self._inicio
+        liberados = int(decorrido * self.bytes_por_segundo * self.velocidade)
+        if self.repetir:
+            return liberados
+        return min(liberados, len(self._dados))
+
+    def _transbordar(self):
+        """Descarta o que não coube em capacidade_rx (a posição das perdas não importa aqui)."""
+        if self.capacidade_rx and self.velocidade:
+            excesso = self._bytes_liberados() - self._posicao - self.capacidade_rx
+            if excesso > 0:
+                self._posicao += excesso
+                self.bytes_perdidos += excesso
+
+    @property
+    def in_waiting(self):
+        if self.repetir and not self.velocidade:
+            return len(self._dados)
+        self._transbordar()
+        return max(0, self._bytes_liberados() - self._posicao)
+
+    @property
+    def fim(self):
+        """True quando toda a captura já foi entregue (nunca, se repetir=True)."""
+        return not self.repetir and self._posicao >= len(self._dados)
+
+    def read(self, size=1):
+        """Lê até 'size' bytes, esperando no máximo 'timeout' segundos como a pyserial."""
+        limite = None if self.timeout is None else time.perf_counter() + self.timeout
+        while self.velocidade and self.in_waiting < size and not self.fim:
+            if limite is not None and time.perf_counter() >= limite:
+                break
+            time.sleep(0.001)
+
+        n = size if (self.repetir and not self.velocidade) else min(size, self.in_waiting)
+        if n <= 0:
+            return b''
+
+        if not self.repetir:
+            bloco = self._dados[self._posicao:self._posicao + n]
+        else:
+            total = len(self._dados)
+            inicio = self._posicao % total
+            partes = []
+            restante = n
+            while restante > 0:
+                pedaco = self._dados[inicio:inicio + restante]
+                partes.append(pedaco)
+                restante -= len(pedaco)
+                inicio = 0
+            bloco = b''.join(partes)
+        self._posicao += n
+        return bloco
+
+    def reset_input_buffer(self):
+        """Descarta o que já estaria no buffer, como na porta real."""
+        if self.velocidade:
+            self._posicao = max(self._posicao, self._bytes_liberados())
+
+    def set_buffer_size(self, rx_size=None, tx_size=None):
+        pass
+
+    def close(self):
+        self.is_open = False
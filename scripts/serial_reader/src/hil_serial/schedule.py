@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+"""
+AGENDA POR ESTADO: quadros do ScheduledSerialManager (USE_SCHEDULED_SERIAL).
+
+Cada disparo de SEND_INTERVAL_US atendido pelo FSM leva um quadro; os que
+chegam durante a transmissão do anterior ficam sem quadro:
+  - dados    : 0xFC | seq | disparo | 6 bytes por estado agendado em seq
+  - descritor: 0xFD | N | decimação de cada estado | L | intervalo_us (2 B) | XOR dos bytes 1..N+4
+O estado i vai no quadro seq quando decimação[i] > 0 e seq % decimação[i] == 0.
+seq conta os quadros enviados módulo o maior múltiplo de L (MMC das decimações)
+que cabe em um byte; disparo conta todos os disparos módulo 256. A cada
+INTERVALO_DESCRITOR quadros o descritor substitui o quadro de dados (seq
+avança do mesmo jeito).
+
+O DemultiplexadorAgenda lê o descritor do próprio fluxo e separa os estados em
+séries com base de tempo própria: cada amostra vem com o índice do disparo
+(tempo = disparo * intervalo_s), e os saltos de seq mostram quadros perdidos
+no enlace. seq e disparo só dizem o salto módulo a volta do contador: depois de
+uma perda, o salto só é aceito quando os bytes descartados explicam exatamente
+os quadros perdidos. Se faltam bytes que nunca chegaram (buffer do driver
+cheio, por exemplo), o tamanho da lacuna é desconhecido e começa um novo
+segmento (ver DemultiplexadorAgenda.descontinuidades).
+Depois de sincronizado, valida e extrai de uma vez os quadros do bloco, já que
+a sequência de tamanhos é periódica.
+"""
+
+import math
+
+import numpy as np
+
+from .decoder import BYTES_POR_ESTADO, bytes_para_inteiros
+
+# --- Configurações da Agenda ---
+HEADER_DADOS_INT = 0xFC
+HEADER_DESCRITOR_INT = 0xFD
+INTERVALO_DESCRITOR = 1000     # DESCRIPTOR_INTERVAL do ScheduledSerialManager (quadros)
+BYTES_CABECALHO_DADOS = 3      # header + seq + disparo
+CICLO_DISPARO = 256            # Período do byte disparo
+QUADROS_POR_LOTE = 8192        # Quadros validados por vez no fluxo sincronizado
+
+
+class DescritorAgenda:
+    """Decimação por estado (0 = não enviado) e intervalo entre disparos."""
+
+    def __init__(self, decimacoes, intervalo_us):
+        self.decimacoes = tuple(int(d) for d in decimacoes)
+        if any(d < 0 or d > 255 for d in self.decimacoes):
+            raise ValueError(f"Decimações devem estar entre 0 e 255: {self.decimacoes}")
+        self.intervalo_us = int(intervalo_us)
+        self.comprimento = math.lcm(*[d for d in self.decimacoes if d]) if any(self.decimacoes) else 1
+        if self.comprimento > 255:
+            raise ValueError(f"MMC das decimações ({self.comprimento}) não cabe em um byte.")
+
+        # Período do contador seq: maior múltiplo de L até 256
+        self.ciclo_seq = self.comprimento * (256 // self.comprimento)
+
+        d = np.array(self.decimacoes)
+        seqs = np.arange(self.ciclo_seq)[:, None]
+        # presenca[seq, i]: estado i enviado no quadro seq
+        self.presenca = (d > 0) & (seqs % np.maximum(d, 1) == 0)
+        ordem = np.cumsum(self.presenca, axis=1) - 1
+        self.deslocamentos = np.where(self.presenca, BYTES_CABECALHO_DADOS + ordem * BYTES_POR_ESTADO, -1)
+        self.tamanhos = BYTES_CABECALHO_DADOS + BYTES_POR_ESTADO * self.presenca.sum(axis=1)
+
+    @property
+    def num_estados(self):
+        return len(self.decimacoes)
+
+    @property
+    def estados_enviados(self):
+        return [i for i, d in enumerate(self.decimacoes) if d]
+
+    @property
+    def intervalo_s(self):
+        return self.intervalo_us * 1e-6
+
+    @property
+    def tamanho_descritor(self):
+        return self.num_estados + 6
+
+    def bytes_por_disparo(self, intervalo_descritor=INTERVALO_DESCRITOR):
+        """Média de bytes por quadro atendido, incluindo os descritores."""
+        dados = self.tamanhos.mean() * (intervalo_descritor - 1)
+        return (dados + self.tamanho_descritor) / intervalo_descritor
+
+    def para_bytes(self):
+        corpo = bytes([self.num_estados, *self.decimacoes, self.comprimento,
+                       self.intervalo_us & 0xFF, self.intervalo_us >> 8])
+        checksum = 0
+        for b in corpo:
+            checksum ^= b
+        return bytes([HEADER_DESCRITOR_INT]) + corpo + bytes([checksum])
+
+    @classmethod
+    def de_bytes(cls, dados):
+        """Descritor a partir dos bytes do quadro (header incluso); ValueError se inválido."""
+        dados = bytes(dados)
+        if len(dados) < 2 or dados[0] != HEADER_DESCRITOR_INT:
+            raise ValueError('Quadro não começa com o header do descritor.')
+        n = dados[1]
+        if len(dados) < n + 6:
+            raise ValueError('Descritor incompleto.')
+        checksum = 0
+        for b in dados[1:n + 5]:
+            checksum ^= b
+        if checksum != dados[n + 5]:
+            raise ValueError('Checksum do descritor inválido.')
+        descritor = cls(dados[2:2 + n], dados[n + 3] | dados[n + 4] << 8)
+        if descritor.comprimento != dados[n + 2]:
+            raise ValueError('Comprimento da agenda incoerente com as decimações.')
+        return descritor
+
+    def __eq__(self, outro):
+        return (isinstance(outro, DescritorAgenda) and self.decimacoes == outro.decimacoes
+                and self.intervalo_us == outro.intervalo_us)
+
+    def __repr__(self):
+        return (f"DescritorAgenda(decimacoes={self.decimacoes}, intervalo_us={self.intervalo_us}, "
+                f"comprimento={self.comprimento})")
+
+
+def codificar_agenda(valores_int, descritor, intervalo_descritor=INTERVALO_DESCRITOR,
+                     disparos_por_quadro=1):
+    """
+    Fluxo de bytes que o ScheduledSerialManager enviaria para os estados
+    'valores_int' (disparos x estados, int64). Com disparos_por_quadro > 1 o
+    FSM só atende um disparo a cada disparos_por_quadro (quadro mais longo
+    que o intervalo). Retorna (bytes, disparos_dados): índices dos disparos
+    com quadro de dados.
+    """
+    valores = np.asarray(valores_int, dtype=np.int64)
+    atendidos = np.arange(0, valores.shape[0], disparos_por_quadro)
+    quadros = np.arange(atendidos.size)
+    eh_descritor = quadros % intervalo_descritor == 0
+    quadros_dados = quadros[~eh_descritor]
+    disparos_dados = atendidos[quadros_dados]
+    seqs = quadros_dados % descritor.ciclo_seq
+
+    tamanhos = np.full(quadros.size, descritor.tamanho_descritor)
+    tamanhos[quadros_dados] = descritor.tamanhos[seqs]
+    inicios = np.concatenate(([0], np.cumsum(tamanhos)[:-1]))
+    fluxo = np.zeros(int(tamanhos.sum()), dtype=np.uint8)
+
+    quadro_descritor = np.frombuffer(descritor.para_bytes(), dtype=np.uint8)
+    fluxo[inicios[eh_descritor][:, None] + np.arange(quadro_descritor.size)] = quadro_descritor
+
+    mascara = np.int64((1 << 42) - 1)
+    brutos = np.ascontiguousarray((valores & mascara).astype('<u8')).view(np.uint8).reshape(valores.shape[0], -1, 8)
+    inicio_dados = inicios[quadros_dados]
+    fluxo[inicio_dados] = HEADER_DADOS_INT
+    fluxo[inicio_dados + 1] = seqs
+    fluxo[inicio_dados + 2] = disparos_dados % CICLO_DISPARO
+    for i in descritor.estados_enviados:
+        sel = descritor.presenca[seqs, i]
+        destino = inicio_dados[sel] + descritor.deslocamentos[seqs[sel], i]
+        fluxo[destino[:, None] + np.arange(BYTES_POR_ESTADO)] = brutos[disparos_dados[sel], i, :BYTES_POR_ESTADO]
+    return fluxo.tobytes(), disparos_dados
+
+
+class DemultiplexadorAgenda:
+    """
+    Separa o fluxo da agenda em séries por estado.
+
+    decodificar() devolve {estado: (disparos, valores)} com as amostras novas.
+    O primeiro quadro sincronizado recebe o índice igual ao seu byte disparo,
+    e os seguintes avançam pela diferença desse byte. Depois da perda de
+    sincronismo, os quadros perdidos são o salto de seq mais as voltas completas
+    do contador que fazem os bytes descartados baterem com o tamanho desses
+    quadros; as voltas do byte disparo vêm da média de disparos por quadro.
+
+    Quando nenhum número de voltas explica os bytes descartados (bytes perdidos
+    antes de chegarem aqui), a lacuna é ambígua: só o mínimo (o salto de seq)
+    entra em quadros_perdidos, perdas_indeterminadas é incrementado e o índice
+    da primeira amostra depois dela vai para 'descontinuidades'. Os índices de
+    cada segmento são exatos entre si, mas o deslocamento entre segmentos é só
+    um limite inferior (ver segmentos()).
+    """
+
+    def __init__(self, num_estados, descritor=None):
+        self.num_estados = num_estados
+        self.descritor = descritor
+        self.disparo = 0                 # Índice do disparo do último quadro de dados
+        self.pacotes_validos = 0
+        self.descritores_recebidos = 0
+        self.bytes_descartados = 0
+        self.quadros_perdidos = 0        # Mínimo: lacunas ambíguas entram só com o salto de seq
+        self.perdas_indeterminadas = 0
+        self.descontinuidades = []       # Índice da 1ª amostra de cada segmento depois do primeiro
+        self._byte_disparo = None        # Byte disparo do último quadro de dados
+        self._saltos = [0, 0]            # (disparos, quadros) entre quadros seguidos, para a média
+        self._seq = None                 # seq esperado no próximo quadro (None = sem sincronismo)
+        self._perda = None               # (seq esperado, bytes descartados, descritores) na perda de sincronismo
+        self._pendente = b''
+
+    def tempos(self, disparos):
+        """Instantes (s) dos índices de disparo (exatos só dentro de cada segmento)."""
+        return np.asarray(disparos) * self.descritor.intervalo_s
+
+    def segmentos(self, disparos):
+        """Segmento (0, 1, ...) de cada índice de disparo, separado pelas descontinuidades."""
+        return np.searchsorted(np.asarray(self.descontinuidades, dtype=np.int64), disparos, side='right')
+
+    # --- Quadros de descritor ---
+    def _ler_descritor(self, buf, pos):
+        """(descritor, tamanho) em 'pos'; None se inválido, 'incompleto' se faltam bytes."""
+        tamanho = self.num_estados + 6
+        if pos + tamanho > len(buf):
+            return 'incompleto'
+        try:
+            descritor = DescritorAgenda.de_bytes(buf[pos:pos + tamanho].tobytes())
+        except ValueError:
+            return None
+        if descritor.num_estados != self.num_estados:
+            return None
+        return descritor, tamanho
+
+    def _aceitar_descritor(self, descritor):
+        if self._perda is not None:
+            # Descritor no meio de uma lacuna: ocupa o seq de um quadro e seus bytes
+            # não foram descartados; com agenda nova a lacuna não pode ser medida
+            seq_esperado, descartados, descritores = self._perda
+            self._perda = (seq_esperado if descritor == self.descritor else None,
+                           descartados - descritor.tamanho_descritor, descritores + 1)
+        if descritor != self.descritor:
+            self.descritor = descritor
+            self._seq = None             # Nova agenda: ressincroniza nos quadros de dados
+        self.descritores_recebidos += 1
+
+    # --- Quadros de dados ---
+    def _preenchimento_ok(self, buf, inicios, seqs):
+        """Bits superiores do último byte de cada estado presente em zero."""
+        deslocamentos = self.descritor.deslocamentos[seqs]
+        presentes = deslocamentos >= 0
+        posicoes = np.where(presentes, inicios[:, None] + deslocamentos + BYTES_POR_ESTADO - 1, 0)
+        return ~np.any(presentes & ((buf[posicoes] & 0xFC) != 0), axis=1)
+
+    def _sincronizar(self, buf, pos):
+        """
+        Procura um descritor válido ou um quadro de dados confirmado pelo quadro
+        seguinte. Retorna (tipo, posição, extra); tipo 'esperar' pede mais bytes.
+        """
+        headers = np.flatnonzero((buf[pos:] == HEADER_DADOS_INT) | (buf[pos:] == HEADER_DESCRITOR_INT)) + pos
+        for p in headers:
+            p = int(p)
+            if buf[p] == HEADER_DESCRITOR_INT:
+                lido = self._ler_descritor(buf, p)
+                if lido == 'incompleto':
+                    return 'esperar', p, None
+                if lido:
+                    return 'descritor', p, lido
+                continue
+            if self.descritor is None:
+                continue
+            if p + BYTES_CABECALHO_DADOS > len(buf):
+                return 'esperar', p, None
+            seq = int(buf[p + 1])
+            if seq >= self.descritor.ciclo_seq:
+                continue
+            seguinte = p + int(self.descritor.tamanhos[seq])
+            if seguinte + BYTES_CABECALHO_DADOS > len(buf):
+                return 'esperar', p, None
+            if not self._preenchimento_ok(buf, np.array([p]), np.array([seq]))[0]:
+                continue
+            proximo = (seq + 1) % self.descritor.ciclo_seq
+            if buf[seguinte] == HEADER_DESCRITOR_INT or (buf[seguinte] == HEADER_DADOS_INT
+                                                         and buf[seguinte + 1] == proximo):
+                return 'dados', p, (seq, int(buf[p + 2]))
+        # Nada encontrado: guarda só o que ainda pode conter o início de um quadro
+        cauda = max(self.num_estados + 6, BYTES_CABECALHO_DADOS * 2 + self.num_estados * BYTES_POR_ESTADO)
+        return 'esperar', max(pos, len(buf) - cauda), None
+
+    def _bytes_quadros(self, seq_inicial, num_quadros):
+        """Bytes de 'num_quadros' quadros de dados seguidos a partir de 'seq_inicial'."""
+        tamanhos = self.descritor.tamanhos
+        voltas, resto = divmod(num_quadros, self.descritor.ciclo_seq)
+        indices = (seq_inicial + np.arange(resto)) % self.descritor.ciclo_seq
+        return int(voltas * tamanhos.sum() + tamanhos[indices].sum())
+
+    def _quadros_perdidos(self, seq_esperado, seq, descartados):
+        """
+        Quadros perdidos entre seq_esperado e seq cujos bytes somam 'descartados'
+        (cada descritor perdido no meio muda a soma em até um quadro), ou None
+        se nenhum número de voltas do seq ou mais de um explica os bytes.
+        """
+        d = self.descritor
+        salto = (seq - seq_esperado) % d.ciclo_seq
+        diferenca = int(np.max(np.abs(d.tamanhos - d.tamanho_descritor)))
+        bytes_ciclo = int(d.tamanhos.sum())
+        candidatos = []
+        for voltas in range(descartados // max(1, bytes_ciclo) + 2):
+            perdidos = salto + voltas * d.ciclo_seq
+            tolerancia = (perdidos // INTERVALO_DESCRITOR + 1) * diferenca
+            if abs(self._bytes_quadros(seq_esperado, perdidos) - descartados) <= tolerancia:
+                candidatos.append(perdidos)
+        return candidatos[0] if len(candidatos) == 1 else None
+
+    def _retomar(self, seq, byte_disparo):
+        """
+        Fixa o sincronismo no quadro ('seq', 'byte_disparo'). Depois de uma perda,
+        conta os quadros perdidos e soma as voltas completas do byte disparo;
+        _extrair soma depois o salto do próprio byte. Lacuna ambígua abre um
+        novo segmento com o menor salto possível.
+        """
+        if self._byte_disparo is None:
+            self.disparo = byte_disparo - 1
+            self._byte_disparo = (byte_disparo - 1) % CICLO_DISPARO
+        elif self._perda is not None:
+            seq_esperado, descartados_antes, descritores = self._perda
+            salto_disparo = (byte_disparo - self._byte_disparo - 1) % CICLO_DISPARO + 1
+            perdidos = None if seq_esperado is None else self._quadros_perdidos(
+                seq_esperado, seq, self.bytes_descartados - descartados_antes)
+            voltas = 0
+            if perdidos is not None:
+                # Voltas completas do byte disparo: pela média de disparos por quadro
+                disparos, quadros = self._saltos
+                media = disparos / quadros if quadros else 1.0
+                estimadas = ((perdidos + 1) * media - salto_disparo) / CICLO_DISPARO
+                voltas = max(0, int(round(estimadas)))
+                if abs(estimadas - voltas) > 0.25 and estimadas > 0:
+                    perdidos = None            # Ritmo de disparos irregular: voltas incertas
+            if perdidos is None:
+                if seq_esperado is not None:
+                    self.quadros_perdidos += max(0, (seq - seq_esperado) % self.descritor.ciclo_seq - descritores)
+                self.perdas_indeterminadas += 1
+                self.descontinuidades.append(self.disparo + salto_disparo)
+            else:
+                self.quadros_perdidos += perdidos - descritores
+                self.disparo += CICLO_DISPARO * voltas
+        self._perda = None
+        self._seq = seq
+
+    def _extrair(self, buf, pos, partes):
+        """
+        Valida e extrai até QUADROS_POR_LOTE quadros de dados a partir de 'pos'.
+        Retorna (posição final, True se parou em um quadro que não é o esperado).
+        """
+        d = self.descritor
+        num_max = min(QUADROS_POR_LOTE, (len(buf) - pos) // int(d.tamanhos.min()))
+        seqs = (self._seq + np.arange(num_max)) % d.ciclo_seq
+        tamanhos = d.tamanhos[seqs]
+        fins = pos + np.cumsum(tamanhos)
+        num = int(np.searchsorted(fins, len(buf), side='right'))
+        if num == 0:
+            return pos, False
+        seqs, fins = seqs[:num], fins[:num]
+        inicios = fins - tamanhos[:num]
+
+        validos = (buf[inicios] == HEADER_DADOS_INT) & (buf[inicios + 1] == seqs)
+        validos &= self._preenchimento_ok(buf, inicios, seqs)
+        n_ok = num if validos.all() else int(np.argmin(validos))
+
+        if n_ok == 0:
+            return int(inicios[0]), True
+        # Disparos entre quadros seguidos pelo byte disparo (1..256: nunca repete)
+        bytes_disparo = buf[inicios[:n_ok] + 2].astype(np.int64)
+        saltos = (np.diff(bytes_disparo, prepend=self._byte_disparo) - 1) % CICLO_DISPARO + 1
+        disparos = self.disparo + np.cumsum(saltos)
+        for i in d.estados_enviados:
+            sel = d.presenca[seqs[:n_ok], i]
+            origem = inicios[:n_ok][sel] + d.deslocamentos[seqs[:n_ok][sel], i]
+            payload = buf[origem[:, None] + np.arange(BYTES_POR_ESTADO)]
+            partes[i].append((disparos[sel], bytes_para_inteiros(payload, 1)[:, 0]))
+
+        self.pacotes_validos += n_ok
+        self._saltos[0] += int(saltos[1:].sum())
+        self._saltos[1] += n_ok - 1
+        self.disparo = int(disparos[-1])
+        self._byte_disparo = int(bytes_disparo[-1])
+        self._seq = int((self._seq + n_ok) % d.ciclo_seq)
+        return (int(inicios[n_ok]) if n_ok < num else int(fins[-1])), n_ok < num
+
+    def decodificar(self, novos_bytes):
+        """
+        Processa os bytes recebidos e retorna {estado: (disparos int64, valores int64)}
+        para os estados enviados pela agenda atual (vazio enquanto não houver descritor).
+        """
+        buf = np.frombuffer(self._pendente + bytes(novos_bytes), dtype=np.uint8)
+        partes = {i: [] for i in range(self.num_estados)}
+        pos = 0
+
+        while pos < len(buf):
+            if self.descritor is None or self._seq is None:
+                tipo, p, extra = self._sincronizar(buf, pos)
+                self.bytes_descartados += p - pos
+                pos = p
+                if tipo == 'esperar':
+                    break
+                if tipo == 'descritor':
+                    descritor, tamanho = extra
+                    self._aceitar_descritor(descritor)
+                    pos += tamanho
+                    continue
+                self._retomar(*extra)
+
+            pos, interrompido = self._extrair(buf, pos, partes)
+            if pos >= len(buf):
+                break
+            if buf[pos] == HEADER_DESCRITOR_INT:
+                lido = self._ler_descritor(buf, pos)
+                if lido == 'incompleto':
+                    break
+                if lido:
+                    self._aceitar_descritor(lido[0])
+                    if self._seq is not None:
+                        # O descritor ocupa o seq de um quadro de dados; o disparo
+                        # dele entra no salto do byte disparo do quadro seguinte
+                        self._seq = (self._seq + 1) % self.descritor.ciclo_seq
+                    pos += lido[1]
+                    continue
+            elif not interrompido:
+                if len(buf) - pos < int(self.descritor.tamanhos[self._seq]):
+                    break                      # Quadro incompleto: espera os próximos bytes
+                continue                       # Lote cheio: segue no mesmo buffer
+            # Quadro inválido: perde o sincronismo e descarta o header falso
+            self._perda = (self._seq, self.bytes_descartados, 0)
+            self._seq = None
+            pos += 1
+            self.bytes_descartados += 1
+
+        self._pendente = buf[pos:].tobytes()
+        resultado = {}
+        for i, lista in partes.items():
+            if lista or (self.descritor is not None and self.descritor.decimacoes[i]):
+                disparos = np.concatenate([p[0] for p in lista]) if lista else np.empty(0, dtype=np.int64)
+                valores = np.concatenate([p[1] for p in lista]) if lista else np.empty(0, dtype=np.int64)
+                resultado[i] = (disparos.astype(np.int64), valores)
+        return resultado
+
+
+def demultiplexar_captura(dados, num_estados, descritor=None):
+    """
+    Demultiplexa uma captura .bin inteira: {estado: (tempos_s, valores_int)}
+    e o demultiplexador usado (descritor, contadores e descontinuidades).
+    """
+    demux = DemultiplexadorAgenda(num_estados, descritor)
+    series = demux.decodificar(dados)
+    if demux.descritor is None:
+        raise ValueError('Nenhum descritor de agenda encontrado na captura.')
+    return {i: (demux.tempos(d), v) for i, (d, v) in series.items()}, demux
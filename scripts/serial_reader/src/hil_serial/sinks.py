@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+GRAVADORES (sinks) das capturas contínuas.
+
+Todos recebem blocos de inteiros Q14.28 (amostras x estados) em escrever();
+o gravador bruto (.bin) recebe os bytes da serial em escrever_bytes(), para que
+o replay reproduza exatamente o fluxo original (inclusive ressincronizações).
+
+Formatos, escolhidos pela extensão do arquivo:
+  - .bin : bytes brutos da serial
+  - .csv : colunas <nome>_Real, sep=';' e decimal=',' (mesmo formato dos scripts)
+  - .hilz: armazenamento compactado (storage.py)
+"""
+
+import os
+
+from .decoder import FATOR_CONVERSAO
+
+FORMATOS_GRAVACAO = ('.bin', '.csv', '.hilz')
+
+
+class GravadorBruto:
+    """Grava os bytes recebidos sem decodificação."""
+
+    bruto = True
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.amostras = 0
+        self._arquivo = open(caminho, 'wb')
+
+    def escrever_bytes(self, dados):
+        self._arquivo.write(dados)
+
+    def escrever(self, bloco_int):
+        self.amostras += bloco_int.shape[0]
+
+    def fechar(self):
+        self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class GravadorCsv(GravadorBruto):
+    """
+    Grava as amostras convertidas para real em CSV, bloco a bloco, sem pandas
+    (o CSV é lido depois pelo pandas com sep=';' e decimal=',').
+    """
+
+    bruto = False
+
+    def __init__(self, caminho, nomes_estados):
+        self.caminho = caminho
+        self.amostras = 0
+        self._arquivo = open(caminho, 'w', encoding='utf-8', newline='')
+        self._arquivo.write(';'.join(f'{nome}_Real' for nome in nomes_estados) + '\n')
+
+    def escrever_bytes(self, dados):
+        pass
+
+    def escrever(self, bloco_int):
+        # repr() do float garante a volta exata para o inteiro Q14.28 no replay
+        linhas = (bloco_int / FATOR_CONVERSAO).tolist()
+        texto = '\n'.join(';'.join(map(repr, linha)) for linha in linhas)
+        self._arquivo.write(texto.replace('.', ',') + '\n')
+        self.amostras += bloco_int.shape[0]
+
+
+class GravadorHilz(GravadorBruto):
+    """Grava as amostras no formato compactado .hilz."""
+
+    bruto = False
+
+    def __init__(self, caminho, num_estados, intervalo_s, metadados=None):
+        from .storage import EscritorCompactado
+
+        self.caminho = caminho
+        self.amostras = 0
+        self._escritor = EscritorCompactado(caminho, num_estados, intervalo_s, metadados=metadados)
+
+    def escrever_bytes(self, dados):
+        pass
+
+    def escrever(self, bloco_int):
+        self._escritor.escrever(bloco_int)
+        self.amostras += bloco_int.shape[0]
+
+    def fechar(self):
+        self._escritor.fechar()
+
+
+def abrir_gravador(caminho, config, metadados=None):
+    """Cria o gravador adequado à extensão de 'caminho'."""
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == '.bin':
+        return GravadorBruto(caminho)
+    if extensao == '.csv':
+        return GravadorCsv(caminho, config.nomes)
+    if extensao == '.hilz':
+        metadados = {'estados': config.nomes, **(metadados or {})}
+        return GravadorHilz(caminho, config.num_estados, config.intervalo_s, metadados)
+    raise ValueError(f"Formato '{extensao}' não suportado. Opções: {', '.join(FORMATOS_GRAVACAO)}")
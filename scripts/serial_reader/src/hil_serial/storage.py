@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+ARMAZENAMENTO COMPACTADO de capturas (.hilz) com acesso aleatório rápido.
+
+As amostras Q14.28 são muito correlacionadas, então cada bloco ("chunk") guarda
+o resíduo da predição (diferença de 1ª ou 2ª ordem dos inteiros de 42 bits),
+codificado em zigzag, com largura de bytes mínima e bytes transpostos (shuffle),
+e passa por um compressor rápido (zstd se instalado, senão zlib). Um índice no
+fim do arquivo permite decodificar qualquer intervalo de amostras lendo apenas
+os chunks necessários.
+
+Layout do arquivo:
+    'HILZ' | versão u8 | codec u8 | num_estados u8 | intervalo_s f64 |
+    tamanho_chunk u32 | len_meta u32 | metadados JSON
+    chunks...
+    índice: por chunk (offset u64, tamanho u32, primeira_amostra u64, num_amostras u32)
+    rodapé: offset_indice u64 | num_chunks u32 | 'HZIX'
+
+Exemplos:
+    python -m hil_serial.storage compactar captura.csv --intervalo-us 150
+    python -m hil_serial.storage info captura.hilz
+"""
+
+import argparse
+import json
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC = b'HILZ'
+MAGIC_INDICE = b'HZIX'
+VERSAO = 1
+CODEC_ZLIB = 0
+CODEC_ZSTD = 1
+NOMES_CODEC = {CODEC_ZLIB: 'zlib', CODEC_ZSTD: 'zstd'}
+
+TAMANHO_CHUNK_PADRAO = 16384   # amostras por chunk
+
+_CABECALHO = struct.Struct('<4sBBBdII')
+_ENTRADA_INDICE = struct.Struct('<QIQI')
+_RODAPE = struct.Struct('<QI4s')
+
+
+# --- Codificação preditiva ---
+def _residuo(coluna, ordem):
+    """Diferenças sucessivas (ordem 0, 1 ou 2) com o primeiro valor preservado."""
+    for _ in range(ordem):
+        coluna = np.diff(coluna, prepend=np.int64(0))
+    return coluna
+
+
+def _reconstruir(residuo, ordem):
+    for _ in range(ordem):
+        residuo = np.cumsum(residuo, dtype=np.int64)
+    return residuo
+
+
+def _zigzag(v):
+    return ((v << 1) ^ (v >> 63)).astype(np.uint64)
+
+
+def _zagzig(u):
+    return ((u >> np.uint64(1)).astype(np.int64)) ^ -((u & np.uint64(1)).astype(np.int64))
+
+
+def codificar_chunk(valores):
+    """
+    Codifica um chunk (amostras x estados) de inteiros Q14.28.
+    Para cada estado escolhe a ordem de predição com menor resíduo e guarda
+    (ordem u8, largura u8), os 'ordem' primeiros resíduos em int64 (valores
+    iniciais) e os planos de bytes dos demais resíduos em zigzag.
+    """
+    partes = []
+    n = valores.shape[0]
+    for coluna in valores.T:
+        melhor = None
+        for ordem in (1, 2):
+            ordem = min(ordem, n)
+            residuo = _residuo(coluna, ordem)
+            z = _zigzag(residuo[ordem:])
+            maximo = int(z.max()) if z.size else 0
+            if melhor is None or maximo < melhor[0]:
+                melhor = (maximo, ordem, residuo, z)
+        maximo, ordem, residuo, z = melhor
+        largura = max(1, (maximo.bit_length() + 7) // 8)
+        planos = z.view(np.uint8).reshape(-1, 8)[:, :largura].T  # byte shuffle
+        partes.append(struct.pack('<BB', ordem, largura))
+        partes.append(residuo[:ordem].astype('<i8').tobytes())
+        partes.append(np.ascontiguousarray(planos).tobytes())
+    return b''.join(partes)
+
+
+def decodificar_chunk(dados, num_amostras, num_estados):
+    """Inverso de codificar_chunk: retorna array int64 (amostras x estados)."""
+    saida = np.empty((num_amostras, num_estados), dtype=np.int64)
+    pos = 0
+    for i in range(num_estados):
+        ordem, largura = struct.unpack_from('<BB', dados, pos)
+        pos += 2
+        residuo = np.empty(num_amostras, dtype=np.int64)
+        residuo[:ordem] = np.frombuffer(dados, dtype='<i8', count=ordem, offset=pos)
+        pos += 8 * ordem
+        n = num_amostras - ordem
+        planos = np.frombuffer(dados, dtype=np.uint8, count=largura * n, offset=pos)
+        pos += largura * n
+        palavras = np.zeros((n, 8), dtype=np.uint8)
+        palavras[:, :largura] = planos.reshape(largura, n).T
+        residuo[ordem:] = _zagzig(palavras.view('<u8')[:, 0])
+        saida[:, i] = _reconstruir(residuo, ordem)
+    return saida
+
+
+def _compressor(codec):
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress
+    return lambda dados: zlib.compress(dados, 1)
+
+
+def _descompressor(codec):
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Arquivo compactado com zstd: instale o pacote 'zstandard'.")
+        return zstandard.ZstdDecompressor().decompress
+    return zlib.decompress
+
+
+class EscritorCompactado:
+    """
+    Grava amostras em blocos à medida que chegam (adequado para aquisição contínua).
+
+    with EscritorCompactado('sessao.hilz', 5, 150e-6) as esc:
+        esc.escrever(bloco_int)
+    """
+
+    def __init__(self, caminho, num_estados, intervalo_s, tamanho_chunk=TAMANHO_CHUNK_PADRAO,
+                 metadados=None, codec=None):
+        if codec is None:
+            codec = CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+        self.caminho = caminho
+        self.num_estados = num_estados
+        self.tamanho_chunk = tamanho_chunk
+        self.codec = codec
+        self._comprimir = _compressor(codec)
+        self._pendentes = []
+        self._num_pendentes = 0
+        self._indice = []
+        self._total = 0
+
+        meta = json.dumps(metadados or {}).encode('utf-8')
+        self._arquivo = open(caminho, 'wb')
+        self._arquivo.write(_CABECALHO.pack(MAGIC, VERSAO, codec, num_estados, intervalo_s,
+                                            tamanho_chunk, len(meta)))
+        self._arquivo.write(meta)
+
+    def _gravar_chunk(self, valores):
+        dados = self._comprimir(codificar_chunk(valores))
+        self._indice.append((self._arquivo.tell(), len(dados), self._total, valores.shape[0]))
+        self._arquivo.write(dados)
+        self._total += valores.shape[0]
+
+    def escrever(self, valores_int):
+        valores = np.asarray(valores_int, dtype=np.int64).reshape(-1, self.num_estados)
+        self._pendentes.append(valores)
+        self._num_pendentes += valores.shape[0]
+        if self._num_pendentes < self.tamanho_chunk:
+            return
+        tudo = np.concatenate(self._pendentes)
+        n_cheios = (tudo.shape[0] // self.tamanho_chunk) * self.tamanho_chunk
+        for inicio in range(0, n_cheios, self.tamanho_chunk):
+            self._gravar_chunk(tudo[inicio:inicio + self.tamanho_chunk])
+        self._pendentes = [tudo[n_cheios:]]
+        self._num_pendentes = tudo.shape[0] - n_cheios
+
+    def fechar(self):
+        if self._arquivo.closed:
+            return
+        if self._num_pendentes:
+            self._gravar_chunk(np.concatenate(self._pendentes))
+        offset_indice = self._arquivo.tell()
+        for entrada in self._indice:
+            self._arquivo.write(_ENTRADA_INDICE.pack(*entrada))
+        self._arquivo.write(_RODAPE.pack(offset_indice, len(self._indice), MAGIC_INDICE))
+        self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class LeitorCompactado:
+    """
+    Leitura com acesso aleatório: ler(inicio, fim) decodifica só os chunks
+    que cobrem o intervalo pedido.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._arquivo = open(caminho, 'rb')
+        cab = self._arquivo.read(_CABECALHO.size)
+        magic, versao, codec, num_estados, intervalo_s, tamanho_chunk, len_meta = _CABECALHO.unpack(cab)
+        if magic != MAGIC:
+            raise ValueError(f"'{caminho}' não é uma captura .hilz.")
+        if versao > VERSAO:
+            raise ValueError(f"Versão {versao} do formato .hilz não suportada.")
+        self.codec = codec
+        self.num_estados = num_estados
+        self.intervalo_s = intervalo_s
+        self.tamanho_chunk = tamanho_chunk
+        self.metadados = json.loads(self._arquivo.read(len_meta).decode('utf-8') or '{}')
+        self._descomprimir = _descompressor(codec)
+
+        self._arquivo.seek(-_RODAPE.size, os.SEEK_END)
+        offset_indice, num_chunks, magic_indice = _RODAPE.unpack(self._arquivo.read(_RODAPE.size))
+        if magic_indice != MAGIC_INDICE:
+            raise ValueError(f"'{caminho}' sem índice (gravação interrompida?).")
+        self._arquivo.seek(offset_indice)
+        brutos = self._arquivo.read(num_chunks * _ENTRADA_INDICE.size)
+        indice = np.frombuffer(brutos, dtype=[('offset', '<u8'), ('tamanho', '<u4'),
+                                              ('primeira', '<u8'), ('n', '<u4')])
+        self._offsets = indice['offset'].astype(np.int64)
+        self._tamanhos = indice['tamanho'].astype(np.int64)
+        self._primeiras = indice['primeira'].astype(np.int64)
+        self._contagens = indice['n'].astype(np.int64)
+        self.num_amostras = int(self._primeiras[-1] + self._contagens[-1]) if num_chunks else 0
+
+    def __len__(self):
+        return self.num_amostras
+
+    def _chunk(self, k):
+        self._arquivo.seek(self._offsets[k])
+        dados = self._descomprimir(self._arquivo.read(self._tamanhos[k]))
+        return decodificar_chunk(dados, int(self._contagens[k]), self.num_estados)
+
+    def ler(self, inicio=0, fim=None):
+        """Amostras inteiras [inicio, fim) como array int64 (amostras x estados)."""
+        fim = self.num_amostras if fim is None else min(fim, self.num_amostras)
+        inicio = max(0, inicio)
+        if fim <= inicio:
+            return np.empty((0, self.num_estados), dtype=np.int64)
+        k0 = int(np.searchsorted(self._primeiras, inicio, side='right') - 1)
+        k1 = int(np.searchsorted(self._primeiras, fim, side='left'))
+        blocos = [self._chunk(k) for k in range(k0, k1)]
+        tudo = np.concatenate(blocos) if len(blocos) > 1 else blocos[0]
+        base = int(self._primeiras[k0])
+        return tudo[inicio - base:fim - base]
+
+    def ler_tempo(self, t0, t1):
+        """Amostras entre os instantes t0 e t1 (segundos desde o início)."""
+        return self.ler(int(np.floor(t0 / self.intervalo_s)), int(np.ceil(t1 / self.intervalo_s)))
+
+    def blocos(self):
+        """Itera chunk a chunk (leitura sequencial de arquivos grandes)."""
+        for k in range(len(self._offsets)):
+            yield self._chunk(k)
+
+    def fechar(self):
+        self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def compactar_csv(caminho_csv, destino, intervalo_s, tamanho_chunk=TAMANHO_CHUNK_PADRAO):
+    """Converte uma captura CSV (formato dos scripts de captura) para .hilz."""
+    from .replay import carregar_captura_csv
+
+    valores = carregar_captura_csv(caminho_csv)
+    with EscritorCompactado(destino, valores.shape[1], intervalo_s, tamanho_chunk,
+                            metadados={'origem': os.path.basename(caminho_csv)}) as esc:
+        esc.escrever(valores)
+    return valores
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Armazenamento compactado de capturas (.hilz).')
+    sub = parser.add_subparsers(dest='comando', required=True)
+    p_cmp = sub.add_parser('compactar', help='converte um CSV de captura para .hilz')
+    p_cmp.add_argument('csv')
+    p_cmp.add_argument('--saida', help='arquivo .hilz (padrão: mesmo nome)')
+    p_cmp.add_argument('--intervalo-us', type=float, default=150.0, help='intervalo entre amostras (µs)')
+    p_cmp.add_argument('--chunk', type=int, default=TAMANHO_CHUNK_PADRAO, help='amostras por chunk')
+    p_inf = sub.add_parser('info', help='mostra metadados e mede a vazão de decodificação')
+    p_inf.add_argument('hilz')
+    args = parser.parse_args()
+
+    if args.comando == 'compactar':
+        destino = args.saida or os.path.splitext(args.csv)[0] + '.hilz'
+        valores = compactar_csv(args.csv, destino, args.intervalo_us * 1e-6, args.chunk)
+        bruto = valores.shape[0] * (1 + valores.shape[1] * 6)
+        tamanho = os.path.getsize(destino)
+        print(f"{valores.shape[0]} amostras x {valores.shape[1]} estados -> '{destino}'")
+        print(f"  CSV: {os.path.getsize(args.csv)} B | bytes na serial: {bruto} B | .hilz: {tamanho} B "
+              f"({bruto / tamanho:.1f}x menor que o fluxo bruto)")
+    else:
+        with LeitorCompactado(args.hilz) as leitor:
+            t = time.perf_counter()
+            total = sum(b.shape[0] for b in leitor.blocos())
+            dt = time.perf_counter() - t
+            print(f"'{args.hilz}': {total} amostras x {leitor.num_estados} estados, "
+                  f"dt={leitor.intervalo_s * 1e6:g} µs, codec {NOMES_CODEC[leitor.codec]}, "
+                  f"{len(leitor._offsets)} chunks")
+            print(f"  Metadados: {leitor.metadados}")
+            if dt > 0:
+                taxa = total / dt
+                print(f"  Decodificação: {taxa:,.0f} amostras/s "
+                      f"({taxa * leitor.intervalo_s:,.0f}x a taxa de aquisição)")
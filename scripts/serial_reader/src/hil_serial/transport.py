@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+TRANSPORTE: abertura da porta serial (ou do replay) e leitura em blocos.
+
+Todo o resto do pacote só depende da interface mínima da pyserial
+(in_waiting, read, reset_input_buffer, close, is_open, port), então a mesma
+cadeia decodificador -> buffer -> gravador/renderizador roda igual sobre a
+FPGA ou sobre uma captura gravada.
+
+Acima de 3 Mbaud (12 Mbaud no FT4232 = 1,2 MB/s) uma pausa de ~50 ms do
+consumidor (redesenho do gráfico, disco) já enche o buffer do driver. Com
+leitura em segundo plano (config.leitura_em_segundo_plano) uma thread lê em
+blocos grandes e decodifica, e o consumidor só esvazia a fila.
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+from .decoder import DecodificadorPacotes
+
+TAMANHO_BLOCO_LEITURA = 65536
+TAMANHO_MINIMO_LEITURA = 4096   # Leitura em segundo plano: menos chamadas ao driver (3,4 ms a 12 Mbaud)
+FILA_MAX_BLOCOS = 4096          # Blocos decodificados aguardando o consumidor
+
+
+def abrir_serial(config):
+    """Abre a porta configurada, aumenta o buffer de recepção e descarta o lixo inicial."""
+    import serial
+
+    ser = serial.Serial(config.porta, config.baud_rate, timeout=config.timeout_s)
+    if hasattr(ser, 'set_buffer_size'):  # Só existe no Windows
+        ser.set_buffer_size(rx_size=config.buffer_rx_bytes)
+    time.sleep(config.espera_abertura_s)
+    ser.reset_input_buffer()
+    return ser
+
+
+def abrir_fonte(config, replay=None, velocidade=1.0, repetir=False):
+    """Abre a serial ou, se 'replay' for um arquivo, a FonteReplay equivalente."""
+    if replay:
+        from .replay import FonteReplay
+        return FonteReplay(replay, config.num_estados, config.intervalo_s, velocidade=velocidade,
+                           repetir=repetir, timeout=config.timeout_s, formato=config.formato_pacote)
+    return abrir_serial(config)
+
+
+def descrever_fonte(fonte, config):
+    """Texto curto para as mensagens de conexão."""
+    if hasattr(fonte, 'velocidade'):
+        return f"replay de '{fonte.port}' em velocidade {fonte.velocidade or 'máxima'}"
+    return f"porta {config.porta} a {config.baud_rate} de baudrate"
+
+
+class LeitorEmSegundoPlano:
+    """
+    Thread que lê a fonte em blocos grandes e decodifica, deixando pares
+    (bytes brutos, amostras) numa fila limitada. Se o consumidor parar por
+    tempo suficiente para encher a fila, os blocos novos são descartados e
+    contados em 'amostras_descartadas' (a leitura da porta nunca para).
+    """
+
+    def __init__(self, fonte, decodificador, tamanho_bloco=TAMANHO_BLOCO_LEITURA, max_blocos=FILA_MAX_BLOCOS):
+        self.fonte = fonte
+        self.decodificador = decodificador
+        self.metricas = decodificador.metricas
+        self.tamanho_bloco = tamanho_bloco
+        self.amostras_descartadas = 0
+        self._fila = queue.Queue(maxsize=max_blocos)
+        self._parar = threading.Event()
+        self._erro = None
+        self._thread = threading.Thread(target=self._executar, name='hil_serial-leitor', daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+        return self
+
+    def _executar(self):
+        try:
+            metricas = self.metricas
+            while not self._parar.is_set():
+                fila_driver = self.fonte.in_waiting
+                tamanho = max(TAMANHO_MINIMO_LEITURA, min(fila_driver, self.tamanho_bloco))
+                with metricas.medir('leitura'):
+                    dados = self.fonte.read(tamanho)
+                metricas.contar(bytes_recebidos=len(dados), fila_driver=fila_driver)
+                if not dados:
+                    if getattr(self.fonte, 'fim', False):
+                        return
+                    continue
+                bloco = self.decodificador.decodificar(dados)
+                try:
+                    self._fila.put_nowait((dados, bloco))
+                except queue.Full:
+                    self.amostras_descartadas += bloco.shape[0]
+                    metricas.contar(descartados=bloco.shape[0])
+        except Exception as e:  # Porta fechada/desconectada: repassa ao consumidor
+            if not self._parar.is_set():
+                self._erro = e
+
+    @property
+    def fim(self):
+        """True quando a thread terminou e a fila já foi esvaziada."""
+        return not self._thread.is_alive() and self._fila.empty()
+
+    def obter(self, timeout=None):
+        """Todos os pares (bytes, amostras) disponíveis, esperando até 'timeout' pelo primeiro."""
+        itens = []
+        try:
+            itens.append(self._fila.get(timeout=timeout) if timeout else self._fila.get_nowait())
+            while True:
+                itens.append(self._fila.get_nowait())
+        except queue.Empty:
+            pass
+        if not itens and self._erro is not None:
+            raise self._erro
+        return itens
+
+    def parar(self, timeout=1.0):
+        self._parar.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+
+def _ler_blocos_em_segundo_plano(fonte, decodificador, tamanho_bloco, ao_receber):
+    leitor = LeitorEmSegundoPlano(fonte, decodificador, tamanho_bloco).iniciar()
+    try:
+        while True:
+            itens = leitor.obter(timeout=0.1)
+            if not itens and leitor.fim:
+                return
+            for dados, bloco in itens:
+                if ao_receber:
+                    ao_receber(dados)
+                if bloco.shape[0]:
+                    yield bloco
+    finally:
+        leitor.parar()
+        if leitor.amostras_descartadas:
+            print(f"Aviso: {leitor.amostras_descartadas} amostras descartadas com a fila de leitura cheia.")
+
+
+def ler_blocos(fonte, decodificador, tamanho_bloco=TAMANHO_BLOCO_LEITURA, ao_receber=None,
+               em_segundo_plano=False):
+    """
+    Gera blocos decodificados (amostras x estados, int64) até o fim do replay.
+    Na serial, só termina quando o chamador interrompe a iteração.
+
+    ao_receber(bytes) é chamado com os bytes brutos antes da decodificação
+    (usado para gravar o fluxo .bin). Com em_segundo_plano=True a leitura e a
+    decodificação rodam no LeitorEmSegundoPlano.
+    """
+    if em_segundo_plano:
+        yield from _ler_blocos_em_segundo_plano(fonte, decodificador, tamanho_bloco, ao_receber)
+        return
+    metricas = decodificador.metricas
+    while True:
+        fila_driver = fonte.in_waiting
+        with metricas.medir('leitura'):
+            dados = fonte.read(max(1, min(fila_driver, tamanho_bloco)))
+        metricas.contar(bytes_recebidos=len(dados), fila_driver=fila_driver)
+        if not dados:
+            if getattr(fonte, 'fim', False):
+                return
+            continue
+        if ao_receber:
+            ao_receber(dados)
+        bloco = decodificador.decodificar(dados)
+        if bloco.shape[0]:
+            yield bloco
+
+
+def ler_amostras(config, num_amostras, replay=None, velocidade=0.0):
+    """
+    Lê exatamente 'num_amostras' pacotes (ou até o fim do replay) e retorna
+    (inteiros Q14.28 amostras x estados, decodificador).
+    """
+    decodificador = DecodificadorPacotes(config.num_estados, config.formato_pacote)
+    fonte = abrir_fonte(config, replay=replay, velocidade=velocidade)
+    blocos = []
+    recebidas = 0
+    try:
+        for bloco in ler_blocos(fonte, decodificador, em_segundo_plano=config.leitura_em_segundo_plano):
+            blocos.append(bloco)
+            recebidas += bloco.shape[0]
+            if recebidas >= num_amostras:
+                break
+    finally:
+        fonte.close()
+
+    if not blocos:
+        return np.empty((0, config.num_estados), dtype=np.int64), decodificador
+    return np.concatenate(blocos)[:num_amostras], decodificador
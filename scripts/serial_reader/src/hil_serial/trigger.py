@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de GATILHO (trigger) sobre o fluxo de amostras decodificadas.
+
+Mantém um buffer circular pré-gatilho em memória e, quando a condição dispara,
+monta a janela [pré + pós] e a entrega para gravação. As condições são avaliadas
+de forma vetorizada por bloco, sem laço Python por amostra, para acompanhar a
+taxa máxima de pacotes.
+
+Tipos de condição (sobre um estado):
+  - 'acima' / 'abaixo'     : nível maior / menor que o limiar
+  - 'subida' / 'descida'   : cruzamento do limiar (borda)
+  - 'taxa'                 : |dx/dt| maior que o limiar (unidades por segundo)
+  - 'fora_faixa'           : valor fora de [minimo, maximo]
+"""
+
+import numpy as np
+
+from .buffers import BufferCircular
+from .decoder import FATOR_CONVERSAO
+
+TIPOS_GATILHO = ('acima', 'abaixo', 'subida', 'descida', 'taxa', 'fora_faixa')
+
+
+class CondicaoGatilho:
+    """
+    Condição de disparo sobre um estado. Guarda a última amostra do bloco
+    anterior para que bordas e taxa funcionem na fronteira entre blocos.
+    """
+
+    def __init__(self, estado, tipo, limiar=0.0, minimo=None, maximo=None, intervalo_amostra_s=None):
+        if tipo not in TIPOS_GATILHO:
+            raise ValueError(f"Tipo de gatilho '{tipo}' inválido. Opções: {', '.join(TIPOS_GATILHO)}")
+        if tipo == 'fora_faixa' and (minimo is None or maximo is None):
+            raise ValueError("Gatilho 'fora_faixa' requer minimo e maximo.")
+        if tipo == 'taxa' and not intervalo_amostra_s:
+            raise ValueError("Gatilho 'taxa' requer o intervalo entre amostras.")
+
+        self.estado = estado
+        self.tipo = tipo
+        self.limiar = limiar
+        self.minimo = minimo
+        self.maximo = maximo
+        self.intervalo_amostra_s = intervalo_amostra_s
+        self._anterior = None
+
+    def avaliar(self, valores):
+        """
+        Recebe o bloco de valores reais do estado e retorna os índices
+        (dentro do bloco) onde a condição é verdadeira.
+        """
+        if valores.size == 0:
+            return np.empty(0, dtype=np.intp)
+
+        if self.tipo == 'acima':
+            mascara = valores > self.limiar
+        elif self.tipo == 'abaixo':
+            mascara = valores < self.limiar
+        elif self.tipo == 'fora_faixa':
+            mascara = (valores < self.minimo) | (valores > self.maximo)
+        else:
+            # Condições que dependem da amostra anterior (inclusive do bloco passado)
+            anterior = valores[0] if self._anterior is None else self._anterior
+            anteriores = np.concatenate(([anterior], valores[:-1]))
+            if self.tipo == 'subida':
+                mascara = (anteriores <= self.limiar) & (valores > self.limiar)
+            elif self.tipo == 'descida':
+                mascara = (anteriores >= self.limiar) & (valores < self.limiar)
+            else:
+                taxa = np.abs(valores - anteriores) / self.intervalo_amostra_s
+                mascara = taxa > self.limiar
+
+        self._anterior = valores[-1]
+        return np.flatnonzero(mascara)
+
+
+class MotorGatilho:
+    """
+    Avalia a condição bloco a bloco e produz capturas com 'pre_amostras' antes
+    e 'pos_amostras' a partir do instante do disparo.
+
+    processar(bloco) retorna uma lista de capturas concluídas, cada uma como
+    (valores_int, indice_gatilho, amostra_absoluta_do_gatilho).
+    """
+
+    def __init__(self, condicao, num_estados, pre_amostras, pos_amostras, rearmar=False):
+        self.condicao = condicao
+        self.num_estados = num_estados
+        self.pre_amostras = pre_amostras
+        self.pos_amostras = max(1, pos_amostras)
+        self.rearmar = rearmar
+        self.disparos = 0
+
+        # Buffer circular pré-gatilho (sempre guarda as últimas pre_amostras; sem uso se 0)
+        self._anel = BufferCircular(max(1, pre_amostras), num_estados, dtype=np.int64)
+
+        self._amostras_vistas = 0
+        self._janela = None       # Lista de blocos da captura em andamento
+        self._faltam_pos = 0
+        self._indice_gatilho = 0
+        self._amostra_gatilho = 0
+        self.armado = True
+
+    # --- Processamento ---
+    def processar(self, bloco_int):
+        """Processa um bloco (amostras x estados) de inteiros Q14.28."""
+        capturas = []
+        inicio = 0
+        n = bloco_int.shape[0]
+        indices = self.condicao.avaliar(bloco_int[:, self.condicao.estado] / FATOR_CONVERSAO)
+
+        while inicio < n:
+            if self._janela is not None:
+                # Completa a janela pós-gatilho em andamento
+                fim = min(n, inicio + self._faltam_pos)
+                self._janela.append(bloco_int[inicio:fim])
+                self._faltam_pos -= fim - inicio
+                self._anel.adicionar(bloco_int[inicio:fim])
+                inicio = fim
+                if self._faltam_pos == 0:
+                    capturas.append((np.concatenate(self._janela), self._indice_gatilho, self._amostra_gatilho))
+                    self._janela = None
+                    self.armado = self.rearmar
+                continue
+
+            disparos = indices[indices >= inicio] if self.armado else indices[:0]
+            if disparos.size == 0:
+                self._anel.adicionar(bloco_int[inicio:])
+                break
+
+            t = int(disparos[0])
+            # Janela pré-gatilho: anel + trecho do bloco antes do disparo
+            pre = np.concatenate((self._anel.dados(), bloco_int[inicio:t]))[-self.pre_amostras:] \
+                if self.pre_amostras else bloco_int[t:t]
+            self._anel.adicionar(bloco_int[inicio:t])
+            self._janela = [pre]
+            self._indice_gatilho = pre.shape[0]
+            self._amostra_gatilho = self._amostras_vistas + t
+            self._faltam_pos = self.pos_amostras
+            self.disparos += 1
+            inicio = t
+
+        self._amostras_vistas += n
+        return capturas
+
+
+def salvar_captura_csv(caminho, valores_int, indice_gatilho, intervalo_amostra_s, nomes_estados=None):
+    """
+    Salva a janela capturada no mesmo formato CSV dos scripts de captura
+    (colunas Estado_i_Real, sep=';' e decimal=','), com o tempo relativo
+    ao gatilho na coluna Tempo_s.
+    """
+    import pandas as pd
+
+    num_estados = valores_int.shape[1]
+    nomes = nomes_estados or [f'Estado_{i}' for i in range(num_estados)]
+    df = pd.DataFrame({'Tempo_s': (np.arange(valores_int.shape[0]) - indice_gatilho) * intervalo_amostra_s})
+    for i, nome in enumerate(nomes):
+        df[f'{nome}_Real'] = valores_int[:, i] / FATOR_CONVERSAO
+    df.to_csv(caminho, index=False, sep=';', decimal=',')
+
+
+def salvar_captura_hilz(caminho, valores_int, indice_gatilho, intervalo_amostra_s, nomes_estados=None):
+    """Salva a janela capturada no formato compactado (.hilz) com os metadados do gatilho."""
+    from .storage import EscritorCompactado
+
+    metadados = {'indice_gatilho': int(indice_gatilho), 'estados': nomes_estados}
+    with EscritorCompactado(caminho, valores_int.shape[1], intervalo_amostra_s, metadados=metadados) as esc:
+        esc.escrever(valores_int)
@@ -4,126 +4,58 @@ Script para ler pacotes de dados de MÚLTIPLOS ESTADOS da porta serial,
 processar e plotar.
 """
 
-import serial
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import time
+
+from hil_serial import carregar_configuracao, ler_amostras
 
 # --- Bloco de Configuração ---
-PORTA_SERIAL = 'COM4'
-BAUD_RATE = 3000000  # Ajustado conforme seu novo script
+# Porta e baud rate vêm de hil_serial.json / HIL_SERIAL_PORTA (ver hil_serial/config.py)
 NUM_PACOTES = 1000   # Renomeado para clareza (cada pacote contém 5 estados)
 NOME_ARQUIVO_CSV = 'dados_multiplos_estados.csv'
-
-# --- Configurações do Pacote de Dados ---
-HEADER_BYTE = b'\xfa'
-NUM_ESTADOS = 5
-BYTES_POR_ESTADO = 6
-TAMANHO_PAYLOAD_BYTES = NUM_ESTADOS * BYTES_POR_ESTADO # 5 estados * 6 bytes = 30 bytes
-
-# --- Configurações do Formato Ponto Fixo (Q14.28) ---
-TOTAL_BITS = 42
 BITS_FRACIONARIOS = 28
 
 # --- Fim do Bloco de Configuração ---
 
 
-def to_signed(val, nbits):
-    """
-    Converte um inteiro de nbits para um valor com sinal (complemento de dois).
-    """
-    if val & (1 << (nbits - 1)):
-        return val - (1 << nbits)
-    else:
-        return val
-
-
 def ler_dados_serial():
     """
-    Conecta-se à porta serial, sincroniza com o header 0xFA e lê 
-    pacotes de dados, cada um contendo 5 estados.
-    Retorna uma lista de listas. Ex: [[e0, e1, e2, e3, e4], [...], ...]
+    Lê NUM_PACOTES pacotes de 5 estados pela leitura em blocos do hil_serial
+    (sincronização no header 0xFA e decodificação vetorizada).
+    Retorna uma matriz de inteiros com sinal (pacotes x estados) ou None.
     """
-    # Lista para armazenar todos os pacotes lidos
-    dados_dos_pacotes = []
-    ser = None
-    
+    config = carregar_configuracao(perfil='multi')
+    print(f"Procurando por {NUM_PACOTES} pacotes de dados na porta {config.porta} "
+          f"(1 header + {config.num_estados} estados por pacote)...")
     try:
-        ser = serial.Serial(PORTA_SERIAL, BAUD_RATE, timeout=2)
-        ser.set_buffer_size(rx_size=1048576) # 1MB de buffer
-        
-        print(f"Conectado à porta {PORTA_SERIAL} a {BAUD_RATE} de baudrate.")
-        print(f"Procurando por {NUM_PACOTES} pacotes de dados (1 header + {NUM_ESTADOS} estados por pacote)...")
-        time.sleep(1)
-        ser.reset_input_buffer()
-
-        pacotes_lidos = 0
-        while pacotes_lidos < NUM_PACOTES:
-            
-            # 1. SINCRONIZAÇÃO: Procura pelo byte de header 0xFA
-            byte_lido = ser.read(1)
-            if byte_lido != HEADER_BYTE:
-                continue
-
-            # 2. LEITURA DO PAYLOAD: Lê todos os 30 bytes dos 5 estados de uma vez
-            payload_bruto = ser.read(TAMANHO_PAYLOAD_BYTES)
-
-            if len(payload_bruto) < TAMANHO_PAYLOAD_BYTES:
-                print("\nAviso: Timeout após receber o header. Pacote incompleto.")
-                continue
-
-            # Lista para armazenar os 5 estados deste pacote específico
-            estados_do_pacote_atual = []
-            
-            # 3. PROCESSAMENTO DO PAYLOAD: Itera 5 vezes, uma para cada estado
-            for i in range(NUM_ESTADOS):
-                # Extrai o "chunk" de 6 bytes correspondente ao estado atual
-                inicio_chunk = i * BYTES_POR_ESTADO
-                fim_chunk = inicio_chunk + BYTES_POR_ESTADO
-                chunk_estado = payload_bruto[inicio_chunk:fim_chunk]
-                
-                # 4. RECONSTRUÇÃO DO NÚMERO DE 42 BITS (mesma lógica de antes)
-                valor_completo_int = 0
-                for j in range(5): # 5 bytes completos
-                    valor_completo_int |= chunk_estado[j] << (j * 8)
-                # 2 bits do último byte
-                valor_completo_int |= (chunk_estado[5] & 0x03) << 40
-
-                # 5. CONVERSÃO PARA SINAL
-                valor_com_sinal = to_signed(valor_completo_int, TOTAL_BITS)
-                estados_do_pacote_atual.append(valor_com_sinal)
-            
-            # Adiciona a lista com os 5 estados do pacote à lista principal
-            dados_dos_pacotes.append(estados_do_pacote_atual)
-            pacotes_lidos += 1
-        
-        print(f"\nLeitura de {pacotes_lidos} pacotes concluída com sucesso.")
-
-    except serial.SerialException as e:
-        print(f"Erro: Não foi possível abrir a porta serial {PORTA_SERIAL}.")
+        dados_dos_pacotes, _ = ler_amostras(config, NUM_PACOTES)
+    except Exception as e:
+        print(f"Erro: Não foi possível abrir a porta serial {config.porta}.")
         print(f"Detalhe do erro: {e}")
         return None
     except KeyboardInterrupt:
         print("\nLeitura interrompida pelo usuário.")
-    finally:
-        if ser and ser.is_open:
-            ser.close()
-            print(f"Porta {PORTA_SERIAL} fechada.")
-            
+        return None
+
+    print(f"\nLeitura de {len(dados_dos_pacotes)} pacotes concluída com sucesso.")
     return dados_dos_pacotes
 
 def processar_e_plotar_dados(dados_dos_pacotes):
     """
-    Processa a lista de pacotes, converte para real, salva em CSV e plota os 5 estados.
+    Processa a matriz de pacotes (amostras x estados), converte para real,
+    salva em CSV e plota todos os estados.
     """
-    if not dados_dos_pacotes:
+    if dados_dos_pacotes is None or len(dados_dos_pacotes) == 0:
         print("Nenhum dado para processar.")
         return
         
-    # Nomes das colunas para o DataFrame
-    nomes_colunas = [f'Estado_{i}' for i in range(NUM_ESTADOS)]
+    # Nomes das colunas para o DataFrame (número de estados vem dos próprios dados)
+    dados_dos_pacotes = np.asarray(dados_dos_pacotes)
+    num_estados = dados_dos_pacotes.shape[1]
+    nomes_colunas = [f'Estado_{i}' for i in range(num_estados)]
 
-    # Cria o DataFrame diretamente da lista de listas
+    # Cria o DataFrame diretamente da matriz
     df = pd.DataFrame(dados_dos_pacotes, columns=nomes_colunas)
     print(f"\nDataFrame criado com {len(df)} amostras e {len(df.columns)} estados.")
 
@@ -147,7 +79,7 @@ def processar_e_plotar_dados(dados_dos_pacotes):
     for coluna in nomes_colunas_real:
         plt.plot(df.index, df[coluna], marker='.', linestyle='-', markersize=2, label=coluna)
 
-    plt.title('Gráfico dos 5 Estados Decodificados')
+    plt.title(f'Gráfico dos {num_estados} Estados Decodificados')
     plt.xlabel('Amostra')
     plt.ylabel('Valor Real')
     plt.grid(True)
@@ -161,5 +93,5 @@ def processar_e_plotar_dados(dados_dos_pacotes):
 if __name__ == '__main__':
     dados_lidos = ler_dados_serial()
     
-    if dados_lidos:
+    if dados_lidos is not None:
         processar_e_plotar_dados(dados_lidos)
\ No newline at end of file
@@ -2,6 +2,9 @@
 """
 Visualizador offline simples para dados do FPGA decodificados.
 Este programa carrega e plota o arquivo CSV gerado pelo main.py.
+
+Para rever a captura com a mesma renderização da leitura ao vivo, use o replay:
+    python -m hil_serial replay data/IL2/dados_fpga_il2_25us.csv --perfil single
 """
 
 import pandas as pd
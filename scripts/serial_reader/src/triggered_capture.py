@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""
+CAPTURA COM GATILHO para os 5 estados.
+
+Lê a serial continuamente em blocos, decodifica de forma vetorizada e mantém
+um buffer pré-gatilho em memória. Só a janela [pré + pós] em torno do evento
+(conexão à rede, partida do PWM, ...) é gravada em disco.
+
+Atalho para 'python -m hil_serial capture --gatilho ...'.
+
+Exemplos:
+    python triggered_capture.py --estado 0 --tipo subida --limiar 10
+    python triggered_capture.py --estado 3 --tipo fora_faixa --faixa -350 350 --pre 2000 --pos 4000
+    python triggered_capture.py --replay sessao.bin -v 0 --estado 2 --tipo taxa --limiar 1e5 --capturas 3
+"""
+
+import sys
+
+from hil_serial.cli import main
+
+if __name__ == '__main__':
+    main(['capture', '--perfil', 'multi', '--tipo', 'subida'] + sys.argv[1:])
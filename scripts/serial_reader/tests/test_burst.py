@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""CRC e remontagem das rajadas do BurstCapture."""
+
+import numpy as np
+import pytest
+
+from hil_serial import burst
+
+
+def _crc16_update(crc, byte):
+    """Tradução direta do crc16_update do BurstCapture.vhd (bit a bit)."""
+    crc ^= byte << 8
+    for _ in range(8):
+        crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        crc &= 0xFFFF
+    return crc
+
+
+def _valores(num_amostras=64, num_estados=5, semente=3):
+    rng = np.random.default_rng(semente)
+    return rng.integers(-(1 << 41), 1 << 41, size=(num_amostras, num_estados), dtype=np.int64)
+
+
+def test_crc_vetor_de_referencia():
+    # Valor de verificação do CRC-16/CCITT-FALSE
+    assert burst.crc16_ccitt(b'123456789') == 0x29B1
+    assert burst.crc16_ccitt(b'') == 0xFFFF
+
+
+def test_crc_igual_ao_do_vhdl():
+    dados = np.random.default_rng(0).integers(0, 256, 1000, dtype=np.uint8).tobytes()
+    crc = 0xFFFF
+    for b in dados:
+        crc = _crc16_update(crc, b)
+    assert burst.crc16_ccitt(dados) == crc
+    # Continuação a partir de um CRC parcial
+    assert burst.crc16_ccitt(dados[500:], burst.crc16_ccitt(dados[:500])) == crc
+
+
+def test_quadro_termina_com_crc_lsb_primeiro():
+    quadro = burst.codificar_rajada(_valores(4))
+    crc = burst.crc16_ccitt(quadro[:-burst.BYTES_CRC])
+    assert quadro[-2:] == bytes([crc & 0xFF, crc >> 8])
+    assert quadro[:2] == burst.HEADER_RAJADA
+
+
+@pytest.mark.parametrize('tamanho_leitura', [1, 7, 100_000])
+def test_remontagem_com_lixo_antes_do_cabecalho(tamanho_leitura):
+    valores = _valores()
+    fluxo = bytes([0xFA, 0xFE, 0x01, 0xFE]) + burst.codificar_rajada(valores, decimacao=4, identificador=9)
+    receptor = burst.ReceptorRajada(valores.shape[1])
+
+    rajadas = []
+    for i in range(0, len(fluxo), tamanho_leitura):
+        rajadas += receptor.alimentar(fluxo[i:i + tamanho_leitura])
+
+    assert len(rajadas) == 1
+    rajada = rajadas[0]
+    np.testing.assert_array_equal(rajada.valores, valores)
+    assert rajada.pronta and rajada.decimacao == 4 and rajada.identificador == 9
+    assert rajada.intervalo_s == pytest.approx(4 * burst.PASSO_SOLVER_S)
+    assert receptor.crc_invalidos == 0
+
+
+def test_rajada_corrompida_e_descartada():
+    valores = _valores(8)
+    quadro = bytearray(burst.codificar_rajada(valores))
+    quadro[burst.BYTES_CABECALHO + 10] ^= 0x40
+    receptor = burst.ReceptorRajada(valores.shape[1])
+
+    assert receptor.alimentar(bytes(quadro)) == []
+    assert receptor.crc_invalidos == 1
+    # A repetição da descarga ('D') chega íntegra
+    rajadas = receptor.alimentar(burst.codificar_rajada(valores))
+    assert len(rajadas) == 1
+    np.testing.assert_array_equal(rajadas[0].valores, valores)
+
+
+@pytest.mark.parametrize('status, num_amostras', [
+    (burst.STATUS_PRONTA, 0xFFFF),              # Mais amostras que o BURST_DEPTH
+    (burst.STATUS_ARMADA, 16),                  # Amostras em uma rajada que não está pronta
+])
+def test_cabecalho_falso_no_trafego_periodico(status, num_amostras):
+    from hil_serial.replay import codificar_pacotes
+
+    valores = _valores(8)
+    trafego = bytearray(codificar_pacotes(_valores(200, semente=5)))
+    # 0xFE 0xB5 dentro de um payload de estados, seguido de um cabeçalho coerente no resto
+    falso = burst.HEADER_RAJADA + bytes([status, valores.shape[1], num_amostras & 0xFF, num_amostras >> 8, 1, 0])
+    trafego[301:301 + len(falso)] = falso
+    quadro = burst.codificar_rajada(valores, identificador=7)
+    receptor = burst.ReceptorRajada(valores.shape[1])
+
+    # A rajada verdadeira sai assim que o último byte dela chega
+    rajadas = receptor.alimentar(bytes(trafego) + quadro)
+    assert len(rajadas) == 1
+    np.testing.assert_array_equal(rajadas[0].valores, valores)
+    assert rajadas[0].identificador == 7 and receptor.crc_invalidos == 0
+
+
+def test_rajada_nao_pronta_sem_amostras_e_aceita():
+    receptor = burst.ReceptorRajada(5)
+    rajadas = receptor.alimentar(burst.codificar_rajada(np.zeros((0, 5), dtype=np.int64),
+                                                        status=burst.STATUS_CAPTURANDO))
+    assert len(rajadas) == 1
+    assert rajadas[0].status == burst.STATUS_CAPTURANDO and rajadas[0].valores.shape == (0, 5)
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""'hil_serial capture' com gatilho: nomes dos arquivos com --saida e várias capturas."""
+
+import numpy as np
+
+from hil_serial.cli import main
+from hil_serial.replay import codificar_pacotes
+
+
+def _replay_com_subidas(caminho, num_subidas=4, periodo=200):
+    # Estado 0 alterna entre 0 e 20 A: uma subida por 10 A a cada 'periodo' amostras
+    n = num_subidas * periodo
+    valores = np.zeros((n, 5), dtype=np.int64)
+    valores[:, 0] = np.where(np.arange(n) % periodo >= periodo // 2, 20, 0) << 28
+    caminho.write_bytes(codificar_pacotes(valores))
+    return str(caminho)
+
+
+def _capturar(tmp_path, *opcoes):
+    replay = _replay_com_subidas(tmp_path / 'sessao.bin')
+    main(['capture', '--perfil', 'multi', '--replay', replay, '-v', '0', '--gatilho', 'subida',
+          '--estado', '0', '--limiar', '10', '--pre', '10', '--pos', '20', *opcoes])
+
+
+def test_varias_capturas_numeradas_a_partir_de_saida(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _capturar(tmp_path, '--capturas', '3', '--saida', str(tmp_path / 'rede.csv'))
+
+    assert sorted(p.name for p in tmp_path.glob('rede*')) == ['rede_0.csv', 'rede_1.csv', 'rede_2.csv']
+    assert not list(tmp_path.glob('captura_gatilho_*'))
+
+
+def test_uma_captura_usa_saida_sem_numero(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _capturar(tmp_path, '--saida', str(tmp_path / 'rede.hilz'))
+
+    assert [p.name for p in tmp_path.glob('rede*')] == ['rede.hilz']
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Orçamento do enlace: maior quadro da agenda e SCHEDULE_INTERVAL_US do HIL_TOP."""
+
+import math
+import os
+import re
+
+import pytest
+
+from hil_serial.config import PERFIS
+from hil_serial.link import OrcamentoEnlace, bytes_por_quadro
+
+HIL_TOP = os.path.join(os.path.dirname(os.path.abspath(__file__)), *[os.pardir] * 3, 'HIL_TOP.vhd')
+
+
+def _generic(texto, nome):
+    return re.search(rf'constant {nome}\s*:[^:]*:=\s*([^;]+);', texto).group(1).strip()
+
+
+@pytest.fixture(scope='module')
+def hil_top():
+    with open(HIL_TOP, encoding='utf-8', errors='replace') as f:
+        texto = f.read()
+    decimacoes = [int(d) for d in re.findall(r'\d+', _generic(texto, 'SCHEDULE_DECIMATION'))]
+    baud = int(_generic(texto, 'SERIAL_BAUD_RATE').replace('_', ''))
+    clk = int(_generic(texto, 'CLK_FREQ').replace('_', ''))
+    return decimacoes, int(_generic(texto, 'SCHEDULE_INTERVAL_US')), baud, clk
+
+
+def test_quadro_da_agenda_so_com_os_estados_agendados():
+    assert bytes_por_quadro(5, [0, 0, 1, 0, 6])['agenda'] == 15      # 0xFC seq disparo + IL2 + VCd
+    assert bytes_por_quadro(5)['agenda'] == 33                       # Todos os estados
+    assert bytes_por_quadro(5, [0, 0, 1, 0, 0])['agenda'] == 11      # O descritor é maior que o quadro
+
+
+def test_tempo_do_maior_quadro_da_agenda():
+    inteiro = OrcamentoEnlace(3_000_000, 250_000_000, False, 5, decimacoes=[0, 0, 1, 0, 6])
+    fracionario = OrcamentoEnlace(3_000_000, 250_000_000, True, 5, decimacoes=[0, 0, 1, 0, 6])
+    assert inteiro.tempo_quadro_s(15) * 1e6 == pytest.approx(49.928)
+    assert fracionario.tempo_quadro_s(15) * 1e6 == pytest.approx(50.128)
+
+
+@pytest.mark.parametrize('fracionario', [False, True])
+def test_intervalo_do_hil_top_comporta_o_maior_quadro(hil_top, fracionario):
+    decimacoes, intervalo_us, baud, clk = hil_top
+    assert PERFIS['agenda']['decimacoes'] == decimacoes
+    assert PERFIS['agenda']['intervalo_us'] == intervalo_us
+    orcamento = OrcamentoEnlace(baud, clk, fracionario, len(decimacoes), intervalo_us, decimacoes)
+    num_bytes, tempo, intervalo_minimo, taxa = orcamento.quadros()['agenda']
+    assert intervalo_minimo <= intervalo_us
+    # Nenhum disparo perdido: um quadro por SCHEDULE_INTERVAL_US
+    assert taxa == pytest.approx(1e6 / intervalo_us)
+    assert math.ceil(tempo * 1e6) == intervalo_minimo
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Caminho de gravação do multi_state_save_img com dados sintéticos (sem porta serial)."""
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import multi_state_save_img as script
+
+
+@pytest.mark.parametrize('num_estados', [5, 2])
+def test_grava_csv_com_um_estado_por_coluna(tmp_path, monkeypatch, num_estados):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(script.plt, 'show', lambda: None)
+    dados = np.arange(12 * num_estados, dtype=np.int64).reshape(12, num_estados) - 30
+    dados[0, 0] = -(1 << 41)
+
+    script.processar_e_plotar_dados(dados)
+
+    df = pd.read_csv(tmp_path / script.NOME_ARQUIVO_CSV, sep=';', decimal=',')
+    assert list(df.columns) == [f'Estado_{i}_Real' for i in range(num_estados)]
+    np.testing.assert_allclose(df.to_numpy(), dados / 2**script.BITS_FRACIONARIOS)
+    script.plt.close('all')
+
+
+def test_sem_dados_nao_grava(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    script.processar_e_plotar_dados(np.zeros((0, 5), dtype=np.int64))
+    assert not (tmp_path / script.NOME_ARQUIVO_CSV).exists()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Ressincronismo do DemultiplexadorAgenda depois de perdas no enlace e no driver."""
+
+import numpy as np
+import pytest
+
+from hil_serial.schedule import (INTERVALO_DESCRITOR, DemultiplexadorAgenda, DescritorAgenda,
+                                 codificar_agenda)
+
+NUM_ESTADOS = 5
+DISPAROS = 60_000
+TAMANHO_LEITURA = 4096
+
+
+def _valores():
+    # Estado i no disparo k vale 5k + i: o disparo verdadeiro sai do próprio valor
+    return np.arange(DISPAROS * NUM_ESTADOS, dtype=np.int64).reshape(DISPAROS, NUM_ESTADOS)
+
+
+def _descritor():
+    return DescritorAgenda([0, 0, 1, 0, 2], 60)
+
+
+def _inicios_quadros(descritor, num_quadros):
+    quadros = np.arange(num_quadros)
+    tamanhos = np.where(quadros % INTERVALO_DESCRITOR == 0, descritor.tamanho_descritor,
+                        descritor.tamanhos[quadros % descritor.ciclo_seq])
+    return np.concatenate(([0], np.cumsum(tamanhos)[:-1]))
+
+
+def _decodificar(fluxo, estado=2):
+    demux = DemultiplexadorAgenda(NUM_ESTADOS)
+    partes = []
+    for i in range(0, len(fluxo), TAMANHO_LEITURA):
+        partes.append(demux.decodificar(fluxo[i:i + TAMANHO_LEITURA]).get(estado, (np.empty(0), np.empty(0))))
+    disparos = np.concatenate([p[0] for p in partes]).astype(np.int64)
+    valores = np.concatenate([p[1] for p in partes]).astype(np.int64)
+    return demux, disparos, (valores - estado) // NUM_ESTADOS
+
+
+@pytest.mark.parametrize('disparos_por_quadro', [1, 3])
+def test_fluxo_inteiro_tem_indices_exatos(disparos_por_quadro):
+    fluxo, _ = codificar_agenda(_valores(), _descritor(), disparos_por_quadro=disparos_por_quadro)
+
+    demux, disparos, verdadeiros = _decodificar(fluxo)
+
+    np.testing.assert_array_equal(disparos, verdadeiros)
+    assert demux.quadros_perdidos == 0 and demux.descontinuidades == []
+
+
+@pytest.mark.parametrize('perdidos', [1, 300, 700])
+def test_headers_corrompidos_ressincronizam_com_indices_exatos(perdidos):
+    descritor = _descritor()
+    fluxo, _ = codificar_agenda(_valores(), descritor)
+    inicios = _inicios_quadros(descritor, 2000)
+    corrompido = bytearray(fluxo)
+    quadros = [q for q in range(500, 500 + perdidos) if q % INTERVALO_DESCRITOR]
+    for q in quadros:
+        corrompido[inicios[q]] ^= 0xFF      # Os bytes chegam, só o header é inválido
+
+    demux, disparos, verdadeiros = _decodificar(bytes(corrompido))
+
+    np.testing.assert_array_equal(disparos, verdadeiros)
+    assert demux.quadros_perdidos == len(quadros)
+    assert demux.perdas_indeterminadas == 0 and demux.descontinuidades == []
+
+
+@pytest.mark.parametrize('disparos_por_quadro', [1, 3])
+@pytest.mark.parametrize('corte', [5, 3900, 20_000])
+def test_corte_no_driver_abre_novo_segmento(disparos_por_quadro, corte):
+    fluxo, _ = codificar_agenda(_valores(), _descritor(), disparos_por_quadro=disparos_por_quadro)
+    inicio_corte = 50_003
+    cortado = fluxo[:inicio_corte] + fluxo[inicio_corte + corte:]
+
+    demux, disparos, verdadeiros = _decodificar(cortado)
+
+    # Lacuna de tamanho desconhecido: marcada, e nenhuma amostra com voltas adivinhadas
+    assert demux.perdas_indeterminadas == 1
+    assert len(demux.descontinuidades) == 1
+    segmentos = demux.segmentos(disparos)
+    assert set(np.unique(segmentos)) == {0, 1}
+    for s in (0, 1):
+        sel = segmentos == s
+        np.testing.assert_array_equal(np.diff(disparos[sel]), np.diff(verdadeiros[sel]))
+    np.testing.assert_array_equal(disparos[segmentos == 0], verdadeiros[segmentos == 0])
+    # O deslocamento do segmento novo é só um limite inferior
+    assert np.all(disparos[segmentos == 1] <= verdadeiros[segmentos == 1])
+    assert np.all(np.diff(disparos) > 0)
+    assert demux.quadros_perdidos <= corte // int(_descritor().tamanhos.min()) + 1
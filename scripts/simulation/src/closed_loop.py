@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""
+MALHA FECHADA: controlador em Python acionando o modelo da planta do HIL.
+
+A cada período de controle o controlador recebe os estados medidos (qualquer
+subconjunto dos 5, amostrados 'atraso' antes) e devolve o índice de modulação
+m em [-1, 1]. O modulador transforma m na tensão do inversor:
+
+  - 'pwm'  : o SPWM_TOP (spwm_model) com m no lugar da amostra da SineLUT,
+             constante em cada período da triangular, e a leitura do pino pelo
+             HIL (sincronizador e amostragem por passo de pwm_edges)
+  - 'medio': modelo médio, u = m * VDC constante no período de controle
+
+A tensão da rede vem do GridGen (gridgen_model, um valor por passo) e entra
+em L2 (plant_model.matrizes_hil com rede=True); com --sem-rede a rede fica
+curto-circuitada como no HIL_TOP. Cada período é afim no estado: a resposta ao
+PWM é tabelada por nível da comparação e a da rede sai de um produto matricial
+por bloco de períodos (PASSOS_POR_BLOCO_REDE passos do solver de cada vez, o
+que limita a memória em execuções longas), então o custo é tipicamente bem
+menor que o tempo real.
+
+O controlador pode ser qualquer objeto com atualizar(t, medidas) -> m (e,
+opcionalmente, reiniciar()). Pela linha de comando, '--controlador
+modulo:Classe' carrega uma classe do usuário (instanciada sem argumentos).
+
+Exemplos:
+    python closed_loop.py
+    python closed_loop.py --kp 0.02 --kr 40 --atraso-us 50 --grafico
+    python closed_loop.py --controlador meu_controle:Controlador --estados 0 2 3
+"""
+
+import argparse
+import importlib
+import time
+
+import numpy as np
+
+from gridgen_model import GRID_FREQ, ParametrosGridGen, saida_decimada
+from plant_model import FP_FRACTION_BITS, NOMES_ESTADOS, N_IN, N_SS, VDC_VOLTAGE, ParametrosLCL, PlantaLCL, matrizes_hil
+from pwm_edges import ParametrosEntradaHIL, padrao_spwm
+from spwm_model import SWITCHING_FREQ, TRI_PERIODO_PASSOS, TRIANGULAR_BITS, ParametrosSPWM
+
+# --- Bloco de Configuração ---
+PERIODOS_PORTADORA_POR_CONTROLE = 1
+ATRASO_MEDICAO_S = 0.0
+ESTADOS_MEDIDOS = (2,)          # IL2
+MODULACOES = ('pwm', 'medio')
+PASSOS_POR_BLOCO_REDE = 2**20   # Passos de v_rede gerados de uma vez (8 MB por bloco)
+
+# --- Controlador de exemplo (PR na corrente IL2, na frequência do GridGen) ---
+AMPLITUDE_REFERENCIA = 10.0     # A de pico
+KP_PADRAO = 0.01
+KR_PADRAO = 20.0
+
+# --- Fim do Bloco de Configuração ---
+
+
+class ControladorPR:
+    """
+    Proporcional-ressonante para seguir uma senoide em um estado medido
+    (ganhos em índice de modulação por ampère).
+    Ressonante discretizado por Tustin com pré-distorção na frequência da referência.
+    """
+
+    def __init__(self, periodo_s, kp=KP_PADRAO, kr=KR_PADRAO, freq=GRID_FREQ,
+                 amplitude=AMPLITUDE_REFERENCIA):
+        self.periodo_s = periodo_s
+        self.kp, self.kr = kp, kr
+        self.freq, self.amplitude = freq, amplitude
+        w0 = 2 * np.pi * freq
+        k = w0 / np.tan(w0 * periodo_s / 2)
+        # kr * s / (s^2 + w0^2) com s = k (z-1)/(z+1)
+        den = k**2 + w0**2
+        self._b = np.array([kr * k, 0.0, -kr * k]) / den
+        self._a = np.array([1.0, 2 * (w0**2 - k**2) / den, 1.0])
+        self.reiniciar()
+
+    def reiniciar(self):
+        self._e = [0.0, 0.0]
+        self._y = [0.0, 0.0]
+
+    def referencia(self, t):
+        return self.amplitude * np.sin(2 * np.pi * self.freq * t)
+
+    def atualizar(self, t, medidas):
+        erro = self.referencia(t) - medidas[0]
+        b, a = self._b, self._a
+        ressonante = b[0] * erro + b[1] * self._e[0] + b[2] * self._e[1] - a[1] * self._y[0] - a[2] * self._y[1]
+        self._e = [erro, self._e[0]]
+        self._y = [ressonante, self._y[0]]
+        return self.kp * erro + ressonante
+
+
+class ResultadoMalha:
+    """Registros por período de controle."""
+
+    def __init__(self, tempos, estados, medidas, modulacao):
+        self.tempos = tempos
+        self.estados = estados
+        self.medidas = medidas
+        self.modulacao = modulacao
+
+
+def modulador_spwm(freq_chaveamento=SWITCHING_FREQ, hil=None):
+    """
+    (ParametrosSPWM no clock do HIL, passos do solver por período da triangular).
+
+    A malha repete o mesmo padrão de passos em todo período da triangular, então
+    o período é arredondado para um número inteiro de passos. Se CLK_PER_STEP *
+    510 não for múltiplo de SIMUL_PERIOD, a portadora do modelo se desloca
+    deriva_portadora() passos por período em relação à do RTL (com os generics
+    padrão, 65 * 510 = 1326 * 25 clocks e a deriva é zero).
+    """
+    hil = hil or ParametrosEntradaHIL(ciclo_primeiro_passo=0)
+    spwm = ParametrosSPWM(clk_freq=hil.clk_freq, switching_freq=int(freq_chaveamento))
+    ciclos = spwm.clk_por_passo * TRI_PERIODO_PASSOS
+    return spwm, int(round(ciclos / hil.periodo_passo))
+
+
+def deriva_portadora(freq_chaveamento=SWITCHING_FREQ, hil=None):
+    """Passos (fracionários) que a portadora arredondada de modulador_spwm adianta por período em relação ao RTL."""
+    hil = hil or ParametrosEntradaHIL(ciclo_primeiro_passo=0)
+    spwm, passos_portadora = modulador_spwm(freq_chaveamento, hil)
+    return spwm.clk_por_passo * TRI_PERIODO_PASSOS / hil.periodo_passo - passos_portadora
+
+
+def nivel_spwm(spwm, m):
+    """
+    Índice do padrão de comparação para m em [-1, 1]: m vira a amostra da
+    SineLUT (mesma escala) e o padrão só depende de ceil(seno / 2^deslocamento).
+    """
+    seno = int(round(min(max(m, -1.0), 1.0) * (2**(spwm.largura_seno - 1) - 1)))
+    return (-((-seno) >> spwm.deslocamento)) + 2**(TRIANGULAR_BITS - 1) - 1
+
+
+def _segmentos_pwm(nivel, spwm, hil, passos_portadora, vdc):
+    """Trechos (passos, tensão) de um período da triangular (pwm_edges.padrao_spwm) no 'nivel' dado."""
+    u = padrao_spwm(spwm, hil, nivel, passos_portadora) * (vdc / hil.vdc)
+    inicios = np.flatnonzero(np.diff(u, prepend=np.nan))
+    return list(zip(np.diff(np.append(inicios, len(u))).tolist(), u[inicios].tolist()))
+
+
+def _ganhos_rede(planta, passos):
+    """H (passos, N_SS): estado após 'passos' passos = soma_j H[j] * v_rede[j], partindo de x = 0."""
+    H = np.empty((passos, N_SS))
+    h = planta.B[:, 1].copy()
+    for j in range(passos - 1, -1, -1):
+        H[j] = h
+        h = planta.A @ h
+    return H
+
+
+def tensao_rede(num_passos, rede=None, hil=None, passo_inicial=0):
+    """v_rede (V) do GridGen nos passos do solver passo_inicial .. passo_inicial + num_passos - 1
+    (saída no clock em que o passo lê Uvector)."""
+    hil = hil or ParametrosEntradaHIL(ciclo_primeiro_passo=0)
+    rede = rede or ParametrosGridGen(clk_freq=hil.clk_freq)
+    clock_inicial = hil.ciclo_primeiro_passo + passo_inicial * hil.periodo_passo
+    return saida_decimada(rede, hil.periodo_passo, num_passos, clock_inicial) / 2.0**FP_FRACTION_BITS
+
+
+class _RespostaRede:
+    """
+    Resposta à rede de cada trecho (período da malha) e do pedaço até a amostra,
+    calculada por blocos de trechos conforme o laço avança: só um bloco de
+    v_rede fica na memória, em vez da execução inteira.
+    """
+
+    def __init__(self, planta, periodo, inicio_amostra, rede, hil, passos_por_bloco):
+        self.periodo, self.inicio_amostra = periodo, inicio_amostra
+        self.rede, self.hil = rede, hil
+        self.trechos_por_bloco = max(1, passos_por_bloco // periodo)
+        self.H = _ganhos_rede(planta, periodo)
+        self._bloco = None
+
+    def __call__(self, trecho):
+        """(resposta do trecho inteiro, resposta até inicio_amostra)."""
+        bloco, i = divmod(trecho, self.trechos_por_bloco)
+        if bloco != self._bloco:
+            n = self.trechos_por_bloco
+            v_rede = tensao_rede(n * self.periodo, self.rede, self.hil,
+                                 bloco * n * self.periodo).reshape(n, self.periodo)
+            self._completo = v_rede @ self.H
+            self._amostra = v_rede[:, :self.inicio_amostra] @ self.H[self.periodo - self.inicio_amostra:]
+            self._bloco = bloco
+        return self._completo[i], self._amostra[i]
+
+
+def _resposta_forcada(planta, segmentos, ate):
+    """Estado após 'ate' passos dos trechos, partindo de x = 0."""
+    x = np.zeros(N_SS)
+    u = np.zeros(N_IN)
+    for passos, tensao in segmentos:
+        passos = min(passos, ate)
+        u[0] = tensao
+        x = planta.propagar(x, u, passos)
+        ate -= passos
+        if ate == 0:
+            break
+    return x
+
+
+def executar_malha(controlador, duracao_s, planta=None, freq_chaveamento=SWITCHING_FREQ,
+                   periodos_por_controle=PERIODOS_PORTADORA_POR_CONTROLE, estados_medidos=ESTADOS_MEDIDOS,
+                   atraso_s=ATRASO_MEDICAO_S, modulacao='pwm', vdc=VDC_VOLTAGE, x0=None, rede=None,
+                   usar_rede=True, passos_por_bloco=PASSOS_POR_BLOCO_REDE):
+    """
+    Roda a malha por 'duracao_s' e retorna um ResultadoMalha com os estados no
+    início de cada período de controle, as medidas entregues e o m aplicado.
+    'rede' são os ParametrosGridGen da tensão da rede (padrão: GridGen padrão);
+    a planta padrão liga v_rede em L2, a não ser com usar_rede=False.
+    'passos_por_bloco' limita quantos passos de v_rede ficam na memória.
+    """
+    if modulacao not in MODULACOES:
+        raise ValueError(f"Modulação '{modulacao}' inválida; use uma de {MODULACOES}.")
+    if planta is None:
+        parametros = ParametrosLCL()
+        A, B = matrizes_hil(parametros, rede=usar_rede)
+        planta = PlantaLCL(parametros, A=A, B=B)
+    hil = ParametrosEntradaHIL(ciclo_primeiro_passo=0)
+    spwm, passos_portadora = modulador_spwm(freq_chaveamento, hil)
+    passos_controle = passos_portadora * periodos_por_controle
+    atraso = int(round(atraso_s / planta.ts))
+    num_periodos = int(np.ceil(duracao_s / (passos_controle * planta.ts)))
+    indices = np.asarray(estados_medidos, dtype=np.int64)
+
+    # A amostra usada na atualização j é tirada no passo j*passos_controle - atraso,
+    # ou seja, no período j - antecedencia, a 'deslocamento' passos do início dele
+    deslocamento = (-atraso) % passos_controle
+    antecedencia = (atraso + deslocamento) // passos_controle
+    portadora_amostra, passo_amostra = divmod(deslocamento, passos_portadora)
+
+    # Um período inteiro (ou o trecho até a amostra) é afim no estado:
+    # x_fim = phi x + resposta[entrada] + rede[período], com a resposta tabelada por entrada
+    if modulacao == 'pwm':
+        periodo, inicio_amostra = passos_portadora, passo_amostra
+        phi, _ = planta.transicao(passos_portadora)
+        phi_amostra, _ = planta.transicao(passo_amostra)
+        padroes = [_segmentos_pwm(n, spwm, hil, passos_portadora, vdc) for n in range(2**TRIANGULAR_BITS)]
+        resposta = np.array([_resposta_forcada(planta, seg, passos_portadora) for seg in padroes])
+        resposta_amostra = np.array([_resposta_forcada(planta, seg, passo_amostra) for seg in padroes])
+    else:
+        periodo, inicio_amostra = passos_controle, deslocamento
+        phi, gamma = planta.transicao(passos_controle)
+        phi_amostra, gamma_amostra = planta.transicao(deslocamento)
+        resposta, resposta_amostra = gamma[:, 0] * vdc, gamma_amostra[:, 0] * vdc
+
+    # Resposta à rede de cada período (e do trecho até a amostra), por blocos
+    if usar_rede and np.any(planta.B[:, 1]):
+        resposta_rede = _RespostaRede(planta, periodo, inicio_amostra, rede, hil, passos_por_bloco)
+    else:
+        zeros = (np.zeros(N_SS), np.zeros(N_SS))
+        resposta_rede = lambda trecho: zeros
+
+    amostras = {}
+    x = np.zeros(N_SS) if x0 is None else np.asarray(x0, dtype=np.float64)
+    tempos = np.arange(num_periodos) * passos_controle * planta.ts
+    estados = np.empty((num_periodos, N_SS))
+    medidas = np.empty((num_periodos, len(indices)))
+    modulacoes = np.empty(num_periodos)
+    if hasattr(controlador, 'reiniciar'):
+        controlador.reiniciar()
+
+    for k in range(num_periodos):
+        estados[k] = x
+        if deslocamento == 0:
+            amostras[k + antecedencia] = x[indices]
+        # Antes da primeira amostra (atraso maior que o tempo decorrido) vale o estado inicial
+        medidas[k] = amostras.pop(k, estados[0, indices])
+        m = float(controlador.atualizar(tempos[k], medidas[k]))
+        modulacoes[k] = m
+        m = min(max(m, -1.0), 1.0)
+
+        if modulacao == 'medio':
+            rede_periodo, rede_amostra = resposta_rede(k)
+            if deslocamento:
+                amostras[k + antecedencia] = (phi_amostra @ x + resposta_amostra * m + rede_amostra)[indices]
+            x = phi @ x + resposta * m + rede_periodo
+            continue
+
+        nivel = nivel_spwm(spwm, m)
+        for c in range(periodos_por_controle):
+            rede_periodo, rede_amostra = resposta_rede(k * periodos_por_controle + c)
+            if deslocamento and c == portadora_amostra:
+                amostras[k + antecedencia] = (phi_amostra @ x + resposta_amostra[nivel] + rede_amostra)[indices]
+            x = phi @ x + resposta[nivel] + rede_periodo
+
+    return ResultadoMalha(tempos, estados, medidas, modulacoes)
+
+
+def carregar_controlador(especificacao):
+    """'modulo:Classe' -> instância (o módulo precisa estar no PYTHONPATH ou na pasta atual)."""
+    modulo, _, nome = especificacao.partition(':')
+    return getattr(importlib.import_module(modulo), nome or 'Controlador')()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Malha fechada controlador Python + planta LCL do HIL.')
+    parser.add_argument('--duracao', type=float, default=0.5, help='tempo simulado (s)')
+    parser.add_argument('--controlador', help="classe do usuário 'modulo:Classe' (padrão: PR de exemplo)")
+    parser.add_argument('--kp', type=float, default=KP_PADRAO)
+    parser.add_argument('--kr', type=float, default=KR_PADRAO)
+    parser.add_argument('--amplitude', type=float, default=AMPLITUDE_REFERENCIA, help='referência de IL2 (A)')
+    parser.add_argument('--fsw', type=int, default=SWITCHING_FREQ, help='SWITCHING_FREQ do SPWM_TOP (Hz)')
+    parser.add_argument('--periodos-por-controle', type=int, default=PERIODOS_PORTADORA_POR_CONTROLE)
+    parser.add_argument('--estados', type=int, nargs='+', default=list(ESTADOS_MEDIDOS),
+                        help='índices dos estados medidos (0=IL1 ... 4=VCd)')
+    parser.add_argument('--atraso-us', type=float, default=ATRASO_MEDICAO_S * 1e6)
+    parser.add_argument('--modulacao', choices=MODULACOES, default='pwm')
+    parser.add_argument('--sem-rede', action='store_true', help='rede curto-circuitada, como no HIL_TOP')
+    parser.add_argument('--grafico', action='store_true')
+    args = parser.parse_args()
+
+    _, passos_portadora = modulador_spwm(args.fsw)
+    deriva = deriva_portadora(args.fsw)
+    if deriva:
+        print(f"Aviso: período da triangular arredondado para {passos_portadora} passos; a portadora do modelo "
+              f"se desloca {deriva:+.3f} passo(s) por período em relação ao RTL.")
+    periodo_controle = args.periodos_por_controle * passos_portadora * ParametrosLCL().ts
+    if args.controlador:
+        controlador = carregar_controlador(args.controlador)
+    else:
+        controlador = ControladorPR(periodo_controle, args.kp, args.kr, amplitude=args.amplitude)
+
+    t = time.perf_counter()
+    r = executar_malha(controlador, args.duracao, freq_chaveamento=args.fsw,
+                       periodos_por_controle=args.periodos_por_controle, estados_medidos=args.estados,
+                       atraso_s=args.atraso_us * 1e-6, modulacao=args.modulacao, usar_rede=not args.sem_rede)
+    dt = time.perf_counter() - t
+    print(f"{args.duracao * 1e3:g} ms simulados ({len(r.tempos)} atualizações de controle, "
+          f"{args.modulacao}) em {dt:.3f} s -> {args.duracao / dt:.1f}x o tempo real")
+    print(f"Saturação da modulação: {np.mean(np.abs(r.modulacao) >= 1) * 100:.1f}% dos períodos")
+
+    if hasattr(controlador, 'referencia'):
+        # Erro de seguimento no último ciclo da referência
+        ultimo = r.tempos >= r.tempos[-1] - 1 / getattr(controlador, 'freq', GRID_FREQ)
+        ref = controlador.referencia(r.tempos[ultimo])
+        erro = r.medidas[ultimo, 0] - ref
+        print(f"Último ciclo: erro RMS {np.sqrt(np.mean(erro ** 2)):.4f} A, "
+              f"pico medido {np.max(np.abs(r.medidas[ultimo, 0])):.3f} A (referência {args.amplitude:g} A)")
+
+    if args.grafico:
+        import matplotlib.pyplot as plt
+
+        fig, ax = plt.subplots(2, 1, sharex=True, figsize=(12, 7))
+        for i, nome in enumerate(NOMES_ESTADOS):
+            ax[0].plot(r.tempos * 1e3, r.estados[:, i], label=nome)
+        ax[0].set_ylabel('Corrente(A)/Tensão(V)')
+        ax[0].legend(loc='upper right')
+        ax[0].grid(True)
+        ax[1].plot(r.tempos * 1e3, r.modulacao)
+        ax[1].set_ylabel('Índice de modulação')
+        ax[1].set_xlabel('Tempo (ms)')
+        ax[1].grid(True)
+        plt.tight_layout()
+        plt.show()
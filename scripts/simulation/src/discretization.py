@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+GERADOR DA DISCRETIZAÇÃO do LCL (AMATRIX_C / BMATRIX_C do HIL_TOP).
+
+A partir dos componentes do filtro (plant_model.ParametrosLCL) calcula as
+matrizes discretas x[n+1] = Ad x[n] + Bd u[n] por três métodos:
+  - 'euler' : Ad = I + Ac Ts, Bd = Bc Ts (o que o HIL_TOP usa hoje)
+  - 'zoh'   : exato para entrada constante no passo, exp([[Ac, Bc], [0, 0]] Ts)
+  - 'tustin': Ad = (I - Ac Ts/2)^-1 (I + Ac Ts/2), Bd = (I - Ac Ts/2)^-1 Bc Ts
+              (forma sem termo direto: ganho DC exato com u constante)
+quantiza para Q14.28 (plant_model.para_q) e, para cada Ts candidato, avalia:
+  - estabilidade: raio espectral de Ad já quantizada
+  - polos: erro relativo de log(z)/Ts em relação aos autovalores de Ac
+  - degrau: erro máximo (% do pico de cada estado) da resposta a um degrau de
+    VDC com as matrizes quantizadas, contra a resposta contínua exata nos
+    mesmos instantes
+  - termos não nulos de A e B (MACs por passo) e ciclos de clock por passo.
+Euler e Tustin/ZOH trocam precisão por densidade: ZOH e Tustin enchem as
+matrizes (até 25 + 5 termos contra 15 + 1), o que pesa no agendamento dos MACs.
+O arredondamento de cada passo no ponto fixo não entra aqui (ver lsm_model).
+
+Por fim emite o bloco de constantes VHDL com os valores já quantizados
+(cada real é exatamente k / 2^28, então o to_fp do SolverPkg não muda nada).
+
+Exemplos:
+    python discretization.py
+    python discretization.py --ts 1e-7 5e-7 1e-6 2e-6 --duracao 0.01
+    python discretization.py --metodo zoh --ts 1e-6 --vhdl matrizes_zoh_1us.vhd
+"""
+
+import argparse
+import math
+
+import numpy as np
+
+from plant_model import (FP_FRACTION_BITS, N_IN, N_SS, NOMES_ESTADOS, VDC_VOLTAGE, ParametrosLCL,
+                         PlantaLCL, matrizes_continuas, para_q)
+
+# --- Bloco de Configuração ---
+METODOS = ('euler', 'zoh', 'tustin')
+PERIODOS_CANDIDATOS = (1e-7, 2e-7, 2.5e-7, 5e-7, 1e-6, 2e-6)
+CLK_FREQ = 250_000_000
+FP_TOTAL_BITS = 42
+
+PASSO_ANALISE_S = 10e-6        # Instantes comparados no degrau (múltiplo de todos os Ts candidatos)
+DURACAO_ANALISE_S = 5e-3
+ERRO_ACEITAVEL_PCT = 1.0       # Erro no degrau para recomendar um Ts
+
+ORDEM_PADE = 6
+
+# --- Fim do Bloco de Configuração ---
+
+
+def expm(M):
+    """Exponencial de matriz por Padé diagonal com escalonamento e quadraturas (só NumPy)."""
+    M = np.asarray(M, dtype=np.float64)
+    norma = np.linalg.norm(M, np.inf)
+    quadraturas = max(0, int(math.ceil(math.log2(norma / 0.5)))) if norma > 0.5 else 0
+    X = M / 2.0**quadraturas
+
+    q = ORDEM_PADE
+    c = 1.0
+    potencia = np.eye(M.shape[0])
+    N = np.eye(M.shape[0])
+    D = np.eye(M.shape[0])
+    for k in range(1, q + 1):
+        c *= (q - k + 1) / (k * (2 * q - k + 1))
+        potencia = potencia @ X
+        N += c * potencia
+        D += (-1)**k * c * potencia
+    E = np.linalg.solve(D, N)
+    for _ in range(quadraturas):
+        E = E @ E
+    return E
+
+
+def discretizar(Ac, Bc, ts, metodo):
+    """(Ad, Bd) em ponto flutuante para o passo 'ts'."""
+    n, m = Bc.shape
+    if metodo == 'euler':
+        return np.eye(n) + Ac * ts, Bc * ts
+    if metodo == 'zoh':
+        aumentada = np.zeros((n + m, n + m))
+        aumentada[:n, :n] = Ac
+        aumentada[:n, n:] = Bc
+        E = expm(aumentada * ts)
+        return E[:n, :n], E[:n, n:]
+    if metodo == 'tustin':
+        esquerda = np.eye(n) - Ac * ts / 2
+        return np.linalg.solve(esquerda, np.eye(n) + Ac * ts / 2), np.linalg.solve(esquerda, Bc * ts)
+    raise ValueError(f"Método '{metodo}' inválido; use um de {METODOS}.")
+
+
+def quantizar(Ad, Bd, bits_fracao=FP_FRACTION_BITS, largura_bits=FP_TOTAL_BITS):
+    """(Aq, Bq) inteiros Q14.28; levanta ValueError se algum coeficiente não couber."""
+    limite = 2**(largura_bits - 1)
+    Aq, Bq = para_q(Ad, bits_fracao), para_q(Bd, bits_fracao)
+    for nome, q in (('A', Aq), ('B', Bq)):
+        if np.any(q >= limite) or np.any(q < -limite):
+            raise ValueError(f"Coeficiente de {nome} fora do Q{largura_bits - bits_fracao}.{bits_fracao}.")
+    return Aq, Bq
+
+
+def literal_vhdl(q, bits_fracao=FP_FRACTION_BITS):
+    """to_fp(...) com o real exatamente igual a q / 2^bits_fracao (17 algarismos)."""
+    return 'to_fp(0.0)' if q == 0 else f'to_fp({float(q) / 2.0**bits_fracao:.16e})'
+
+
+def _erro_polos(Ad, Ac, ts):
+    """Maior erro relativo entre os polos equivalentes log(z)/Ts e os autovalores de Ac."""
+    s = np.log(np.linalg.eigvals(Ad).astype(complex)) / ts
+    lambdas = list(np.linalg.eigvals(Ac))
+    erro = 0.0
+    for si in s:
+        k = int(np.argmin([abs(si - l) for l in lambdas]))
+        l = lambdas.pop(k)
+        erro = max(erro, abs(si - l) / max(abs(l), 1.0))
+    return erro
+
+
+def _resposta_degrau(A, B, passos_por_amostra, num_amostras, u):
+    """Estados a cada 'passos_por_amostra' passos com entrada constante u."""
+    planta = PlantaLCL(A=A, B=B, tamanho_tabela=passos_por_amostra)
+    phi, gamma = planta.transicao(passos_por_amostra)
+    x = np.zeros(A.shape[0])
+    saida = np.empty((num_amostras, A.shape[0]))
+    for k in range(num_amostras):
+        x = phi @ x + gamma @ u
+        saida[k] = x
+    return saida
+
+
+class Discretizacao:
+    """Matrizes discretas e quantizadas de um método para um Ts."""
+
+    def __init__(self, metodo, ts, parametros=None):
+        self.metodo = metodo
+        self.ts = ts
+        self.parametros = (parametros or ParametrosLCL()).copiar(ts=ts)
+        self.Ac, self.Bc = matrizes_continuas(self.parametros)
+        self.Ad, self.Bd = discretizar(self.Ac, self.Bc, ts, metodo)
+        self.Aq, self.Bq = quantizar(self.Ad, self.Bd)
+
+    @property
+    def matrizes_quantizadas(self):
+        """(A, B) em ponto flutuante com os valores exatos do Q14.28."""
+        escala = 2.0**FP_FRACTION_BITS
+        return self.Aq / escala, self.Bq / escala
+
+    @property
+    def raio_espectral(self):
+        return float(np.max(np.abs(np.linalg.eigvals(self.matrizes_quantizadas[0]))))
+
+    @property
+    def termos_nao_nulos(self):
+        return int(np.count_nonzero(self.Aq)), int(np.count_nonzero(self.Bq))
+
+    @property
+    def ciclos_por_passo(self):
+        return int(round(self.ts * CLK_FREQ))
+
+    def analisar(self, duracao_s=DURACAO_ANALISE_S, passo_analise_s=PASSO_ANALISE_S, vdc=VDC_VOLTAGE):
+        """
+        Dicionário com raio espectral, erro dos polos e erro do degrau
+        (por estado, em % do pico da resposta contínua).
+        """
+        passos_por_amostra = int(round(passo_analise_s / self.ts))
+        if abs(passos_por_amostra * self.ts - passo_analise_s) > 1e-6 * passo_analise_s:
+            raise ValueError(f"Ts = {self.ts:g} s não divide o passo de análise de {passo_analise_s:g} s.")
+        num_amostras = int(round(duracao_s / passo_analise_s))
+        u = np.zeros(N_IN)
+        u[0] = vdc
+
+        A, B = self.matrizes_quantizadas
+        raio = self.raio_espectral
+        resultado = {'raio_espectral': raio, 'estavel': raio < 1.0,
+                     'erro_polos': _erro_polos(A, self.Ac, self.ts) if raio > 0 else float('inf')}
+        # Referência: ZOH em ponto flutuante no passo de análise (exato para o degrau)
+        Ar, Br = discretizar(self.Ac, self.Bc, passo_analise_s, 'zoh')
+        referencia = _resposta_degrau(Ar, Br, 1, num_amostras, u)
+        if resultado['estavel']:
+            discreta = _resposta_degrau(A, B, passos_por_amostra, num_amostras, u)
+            pico = np.maximum(np.max(np.abs(referencia), axis=0), 1e-12)
+            resultado['erro_degrau_pct'] = np.max(np.abs(discreta - referencia), axis=0) / pico * 100
+        else:
+            resultado['erro_degrau_pct'] = np.full(N_SS, np.inf)
+        return resultado
+
+    def bloco_vhdl(self):
+        """Constantes AMATRIX_C/BMATRIX_C no formato do HIL_TOP."""
+        def linhas(Q):
+            corpo = [f"        ({', '.join(literal_vhdl(int(q)) for q in linha)})" for linha in Q]
+            return ',\n'.join(corpo)
+
+        nz_a, nz_b = self.termos_nao_nulos
+        return '\n'.join([
+            f"    -- Gerado por scripts/simulation/src/discretization.py: método '{self.metodo}', "
+            f"Ts = {self.ts:g} s",
+            f"    -- Use com SIMUL_PERIOD := {self.ts:.1e} ({self.ciclos_por_passo} ciclos por passo); "
+            f"{nz_a} + {nz_b} termos não nulos",
+            "    constant AMATRIX_C : matrix_fp_t(0 to N_SS - 1, 0 to N_SS - 1) := (",
+            linhas(self.Aq),
+            "    );",
+            "    constant BMATRIX_C : matrix_fp_t(0 to N_SS - 1, 0 to N_IN - 1) := (",
+            linhas(self.Bq),
+            "    );",
+        ])
+
+
+def comparar(metodos=METODOS, periodos=PERIODOS_CANDIDATOS, parametros=None, **kw):
+    """[(Discretizacao, analise)] para cada combinação; as que não cabem no Q14.28 ficam de fora."""
+    resultados = []
+    for metodo in metodos:
+        for ts in periodos:
+            try:
+                d = Discretizacao(metodo, ts, parametros)
+            except ValueError as e:
+                print(f"  {metodo} @ {ts:g} s: {e}")
+                continue
+            resultados.append((d, d.analisar(**kw)))
+    return resultados
+
+
+def _imprimir_tabela(resultados):
+    print(f"{'método':>7} {'Ts':>8} {'ciclos':>6} {'raio espectral':>16} {'erro polos':>11} "
+          f"{'erro degrau':>12} {'pior estado':>11} {'termos A+B':>10}")
+    for d, r in resultados:
+        erro = r['erro_degrau_pct']
+        pior = int(np.argmax(erro))
+        nz_a, nz_b = d.termos_nao_nulos
+        print(f"{d.metodo:>7} {d.ts * 1e9:6.0f}ns {d.ciclos_por_passo:6d} {r['raio_espectral']:16.12f} "
+              f"{r['erro_polos']:11.2e} {erro[pior]:11.4f}% {NOMES_ESTADOS[pior]:>11} {nz_a:6d}+{nz_b}")
+
+
+def _recomendacao(resultados, erro_aceitavel_pct=ERRO_ACEITAVEL_PCT):
+    """Maior Ts estável com erro no degrau abaixo do aceitável, por método."""
+    melhores = {}
+    for d, r in resultados:
+        if r['estavel'] and np.max(r['erro_degrau_pct']) <= erro_aceitavel_pct:
+            if d.metodo not in melhores or d.ts > melhores[d.metodo].ts:
+                melhores[d.metodo] = d
+    return melhores
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Discretização do LCL do HIL_TOP (Euler, ZOH, Tustin) em Q14.28.')
+    parser.add_argument('--metodo', choices=METODOS, nargs='+', default=list(METODOS))
+    parser.add_argument('--ts', type=float, nargs='+', default=list(PERIODOS_CANDIDATOS),
+                        help='passos candidatos (s); devem dividir --passo-analise')
+    parser.add_argument('--duracao', type=float, default=DURACAO_ANALISE_S, help='duração do degrau analisado (s)')
+    parser.add_argument('--passo-analise', type=float, default=PASSO_ANALISE_S,
+                        help='intervalo entre os instantes comparados (s)')
+    parser.add_argument('--erro-aceitavel', type=float, default=ERRO_ACEITAVEL_PCT, help='erro no degrau (%%)')
+    parser.add_argument('--vhdl', help='grava o bloco de constantes (exige um único --metodo e um único --ts)')
+    args = parser.parse_args()
+
+    if args.vhdl and (len(args.metodo) != 1 or len(args.ts) != 1):
+        parser.error('--vhdl exige exatamente um --metodo e um --ts.')
+
+    Ac, _ = matrizes_continuas(ParametrosLCL())
+    print('Polos contínuos:', ', '.join(f"{l.real:.0f}{l.imag:+.0f}j" for l in sorted(np.linalg.eigvals(Ac),
+                                                                                    key=lambda v: abs(v))))
+    print(f"Degrau de {VDC_VOLTAGE} V por {args.duracao * 1e3:g} ms, comparado a cada "
+          f"{args.passo_analise * 1e6:g} µs com a resposta contínua exata\n")
+    resultados = comparar(args.metodo, args.ts, duracao_s=args.duracao, passo_analise_s=args.passo_analise)
+    _imprimir_tabela(resultados)
+
+    melhores = _recomendacao(resultados, args.erro_aceitavel)
+    print(f"\nMaior Ts com erro <= {args.erro_aceitavel:g}%:")
+    for metodo in args.metodo:
+        d = melhores.get(metodo)
+        print(f"  {metodo:>7}: " + (f"{d.ts * 1e9:.0f} ns ({d.ciclos_por_passo} ciclos por passo)" if d
+                                    else 'nenhum dos candidatos'))
+
+    if args.vhdl:
+        d = Discretizacao(args.metodo[0], args.ts[0])
+        with open(args.vhdl, 'w', encoding='utf-8') as f:
+            f.write(d.bloco_vhdl() + '\n')
+        print(f"\nBloco VHDL gravado em {args.vhdl}")
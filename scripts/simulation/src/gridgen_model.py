@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+MODELO BIT-EXATO DO GridGen (modules/grid_generator) e relatório de pureza espectral.
+
+Reproduz o GridGen.vhd:
+  - FREQ_RATIO_SCALED = integer(GRID_FREQ * 1000 / CLK_FREQ * 2^32) (arredondado)
+  - PHASE_INCREMENT = FREQ_RATIO_SCALED / 1000 (divisão inteira: trunca)
+  - acumulador de fase de 32 bits; endereço da LUT = 8 bits mais significativos
+  - SINE_LUT de 256 posições, signed(15 downto 0)
+  - sine_from_lut * GRID_PEAK_FP em dois registradores e shift_right(..., 15)
+    (arredondamento para baixo) redimensionado para Q14.28
+
+Saída após a borda n (n = 0 na primeira borda com reset_n = '1'):
+    grid_voltage_o(n) = (SINE_LUT[fase((n - 4) * PHASE_INCREMENT)] * GRID_PEAK_FP) >> 15
+As 4 primeiras bordas repetem o conteúdo do pipeline, que o reset não inicializa
+('U' no simulador); o modelo as devolve como 0.
+
+Como a saída só depende de n, qualquer decimação é calculada diretamente nos
+índices pedidos, sem laço por clock. O relatório usa FFT com janela
+Blackman-Harris sobre registros longos e varre tamanho da LUT e largura do
+acumulador.
+
+Exemplos:
+    python gridgen_model.py
+    python gridgen_model.py --freq 60 --varredura
+    python gridgen_model.py --validar
+"""
+
+import argparse
+import os
+import re
+import time
+
+import numpy as np
+
+# --- Bloco de Configuração (generics padrão do GridGen) ---
+CLK_FREQ = 250_000_000
+GRID_FREQ = 50.0
+GRID_PEAK_VOLTAGE = 311.13
+
+LUT_ADDR_WIDTH = 8
+PHASE_ACC_WIDTH = 32
+SCALE_FACTOR = 1000
+LUT_DATA_BITS = 16
+SHIFT_PRODUTO = 15
+FP_FRACTION_BITS = 28
+LATENCIA_CLOCKS = 4         # acumulador -> endereço -> LUT -> produto -> produto2 -> saída
+
+# --- Relatório espectral ---
+TAXA_ANALISE_HZ = 100_000   # Taxa (aproximada) das amostras decimadas usadas na FFT
+AMOSTRAS_FFT = 2**20
+NUM_HARMONICOS = 50
+MEIA_LARGURA_LOBULO = 6     # Bins somados de cada lado de um tom (lóbulo da Blackman-Harris)
+
+ARQUIVO_VHDL = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..',
+                            'modules', 'grid_generator', 'src', 'GridGen.vhd')
+
+# --- Fim do Bloco de Configuração ---
+
+
+def _arredondar_vhdl(x):
+    """Conversão integer(real) do VHDL: mais próximo, empate para longe do zero."""
+    return np.where(x >= 0, np.floor(x + 0.5), np.ceil(x - 0.5)).astype(np.int64)
+
+
+def tabela_seno(lut_addr_width=LUT_ADDR_WIDTH, bits=LUT_DATA_BITS):
+    """SINE_LUT: round((2^(bits-1) - 1) * sin(2*pi*k/N)), a mesma regra da tabela do VHDL."""
+    tamanho = 2**lut_addr_width
+    return _arredondar_vhdl((2**(bits - 1) - 1) * np.sin(2 * np.pi * np.arange(tamanho) / tamanho))
+
+
+def ler_tabela_vhdl(caminho=ARQUIVO_VHDL):
+    """Extrai a SINE_LUT literal do GridGen.vhd."""
+    with open(caminho, encoding='utf-8', errors='replace') as f:
+        texto = f.read()
+    bloco = texto[texto.index('SINE_LUT : sine_lut_t'):]
+    bloco = bloco[:bloco.index(');\n')]
+    return np.array([int(v) for v in re.findall(r'to_signed\((-?\d+),\s*16\)', bloco)], dtype=np.int64)
+
+
+class ParametrosGridGen:
+    """Generics do GridGen e as constantes derivadas com a aritmética do VHDL."""
+
+    def __init__(self, clk_freq=CLK_FREQ, grid_freq=GRID_FREQ, grid_peak=GRID_PEAK_VOLTAGE,
+                 lut_addr_width=LUT_ADDR_WIDTH, phase_acc_width=PHASE_ACC_WIDTH,
+                 lut=None, fp_fraction_bits=FP_FRACTION_BITS):
+        self.clk_freq = clk_freq
+        self.grid_freq = grid_freq
+        self.grid_peak = grid_peak
+        self.lut_addr_width = lut_addr_width
+        self.phase_acc_width = phase_acc_width
+        self.fp_fraction_bits = fp_fraction_bits
+
+        # Mesma expressão do VHDL, generalizada para outras larguras de acumulador
+        self.freq_ratio_scaled = int(_arredondar_vhdl(
+            np.float64(grid_freq * SCALE_FACTOR) / clk_freq * float(2**phase_acc_width)))
+        self.phase_increment = self.freq_ratio_scaled // SCALE_FACTOR
+        # to_fp do SolverPkg: mais próximo em Q.FP_FRACTION_BITS
+        self.grid_peak_fp = int(_arredondar_vhdl(np.float64(grid_peak) * 2**fp_fraction_bits))
+        self.lut = tabela_seno(lut_addr_width) if lut is None else np.asarray(lut, dtype=np.int64)
+
+    @property
+    def freq_real(self):
+        return self.phase_increment * self.clk_freq / 2**self.phase_acc_width
+
+    @property
+    def incremento_ideal(self):
+        """Incremento arredondado direto (sem a divisão por SCALE_FACTOR), para comparação."""
+        return int(round(self.grid_freq * 2**self.phase_acc_width / self.clk_freq))
+
+    def __repr__(self):
+        return (f"GridGen(clk={self.clk_freq / 1e6:g} MHz, f={self.grid_freq:g} Hz, pico={self.grid_peak:g} V, "
+                f"LUT={2**self.lut_addr_width}, acumulador={self.phase_acc_width} bits)")
+
+
+def saida_q(p, clocks):
+    """grid_voltage_o (inteiro Q14.28) após as bordas 'clocks' (vetor de inteiros >= 0)."""
+    n = np.asarray(clocks, dtype=np.int64)
+    mascara = np.uint64(2**p.phase_acc_width - 1)
+    # Produto em uint64 dá a fase módulo 2^64; a máscara reduz ao acumulador (2^w divide 2^64)
+    fase = ((n - LATENCIA_CLOCKS).astype(np.uint64) * np.uint64(p.phase_increment)) & mascara
+    endereco = (fase >> np.uint64(p.phase_acc_width - p.lut_addr_width)).astype(np.int64)
+    # |LUT| < 2^15 e GRID_PEAK_FP < 2^40: o produto cabe em int64
+    valor = (p.lut[endereco] * p.grid_peak_fp) >> SHIFT_PRODUTO
+    return np.where(n >= LATENCIA_CLOCKS, valor, 0)
+
+
+def saida_decimada(p, decimacao, num_amostras, clock_inicial=0):
+    """Saída amostrada a cada 'decimacao' clocks (bit-exata)."""
+    return saida_q(p, clock_inicial + np.arange(num_amostras, dtype=np.int64) * decimacao)
+
+
+def saida_media(p, decimacao, num_amostras):
+    """
+    Média (em volts) da saída em janelas de 'decimacao' clocks a partir da
+    primeira saída válida: o equivalente a um filtro de média móvel antes da
+    amostragem, que evita dobrar as imagens da LUT sobre os harmônicos.
+
+    A saída é uma escada: o degrau j (endereço j mod LUT) começa em
+    m_j = ceil(j * 2^(W-L) / PHASE_INCREMENT) clocks, então a integral é
+    acumulada por degrau, não por clock.
+    """
+    passo_endereco = 2**(p.phase_acc_width - p.lut_addr_width)
+    fim = num_amostras * decimacao
+    ultimo_degrau = fim * p.phase_increment // passo_endereco + 1
+    j = np.arange(ultimo_degrau + 1, dtype=np.int64)
+    inicio = -(-j * passo_endereco // p.phase_increment)
+    niveis = (p.lut[j % len(p.lut)] * p.grid_peak_fp >> SHIFT_PRODUTO) \
+        / 2**p.fp_fraction_bits
+    acumulado = np.concatenate(([0.0], np.cumsum(niveis[:-1] * np.diff(inicio))))
+
+    def integral(m):
+        # Degrau ativo em m: o último j com m_j <= m (degraus vazios são pulados pelo searchsorted)
+        k = np.searchsorted(inicio, m, side='right') - 1
+        return acumulado[k] + niveis[k] * (m - inicio[k])
+
+    limites = np.arange(num_amostras + 1, dtype=np.int64) * decimacao
+    return np.diff(integral(limites)) / decimacao
+
+
+def referencia_por_clock(p, num_clocks):
+    """Simulação registrador a registrador (lenta), usada só na validação."""
+    mascara = 2**p.phase_acc_width - 1
+    desloc = p.phase_acc_width - p.lut_addr_width
+    acc, endereco, seno, produto, produto2 = 0, None, None, None, None
+    saida = np.zeros(num_clocks, dtype=np.int64)
+    for n in range(num_clocks):
+        novo_saida = (produto2 >> SHIFT_PRODUTO) if produto2 is not None else 0
+        produto2, produto = produto, (seno * p.grid_peak_fp if seno is not None else None)
+        seno = int(p.lut[endereco]) if endereco is not None else None
+        endereco = acc >> desloc
+        acc = (acc + p.phase_increment) & mascara
+        saida[n] = novo_saida
+    return saida
+
+
+def _janela_blackman_harris(n):
+    a = (0.35875, 0.48829, 0.14128, 0.01168)
+    k = 2 * np.pi * np.arange(n) / n
+    return a[0] - a[1] * np.cos(k) + a[2] * np.cos(2 * k) - a[3] * np.cos(3 * k)
+
+
+def _bin_dobrado(freq, fs, num_amostras):
+    """Bin da FFT onde cai um tom de frequência 'freq' após o aliasing pela taxa fs."""
+    f = np.mod(freq, fs)
+    f = np.minimum(f, fs - f)
+    return int(round(f / fs * num_amostras))
+
+
+def analisar_espectro(p, taxa_hz=TAXA_ANALISE_HZ, num_amostras=AMOSTRAS_FFT,
+                      num_harmonicos=NUM_HARMONICOS, modo='medio'):
+    """
+    FFT da saída decimada. Retorna um dicionário com frequência, amplitude,
+    THD, SFDR e os maiores espúrios.
+
+    modo 'medio' usa saida_media (imagens da LUT atenuadas, THD da forma de
+    onda real); 'amostrado' usa as amostras bit-exatas, incluindo o aliasing
+    que um amostrador sem filtro veria.
+    """
+    decimacao = max(1, int(round(p.clk_freq / taxa_hz)))
+    fs = p.clk_freq / decimacao
+    if modo == 'medio':
+        x = saida_media(p, decimacao, num_amostras)
+    else:
+        # A partir da primeira saída válida, fora do pipeline de reset
+        x = saida_decimada(p, decimacao, num_amostras, clock_inicial=LATENCIA_CLOCKS) / 2**p.fp_fraction_bits
+
+    janela = _janela_blackman_harris(num_amostras)
+    espectro = np.abs(np.fft.rfft((x - x.mean()) * janela)) ** 2
+    freqs = np.fft.rfftfreq(num_amostras, 1 / fs)
+
+    def potencia_em(b):
+        return espectro[max(b - MEIA_LARGURA_LOBULO, 1):b + MEIA_LARGURA_LOBULO + 1].sum()
+
+    b1 = int(np.argmax(espectro[1:])) + 1
+    p1 = potencia_em(b1)
+    # Frequência medida por interpolação (centroide do lóbulo principal)
+    lobulo = slice(max(b1 - MEIA_LARGURA_LOBULO, 1), b1 + MEIA_LARGURA_LOBULO + 1)
+    freq_medida = float(np.sum(freqs[lobulo] * espectro[lobulo]) / np.sum(espectro[lobulo]))
+
+    ocupados = {b1}
+    p_harm = 0.0
+    for h in range(2, num_harmonicos + 1):
+        b = _bin_dobrado(h * p.freq_real, fs, num_amostras)
+        if all(abs(b - o) > 2 * MEIA_LARGURA_LOBULO for o in ocupados):
+            p_harm += potencia_em(b)
+            ocupados.add(b)
+
+    # Espúrios: picos locais fora do lóbulo da fundamental e do DC
+    resto = espectro.copy()
+    resto[:2 * MEIA_LARGURA_LOBULO + 1] = 0
+    resto[max(b1 - 2 * MEIA_LARGURA_LOBULO, 0):b1 + 2 * MEIA_LARGURA_LOBULO + 1] = 0
+    picos = []
+    for _ in range(5):
+        b = int(np.argmax(resto))
+        if resto[b] <= 0:
+            break
+        picos.append((float(freqs[b]), 10 * np.log10(potencia_em(b) / p1)))
+        resto[max(b - MEIA_LARGURA_LOBULO, 0):b + MEIA_LARGURA_LOBULO + 1] = 0
+
+    return {
+        'freq_real': p.freq_real,
+        'erro_freq_hz': p.freq_real - p.grid_freq,
+        'freq_medida': freq_medida,
+        'pico_v': float(np.max(np.abs(x))),
+        'thd_pct': 100 * np.sqrt(p_harm / p1),
+        'sfdr_dbc': -picos[0][1] if picos else np.inf,
+        'espurios': picos,
+        'taxa_hz': fs,
+        'duracao_s': num_amostras / fs,
+    }
+
+
+def varredura(base, tamanhos_lut=(6, 7, 8, 9, 10, 12), larguras_acumulador=(24, 28, 32, 40, 48), **kw):
+    """Relatórios para combinações de LUT e acumulador (mantendo clk, frequência e pico)."""
+    linhas = []
+    for bits_lut in tamanhos_lut:
+        p = ParametrosGridGen(base.clk_freq, base.grid_freq, base.grid_peak, bits_lut, base.phase_acc_width)
+        linhas.append(('LUT', 2**bits_lut, p, analisar_espectro(p, **kw)))
+    for largura in larguras_acumulador:
+        p = ParametrosGridGen(base.clk_freq, base.grid_freq, base.grid_peak, base.lut_addr_width, largura)
+        linhas.append(('acumulador', largura, p, analisar_espectro(p, **kw)))
+    return linhas
+
+
+def validar(p, num_clocks=200_000):
+    """Confere a LUT com o VHDL e a saída vetorizada (também decimada) com a referência por clock."""
+    resultados = {}
+    if os.path.exists(ARQUIVO_VHDL) and p.lut_addr_width == LUT_ADDR_WIDTH:
+        resultados['LUT igual ao GridGen.vhd'] = np.array_equal(ler_tabela_vhdl(), p.lut)
+    ref = referencia_por_clock(p, num_clocks)
+    resultados['saída por clock'] = np.array_equal(saida_q(p, np.arange(num_clocks)), ref)
+    resultados['saída decimada (7)'] = np.array_equal(saida_decimada(p, 7, num_clocks // 7, 3), ref[3::7][:num_clocks // 7])
+    validos = ref[LATENCIA_CLOCKS:LATENCIA_CLOCKS + (num_clocks - LATENCIA_CLOCKS) // 10 * 10]
+    media_ref = validos.reshape(-1, 10).mean(axis=1) / 2**p.fp_fraction_bits
+    resultados['média por janela (10)'] = np.allclose(saida_media(p, 10, len(media_ref)), media_ref,
+                                                       rtol=0, atol=1e-9)
+    return resultados
+
+
+def _imprimir_relatorio(r):
+    print(f"  Frequência: {r['freq_real']:.6f} Hz (erro {r['erro_freq_hz']:+.6f} Hz, "
+          f"{r['erro_freq_hz'] / (r['freq_real'] - r['erro_freq_hz']) * 1e6:+.0f} ppm); "
+          f"medida na FFT {r['freq_medida']:.4f} Hz")
+    print(f"  Pico: {r['pico_v']:.4f} V | THD {r['thd_pct']:.4f} % | SFDR {r['sfdr_dbc']:.1f} dBc "
+          f"(FFT de {r['duracao_s']:.1f} s a {r['taxa_hz'] / 1e3:.1f} kHz)")
+    for f, dbc in r['espurios']:
+        print(f"    espúrio {f:10.2f} Hz: {dbc:7.1f} dBc")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Modelo bit-exato e pureza espectral do GridGen.')
+    parser.add_argument('--clk-freq', type=int, default=CLK_FREQ)
+    parser.add_argument('--freq', type=float, default=GRID_FREQ)
+    parser.add_argument('--pico', type=float, default=GRID_PEAK_VOLTAGE)
+    parser.add_argument('--lut-bits', type=int, default=LUT_ADDR_WIDTH)
+    parser.add_argument('--acumulador', type=int, default=PHASE_ACC_WIDTH)
+    parser.add_argument('--taxa', type=float, default=TAXA_ANALISE_HZ, help='taxa das amostras da FFT (Hz)')
+    parser.add_argument('--amostras', type=int, default=AMOSTRAS_FFT)
+    parser.add_argument('--modo', choices=('medio', 'amostrado'), default='medio',
+                        help="'medio' filtra por média na janela de decimação; 'amostrado' mostra o aliasing")
+    parser.add_argument('--varredura', action='store_true', help='varre tamanho da LUT e largura do acumulador')
+    parser.add_argument('--validar', action='store_true', help='compara com a LUT do VHDL e a referência por clock')
+    args = parser.parse_args()
+
+    p = ParametrosGridGen(args.clk_freq, args.freq, args.pico, args.lut_bits, args.acumulador)
+    print(p)
+    print(f"  FREQ_RATIO_SCALED = {p.freq_ratio_scaled}, PHASE_INCREMENT = {p.phase_increment} "
+          f"(arredondado direto seria {p.incremento_ideal} -> "
+          f"{p.incremento_ideal * p.clk_freq / 2**p.phase_acc_width:.6f} Hz)")
+    print(f"  GRID_PEAK_FP = {p.grid_peak_fp}")
+
+    if args.validar:
+        t = time.perf_counter()
+        for nome, ok in validar(p).items():
+            print(f"  Validação - {nome}: {'OK' if ok else 'DIVERGENTE'}")
+        print(f"  ({time.perf_counter() - t:.2f} s)")
+
+    t = time.perf_counter()
+    relatorio = analisar_espectro(p, args.taxa, args.amostras, modo=args.modo)
+    print(f"\nEspectro ({time.perf_counter() - t:.2f} s):")
+    _imprimir_relatorio(relatorio)
+
+    if args.varredura:
+        print(f"\n{'Variação':>18} | {'incremento':>10} | {'f real (Hz)':>12} | {'erro (ppm)':>10} | "
+              f"{'THD (%)':>9} | {'SFDR (dBc)':>10}")
+        for tipo, valor, q, r in varredura(p, taxa_hz=args.taxa, num_amostras=args.amostras, modo=args.modo):
+            rotulo = f"LUT {valor}" if tipo == 'LUT' else f"acumulador {valor} b"
+            print(f"{rotulo:>18} | {q.phase_increment:>10} | {r['freq_real']:12.6f} | "
+                  f"{r['erro_freq_hz'] / q.grid_freq * 1e6:10.0f} | {r['thd_pct']:9.4f} | {r['sfdr_dbc']:10.1f}")
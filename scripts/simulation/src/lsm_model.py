@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+MODELO EM PONTO FIXO do LinearSolverManager (um passo por init_calc_i):
+    x[n+1] = A x[n] + B u[n]   em Q14.28 (FP_TOTAL_BITS = 42)
+
+O código do LinearSolverManager/SolverPkg não está neste repositório, então a
+aritmética abaixo é uma SUPOSIÇÃO, não uma transcrição do RTL:
+  - coeficientes: to_fp arredonda para o inteiro mais próximo (plant_model.para_q)
+  - cada produto a_ij * x_j (até 84 bits) é deslocado FP_FRACTION_BITS para a
+    direita antes da soma (ACUMULACAO = 'produto'), por truncamento (shift
+    aritmético, ou seja, floor)
+  - a soma é reduzida a FP_TOTAL_BITS com wrap em complemento de 2
+As alternativas 'soma' (acumula os produtos completos e desloca uma vez) e
+arredondamento ao mais próximo estão disponíveis: se o rtl_checker acusar
+divergência de 1 LSB logo nos primeiros passos, teste as combinações antes de
+suspeitar do RTL.
+
+As contas usam inteiros do Python (precisão arbitrária), só com os termos não
+nulos de A e B; a saída é gerada em blocos (int64) para memória constante.
+
+Exemplos:
+    python lsm_model.py --passos 200000
+    python lsm_model.py --passos 200000 --acumulacao soma --arredondamento mais_proximo
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from plant_model import FP_FRACTION_BITS, N_SS, NOMES_ESTADOS, matrizes_hil, para_q
+
+# --- Bloco de Configuração ---
+FP_TOTAL_BITS = 42
+ACUMULACAO = 'produto'        # 'produto': desloca cada produto | 'soma': desloca a soma
+ARREDONDAMENTO = 'truncar'    # 'truncar' (floor) | 'mais_proximo' (+meio LSB antes do shift)
+PASSOS_POR_BLOCO = 65536
+
+# Alinhamento com o tb_HIL_TOP (estimados do testbench; ajustáveis pela linha de comando)
+DEFASAGEM_SPWM_CICLOS = 100   # rst_tb do SPWM_TOP solto após 100 clocks
+CICLO_PRIMEIRO_PASSO = 126    # 1º start_signal: reset do HIL_TOP (RESET_TRSHD + 1) + START_PERIOD
+
+MODOS_ACUMULACAO = ('produto', 'soma')
+MODOS_ARREDONDAMENTO = ('truncar', 'mais_proximo')
+
+# --- Fim do Bloco de Configuração ---
+
+
+def ajustar_largura(valores, largura_bits=FP_TOTAL_BITS):
+    """Wrap em complemento de 2 para 'largura_bits' (int64, vetorizado)."""
+    valores = np.asarray(valores, dtype=np.int64)
+    deslocamento = 64 - largura_bits
+    return (valores << deslocamento) >> deslocamento
+
+
+class ModeloLSM:
+    """Passo do LinearSolverManager em inteiros Q14.28 (ver suposições no topo do módulo)."""
+
+    def __init__(self, Aq=None, Bq=None, x0q=None, bits_fracao=FP_FRACTION_BITS, largura_bits=FP_TOTAL_BITS,
+                 acumulacao=ACUMULACAO, arredondamento=ARREDONDAMENTO):
+        if acumulacao not in MODOS_ACUMULACAO:
+            raise ValueError(f"Acumulação '{acumulacao}' inválida; use uma de {MODOS_ACUMULACAO}.")
+        if arredondamento not in MODOS_ARREDONDAMENTO:
+            raise ValueError(f"Arredondamento '{arredondamento}' inválido; use um de {MODOS_ARREDONDAMENTO}.")
+        if Aq is None or Bq is None:
+            A, B = matrizes_hil()
+            Aq, Bq = para_q(A, bits_fracao), para_q(B, bits_fracao)
+        self.Aq = np.asarray(Aq, dtype=np.int64)
+        self.Bq = np.asarray(Bq, dtype=np.int64)
+        self.x0q = np.zeros(N_SS, dtype=np.int64) if x0q is None else np.asarray(x0q, dtype=np.int64)
+        self.bits_fracao = bits_fracao
+        self.largura_bits = largura_bits
+        self.acumulacao = acumulacao
+        self.arredondamento = arredondamento
+
+        # Termos não nulos por linha: [(j, a_ij)] de A e [(j, b_ij)] de B
+        self._linhas = [([(j, int(a)) for j, a in enumerate(self.Aq[i]) if a],
+                         [(j, int(b)) for j, b in enumerate(self.Bq[i]) if b])
+                        for i in range(self.Aq.shape[0])]
+        self._bloco = self._compilar_bloco()
+        self.reiniciar()
+
+    def reiniciar(self, x=None):
+        """Volta ao estado inicial (Xvec_initial) ou a um estado dado."""
+        self.x = [int(v) for v in (self.x0q if x is None else x)]
+        self.passo = 0
+
+    def _compilar_bloco(self):
+        """
+        Gera o laço de um bloco com os coeficientes não nulos escritos no
+        código (sem indexação nem laços internos por passo).
+
+        Por que exec: o passo é recursivo (não vetoriza entre passos) e os
+        produtos de até 84 bits não cabem em int64, então cada passo roda em
+        inteiros do Python. O mesmo laço com listas de termos e sum() leva
+        ~3,5x mais (2,6 s contra 0,74 s em 200 mil passos), e os dumps do
+        tb_HIL_TOP têm dezenas de milhões de passos. O código gerado só tem
+        nomes fixos e os inteiros de Aq/Bq; test_lsm_model.py confere o bloco
+        contra o passo com laços comuns em todas as variantes.
+        """
+        f = self.bits_fracao
+        meio_lsb = f" + {1 << (f - 1)}" if self.arredondamento == 'mais_proximo' else ''
+        meio, mascara = 1 << (self.largura_bits - 1), (1 << self.largura_bits) - 1
+        n = len(self._linhas)
+        xs = ', '.join(f'x{i}' for i in range(n))
+        us = ', '.join(f'u{j}' for j in range(self.Bq.shape[1]))
+        codigo = ["def _bloco(x, u):",
+                  f"    {xs}, = x",
+                  "    saida = []",
+                  f"    for {us}, in u:",
+                  f"        saida.append(({xs},))"]
+        for i, (termos_x, termos_u) in enumerate(self._linhas):
+            produtos = [f"{a} * x{j}" for j, a in termos_x] + [f"{b} * u{j}" for j, b in termos_u]
+            if not produtos:
+                soma = '0'
+            elif self.acumulacao == 'produto':
+                soma = ' + '.join(f"(({p}{meio_lsb}) >> {f})" for p in produtos)
+            else:
+                soma = f"(({' + '.join(produtos)}{meio_lsb}) >> {f})"
+            codigo.append(f"        n{i} = (({soma}) + {meio} & {mascara}) - {meio}")
+        codigo.append(f"        {xs}, = {', '.join(f'n{i}' for i in range(n))},")
+        codigo.append(f"    return [{xs}], saida")
+        escopo = {}
+        exec('\n'.join(codigo), escopo)
+        return escopo['_bloco']
+
+    def avancar(self, u):
+        """
+        Aplica um passo para cada linha de u (int64, shape (n,) só com Uvector(0) ou (n, N_IN))
+        e retorna os estados ANTES de cada passo, shape (n, N_SS): x[passo .. passo+n-1].
+        """
+        u = np.asarray(u, dtype=np.int64)
+        if u.ndim == 1:
+            u = np.column_stack([u, np.zeros_like(u)])
+        self.x, saida = self._bloco(self.x, u.tolist())
+        self.passo += len(u)
+        return np.array(saida, dtype=np.int64).reshape(len(u), len(self.x))
+
+    def em_blocos(self, entradas, num_passos, passos_por_bloco=PASSOS_POR_BLOCO):
+        """
+        Gera (passo_inicial, estados[n, N_SS]) a partir do estado atual.
+        entradas(passo_inicial, n) -> Uvector em Q14.28 para os passos pedidos.
+        """
+        fim = self.passo + int(num_passos)
+        while self.passo < fim:
+            inicio = self.passo
+            n = min(passos_por_bloco, fim - inicio)
+            yield inicio, self.avancar(entradas(inicio, n))
+
+
+def entradas_spwm(spwm=None, hil=None, defasagem_ciclos=DEFASAGEM_SPWM_CICLOS):
+    """
+    Uvector(0) por passo (Q14.28) para o SPWM_TOP do tb_HIL_TOP ligado ao PMOD6:
+    função (passo_inicial, n) -> int64[n], gerando só as bordas da janela pedida.
+    """
+    from pwm_edges import ParametrosEntradaHIL, SinalBordas, entrada_por_passo_q, entrada_sincronizada
+    from spwm_model import ParametrosSPWM, bordas_spwm
+
+    hil = hil or ParametrosEntradaHIL(ciclo_primeiro_passo=CICLO_PRIMEIRO_PASSO)
+    spwm = spwm or ParametrosSPWM(clk_freq=hil.clk_freq)
+    if spwm.clk_freq != hil.clk_freq:
+        raise ValueError('O tb_HIL_TOP usa o mesmo clock para o SPWM_TOP e o HIL_TOP.')
+
+    def entradas(passo_inicial, n):
+        # Clocks do SPWM_TOP que podem influenciar as leituras do bloco
+        primeira = hil.ciclo_primeiro_passo + passo_inicial * hil.periodo_passo
+        ultima = hil.ciclo_primeiro_passo + (passo_inicial + n) * hil.periodo_passo
+        a = max(0, primeira - hil.latencia_ciclos - defasagem_ciclos - 1)
+        b = max(a + 1, ultima - defasagem_ciclos + 1)
+        ciclos, niveis, nivel_inicial = bordas_spwm(spwm, a, b)
+        pino = SinalBordas(ciclos, niveis, nivel_inicial, spwm.clk_freq)
+        v_in = entrada_sincronizada(pino, hil, defasagem_ciclos)
+        return entrada_por_passo_q(v_in, hil, n, passo_inicial)
+
+    return entradas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Modelo em ponto fixo do LinearSolverManager.')
+    parser.add_argument('--passos', type=int, default=200_000)
+    parser.add_argument('--acumulacao', choices=MODOS_ACUMULACAO, default=ACUMULACAO)
+    parser.add_argument('--arredondamento', choices=MODOS_ARREDONDAMENTO, default=ARREDONDAMENTO)
+    args = parser.parse_args()
+
+    modelo = ModeloLSM(acumulacao=args.acumulacao, arredondamento=args.arredondamento)
+    entradas = entradas_spwm()
+    t = time.perf_counter()
+    ultimo = None
+    for _, estados in modelo.em_blocos(entradas, args.passos):
+        ultimo = estados[-1]
+    dt = time.perf_counter() - t
+    print(f"{args.passos:,} passos em {dt:.2f} s ({dt / max(args.passos, 1) * 1e6:.2f} µs/passo)")
+
+    # Referência em ponto flutuante com as mesmas matrizes quantizadas
+    from plant_model import PlantaLCL
+    escala = 2.0**FP_FRACTION_BITS
+    planta = PlantaLCL(A=modelo.Aq / escala, B=modelo.Bq / escala)
+    u = entradas(0, args.passos) / escala
+    referencia = planta.simular(u)[args.passos - 1]
+    for nome, q, r in zip(NOMES_ESTADOS, ultimo, referencia):
+        print(f"  {nome}: ponto fixo {q / escala:+.6f}, ponto flutuante {r:+.6f}")
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+AGENDA DE MACs ESPARSA para o passo x[n+1] = A x[n] + B u[n] do LinearSolverManager.
+
+O HIL_TOP entrega AMATRIX_C/BMATRIX_C densas (N_SS x (N_SS + N_IN) produtos por
+passo), mas com Euler cada linha de A tem de 2 a 5 termos não nulos e B só um.
+Este módulo:
+  - lista os termos não nulos de [A | B] (linha, coluna, coeficiente);
+  - separa os coeficientes ±2^k, que viram deslocamento e entram pela entrada
+    de soma do acumulador (porta C do DSP48) sem ocupar o multiplicador;
+  - distribui as linhas entre 'unidades' MAC (maior linha primeiro, para a
+    unidade menos carregada) e gera a agenda ciclo a ciclo;
+  - estima ciclos por passo e DSP48E1 (XC7S100: 160) de cada configuração e
+    compara com a versão densa;
+  - executa a agenda em inteiros (SimuladorAgenda), com o mesmo modo de
+    acumulação e arredondamento do lsm_model.ModeloLSM, para conferir os dois
+    passo a passo (tests/test_mac_schedule.py).
+
+Arquitetura SUPOSTA (o código do LinearSolverManager não está neste repositório):
+cada unidade tem um multiplicador em pipeline (LATENCIA_MULTIPLICADOR ciclos)
+que aceita um produto por ciclo e um acumulador que processa as linhas da
+unidade em sequência; todas as linhas leem x[n] e escrevem x[n+1] no fim do passo.
+Como a soma em inteiros com wrap é associativa, a ordem da agenda não muda o
+resultado; o que a simulação verifica é o deslocamento/arredondamento de cada
+termo (inclusive os coeficientes ±2^k) e a largura que o acumulador precisa.
+
+Exemplos:
+    python mac_schedule.py
+    python mac_schedule.py --unidades 2 --vhdl agenda_mac.vhd
+    python mac_schedule.py --metodo zoh --ts 1e-6
+"""
+
+import argparse
+import math
+
+import numpy as np
+
+from lsm_model import ACUMULACAO, ARREDONDAMENTO, FP_TOTAL_BITS, MODOS_ACUMULACAO, MODOS_ARREDONDAMENTO
+from plant_model import FP_FRACTION_BITS, N_SS, NOMES_ESTADOS, matrizes_hil, para_q
+
+# --- Bloco de Configuração ---
+CLK_FREQ = 250_000_000
+SIMUL_PERIOD = 1.0e-7
+LATENCIA_MULTIPLICADOR = 4     # Estágios do multiplicador 42 x 42 em DSP48E1 (estimativa)
+LATENCIA_ESCRITA = 1           # Wrap para FP_TOTAL_BITS e registro de Xvec
+DSP_DISPONIVEIS = 160          # XC7S100
+PORTA_A_BITS = 25              # DSP48E1: multiplicador 25 x 18 com sinal
+PORTA_B_BITS = 18
+
+# --- Fim do Bloco de Configuração ---
+
+
+def termos_nao_nulos(Aq, Bq):
+    """[(linha, coluna, coeficiente)] de [A | B]; colunas >= N_SS são entradas (Uvector)."""
+    matriz = np.hstack([np.asarray(Aq, dtype=np.int64), np.asarray(Bq, dtype=np.int64)])
+    return [(i, j, int(matriz[i, j])) for i, j in zip(*np.nonzero(matriz))]
+
+
+def expoente_potencia_de_dois(coef):
+    """k se |coef| = 2^k, senão None."""
+    c = abs(int(coef))
+    return c.bit_length() - 1 if c and c & (c - 1) == 0 else None
+
+
+def bits_com_sinal(valor):
+    """Menor largura em complemento de 2 que representa 'valor'."""
+    valor = int(valor)
+    return (valor if valor >= 0 else ~valor).bit_length() + 1
+
+
+def dsps_por_multiplicador(bits_coef, bits_dado=FP_TOTAL_BITS):
+    """
+    DSP48E1 para um produto com sinal bits_coef x bits_dado, quebrando os
+    operandos em fatias sem sinal de 24 (porta A) e 17 bits (porta B).
+    """
+    fatia_a, fatia_b = PORTA_A_BITS - 1, PORTA_B_BITS - 1
+    return min(math.ceil((bits_coef - 1) / fatia_b) * math.ceil((bits_dado - 1) / fatia_a),
+               math.ceil((bits_coef - 1) / fatia_a) * math.ceil((bits_dado - 1) / fatia_b))
+
+
+class AgendaMAC:
+    """
+    Agenda dos produtos de um passo em 'unidades' MACs. Com esparsa=False
+    agenda todos os N_SS x (N_SS + N_IN) produtos, como a versão densa.
+    """
+
+    def __init__(self, Aq, Bq, unidades=1, esparsa=True, latencia_multiplicador=LATENCIA_MULTIPLICADOR):
+        self.Aq = np.asarray(Aq, dtype=np.int64)
+        self.Bq = np.asarray(Bq, dtype=np.int64)
+        self.n_ss, self.n_in = self.Aq.shape[0], self.Bq.shape[1]
+        self.unidades = unidades
+        self.esparsa = esparsa
+        self.latencia_multiplicador = latencia_multiplicador
+
+        # Por linha: produtos [(coluna, coef)] e deslocamentos [(coluna, coef, k)]
+        self.produtos = [[] for _ in range(self.n_ss)]
+        self.deslocamentos = [[] for _ in range(self.n_ss)]
+        if esparsa:
+            for i, j, coef in termos_nao_nulos(self.Aq, self.Bq):
+                k = expoente_potencia_de_dois(coef)
+                if k is None:
+                    self.produtos[i].append((j, coef))
+                else:
+                    self.deslocamentos[i].append((j, coef, k))
+        else:
+            matriz = np.hstack([self.Aq, self.Bq])
+            for i in range(self.n_ss):
+                self.produtos[i] = [(j, int(c)) for j, c in enumerate(matriz[i])]
+
+        self.carga = [0] * unidades
+        self.linhas_por_unidade = [[] for _ in range(unidades)]
+        for i in sorted(range(self.n_ss), key=lambda i: -self.ciclos_linha(i)):
+            u = min(range(unidades), key=lambda u: self.carga[u])
+            self.linhas_por_unidade[u].append(i)
+            self.carga[u] += self.ciclos_linha(i)
+        self.agenda = self._montar_agenda()
+
+    def ciclos_linha(self, i):
+        """Ciclos de emissão da linha i: um produto por ciclo, um deslocamento por ciclo na porta C."""
+        return max(len(self.produtos[i]), len(self.deslocamentos[i]))
+
+    def _montar_agenda(self):
+        """[(ciclo, unidade, linha, produto ou None, deslocamento ou None, ultimo_da_linha)]."""
+        agenda = []
+        for u, linhas in enumerate(self.linhas_por_unidade):
+            ciclo = 0
+            for i in linhas:
+                n = self.ciclos_linha(i)
+                for c in range(n):
+                    produto = self.produtos[i][c] if c < len(self.produtos[i]) else None
+                    deslocamento = self.deslocamentos[i][c] if c < len(self.deslocamentos[i]) else None
+                    agenda.append((ciclo + c, u, i, produto, deslocamento, c == n - 1))
+                ciclo += n
+        return sorted(agenda, key=lambda s: (s[0], s[1]))
+
+    # --- Estimativas ---
+    @property
+    def multiplicacoes(self):
+        return sum(len(p) for p in self.produtos)
+
+    @property
+    def termos_deslocamento(self):
+        return sum(len(d) for d in self.deslocamentos)
+
+    @property
+    def ciclos_emissao(self):
+        return max(self.carga) if self.carga else 0
+
+    @property
+    def ciclos_por_passo(self):
+        """Do init_calc_i até Xvec_current_o atualizado."""
+        return self.ciclos_emissao + self.latencia_multiplicador + LATENCIA_ESCRITA
+
+    @property
+    def dsps(self):
+        """DSP48E1 de cada unidade pela maior largura de coeficiente que ela multiplica."""
+        total = 0
+        for linhas in self.linhas_por_unidade:
+            coefs = [c for i in linhas for _, c in self.produtos[i] if c]
+            if coefs:
+                total += dsps_por_multiplicador(max(bits_com_sinal(c) for c in coefs))
+        return total
+
+    @property
+    def passo_minimo_s(self):
+        return self.ciclos_por_passo / CLK_FREQ
+
+    def relatorio(self):
+        linhas = [f"{self.unidades} unidade(s), {'esparsa' if self.esparsa else 'densa'}: "
+                  f"{self.multiplicacoes} produtos + {self.termos_deslocamento} deslocamentos, "
+                  f"{self.ciclos_emissao} ciclos de emissão + {self.latencia_multiplicador + LATENCIA_ESCRITA} "
+                  f"de latência = {self.ciclos_por_passo} ciclos ({self.passo_minimo_s * 1e9:.0f} ns), "
+                  f"{self.dsps} DSP48E1"]
+        for u, linhas_unidade in enumerate(self.linhas_por_unidade):
+            descricao = []
+            for i in linhas_unidade:
+                termos = [f"{self._nome_coluna(j)}" for j, _ in self.produtos[i]]
+                termos += [f"{'-' if c < 0 else ''}{self._nome_coluna(j)}<<{k}" for j, c, k in self.deslocamentos[i]]
+                descricao.append(f"{NOMES_ESTADOS[i] if i < len(NOMES_ESTADOS) else i}[{', '.join(termos)}]")
+            linhas.append(f"  MAC{u}: {self.carga[u]:3d} ciclos  " + ' '.join(descricao))
+        return '\n'.join(linhas)
+
+    def _nome_coluna(self, j):
+        if j < self.n_ss:
+            return NOMES_ESTADOS[j] if self.n_ss == N_SS else f"x{j}"
+        return f"u{j - self.n_ss}"
+
+    def bloco_vhdl(self):
+        """Lista compacta dos termos e a agenda como constantes VHDL."""
+        from discretization import literal_vhdl
+
+        linhas_termo, coefs = [], []
+        for ciclo, u, i, produto, deslocamento, ultimo in self.agenda:
+            for termo in (produto, deslocamento):
+                if termo is None:
+                    continue
+                j, coef = termo[0], termo[1]
+                k = termo[2] if len(termo) == 3 else -1
+                linhas_termo.append(f"        ({i}, {j}, {u}, {ciclo}, {k}, {'true' if ultimo else 'false'})")
+                coefs.append(literal_vhdl(coef))
+        n = len(linhas_termo)
+        return '\n'.join([
+            f"    -- Gerado por scripts/simulation/src/mac_schedule.py: {self.unidades} unidade(s), "
+            f"{self.ciclos_por_passo} ciclos por passo, {self.dsps} DSP48E1 (estimativa)",
+            "    -- coluna: 0..N_SS-1 = Xvec, N_SS.. = Uvector | desloc: -1 = produto, k >= 0 = coef ±2^k pela porta C",
+            "    type mac_term_t is record",
+            "        linha   : natural;",
+            "        coluna  : natural;",
+            "        unidade : natural;",
+            "        ciclo   : natural;",
+            "        desloc  : integer;",
+            "        ultimo  : boolean;  -- Último termo da linha: escreve Xvec após a latência",
+            "    end record;",
+            "    type mac_term_array_t is array (natural range <>) of mac_term_t;",
+            f"    constant MAC_UNITS_C  : natural := {self.unidades};",
+            f"    constant MAC_CYCLES_C : natural := {self.ciclos_por_passo};",
+            f"    constant MAC_TERMS_C  : mac_term_array_t(0 to {n - 1}) := (",
+            ',\n'.join(linhas_termo),
+            "    );",
+            f"    constant MAC_COEF_C   : vector_fp_t(0 to {n - 1}) := (",
+            ',\n'.join(f"        {c}" for c in coefs),
+            "    );",
+        ])
+
+
+class SimuladorAgenda:
+    """
+    Executa a agenda em inteiros, termo a termo e unidade a unidade, com a
+    mesma aritmética do ModeloLSM (acumulação e arredondamento).
+    """
+
+    def __init__(self, agenda, x0q=None, bits_fracao=FP_FRACTION_BITS, largura_bits=FP_TOTAL_BITS,
+                 acumulacao=ACUMULACAO, arredondamento=ARREDONDAMENTO):
+        if acumulacao not in MODOS_ACUMULACAO:
+            raise ValueError(f"Acumulação '{acumulacao}' inválida; use uma de {MODOS_ACUMULACAO}.")
+        if arredondamento not in MODOS_ARREDONDAMENTO:
+            raise ValueError(f"Arredondamento '{arredondamento}' inválido; use um de {MODOS_ARREDONDAMENTO}.")
+        self.agenda = agenda
+        self.bits_fracao = bits_fracao
+        self.largura_bits = largura_bits
+        self.acumulacao = acumulacao
+        self.meio_lsb = 1 << (bits_fracao - 1) if arredondamento == 'mais_proximo' else 0
+        self.bits_acumulador = 0
+        self.x = [0] * agenda.n_ss if x0q is None else [int(v) for v in x0q]
+
+    def _reduzir(self, valor):
+        return (valor + self.meio_lsb) >> self.bits_fracao
+
+    def _wrap(self, valor):
+        meio = 1 << (self.largura_bits - 1)
+        return ((valor + meio) & ((1 << self.largura_bits) - 1)) - meio
+
+    def passo(self, u):
+        """x[n+1] a partir de self.x e u (inteiros Q14.28)."""
+        entradas = self.x + [int(v) for v in u]
+        acumuladores = [0] * self.agenda.unidades
+        novo = [0] * self.agenda.n_ss
+        por_produto = self.acumulacao == 'produto'
+        for _, unidade, linha, produto, deslocamento, ultimo in self.agenda.agenda:
+            acc = acumuladores[unidade]
+            if produto is not None:
+                termo = produto[1] * entradas[produto[0]]
+                acc += self._reduzir(termo) if por_produto else termo
+            if deslocamento is not None:
+                j, coef, k = deslocamento
+                termo = entradas[j] << k
+                termo = -termo if coef < 0 else termo
+                acc += self._reduzir(termo) if por_produto else termo
+            self.bits_acumulador = max(self.bits_acumulador, bits_com_sinal(acc))
+            if ultimo:
+                novo[linha] = self._wrap(acc if por_produto else self._reduzir(acc))
+                acc = 0
+            acumuladores[unidade] = acc
+        self.x = novo
+        return novo
+
+    def avancar(self, u):
+        """Como ModeloLSM.avancar: estados ANTES de cada passo, shape (n, N_SS)."""
+        u = np.asarray(u, dtype=np.int64)
+        if u.ndim == 1:
+            u = np.column_stack([u, np.zeros_like(u)])
+        saida = np.empty((len(u), self.agenda.n_ss), dtype=np.int64)
+        for k, uk in enumerate(u.tolist()):
+            saida[k] = self.x
+            self.passo(uk)
+        return saida
+
+
+def _matrizes(metodo, ts):
+    if metodo is None:
+        A, B = matrizes_hil()
+        return para_q(A), para_q(B)
+    from discretization import Discretizacao
+    d = Discretizacao(metodo, ts)
+    return d.Aq, d.Bq
+
+
+if __name__ == '__main__':
+    from discretization import METODOS
+
+    parser = argparse.ArgumentParser(description='Agenda de MACs esparsa para o LinearSolverManager.')
+    parser.add_argument('--metodo', choices=METODOS, help='discretiza de novo (padrão: matrizes do HIL_TOP)')
+    parser.add_argument('--ts', type=float, default=SIMUL_PERIOD, help='passo para --metodo (s)')
+    parser.add_argument('--unidades', type=int, help='unidades MAC da agenda detalhada (padrão: a mínima)')
+    parser.add_argument('--vhdl', help='grava a lista de termos e a agenda como constantes VHDL')
+    args = parser.parse_args()
+
+    Aq, Bq = _matrizes(args.metodo, args.ts)
+    ts = args.ts
+    ciclos_disponiveis = int(round(ts * CLK_FREQ))
+    n_ss, n_in = Aq.shape[0], Bq.shape[1]
+    print(f"Termos não nulos: A {np.count_nonzero(Aq)}/{Aq.size}, B {np.count_nonzero(Bq)}/{Bq.size}; "
+          f"passo de {ts * 1e9:.0f} ns = {ciclos_disponiveis} ciclos\n")
+
+    print(f"{'unidades':>8} {'ciclos esparsa':>15} {'DSP':>5} {'ciclos densa':>13} {'DSP':>5} {'cabe no passo':>14}")
+    agendas = {}
+    for unidades in range(1, n_ss + 1):
+        esparsa = AgendaMAC(Aq, Bq, unidades)
+        densa = AgendaMAC(Aq, Bq, unidades, esparsa=False)
+        agendas[unidades] = esparsa
+        cabe = 'sim' if esparsa.ciclos_por_passo <= ciclos_disponiveis else 'não'
+        print(f"{unidades:8d} {esparsa.ciclos_por_passo:15d} {esparsa.dsps:5d} {densa.ciclos_por_passo:13d} "
+              f"{densa.dsps:5d} {cabe:>14}")
+    ciclos_minimos = min(a.ciclos_por_passo for a in agendas.values())
+    minima = min(u for u, a in agendas.items() if a.ciclos_por_passo == ciclos_minimos)
+    print(f"\nMenor agenda: {minima} unidade(s), {ciclos_minimos} ciclos; "
+          f"orçamento do XC7S100: {DSP_DISPONIVEIS} DSP48E1")
+
+    agenda = agendas.get(args.unidades) or AgendaMAC(Aq, Bq, args.unidades or minima)
+    print('\n' + agenda.relatorio())
+
+    if args.vhdl:
+        with open(args.vhdl, 'w', encoding='utf-8') as f:
+            f.write(agenda.bloco_vhdl() + '\n')
+        print(f"Bloco VHDL gravado em {args.vhdl}")
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+MONTE CARLO das tolerâncias do LCL: milhares de plantas perturbadas de uma vez.
+
+Cada planta tem L1, Cf, L2, Cd, Rd e Ld sorteados em torno dos valores do
+HIL_TOP (plant_model.ParametrosLCL) e as matrizes de Euler do HIL_TOP
+(plant_model.matrizes_hil). Todas recebem a MESMA sequência de entrada
+(Uvector(0) do SPWM_TOP do tb_HIL_TOP, lsm_model.entradas_spwm, um valor por
+passo de SIMUL_PERIOD) e avançam juntas como um lote (plantas x estados):
+  - a cada bloco de M passos, x[k+M] = A^M x[k] + soma_j A^(M-1-j) B u[k+j];
+  - o termo da entrada de todos os blocos e plantas sai de um único produto
+    matricial por pedaço (entradas do bloco x [A^(M-1) B ... B] de todas as plantas);
+  - só a recorrência entre blocos fica no laço, vetorizada nas plantas.
+Os estados são observados a cada M passos (M = 10: 1 µs, ~67 amostras por
+período da portadora de 15 kHz), o que basta para picos e RMS.
+
+Por planta calcula a ressonância e o amortecimento (par complexo dominante de
+Ac), o raio espectral de A, os picos na partida e no regime e o RMS no regime
+(últimos ciclos da rede); o relatório mostra percentis de cada grandeza.
+
+Exemplos:
+    python monte_carlo.py
+    python monte_carlo.py --plantas 2000 --tolerancia l1=0.2 cf=0.1 --distribuicao normal
+    python monte_carlo.py --plantas 1000 --comparar 3 --grafico
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from plant_model import (FP_FRACTION_BITS, N_IN, N_SS, NOMES_ESTADOS, SIMUL_PERIOD, ParametrosLCL, PlantaLCL,
+                         matrizes_continuas, matrizes_hil)
+from spwm_model import SINE_FREQ
+
+# --- Bloco de Configuração ---
+NUM_PLANTAS = 1000
+TOLERANCIAS = {'l1': 0.10, 'cf': 0.10, 'l2': 0.10, 'cd': 0.10, 'rd': 0.05, 'ld': 0.10}
+DISTRIBUICOES = ('uniforme', 'normal')   # 'normal': a tolerância é 3 desvios padrão
+SEMENTE = 1
+
+# --- Entrada compartilhada (SPWM_TOP em malha aberta, rede curto-circuitada como no HIL_TOP) ---
+CICLOS_REDE = 5                 # Ciclos da fundamental do SPWM_TOP (SINE_FREQ)
+CICLOS_JANELA = 1               # Últimos ciclos usados para pico e RMS em regime
+
+PASSOS_POR_BLOCO = 10
+BLOCOS_POR_PEDACO = 1024        # Limita a memória do termo de entrada (pedaço x plantas x estados)
+PERCENTIS = (1, 5, 50, 95, 99)
+
+# --- Fim do Bloco de Configuração ---
+
+
+def sortear_parametros(num_plantas, tolerancias=None, distribuicao='uniforme', semente=SEMENTE, base=None):
+    """Lista de ParametrosLCL perturbados (o índice 0 é sempre a planta nominal)."""
+    if distribuicao not in DISTRIBUICOES:
+        raise ValueError(f"Distribuição '{distribuicao}' inválida; use uma de {DISTRIBUICOES}.")
+    tolerancias = TOLERANCIAS if tolerancias is None else tolerancias
+    base = base or ParametrosLCL()
+    rng = np.random.default_rng(semente)
+    fatores = {}
+    for nome, tol in tolerancias.items():
+        if distribuicao == 'uniforme':
+            fator = 1.0 + rng.uniform(-tol, tol, num_plantas)
+        else:
+            fator = 1.0 + rng.normal(0.0, tol / 3.0, num_plantas)
+        fator[0] = 1.0
+        fatores[nome] = fator
+    return [base.copiar(**{nome: getattr(base, nome) * fatores[nome][k] for nome in fatores})
+            for k in range(num_plantas)]
+
+
+def entrada_spwm(num_passos, spwm=None, hil=None):
+    """u (num_passos, N_IN): Uvector(0) do SPWM_TOP (lsm_model.entradas_spwm) em V, rede em 0."""
+    from lsm_model import entradas_spwm
+
+    u = np.zeros((num_passos, N_IN))
+    u[:, 0] = entradas_spwm(spwm, hil)(0, num_passos) / 2.0**FP_FRACTION_BITS
+    return u
+
+
+def matrizes_lote(parametros):
+    """(Ac, A, B) empilhadas: (plantas, N_SS, N_SS), (plantas, N_SS, N_SS), (plantas, N_SS, N_IN)."""
+    Ac = np.stack([matrizes_continuas(p)[0] for p in parametros])
+    discretas = [matrizes_hil(p) for p in parametros]
+    return Ac, np.stack([a for a, _ in discretas]), np.stack([b for _, b in discretas])
+
+
+def simular_lote(A, B, u, passos_por_bloco=PASSOS_POR_BLOCO, blocos_por_pedaco=BLOCOS_POR_PEDACO):
+    """
+    Avança todas as plantas com a mesma entrada u (K, N_IN). Gera
+    (bloco_inicial, estados (blocos, plantas, N_SS)) com o estado no FIM de cada bloco.
+    """
+    plantas, n, _ = A.shape
+    m = B.shape[2]
+    M = passos_por_bloco
+    num_blocos = len(u) // M
+    # potencias[j] = A^j e ganhos[j] = A^(M-1-j) B, por planta
+    potencias = np.empty((M + 1, plantas, n, n))
+    potencias[0] = np.eye(n)
+    for j in range(M):
+        potencias[j + 1] = A @ potencias[j]
+    AM = potencias[M]
+    ganhos = np.stack([potencias[M - 1 - j] @ B for j in range(M)])       # (M, plantas, n, m)
+    # Entradas do bloco (M*m) -> termo forçado de todas as plantas (plantas*n)
+    G = ganhos.transpose(0, 3, 1, 2).reshape(M * m, plantas * n)
+    blocos_u = u[:num_blocos * M].reshape(num_blocos, M * m)
+
+    x = np.zeros((plantas, n))
+    for inicio in range(0, num_blocos, blocos_por_pedaco):
+        # O termo forçado do pedaço vira, no lugar, o estado ao fim de cada bloco
+        estados = (blocos_u[inicio:inicio + blocos_por_pedaco] @ G).reshape(-1, plantas, n)
+        for k in range(len(estados)):
+            estados[k] += np.einsum('eij,ej->ei', AM, x)
+            x = estados[k]
+        yield inicio, estados
+
+
+def ressonancia(Ac):
+    """(frequência em Hz, amortecimento) do par complexo de maior frequência de cada planta."""
+    autovalores = np.linalg.eigvals(Ac)
+    indice = np.argmax(np.abs(autovalores.imag), axis=1)
+    par = autovalores[np.arange(len(Ac)), indice]
+    modulo = np.abs(par)
+    return modulo / (2 * np.pi), -par.real / modulo
+
+
+class ResultadoMonteCarlo:
+    """Grandezas por planta (arrays com uma linha por planta)."""
+
+    def __init__(self, parametros, freq_ressonancia, amortecimento, raio_espectral, pico_partida, pico, rms):
+        self.parametros = parametros
+        self.freq_ressonancia = freq_ressonancia
+        self.amortecimento = amortecimento
+        self.raio_espectral = raio_espectral
+        self.pico_partida = pico_partida
+        self.pico = pico
+        self.rms = rms
+
+    def grandezas(self):
+        """{nome: (valores por planta, unidade)} na ordem do relatório."""
+        g = {'ressonância': (self.freq_ressonancia, 'Hz'), 'amortecimento': (self.amortecimento, '')}
+        for i, nome in enumerate(NOMES_ESTADOS):
+            unidade = 'V' if nome.startswith('V') else 'A'
+            g[f'pico {nome}'] = (self.pico[:, i], unidade)
+            g[f'RMS {nome}'] = (self.rms[:, i], unidade)
+        for i, nome in enumerate(NOMES_ESTADOS):
+            g[f'partida {nome}'] = (self.pico_partida[:, i], 'V' if nome.startswith('V') else 'A')
+        return g
+
+    def relatorio(self, percentis=PERCENTIS):
+        cabecalho = f"{'grandeza':>14} {'nominal':>11} " + ' '.join(f"{'p' + str(p):>11}" for p in percentis)
+        linhas = [cabecalho + f" {'desvio/nom.':>12}"]
+        for nome, (valores, unidade) in self.grandezas().items():
+            nominal = valores[0]
+            quantis = np.percentile(valores, percentis)
+            espalhamento = np.std(valores) / abs(nominal) if nominal else float('nan')
+            linhas.append(f"{nome:>14} {nominal:11.4g} " + ' '.join(f"{q:11.4g}" for q in quantis)
+                          + f" {espalhamento:11.2%} {unidade}")
+        linhas.append(f"Raio espectral de A (Euler): máximo {np.max(self.raio_espectral):.9f} "
+                      f"({'todas estáveis' if np.all(self.raio_espectral < 1) else 'HÁ PLANTAS INSTÁVEIS'})")
+        return '\n'.join(linhas)
+
+
+def monte_carlo(parametros, u, ts=SIMUL_PERIOD, passos_janela=None, passos_por_bloco=PASSOS_POR_BLOCO):
+    """
+    Simula o lote e devolve um ResultadoMonteCarlo. Pico e RMS em regime usam
+    os últimos 'passos_janela' passos (padrão: o último ciclo da rede).
+    """
+    Ac, A, B = matrizes_lote(parametros)
+    freq, zeta = ressonancia(Ac)
+    raio = np.max(np.abs(np.linalg.eigvals(A)), axis=1)
+
+    num_blocos = len(u) // passos_por_bloco
+    passos_janela = passos_janela or int(round(CICLOS_JANELA / (SINE_FREQ * ts)))
+    inicio_janela = num_blocos - max(1, passos_janela // passos_por_bloco)
+    plantas = len(parametros)
+    pico_partida = np.zeros((plantas, N_SS))
+    pico = np.zeros((plantas, N_SS))
+    soma_quadrados = np.zeros((plantas, N_SS))
+    for bloco, estados in simular_lote(A, B, u, passos_por_bloco):
+        pico_partida = np.maximum(pico_partida, np.maximum(estados.max(axis=0), -estados.min(axis=0)))
+        na_janela = estados[max(0, inicio_janela - bloco):]
+        if len(na_janela):
+            pico = np.maximum(pico, np.maximum(na_janela.max(axis=0), -na_janela.min(axis=0)))
+            soma_quadrados += np.einsum('bei,bei->ei', na_janela, na_janela)
+    rms = np.sqrt(soma_quadrados / (num_blocos - inicio_janela))
+    return ResultadoMonteCarlo(parametros, freq, zeta, raio, pico_partida, pico, rms)
+
+
+def comparar_sequencial(parametros, u, passos_por_bloco=PASSOS_POR_BLOCO):
+    """
+    Roda as plantas uma a uma com PlantaLCL.simular (o caminho de uma planta)
+    e devolve (segundos por planta, maior diferença relativa para o lote).
+    """
+    _, A, B = matrizes_lote(parametros)
+    num_blocos = len(u) // passos_por_bloco
+    lote = np.concatenate([e for _, e in simular_lote(A, B, u, passos_por_bloco)])
+    t = time.perf_counter()
+    diferenca = 0.0
+    for k, p in enumerate(parametros):
+        estados = PlantaLCL(p, A=A[k], B=B[k]).simular(u[:num_blocos * passos_por_bloco])
+        referencia = estados[passos_por_bloco::passos_por_bloco]
+        escala = np.maximum(np.max(np.abs(referencia), axis=0), 1e-12)
+        diferenca = max(diferenca, float(np.max(np.abs(lote[:, k] - referencia) / escala)))
+    return (time.perf_counter() - t) / len(parametros), diferenca
+
+
+def _ler_tolerancias(itens):
+    tolerancias = dict(TOLERANCIAS)
+    for item in itens or []:
+        nome, _, valor = item.partition('=')
+        if nome not in ParametrosLCL().__dict__ or nome == 'ts':
+            raise ValueError(f"Componente '{nome}' desconhecido.")
+        tolerancias[nome] = float(valor)
+    return tolerancias
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Monte Carlo das tolerâncias do LCL (lote de plantas).')
+    parser.add_argument('--plantas', type=int, default=NUM_PLANTAS)
+    parser.add_argument('--tolerancia', nargs='+', metavar='COMP=TOL',
+                        help='ex.: l1=0.2 cf=0.05 (fração; os demais ficam no padrão)')
+    parser.add_argument('--distribuicao', choices=DISTRIBUICOES, default='uniforme')
+    parser.add_argument('--ciclos', type=float, default=CICLOS_REDE, help='ciclos da fundamental simulados')
+    parser.add_argument('--bloco', type=int, default=PASSOS_POR_BLOCO, help='passos entre observações')
+    parser.add_argument('--semente', type=int, default=SEMENTE)
+    parser.add_argument('--comparar', type=int, default=0, metavar='N',
+                        help='roda N plantas uma a uma para comparar tempo e resultado')
+    parser.add_argument('--grafico', action='store_true')
+    args = parser.parse_args()
+
+    try:
+        tolerancias = _ler_tolerancias(args.tolerancia)
+    except ValueError as e:
+        parser.error(str(e))
+    parametros = sortear_parametros(args.plantas, tolerancias, args.distribuicao, args.semente)
+    num_passos = int(round(args.ciclos / (SINE_FREQ * SIMUL_PERIOD)))
+    u = entrada_spwm(num_passos)
+
+    print('Tolerâncias: ' + ', '.join(f"{k} ±{v:.0%}" for k, v in tolerancias.items())
+          + f" ({args.distribuicao})")
+    t = time.perf_counter()
+    r = monte_carlo(parametros, u, passos_por_bloco=args.bloco)
+    dt = time.perf_counter() - t
+    print(f"{args.plantas} plantas x {num_passos:,} passos ({args.ciclos:g} ciclos de {SINE_FREQ:g} Hz) "
+          f"em {dt:.2f} s ({dt / args.plantas * 1e3:.2f} ms por planta)\n")
+    print(r.relatorio())
+
+    if args.comparar:
+        por_planta, diferenca = comparar_sequencial(parametros[:args.comparar], u, args.bloco)
+        print(f"\nUma a uma (PlantaLCL.simular): {por_planta:.3f} s por planta -> ~{por_planta * args.plantas:.0f} s "
+              f"para {args.plantas} ({por_planta * args.plantas / dt:.0f}x o lote); "
+              f"diferença máxima {diferenca:.1e} do pico")
+
+    if args.grafico:
+        import matplotlib.pyplot as plt
+
+        escolhidas = ['ressonância', 'amortecimento', 'pico IL2', 'RMS IL2', 'pico VCf', 'partida IL1']
+        grandezas = r.grandezas()
+        fig, axes = plt.subplots(2, 3, figsize=(14, 7))
+        for ax, nome in zip(axes.flat, escolhidas):
+            valores, unidade = grandezas[nome]
+            ax.hist(valores, bins=50)
+            ax.axvline(valores[0], color='k', linestyle='--', label='nominal')
+            ax.set_title(nome)
+            ax.set_xlabel(unidade)
+            ax.grid(True)
+        axes.flat[0].legend()
+        plt.tight_layout()
+        plt.show()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+MODELO DA PLANTA (inversor monofásico + filtro LCL) simulada pelo HIL_TOP.
+
+Usa as mesmas matrizes do HIL_TOP (Euler explícito com Ts = SIMUL_PERIOD):
+    x[n+1] = A x[n] + B u[n],  x = [IL1, ILd, IL2, VCf, VCd],  u = [v_inversor, v_rede]
+
+Duas formas de avançar o modelo:
+  - simular(u): uma entrada por passo, vetorizado (recorrência por duplicação)
+  - propagar(x, u, passos): entrada constante por 'passos' passos, O(1) por
+    trecho com tabelas de A^k e soma_{j<k} A^j B; é o que permite avançar
+    trechos de PWM (poucas bordas por período) muito mais rápido que o tempo real.
+
+Exemplo:
+    python plant_model.py --duracao 0.02 --tensao 100
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from pwm_converter_model import recorrencia_afim
+
+# --- Bloco de Configuração (constantes do HIL_TOP) ---
+SIMUL_PERIOD = 1.0e-7
+VDC_VOLTAGE = 400
+FP_FRACTION_BITS = 28
+
+L1 = 1.0e-3
+R1 = 0.1
+CF = 3.3e-6
+L2 = 0.92e-3
+R2 = 0.1
+CD = 1.65e-6
+RD = 25.9
+LD = 5.1e-3
+
+NOMES_ESTADOS = ['IL1', 'ILd', 'IL2', 'VCf', 'VCd']
+N_SS = 5
+N_IN = 2
+
+TAMANHO_TABELA_PADRAO = 4096  # Maior trecho (em passos) atendido direto pela tabela
+
+# --- Fim do Bloco de Configuração ---
+
+
+class ParametrosLCL:
+    """Componentes do filtro LCL com amortecimento Rd-Cd-Ld (valores do HIL_TOP)."""
+
+    def __init__(self, l1=L1, r1=R1, cf=CF, l2=L2, r2=R2, cd=CD, rd=RD, ld=LD, ts=SIMUL_PERIOD):
+        self.l1, self.r1, self.cf = l1, r1, cf
+        self.l2, self.r2 = l2, r2
+        self.cd, self.rd, self.ld = cd, rd, ld
+        self.ts = ts
+
+    def copiar(self, **alteracoes):
+        novo = ParametrosLCL(**{k: getattr(self, k) for k in ('l1', 'r1', 'cf', 'l2', 'r2', 'cd', 'rd', 'ld', 'ts')})
+        for nome, valor in alteracoes.items():
+            setattr(novo, nome, valor)
+        return novo
+
+
+def matrizes_continuas(p, rede=False):
+    """
+    (Ac, Bc) do modelo contínuo dx/dt = Ac x + Bc u. O HIL_TOP deixa a coluna
+    de v_rede em zero (rede curto-circuitada); rede=True liga v_rede em L2.
+    """
+    Ac = np.array([
+        [-p.r1 / p.l1, 0.0, 0.0, -1.0 / p.l1, 0.0],
+        [0.0, 0.0, 0.0, 1.0 / p.ld, -1.0 / p.ld],
+        [0.0, 0.0, -p.r2 / p.l2, 1.0 / p.l2, 0.0],
+        [1.0 / p.cf, -1.0 / p.cf, -1.0 / p.cf, -1.0 / (p.cf * p.rd), 1.0 / (p.cf * p.rd)],
+        [0.0, 1.0 / p.cd, 0.0, 1.0 / (p.cd * p.rd), -1.0 / (p.cd * p.rd)],
+    ])
+    Bc = np.zeros((N_SS, N_IN))
+    Bc[0, 0] = 1.0 / p.l1
+    if rede:
+        Bc[2, 1] = -1.0 / p.l2
+    return Ac, Bc
+
+
+def matrizes_hil(p=None, rede=False):
+    """(A, B) discretas exatamente como AMATRIX_C/BMATRIX_C do HIL_TOP (antes do to_fp)."""
+    p = p or ParametrosLCL()
+    Ac, Bc = matrizes_continuas(p, rede)
+    return np.eye(N_SS) + Ac * p.ts, Bc * p.ts
+
+
+def para_q(valores, bits_fracao=FP_FRACTION_BITS):
+    """to_fp: real -> inteiro Q14.28 (mais próximo)."""
+    return np.rint(np.asarray(valores, dtype=np.float64) * 2**bits_fracao).astype(np.int64)
+
+
+class PlantaLCL:
+    """Modelo discreto x[n+1] = A x[n] + B u[n] com avanço por trechos de entrada constante."""
+
+    def __init__(self, parametros=None, A=None, B=None, tamanho_tabela=TAMANHO_TABELA_PADRAO):
+        self.parametros = parametros or ParametrosLCL()
+        if A is None or B is None:
+            A, B = matrizes_hil(self.parametros)
+        self.A = np.asarray(A, dtype=np.float64)
+        self.B = np.asarray(B, dtype=np.float64)
+        self.ts = self.parametros.ts
+        self._montar_tabelas(tamanho_tabela)
+
+    def _montar_tabelas(self, tamanho):
+        """potencias[k] = A^k e ganhos[k] = soma_{j<k} A^j B, para k = 0..tamanho."""
+        n, m = self.B.shape
+        self.potencias = np.empty((tamanho + 1, n, n))
+        self.ganhos = np.empty((tamanho + 1, n, m))
+        self.potencias[0] = np.eye(n)
+        self.ganhos[0] = 0.0
+        for k in range(tamanho):
+            self.potencias[k + 1] = self.A @ self.potencias[k]
+            self.ganhos[k + 1] = self.ganhos[k] + self.potencias[k] @ self.B
+        self.tamanho_tabela = tamanho
+
+    def transicao(self, passos):
+        """(A^passos, soma_{j<passos} A^j B), pela tabela ou compondo blocos dela."""
+        if passos <= self.tamanho_tabela:
+            return self.potencias[passos], self.ganhos[passos]
+        phi, gamma = np.eye(self.A.shape[0]), np.zeros_like(self.B)
+        while passos > 0:
+            bloco = min(passos, self.tamanho_tabela)
+            phi, gamma = self.potencias[bloco] @ phi, self.potencias[bloco] @ gamma + self.ganhos[bloco]
+            passos -= bloco
+        return phi, gamma
+
+    def propagar(self, x, u, passos):
+        """Estado após 'passos' passos com a entrada u (vetor N_IN) constante."""
+        phi, gamma = self.transicao(passos)
+        return phi @ np.asarray(x, dtype=np.float64) + gamma @ np.asarray(u, dtype=np.float64)
+
+    def simular(self, u, x0=None):
+        """
+        Estados x[0..K] para entradas u[0..K-1] (shape (K,) para só o inversor, ou (K, N_IN)).
+        Retorna (K+1, N_SS).
+        """
+        u = np.asarray(u, dtype=np.float64)
+        if u.ndim == 1:
+            u = np.column_stack([u, np.zeros_like(u)])
+        forcado = u @ self.B.T
+        x0 = np.zeros(N_SS) if x0 is None else np.asarray(x0, dtype=np.float64)
+        return recorrencia_afim(self.A, np.vstack([forcado, np.zeros((1, N_SS))]), x0)
+
+    def polos(self):
+        """Polos discretos e a frequência equivalente (Hz) e amortecimento de cada um."""
+        z = np.linalg.eigvals(self.A)
+        s = np.log(z.astype(complex)) / self.ts
+        return z, np.abs(s) / (2 * np.pi), -s.real / np.maximum(np.abs(s), 1e-300)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Modelo discreto do LCL do HIL_TOP.')
+    parser.add_argument('--duracao', type=float, default=0.02, help='tempo simulado (s)')
+    parser.add_argument('--tensao', type=float, default=100.0, help='degrau na tensão do inversor (V)')
+    args = parser.parse_args()
+
+    planta = PlantaLCL()
+    z, freqs, amortecimentos = planta.polos()
+    print(f"Ts = {planta.ts * 1e9:.0f} ns, raio espectral de A = {np.max(np.abs(z)):.9f}")
+    for zi, f, zeta in sorted(zip(z, freqs, amortecimentos), key=lambda v: v[1]):
+        print(f"  polo {zi.real:+.9f}{zi.imag:+.9f}j -> {f:9.1f} Hz, amortecimento {zeta:.4f}")
+
+    passos = int(round(args.duracao / planta.ts))
+    t = time.perf_counter()
+    estados = planta.simular(np.full(passos, args.tensao))
+    dt = time.perf_counter() - t
+    print(f"\nDegrau de {args.tensao:g} V por {args.duracao * 1e3:g} ms ({passos:,} passos) em {dt * 1e3:.1f} ms")
+    for nome, valor in zip(NOMES_ESTADOS, estados[-1]):
+        print(f"  {nome} = {valor:+.4f}")
+    x = planta.propagar(np.zeros(N_SS), [args.tensao, 0.0], passos)
+    print(f"  (propagar por trecho: diferença máxima {np.max(np.abs(x - estados[-1])):.2e})")
@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+EMULAÇÃO das saídas analógicas (FixedToPwmConverter + filtro RC) vistas no osciloscópio.
+
+Modelo do FixedToPwmConverter (HIL_TOP, PMOD4):
+  - parte inteira do estado Q14.28: shift_right(x, FP_FRACTION_BITS) (arredonda para baixo)
+  - saturação em [-2^(N-1), 2^(N-1)-1], deslocada de +2^(N-1) -> comparação em [0, 2^N-1]
+  - registrador de comparação com buffer duplo: o valor novo é carregado no
+    último clock do período (pwm_counter = 2^N - 1) e vale o período seguinte
+  - pwm_out = '1' nos primeiros 'comparação' clocks de cada período
+
+O filtro analógico é um sistema linear (cascata de estágios RC com buffer). Como
+a saída só depende do número de clocks em nível alto de cada período, a
+evolução é calculada período a período com tabelas exatas (uma entrada por
+valor de comparação possível), em vez de clock a clock. A recorrência
+x[k+1] = Φ x[k] + g[k] é resolvida de forma vetorizada (varredura por
+duplicação), então um ciclo de rede dos 5 canais leva poucos milissegundos.
+
+Exemplos:
+    python pwm_converter_model.py
+    python pwm_converter_model.py --captura ../../analysis/data/dados_multi.csv --intervalo-us 150
+    python pwm_converter_model.py --tau 1e-4 1e-4 --osciloscopio scope.csv --canal 2
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# --- Bloco de Configuração (HIL_TOP) ---
+CLK_FREQ = 250_000_000
+PWM_RESOLUTION_BITS = 12
+FP_FRACTION_BITS = 28
+NIVEL_ALTO_V = 3.3          # Tensão do pino PMOD em nível alto (LVCMOS33)
+
+# --- Filtro de reconstrução (ajustar para o RC usado na bancada) ---
+TAUS_FILTRO_S = (100e-6,)   # Um estágio RC de 1 kΩ / 100 nF; vários valores = cascata com buffer
+
+NOMES_ESTADOS = ['IL1', 'ILd', 'IL2', 'VCf', 'VCd']
+
+# --- Fim do Bloco de Configuração ---
+
+
+def recorrencia_afim(phi, entradas, x0=None):
+    """
+    Resolve x[k+1] = phi @ x[k] + entradas[k] para k = 0..K-1 sem laço por amostra.
+
+    entradas: (K, n). Retorna x[0..K-1] com shape (K, n). Usa uma varredura
+    por duplicação (log2 K passos vetorizados de K produtos matriz-vetor).
+    """
+    entradas = np.asarray(entradas, dtype=np.float64)
+    K, n = entradas.shape
+    # s[k] = soma_{j<k} phi^(k-1-j) u[j]
+    s = np.zeros((K, n))
+    s[1:] = entradas[:-1]
+    potencia = phi.copy()
+    passo = 1
+    while passo < K:
+        s[passo:] += s[:-passo] @ potencia.T
+        potencia = potencia @ potencia
+        passo *= 2
+
+    if x0 is not None:
+        # Termo homogêneo phi^k x0, também por duplicação
+        homogeneo = np.empty((K, n))
+        homogeneo[0] = x0
+        potencia = phi.copy()
+        feito = 1
+        while feito < K:
+            bloco = min(feito, K - feito)
+            homogeneo[feito:feito + bloco] = homogeneo[:bloco] @ potencia.T
+            potencia = potencia @ potencia
+            feito += bloco
+        s += homogeneo
+    return s
+
+
+class ConversorPwm:
+    """Modelo ciclo-exato do FixedToPwmConverter."""
+
+    def __init__(self, clk_freq=CLK_FREQ, resolucao_bits=PWM_RESOLUTION_BITS,
+                 fp_fraction_bits=FP_FRACTION_BITS):
+        self.clk_freq = clk_freq
+        self.resolucao_bits = resolucao_bits
+        self.fp_fraction_bits = fp_fraction_bits
+        self.periodo_clocks = 2**resolucao_bits
+        self.limite_superior = 2**(resolucao_bits - 1) - 1
+        self.limite_inferior = -2**(resolucao_bits - 1)
+
+    @property
+    def periodo_s(self):
+        return self.periodo_clocks / self.clk_freq
+
+    def valor_comparacao(self, x_q):
+        """next_compare_value para estados Q14.28 (inteiros), vetorizado."""
+        inteiro = np.asarray(x_q, dtype=np.int64) >> self.fp_fraction_bits
+        meio = self.periodo_clocks // 2
+        return np.where(inteiro > self.limite_superior, self.periodo_clocks - 1,
+                        np.where(inteiro < self.limite_inferior, 0, inteiro + meio))
+
+    def comparacoes_por_periodo(self, tempos_s, x_q, num_periodos, atraso_s=0.0):
+        """
+        active_compare_reg de cada período PWM a partir de uma série de estados
+        (retenção de ordem zero: cada amostra vale até a próxima).
+
+        tempos_s: instantes das amostras (s), crescentes, relativos à saída do reset
+        x_q: (amostras,) ou (amostras, canais) em Q14.28
+        Retorna (num_periodos, canais) com o período 0 no valor de reset (2^(N-1)).
+        """
+        x_q = np.asarray(x_q, dtype=np.int64)
+        if x_q.ndim == 1:
+            x_q = x_q[:, None]
+        k = np.arange(1, num_periodos, dtype=np.int64)
+        # Carga no último clock do período anterior: clock k*P - 1
+        instantes = (k * self.periodo_clocks - 1) / self.clk_freq - atraso_s
+        indices = np.clip(np.searchsorted(tempos_s, instantes, side='right') - 1, 0, len(tempos_s) - 1)
+
+        comparacoes = np.empty((num_periodos, x_q.shape[1]), dtype=np.int64)
+        comparacoes[0] = self.periodo_clocks // 2
+        comparacoes[1:] = self.valor_comparacao(x_q[indices])
+        return comparacoes
+
+    def comparacao_para_estado(self, comparacao):
+        """Inverso (a menos da parte fracionária) para levar a saída filtrada de volta a unidades do estado."""
+        return np.asarray(comparacao, dtype=np.float64) - self.periodo_clocks // 2
+
+
+class FiltroReconstrucao:
+    """
+    Cascata de estágios RC de 1ª ordem com buffer entre eles:
+    dv_i/dt = (v_{i-1} - v_i) / tau_i, com v_0 = saída PWM.
+    """
+
+    def __init__(self, taus_s=TAUS_FILTRO_S):
+        self.taus_s = tuple(float(t) for t in taus_s)
+        n = len(self.taus_s)
+        self.A = np.zeros((n, n))
+        self.B = np.zeros(n)
+        for i, tau in enumerate(self.taus_s):
+            self.A[i, i] = -1.0 / tau
+            if i == 0:
+                self.B[0] = 1.0 / tau
+            else:
+                self.A[i, i - 1] = 1.0 / tau
+        self._tabelas = None
+
+    @property
+    def ordem(self):
+        return len(self.taus_s)
+
+    def _expm_passo(self, dt):
+        """exp(A*dt) por escalonamento e quadraturas com série de Taylor (A pequena)."""
+        M = self.A * dt
+        escala = max(0, int(np.ceil(np.log2(max(np.abs(M).sum(axis=1).max(), 1e-300)))) + 1)
+        M = M / 2**escala
+        resultado = np.eye(self.ordem)
+        termo = np.eye(self.ordem)
+        for j in range(1, 20):
+            termo = termo @ M / j
+            resultado = resultado + termo
+        for _ in range(escala):
+            resultado = resultado @ resultado
+        return resultado
+
+    def preparar(self, conversor, nivel_alto=NIVEL_ALTO_V):
+        """
+        Tabelas por número de clocks em alto 'a' (0..P):
+          phi_on[a] = exp(A a/f), gamma_on[a] = resposta forçada após 'a' clocks em alto,
+          g[a] = contribuição de um período inteiro com 'a' clocks em alto.
+        """
+        P = conversor.periodo_clocks
+        n = self.ordem
+        phi_clk = self._expm_passo(1.0 / conversor.clk_freq)
+        potencias = np.empty((P + 1, n, n))
+        potencias[0] = np.eye(n)
+        for a in range(1, P + 1):
+            potencias[a] = potencias[a - 1] @ phi_clk
+
+        # (exp(A t) - I) A^-1 B V: resposta ao degrau de amplitude V a partir do repouso
+        degrau = np.linalg.solve(self.A, self.B * nivel_alto)
+        gamma_on = (potencias - np.eye(n)) @ degrau
+        phi_off = potencias[::-1]  # exp(A (P - a)/f)
+        g = np.einsum('aij,aj->ai', phi_off, gamma_on)
+        self._tabelas = (potencias, gamma_on, g, potencias[P], conversor.periodo_clocks,
+                         conversor.clk_freq)
+        return self
+
+    def simular(self, comparacoes):
+        """
+        Saída do filtro para as comparações de um canal (K,).
+
+        Retorna (v_inicio, v_fim_alto, estados): tensão no início de cada período
+        e no fim do trecho em nível alto (extremos da ondulação para 1 estágio),
+        e o vetor de estados do filtro no início de cada período.
+        O filtro parte do regime permanente da 1ª comparação.
+        """
+        potencias, gamma_on, g, phi, _, _ = self._tabelas
+        a = np.asarray(comparacoes, dtype=np.int64)
+        n = self.ordem
+        x_regime = np.linalg.solve(np.eye(n) - phi, g[a[0]])
+        estados = x_regime + recorrencia_afim(phi, g[a] - g[a[0]])
+        x_on = np.einsum('kij,kj->ki', potencias[a], estados) + gamma_on[a]
+        return estados[:, -1], x_on[:, -1], estados
+
+    def avaliar(self, comparacoes, estados, tempos_s):
+        """Tensão exata nos instantes pedidos (resolução de 1 clock), p. ex. os do osciloscópio."""
+        potencias, gamma_on, _, _, P, clk = self._tabelas
+        clocks = np.floor(np.asarray(tempos_s) * clk).astype(np.int64)
+        k = np.clip(clocks // P, 0, len(comparacoes) - 1)
+        dentro = np.clip(clocks - k * P, 0, P)
+        a = np.asarray(comparacoes, dtype=np.int64)[k]
+        em_alto = dentro < a
+        x_k = estados[k]
+        x_on = np.einsum('kij,kj->ki', potencias[np.minimum(dentro, a)], x_k) + gamma_on[np.minimum(dentro, a)]
+        x_off = np.einsum('kij,kj->ki', potencias[np.maximum(dentro - a, 0)], x_on)
+        return np.where(em_alto, x_on[:, -1], x_off[:, -1])
+
+
+def emular_canais(tempos_s, x_q, duracao_s, conversor=None, filtro=None, atraso_s=0.0):
+    """
+    Emula todos os canais: retorna (tempos_periodo, comparacoes, v_inicio, v_fim_alto, estados),
+    com as tensões em (períodos, canais) e os estados do filtro por canal.
+    """
+    conversor = conversor or ConversorPwm()
+    filtro = filtro or FiltroReconstrucao()
+    if filtro._tabelas is None:
+        filtro.preparar(conversor)
+    num_periodos = int(np.ceil(duracao_s / conversor.periodo_s))
+    comparacoes = conversor.comparacoes_por_periodo(tempos_s, x_q, num_periodos, atraso_s)
+    resultados = [filtro.simular(comparacoes[:, c]) for c in range(comparacoes.shape[1])]
+    v_inicio = np.stack([r[0] for r in resultados], axis=1)
+    v_fim = np.stack([r[1] for r in resultados], axis=1)
+    estados = [r[2] for r in resultados]
+    tempos_periodo = np.arange(num_periodos) * conversor.periodo_s
+    return tempos_periodo, comparacoes, v_inicio, v_fim, estados
+
+
+def carregar_osciloscopio(caminho):
+    """
+    Lê um CSV exportado pelo osciloscópio: 1ª coluna = tempo (s), demais = canais (V).
+    Linhas de cabeçalho/metadados não numéricas são ignoradas.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(caminho, sep=None, engine='python', header=None, skip_blank_lines=True)
+    df = df.apply(pd.to_numeric, errors='coerce').dropna(how='any')
+    dados = df.to_numpy(float)
+    return dados[:, 0] - dados[0, 0], dados[:, 1:]
+
+
+def alinhar_e_comparar(t_ref, v_ref, modelo, atraso_max_s):
+    """
+    Procura o atraso (em passos do osciloscópio, até ±atraso_max_s) que minimiza
+    o erro RMS entre 'modelo(t + atraso)' e a medição; retorna (atraso_s, erro_rms, correlação).
+    """
+    dt = np.median(np.diff(t_ref))
+    n = len(v_ref)
+    folga = int(atraso_max_s / dt)
+    # Modelo amostrado uma única vez numa grade uniforme que cobre todos os atrasos
+    m = modelo(t_ref[0] + (np.arange(n + 2 * folga) - folga) * dt)
+
+    # erro²(lag) = Σ m[j+lag]² - 2 Σ m[j+lag] v[j] + Σ v², com a correlação via FFT
+    tamanho = 1 << int(np.ceil(np.log2(len(m) + n)))
+    cruzada = np.fft.irfft(np.fft.rfft(m, tamanho) * np.conj(np.fft.rfft(v_ref, tamanho)), tamanho)
+    cruzada = cruzada[:2 * folga + 1]
+    energia = np.concatenate(([0.0], np.cumsum(m ** 2)))
+    janela_m = energia[n:n + 2 * folga + 1] - energia[:2 * folga + 1]
+    erros = (janela_m - 2 * cruzada + np.sum(v_ref ** 2)) / n
+
+    lag = int(np.argmin(erros))
+    v = m[lag:lag + n]
+    corr = np.corrcoef(v, v_ref)[0, 1] if np.std(v) > 0 else 0.0
+    return (lag - folga) * dt, float(np.sqrt(max(erros[lag], 0.0))), corr
+
+
+def _carregar_captura(caminho):
+    """Lê uma captura .csv/.hilz do serial_reader (inteiros Q14.28)."""
+    pasta = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                         'serial_reader', 'src')
+    if pasta not in sys.path:
+        sys.path.insert(0, pasta)
+    if caminho.lower().endswith('.hilz'):
+        from hil_serial.storage import LeitorCompactado
+        with LeitorCompactado(caminho) as leitor:
+            return leitor.ler(), leitor.intervalo_s
+    from hil_serial.replay import carregar_captura_csv
+    return carregar_captura_csv(caminho), None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Emulação FixedToPwmConverter + filtro RC (PMOD4).')
+    parser.add_argument('--captura', help='captura .csv/.hilz dos estados (padrão: senoides sintéticas de 60 Hz)')
+    parser.add_argument('--intervalo-us', type=float, default=150.0, help='intervalo entre amostras da captura CSV')
+    parser.add_argument('--duracao', type=float, default=1 / 60, help='duração emulada (s)')
+    parser.add_argument('--tau', type=float, nargs='+', default=list(TAUS_FILTRO_S),
+                        help='constantes de tempo dos estágios RC (s)')
+    parser.add_argument('--nivel-alto', type=float, default=NIVEL_ALTO_V)
+    parser.add_argument('--osciloscopio', help='CSV exportado do osciloscópio para comparação')
+    parser.add_argument('--canal', type=int, default=0, help='estado comparado com a 1ª coluna de tensão do CSV')
+    args = parser.parse_args()
+
+    conversor = ConversorPwm()
+    filtro = FiltroReconstrucao(args.tau)
+
+    if args.captura:
+        x_q, intervalo = _carregar_captura(args.captura)
+        intervalo = intervalo or args.intervalo_us * 1e-6
+        tempos = np.arange(x_q.shape[0]) * intervalo
+    else:
+        tempos = np.arange(0, args.duracao, 1e-7)
+        amplitudes = np.array([300.0, 0.2, 300.0, 180.0, 180.0])
+        fases = np.arange(5) * 0.3
+        x_q = np.rint(amplitudes * np.sin(2 * np.pi * 60 * tempos[:, None] + fases) * 2**FP_FRACTION_BITS)
+        x_q = x_q.astype(np.int64)
+
+    t0 = time.perf_counter()
+    filtro.preparar(conversor, args.nivel_alto)
+    t1 = time.perf_counter()
+    tempos_p, comparacoes, v_inicio, v_fim, estados = emular_canais(tempos, x_q, args.duracao, conversor, filtro)
+    t2 = time.perf_counter()
+
+    print(f"PWM de {conversor.resolucao_bits} bits: período {conversor.periodo_s * 1e6:.3f} µs "
+          f"({1 / conversor.periodo_s / 1e3:.2f} kHz); filtro RC tau = {', '.join(f'{t:g}' for t in args.tau)} s")
+    print(f"{len(tempos_p)} períodos x {comparacoes.shape[1]} canais em {(t2 - t1) * 1e3:.1f} ms "
+          f"(tabelas: {(t1 - t0) * 1e3:.1f} ms)")
+    for c in range(comparacoes.shape[1]):
+        nome = NOMES_ESTADOS[c] if c < len(NOMES_ESTADOS) else f'Estado_{c}'
+        ondulacao = np.abs(v_fim[:, c] - v_inicio[:, c])
+        saturado = np.mean((comparacoes[:, c] == 0) | (comparacoes[:, c] == conversor.periodo_clocks - 1))
+        print(f"  {nome:>4}: {v_inicio[:, c].min():.3f} a {v_inicio[:, c].max():.3f} V | "
+              f"ondulação máx {ondulacao.max() * 1e3:.1f} mV | saturado {saturado * 100:.1f}% do tempo")
+
+    if args.osciloscopio:
+        t_osc, v_osc = carregar_osciloscopio(args.osciloscopio)
+        c = args.canal
+        modelo = lambda t: filtro.avaliar(comparacoes[:, c], estados[c], t)
+        atraso, erro, corr = alinhar_e_comparar(t_osc, v_osc[:, 0], modelo, atraso_max_s=1 / 60)
+        print(f"\nOsciloscópio '{args.osciloscopio}' vs canal {c}: atraso {atraso * 1e3:+.3f} ms, "
+              f"erro RMS {erro * 1e3:.1f} mV, correlação {corr:.4f}")
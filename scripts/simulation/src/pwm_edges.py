@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+ENTRADA DO INVERSOR como lista de bordas (tempo, nível).
+
+No HIL_TOP o PWM externo (PMOD6_PIN1_R) passa por dois flip-flops de
+sincronização (pmod_sync_s1/s2), é registrado no PWMToVoltage (±VDC a cada
+clock de 250 MHz) e o solver lê Uvector(0) uma vez por passo (Ts = 100 ns =
+START_PERIOD clocks). Aqui a entrada é mantida como bordas e a tensão vista em
+cada passo do solver é calculada de forma vetorizada, sem vetores por clock:
+
+  - 'amostrado': valor de v_in no clock em que o passo lê a entrada (o que o
+    hardware faz)
+  - 'medio'    : média exata de v_in nos START_PERIOD clocks do passo (útil para
+    comparar com modelos contínuos/PSIM)
+
+O custo é O(bordas + passos) em tempo e memória.
+
+Exemplos:
+    python pwm_edges.py --ciclos 5
+    python pwm_edges.py --ciclos 1 --validar 200000
+"""
+
+import argparse
+import time
+from math import gcd
+
+import numpy as np
+
+# --- Bloco de Configuração (constantes do HIL_TOP) ---
+CLK_FREQ = 250_000_000
+SIMUL_PERIOD = 1.0e-7
+START_PERIOD = int(SIMUL_PERIOD * CLK_FREQ)   # 25 clocks por passo do solver
+VDC_VOLTAGE = 400
+FP_FRACTION_BITS = 28
+
+ESTAGIOS_SINCRONIZADOR = 2   # pmod_sync_s1 -> pmod_sync_s2
+REGISTRO_PWM_TO_VOLTAGE = 1  # v_in_internal registrado no PWMToVoltage
+CICLO_PRIMEIRO_PASSO = 0     # Clock em que o 1º passo lê Uvector (depende do reset/solver)
+
+MODOS_ENTRADA = ('amostrado', 'medio')
+
+# --- Fim do Bloco de Configuração ---
+
+
+class SinalBordas:
+    """
+    Sinal binário representado pelas bordas.
+
+    ticks: instantes das bordas (int64, crescentes) em unidades de 1/freq_base
+    niveis: nível (0/1) válido a partir de cada borda
+    nivel_inicial: nível antes da primeira borda
+    """
+
+    def __init__(self, ticks, niveis, nivel_inicial, freq_base):
+        self.ticks = np.asarray(ticks, dtype=np.int64)
+        self.niveis = np.asarray(niveis, dtype=np.uint8)
+        self.nivel_inicial = int(nivel_inicial)
+        self.freq_base = int(freq_base)
+        self._alto_acumulado = None
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def __repr__(self):
+        return (f"SinalBordas({len(self)} bordas, freq_base={self.freq_base}, "
+                f"nivel_inicial={self.nivel_inicial})")
+
+    @classmethod
+    def de_spwm(cls, parametros, num_ciclos_clock, ciclo_inicial=0):
+        """Bordas do SPWM_TOP (spwm_model) no domínio do clock da placa geradora."""
+        from spwm_model import bordas_spwm
+
+        ciclos, niveis, nivel_inicial = bordas_spwm(parametros, ciclo_inicial, ciclo_inicial + num_ciclos_clock)
+        return cls(ciclos, niveis, nivel_inicial, parametros.clk_freq)
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Lê o .npz salvo por spwm_model.py --saida."""
+        with np.load(caminho) as d:
+            return cls(d['ciclos_borda'], d['niveis'], int(d['nivel_inicial']), int(d['clk_freq']))
+
+    def simplificar(self):
+        """Remove bordas que não mudam o nível e bordas coincidentes (vale a última)."""
+        if len(self) == 0:
+            return self
+        ultima_do_tick = np.append(self.ticks[1:] != self.ticks[:-1], True)
+        ticks, niveis = self.ticks[ultima_do_tick], self.niveis[ultima_do_tick]
+        anteriores = np.concatenate(([self.nivel_inicial], niveis[:-1]))
+        muda = niveis != anteriores
+        return SinalBordas(ticks[muda], niveis[muda], self.nivel_inicial, self.freq_base)
+
+    def nivel_em(self, ticks):
+        """Nível em cada instante pedido (mesma base de tempo), vetorizado."""
+        i = np.searchsorted(self.ticks, ticks, side='right') - 1
+        niveis = np.append(self.niveis, self.nivel_inicial)  # índice -1 -> nível inicial
+        return niveis[i]
+
+    def tempo_alto(self, ticks):
+        """
+        Tempo acumulado em nível alto de 0 até cada instante pedido (em ticks).
+        Antes da primeira borda vale o nível inicial, inclusive para instantes negativos.
+        """
+        if self._alto_acumulado is None:
+            duracoes = np.diff(self.ticks, prepend=0)
+            anteriores = np.concatenate(([self.nivel_inicial], self.niveis[:-1])).astype(np.int64)
+            self._alto_acumulado = np.cumsum(duracoes * anteriores)
+
+        ticks = np.asarray(ticks, dtype=np.int64)
+        i = np.searchsorted(self.ticks, ticks, side='right') - 1
+        tem_borda = i >= 0
+        j = np.maximum(i, 0)
+        base = np.where(tem_borda, self._alto_acumulado[j], 0)
+        inicio = np.where(tem_borda, self.ticks[j], 0)
+        nivel = np.where(tem_borda, self.niveis[j], self.nivel_inicial).astype(np.int64)
+        return base + nivel * (ticks - inicio)
+
+    def para_clock(self, clk_freq, atraso_ciclos=0, defasagem_ticks=0):
+        """
+        Re-amostra um sinal assíncrono no clock 'clk_freq': cada borda é capturada
+        na primeira borda de subida do clock em ou após o instante dela e atrasada
+        'atraso_ciclos'. O resultado tem freq_base = clk_freq (ticks = ciclos).
+        """
+        # ceil(t * clk / base) exato em inteiros, com a razão reduzida para evitar overflow
+        g = gcd(clk_freq, self.freq_base)
+        num, den = clk_freq // g, self.freq_base // g
+        t = self.ticks + defasagem_ticks
+        ciclos = -((-t * num) // den) + atraso_ciclos
+        return SinalBordas(ciclos, self.niveis, self.nivel_inicial, clk_freq).simplificar()
+
+
+class ParametrosEntradaHIL:
+    """Temporização do caminho PMOD6_PIN1_R -> Uvector(0) no HIL_TOP."""
+
+    def __init__(self, clk_freq=CLK_FREQ, periodo_passo=START_PERIOD, vdc=VDC_VOLTAGE,
+                 estagios_sincronizador=ESTAGIOS_SINCRONIZADOR, registro_saida=REGISTRO_PWM_TO_VOLTAGE,
+                 ciclo_primeiro_passo=CICLO_PRIMEIRO_PASSO, fp_fraction_bits=FP_FRACTION_BITS):
+        self.clk_freq = clk_freq
+        self.periodo_passo = periodo_passo
+        self.vdc = vdc
+        self.estagios_sincronizador = estagios_sincronizador
+        self.registro_saida = registro_saida
+        self.ciclo_primeiro_passo = ciclo_primeiro_passo
+        self.fp_fraction_bits = fp_fraction_bits
+
+    @property
+    def latencia_ciclos(self):
+        """Clocks entre a captura no 1º flip-flop e a mudança de v_in."""
+        return self.estagios_sincronizador - 1 + self.registro_saida
+
+    @property
+    def ts(self):
+        return self.periodo_passo / self.clk_freq
+
+
+def entrada_sincronizada(sinal, parametros, defasagem_ticks=0):
+    """Sinal v_in (0 = -VDC, 1 = +VDC) no domínio do clock do HIL, já com a latência."""
+    return sinal.para_clock(parametros.clk_freq, parametros.latencia_ciclos, defasagem_ticks)
+
+
+def entrada_por_passo(v_in, parametros, num_passos, passo_inicial=0, modo='amostrado'):
+    """
+    Tensão de entrada (V) vista pelo solver em cada passo [passo_inicial, +num_passos).
+
+    v_in deve estar no domínio do clock do HIL (entrada_sincronizada).
+    """
+    if modo not in MODOS_ENTRADA:
+        raise ValueError(f"Modo '{modo}' inválido. Opções: {', '.join(MODOS_ENTRADA)}")
+    p = parametros
+    passos = np.arange(passo_inicial, passo_inicial + num_passos, dtype=np.int64)
+    leitura = p.ciclo_primeiro_passo + passos * p.periodo_passo
+
+    if modo == 'amostrado':
+        fracao = v_in.nivel_em(leitura).astype(np.float64)
+    else:
+        # Clocks (leitura - P, leitura] que compõem o passo
+        alto = v_in.tempo_alto(leitura + 1) - v_in.tempo_alto(leitura + 1 - p.periodo_passo)
+        fracao = alto / p.periodo_passo
+    return p.vdc * (2.0 * fracao - 1.0)
+
+
+def entrada_por_passo_q(v_in, parametros, num_passos, passo_inicial=0):
+    """Uvector(0) em Q14.28 (inteiros), bit a bit igual ao PWMToVoltage, no modo amostrado."""
+    niveis = v_in.nivel_em(parametros.ciclo_primeiro_passo +
+                           np.arange(passo_inicial, passo_inicial + num_passos, dtype=np.int64) *
+                           parametros.periodo_passo)
+    vdc_q = np.int64(parametros.vdc) << parametros.fp_fraction_bits
+    return np.where(niveis == 1, vdc_q, -vdc_q)
+
+
+def padrao_spwm(spwm, parametros, nivel, num_passos):
+    """
+    Tensão (V) vista pelo solver em cada passo de um período da triangular do
+    SPWM_TOP (spwm_model) com a amostra da SineLUT fixa, no modo amostrado.
+    'nivel' (0 .. 2^TRIANGULAR_BITS - 1) é ceil(seno / 2^deslocamento) + 127: só
+    ele define a comparação. Com a mesma amostra em todos os períodos o padrão
+    se repete, então cada período começa no nível do fim do anterior.
+    """
+    from spwm_model import TRI_PERIODO_PASSOS, TRIANGULAR_BITS, valor_triangular
+
+    maximo = 2**(spwm.largura_seno - 1) - 1
+    seno = min(max((nivel - 2**(TRIANGULAR_BITS - 1) + 1) << spwm.deslocamento, -maximo), maximo)
+    bits = (seno > (valor_triangular(np.arange(TRI_PERIODO_PASSOS)) << spwm.deslocamento)).astype(np.uint8)
+    mudancas = np.flatnonzero(np.diff(bits)) + 1
+    # clk_enable e spwm_out registrados: o nível novo vale 2 clocks depois do pulso do divisor
+    pino = SinalBordas(mudancas * spwm.clk_por_passo + 2, bits[mudancas], bits[-1], spwm.clk_freq)
+    return entrada_por_passo(entrada_sincronizada(pino, parametros), parametros, num_passos)
+
+
+def _referencia_por_clock(sinal, parametros, num_passos):
+    """Referência lenta (um valor por clock) para validar entrada_por_passo."""
+    p = parametros
+    n_clocks = p.ciclo_primeiro_passo + num_passos * p.periodo_passo + 1
+    clocks = np.arange(n_clocks, dtype=np.int64)
+    g = gcd(p.clk_freq, sinal.freq_base)
+    # Nível do pino amostrado em cada borda de clock n (instante n / clk_freq)
+    pino = sinal.nivel_em((clocks * (sinal.freq_base // g)) // (p.clk_freq // g))
+    v_in = np.empty_like(pino)
+    lat = p.latencia_ciclos
+    v_in[:lat] = sinal.nivel_inicial
+    v_in[lat:] = pino[:-lat]
+    leitura = p.ciclo_primeiro_passo + np.arange(num_passos) * p.periodo_passo
+    amostrado = v_in[leitura]
+    # Antes do clock 0 o sinal fica no nível inicial (mesma convenção de tempo_alto)
+    estendido = np.concatenate((np.full(p.periodo_passo, sinal.nivel_inicial), v_in)).astype(np.int64)
+    soma = np.concatenate(([0], np.cumsum(estendido)))
+    medio = (soma[leitura + 1 + p.periodo_passo] - soma[leitura + 1]) / p.periodo_passo
+    return p.vdc * (2.0 * amostrado - 1.0), p.vdc * (2.0 * medio - 1.0)
+
+
+if __name__ == '__main__':
+    from spwm_model import ParametrosSPWM
+
+    parser = argparse.ArgumentParser(description='Entrada do inversor por bordas, por passo do solver.')
+    parser.add_argument('--bordas', help='.npz de bordas (spwm_model.py --saida); padrão: SPWM_TOP padrão')
+    parser.add_argument('--ciclos', type=float, default=1, help='ciclos da fundamental (sem --bordas)')
+    parser.add_argument('--modo', choices=MODOS_ENTRADA, default='amostrado')
+    parser.add_argument('--validar', type=int, metavar='N_PASSOS',
+                        help='compara com a referência por clock nos N primeiros passos')
+    args = parser.parse_args()
+
+    hil = ParametrosEntradaHIL()
+    if args.bordas:
+        pino = SinalBordas.carregar(args.bordas)
+        duracao_s = pino.ticks[-1] / pino.freq_base if len(pino) else 0.0
+    else:
+        spwm = ParametrosSPWM()
+        n = int(round(args.ciclos * spwm.ciclos_por_fundamental))
+        pino = SinalBordas.de_spwm(spwm, n)
+        duracao_s = n / spwm.clk_freq
+
+    t = time.perf_counter()
+    v_in = entrada_sincronizada(pino, hil)
+    num_passos = int(duracao_s / hil.ts)
+    u = entrada_por_passo(v_in, hil, num_passos, modo=args.modo)
+    dt = time.perf_counter() - t
+    print(f"{len(pino):,} bordas no pino -> {len(v_in):,} bordas em v_in "
+          f"(v_in muda {hil.latencia_ciclos} clocks após a captura no 1º flip-flop)")
+    print(f"{num_passos:,} passos de {hil.ts * 1e9:.0f} ns ({duracao_s * 1e3:.2f} ms) no modo '{args.modo}' "
+          f"em {dt * 1e3:.1f} ms; média de u = {u.mean():+.3f} V")
+    print(f"  Memória: {(v_in.ticks.nbytes + u.nbytes) / 1e6:.1f} MB "
+          f"(vetor por clock seria {num_passos * hil.periodo_passo / 1e6:.0f} MB)")
+
+    if args.validar:
+        ref_amostrado, ref_medio = _referencia_por_clock(pino, hil, args.validar)
+        ok_a = np.array_equal(entrada_por_passo(v_in, hil, args.validar, modo='amostrado'), ref_amostrado)
+        ok_m = np.allclose(entrada_por_passo(v_in, hil, args.validar, modo='medio'), ref_medio,
+                           rtol=0, atol=1e-9)
+        print(f"  Validação por clock ({args.validar} passos): amostrado {'OK' if ok_a else 'DIVERGENTE'}, "
+              f"médio {'OK' if ok_m else 'DIVERGENTE'}")
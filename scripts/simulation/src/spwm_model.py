@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+MODELO DA FONTE SPWM (modules/spwm_generator) em forma de lista de bordas.
+
+Reproduz ciclo a ciclo o comportamento do SPWM_TOP:
+  - EnableGenerator: pulso registrado a cada DIVISOR = CLK_FREQ / (SINE_FREQ * TABLE_SIZE)
+    clocks (enable = 1 depois das bordas DIVISOR, 2*DIVISOR, ...)
+  - SineLUT: índice avança na borda seguinte ao enable; LUT com integer(sin * (2^(W-1)-1))
+  - TriangularWave: contador de 8 bits (-128..127..-128, período de 510 passos)
+    avançando na borda seguinte ao clk_enable registrado, que vem a cada
+    CLK_PER_STEP = CLK_FREQ / (SWITCHING_FREQ * 256) clocks; escalado por 2^(W-8)
+  - SPWMComparator: spwm_out registrado (sine > triangular), 1 clock de atraso
+Contando as bordas de clock a partir do reset (ciclo 0 = em reset), o índice da
+LUT e a triangular depois da borda n valem os de (n - 1) // DIVISOR e
+(n - 1) // CLK_PER_STEP avanços, e spwm_out é 0 no reset e segue a comparação
+da borda anterior.
+
+Em vez de um vetor por clock, gera só os instantes (em ciclos de clock) em que
+spwm_out muda de nível. Entre dois eventos (troca de índice da LUT ou inversão
+da triangular) a senoide é constante e a triangular é monotônica, então o
+cruzamento é calculado de forma fechada e vetorizada: o custo é proporcional ao
+número de eventos, não ao número de clocks.
+
+Exemplos:
+    python spwm_model.py --ciclos 10
+    python spwm_model.py --ciclos 50 --saida bordas_spwm.npz
+    python spwm_model.py --validar 2000000 --clk-freq 250000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+# --- Bloco de Configuração (generics padrão do SPWM_TOP) ---
+CLK_FREQ = 200_000_000
+SINE_FREQ = 50
+SWITCHING_FREQ = 15_000
+TABLE_SIZE = 1024
+DATA_WIDTH = 48
+CALC_WIDTH = 32
+
+# --- Configurações da triangular (fixas no TriangularWave) ---
+TRIANGULAR_BITS = 8
+TRI_MIN = -2**(TRIANGULAR_BITS - 1)       # -128
+TRI_MAX = 2**(TRIANGULAR_BITS - 1) - 1    # +127
+TRI_PERIODO_PASSOS = 2 * (TRI_MAX - TRI_MIN)  # 510 passos por período
+
+CICLOS_POR_BLOCO = 2**31  # Janela máxima processada de uma vez em bordas_spwm_em_blocos
+
+# --- Fim do Bloco de Configuração ---
+
+
+def _arredondar_vhdl(x):
+    """Conversão integer(real) do VHDL: mais próximo, empate para longe do zero."""
+    return np.where(x >= 0, np.floor(x + 0.5), np.ceil(x - 0.5)).astype(np.int64)
+
+
+def tabela_seno(table_size, largura_efetiva):
+    """LUT do SineLUT (mesma expressão de init_sine_lut)."""
+    amplitude = float(2**(largura_efetiva - 1) - 1)
+    angulos = np.arange(table_size) * ((2.0 * np.pi) / table_size)
+    return _arredondar_vhdl(np.sin(angulos) * amplitude)
+
+
+def valor_triangular(passos):
+    """Valor do contador de 8 bits após 'passos' avanços a partir do reset (-128, subindo)."""
+    fase = np.asarray(passos, dtype=np.int64) % TRI_PERIODO_PASSOS
+    subida = TRI_MAX - TRI_MIN  # 255
+    return np.where(fase <= subida, TRI_MIN + fase, TRI_MIN + TRI_PERIODO_PASSOS - fase)
+
+
+class ParametrosSPWM:
+    """Generics do SPWM_TOP e as constantes derivadas exatamente como no VHDL."""
+
+    def __init__(self, clk_freq=CLK_FREQ, sine_freq=SINE_FREQ, switching_freq=SWITCHING_FREQ,
+                 table_size=TABLE_SIZE, data_width=DATA_WIDTH, calc_width=CALC_WIDTH):
+        self.clk_freq = clk_freq
+        self.sine_freq = sine_freq
+        self.switching_freq = switching_freq
+        self.table_size = table_size
+        self.data_width = data_width
+        self.calc_width = calc_width
+
+        # EFFECTIVE_WIDTH do SPWM_TOP (triangular) e do SineLUT
+        self.largura_triangular = min(data_width, 32)
+        self.largura_seno = min(data_width, calc_width)
+        if self.largura_triangular < TRIANGULAR_BITS:
+            raise ValueError(f"DATA_WIDTH >= {TRIANGULAR_BITS} é necessário para o modelo.")
+
+        # Divisões inteiras dos generics (truncamento do VHDL)
+        self.divisor_seno = clk_freq // (sine_freq * table_size)
+        self.clk_por_passo = max(1, clk_freq // (switching_freq * 2**TRIANGULAR_BITS))
+        if self.divisor_seno < 1:
+            raise ValueError("CLK_FREQ / (SINE_FREQ * TABLE_SIZE) precisa ser >= 1.")
+
+        self.deslocamento = self.largura_triangular - TRIANGULAR_BITS
+        self.lut = tabela_seno(table_size, self.largura_seno)
+
+    @property
+    def freq_seno_real(self):
+        return self.clk_freq / (self.divisor_seno * self.table_size)
+
+    @property
+    def freq_chaveamento_real(self):
+        return self.clk_freq / (self.clk_por_passo * TRI_PERIODO_PASSOS)
+
+    @property
+    def ciclos_por_fundamental(self):
+        return self.divisor_seno * self.table_size
+
+    def __repr__(self):
+        return (f"ParametrosSPWM(clk_freq={self.clk_freq}, sine_freq={self.sine_freq}, "
+                f"switching_freq={self.switching_freq}, table_size={self.table_size}, "
+                f"data_width={self.data_width}, calc_width={self.calc_width})")
+
+
+def _comparacao_contagem(parametros, contagem):
+    """(sine > triangular) depois de 'contagem' clocks contados pelos divisores (contagem >= 0)."""
+    contagem = np.asarray(contagem, dtype=np.int64)
+    seno = parametros.lut[(contagem // parametros.divisor_seno) % parametros.table_size]
+    tri = valor_triangular(contagem // parametros.clk_por_passo) << parametros.deslocamento
+    return seno > tri
+
+
+def comparacao(parametros, ciclos):
+    """
+    Resultado de (sine > triangular) com o estado dos registradores após a
+    borda de clock 'ciclos' (ciclos >= 0; o reset equivale ao ciclo 0). O
+    enable e o clk_enable são registrados: o pulso da borda k*DIVISOR só
+    avança o índice na borda seguinte (idem para a triangular).
+    """
+    ciclos = np.asarray(ciclos, dtype=np.int64)
+    return _comparacao_contagem(parametros, np.maximum(ciclos - 1, 0))
+
+
+def _limiar_triangular(parametros, seno):
+    """Menor valor da triangular (8 bits) que deixa a comparação falsa: ceil(seno / 2^desloc)."""
+    return -((-seno) >> parametros.deslocamento)
+
+
+def _trocas_contagem(parametros, a, b):
+    """
+    Contagens k em [a, b) (a >= 1) em que a comparação muda em relação a k - 1,
+    e o novo resultado. Entre dois eventos (troca de índice da LUT ou inversão
+    da triangular) o cruzamento é calculado em forma fechada.
+    """
+    p = parametros
+    # Início de todos os trechos em que a senoide é constante e a triangular monotônica
+    D, C = p.divisor_seno, p.clk_por_passo
+    trocas_seno = np.arange(-(-a // D), -(-b // D), dtype=np.int64) * D
+    meio = TRI_MAX - TRI_MIN
+    n_ini, n_fim = -(-a // (C * meio)), -(-b // (C * meio))
+    inversoes = np.arange(n_ini, n_fim, dtype=np.int64) * meio * C  # fases 0 e 255 do contador
+    inicios = np.unique(np.concatenate(([a], trocas_seno, inversoes)))
+    fins = np.append(inicios[1:], b)
+
+    # Cruzamento dentro de cada trecho (forma fechada, uma borda no máximo)
+    passos = inicios // C
+    fase = passos % TRI_PERIODO_PASSOS
+    tri = valor_triangular(passos)
+    limiar = _limiar_triangular(p, p.lut[(inicios // D) % p.table_size])
+    subindo = fase < meio
+    ate_cruzar = np.where(subindo, limiar - tri, tri - limiar + 1)
+    cruzamentos = (passos + ate_cruzar) * C
+    validos = (ate_cruzar > 0) & (cruzamentos < fins)
+
+    candidatos = np.unique(np.concatenate((inicios, cruzamentos[validos])))
+    c = _comparacao_contagem(p, candidatos)
+    anterior = np.concatenate((_comparacao_contagem(p, [a - 1]), c[:-1]))
+    mudou = c != anterior
+    return candidatos[mudou], c[mudou]
+
+
+def bordas_spwm(parametros, ciclo_inicial=0, ciclo_final=None):
+    """
+    Bordas de spwm_out na janela de estados [ciclo_inicial, ciclo_final).
+
+    Retorna (ciclos_borda, niveis, nivel_inicial):
+      - ciclos_borda: int64, borda de clock a partir da qual o novo nível vale
+        (já inclui o atraso de 1 clock do registrador do comparador)
+      - niveis: uint8, nível após cada borda
+      - nivel_inicial: nível de spwm_out em ciclo_inicial (0 no reset)
+    """
+    p = parametros
+    if ciclo_final is None:
+        ciclo_final = ciclo_inicial + p.ciclos_por_fundamental
+    a, b = int(ciclo_inicial), int(ciclo_final)
+
+    # spwm_out(n) = comparacao(n - 1), ou seja, a contagem n - 2; 0 no reset (n = 0)
+    contagens, niveis = _trocas_contagem(p, max(a - 1, 1), max(b - 1, 1))
+    ciclos = contagens + 2
+    if a <= 0 < b and _comparacao_contagem(p, 0):
+        # Saída do reset: o comparador registra a comparação do estado inicial
+        ciclos, niveis = np.append(1, ciclos), np.append(True, niveis)
+    nivel_inicial = 0 if a <= 0 else int(_comparacao_contagem(p, max(a - 2, 0)))
+    return ciclos.astype(np.int64), niveis.astype(np.uint8), nivel_inicial
+
+
+def bordas_spwm_em_blocos(parametros, num_ciclos, ciclos_por_bloco=CICLOS_POR_BLOCO):
+    """Gera (ciclos_borda, niveis) em janelas consecutivas, para registros muito longos."""
+    for inicio in range(0, int(num_ciclos), int(ciclos_por_bloco)):
+        ciclos, niveis, _ = bordas_spwm(parametros, inicio, min(num_ciclos, inicio + ciclos_por_bloco))
+        yield ciclos, niveis
+
+
+def bitstream_spwm(parametros, ciclo_inicial, num_ciclos):
+    """
+    Referência ciclo a ciclo (uint8, um valor por clock) de spwm_out, só para
+    validação em janelas curtas.
+    """
+    ciclos = np.arange(ciclo_inicial, ciclo_inicial + num_ciclos, dtype=np.int64)
+    return np.where(ciclos >= 1, comparacao(parametros, ciclos - 1), False).astype(np.uint8)
+
+
+def bordas_de_bitstream(bits, ciclo_inicial=0):
+    """Converte um vetor por clock em (ciclos_borda, niveis)."""
+    mudancas = np.flatnonzero(np.diff(bits.astype(np.int8))) + 1
+    return mudancas + ciclo_inicial, bits[mudancas]
+
+
+def validar(parametros, num_ciclos, ciclo_inicial=0):
+    """Compara o modelo por bordas com a referência por clock. Retorna True se idênticos."""
+    ref_ciclos, ref_niveis = bordas_de_bitstream(bitstream_spwm(parametros, ciclo_inicial, num_ciclos),
+                                                 ciclo_inicial)
+    ciclos, niveis, _ = bordas_spwm(parametros, ciclo_inicial, ciclo_inicial + num_ciclos - 1)
+    return np.array_equal(ciclos, ref_ciclos) and np.array_equal(niveis, ref_niveis)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Lista de bordas do SPWM_TOP (modules/spwm_generator).')
+    parser.add_argument('--clk-freq', type=int, default=CLK_FREQ)
+    parser.add_argument('--sine-freq', type=int, default=SINE_FREQ)
+    parser.add_argument('--switching-freq', type=int, default=SWITCHING_FREQ)
+    parser.add_argument('--table-size', type=int, default=TABLE_SIZE)
+    parser.add_argument('--data-width', type=int, default=DATA_WIDTH)
+    parser.add_argument('--calc-width', type=int, default=CALC_WIDTH)
+    parser.add_argument('--ciclos', type=float, default=1, help='ciclos da fundamental a gerar')
+    parser.add_argument('--saida', help='salva as bordas em .npz (ciclos_borda, niveis, clk_freq)')
+    parser.add_argument('--validar', type=int, metavar='N_CLOCKS',
+                        help='compara com a referência ciclo a ciclo em N clocks')
+    args = parser.parse_args()
+
+    p = ParametrosSPWM(args.clk_freq, args.sine_freq, args.switching_freq,
+                       args.table_size, args.data_width, args.calc_width)
+    print(p)
+    print(f"  Senoide: divisor {p.divisor_seno} -> {p.freq_seno_real:.6f} Hz "
+          f"(pedido {p.sine_freq} Hz)")
+    print(f"  Triangular: {p.clk_por_passo} clocks/passo, {TRI_PERIODO_PASSOS} passos/período -> "
+          f"{p.freq_chaveamento_real:.3f} Hz (pedido {p.switching_freq} Hz)")
+
+    if args.validar:
+        t = time.perf_counter()
+        ok = validar(p, args.validar)
+        print(f"  Validação contra referência por clock ({args.validar} clocks): "
+              f"{'OK' if ok else 'DIVERGENTE'} ({time.perf_counter() - t:.2f} s)")
+
+    num_ciclos = int(round(args.ciclos * p.ciclos_por_fundamental))
+    t = time.perf_counter()
+    ciclos, niveis, nivel_inicial = bordas_spwm(p, 0, num_ciclos)
+    dt = time.perf_counter() - t
+    print(f"\n{args.ciclos:g} ciclo(s) da fundamental = {num_ciclos:,} clocks "
+          f"({num_ciclos / p.clk_freq * 1e3:.3f} ms)")
+    print(f"  {len(ciclos):,} bordas em {dt * 1e3:.1f} ms "
+          f"({(ciclos.nbytes + niveis.nbytes) / 1e6:.2f} MB vs {num_ciclos / 1e6:.1f} MB por clock)")
+    if len(ciclos):
+        duty = (np.sum(np.diff(np.append(ciclos, num_ciclos))[niveis == 1])
+                + (ciclos[0] if nivel_inicial else 0)) / num_ciclos
+        print(f"  Razão cíclica média: {duty:.4f}")
+
+    if args.saida:
+        np.savez(args.saida, ciclos_borda=ciclos, niveis=niveis, nivel_inicial=nivel_inicial,
+                 clk_freq=p.clk_freq)
+        print(f"Bordas salvas em '{args.saida}'.")
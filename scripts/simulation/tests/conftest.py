@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""Deixa os modelos de scripts/simulation/src importáveis nos testes."""
+
+import os
+import sys
+
+_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Malha fechada: resposta à rede por blocos e período da portadora em passos do solver."""
+
+import numpy as np
+import pytest
+
+from closed_loop import ControladorPR, deriva_portadora, executar_malha, modulador_spwm, tensao_rede
+
+
+def _executar(modulacao, atraso_s, passos_por_bloco):
+    _, passos_portadora = modulador_spwm()
+    controlador = ControladorPR(passos_portadora * 100e-9)
+    return executar_malha(controlador, 0.01, modulacao=modulacao, atraso_s=atraso_s,
+                          passos_por_bloco=passos_por_bloco)
+
+
+@pytest.mark.parametrize('modulacao', ['pwm', 'medio'])
+@pytest.mark.parametrize('atraso_s', [0.0, 37e-6])
+def test_blocos_da_rede_nao_mudam_o_resultado(modulacao, atraso_s):
+    # Um bloco só (referência) contra blocos menores que um período e que não dividem a execução
+    inteiro = _executar(modulacao, atraso_s, 10**7)
+    for passos_por_bloco in (1, 3000):
+        em_blocos = _executar(modulacao, atraso_s, passos_por_bloco)
+        np.testing.assert_allclose(em_blocos.estados, inteiro.estados, rtol=0, atol=1e-9)
+        np.testing.assert_allclose(em_blocos.medidas, inteiro.medidas, rtol=0, atol=1e-9)
+        np.testing.assert_allclose(em_blocos.modulacao, inteiro.modulacao, rtol=0, atol=1e-9)
+
+
+def test_tensao_rede_a_partir_de_um_passo():
+    inteira = tensao_rede(5000)
+    np.testing.assert_array_equal(tensao_rede(1000, passo_inicial=3000), inteira[3000:4000])
+
+
+def test_deriva_da_portadora():
+    # Padrão: 65 clocks/passo * 510 = 33150 clocks = 1326 passos de 25 clocks
+    assert modulador_spwm()[1] == 1326
+    assert deriva_portadora() == 0
+    # 18,7 kHz: 52 * 510 = 26520 clocks = 1060,8 passos, arredondado para 1061
+    assert modulador_spwm(18_700)[1] == 1061
+    assert deriva_portadora(18_700) == pytest.approx(-0.2)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Discretização de Euler vs os coeficientes AMATRIX_C/BMATRIX_C do HIL_TOP.vhd."""
+
+import os
+import re
+
+import numpy as np
+import pytest
+
+import discretization as disc
+import plant_model
+
+HIL_TOP = os.path.join(os.path.dirname(os.path.abspath(__file__)), *[os.pardir] * 3, 'HIL_TOP.vhd')
+
+
+def _constantes_reais(texto):
+    """Constantes 'real' do HIL_TOP avaliadas em ordem (a sintaxe das expressões é a mesma do Python)."""
+    valores = {}
+    for nome, expressao in re.findall(r'constant\s+(\w+)\s*:\s*real\s*:=\s*([^;]+);', texto):
+        valores[nome] = eval(expressao, {'__builtins__': {}}, dict(valores))
+    return valores
+
+
+def _matriz(texto, nome, valores):
+    """Uma linha da matriz por linha do VHDL: (to_fp(a00), to_fp(0.0), ...)."""
+    corpo = re.search(rf'constant {nome}\s*:.*?\n(.*?)\n\s*\);', texto, re.S).group(1)
+    return np.array([[eval(arg, {'__builtins__': {}}, valores) for arg in re.findall(r'to_fp\(([^)]*)\)', linha)]
+                     for linha in corpo.splitlines() if 'to_fp' in linha])
+
+
+@pytest.fixture(scope='module')
+def hil_top():
+    with open(HIL_TOP, encoding='utf-8', errors='replace') as f:
+        texto = f.read()
+    valores = _constantes_reais(texto)
+    return valores, _matriz(texto, 'AMATRIX_C', valores), _matriz(texto, 'BMATRIX_C', valores)
+
+
+def test_componentes_iguais_aos_do_hil_top(hil_top):
+    valores, _, _ = hil_top
+    p = plant_model.ParametrosLCL()
+    for vhdl, python in (('L1', 'l1'), ('R1', 'r1'), ('Cf', 'cf'), ('L2', 'l2'), ('R2', 'r2'),
+                         ('Cd', 'cd'), ('Rd', 'rd'), ('Ld', 'ld'), ('SIMUL_PERIOD', 'ts')):
+        assert getattr(p, python) == valores[vhdl], vhdl
+
+
+def test_euler_igual_aos_coeficientes_do_hil_top(hil_top):
+    _, A_vhdl, B_vhdl = hil_top
+    d = disc.Discretizacao('euler', plant_model.SIMUL_PERIOD)
+
+    assert A_vhdl.shape == (plant_model.N_SS, plant_model.N_SS)
+    assert B_vhdl.shape == (plant_model.N_SS, plant_model.N_IN)
+    np.testing.assert_allclose(d.Ad, A_vhdl, rtol=1e-15, atol=1e-18)
+    np.testing.assert_allclose(d.Bd, B_vhdl, rtol=1e-15, atol=1e-18)
+    # Depois do to_fp, bit a bit
+    np.testing.assert_array_equal(d.Aq, plant_model.para_q(A_vhdl))
+    np.testing.assert_array_equal(d.Bq, plant_model.para_q(B_vhdl))
+    assert d.termos_nao_nulos == (np.count_nonzero(A_vhdl), np.count_nonzero(B_vhdl))
+    assert d.ciclos_por_passo == 25
+
+
+def test_matrizes_hil_iguais_a_euler():
+    A, B = plant_model.matrizes_hil()
+    d = disc.Discretizacao('euler', plant_model.SIMUL_PERIOD)
+    np.testing.assert_array_equal(plant_model.para_q(A), d.Aq)
+    np.testing.assert_array_equal(plant_model.para_q(B), d.Bq)
+
+
+def test_literais_vhdl_voltam_ao_mesmo_q():
+    d = disc.Discretizacao('tustin', 1e-6)
+    literais = re.findall(r'to_fp\(([^)]*)\)', d.bloco_vhdl())
+    q = np.concatenate([d.Aq.ravel(), d.Bq.ravel()])
+    assert len(literais) == q.size
+    np.testing.assert_array_equal(plant_model.para_q([float(v) for v in literais]), q)
+
+
+@pytest.mark.parametrize('metodo', disc.METODOS)
+def test_metodos_convergem_para_passo_pequeno(metodo):
+    d = disc.Discretizacao(metodo, 1e-7)
+    resultado = d.analisar(duracao_s=1e-3)
+    assert resultado['estavel']
+    assert np.max(resultado['erro_degrau_pct']) < disc.ERRO_ACEITAVEL_PCT
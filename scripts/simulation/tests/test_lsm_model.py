@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Bloco gerado do ModeloLSM contra um passo escrito com laços comuns."""
+
+import numpy as np
+import pytest
+
+from lsm_model import MODOS_ACUMULACAO, MODOS_ARREDONDAMENTO, ModeloLSM
+
+
+def _passo_direto(modelo, x, u):
+    """Um passo do LinearSolverManager com laços comuns em inteiros do Python."""
+    f = modelo.bits_fracao
+    meio_lsb = 1 << (f - 1) if modelo.arredondamento == 'mais_proximo' else 0
+    produtos = [[int(a) * x[j] for j, a in enumerate(linha_a)] + [int(b) * u[j] for j, b in enumerate(linha_b)]
+                for linha_a, linha_b in zip(modelo.Aq, modelo.Bq)]
+    if modelo.acumulacao == 'produto':
+        somas = [sum((p + meio_lsb) >> f for p in linha) for linha in produtos]
+    else:
+        somas = [(sum(linha) + meio_lsb) >> f for linha in produtos]
+    meio = 1 << (modelo.largura_bits - 1)
+    return [((s + meio) & ((1 << modelo.largura_bits) - 1)) - meio for s in somas]
+
+
+@pytest.mark.parametrize('acumulacao', MODOS_ACUMULACAO)
+@pytest.mark.parametrize('arredondamento', MODOS_ARREDONDAMENTO)
+def test_bloco_gerado_igual_ao_passo_direto(acumulacao, arredondamento):
+    modelo = ModeloLSM(acumulacao=acumulacao, arredondamento=arredondamento)
+    rng = np.random.default_rng(1)
+    u = rng.integers(-(400 << 28), 400 << 28, size=(500, 2))
+
+    estados = modelo.avancar(u)
+
+    x = [int(v) for v in modelo.x0q]
+    for passo in range(len(u)):
+        assert list(estados[passo]) == x
+        x = _passo_direto(modelo, x, [int(v) for v in u[passo]])
+    assert modelo.x == x
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Agenda de MACs esparsa executada em inteiros vs lsm_model.ModeloLSM, bit a bit."""
+
+import numpy as np
+import pytest
+
+import mac_schedule as mac
+from discretization import Discretizacao
+from lsm_model import FP_TOTAL_BITS, MODOS_ACUMULACAO, MODOS_ARREDONDAMENTO, ModeloLSM
+from plant_model import FP_FRACTION_BITS, N_SS, VDC_VOLTAGE, matrizes_hil, para_q
+
+PASSOS = 5_000
+
+
+def _entrada_pwm(passos=PASSOS, semente=1):
+    """±VDC aleatório por trechos, como um PWM, em Q14.28 (v_rede = 0)."""
+    rng = np.random.default_rng(semente)
+    duracoes = rng.integers(1, 200, size=passos)
+    niveis = rng.choice([-VDC_VOLTAGE, VDC_VOLTAGE], size=passos)
+    u0 = np.repeat(niveis, duracoes)[:passos] * (1 << FP_FRACTION_BITS)
+    return np.column_stack([u0, np.zeros(passos, dtype=np.int64)]).astype(np.int64)
+
+
+def _matrizes_hil_q():
+    A, B = matrizes_hil()
+    return para_q(A), para_q(B)
+
+
+@pytest.mark.parametrize('acumulacao', MODOS_ACUMULACAO)
+@pytest.mark.parametrize('arredondamento', MODOS_ARREDONDAMENTO)
+@pytest.mark.parametrize('unidades', [1, 2, N_SS])
+def test_agenda_igual_ao_modelo_lsm(acumulacao, arredondamento, unidades):
+    Aq, Bq = _matrizes_hil_q()
+    agenda = mac.AgendaMAC(Aq, Bq, unidades)
+    u = _entrada_pwm()
+
+    esperado = ModeloLSM(Aq, Bq, acumulacao=acumulacao, arredondamento=arredondamento).avancar(u)
+    simulador = mac.SimuladorAgenda(agenda, acumulacao=acumulacao, arredondamento=arredondamento)
+    obtido = simulador.avancar(u)
+
+    np.testing.assert_array_equal(obtido, esperado)
+    assert np.any(esperado != 0)
+    # Produto 42 x 42 mais alguns bits de soma
+    assert simulador.bits_acumulador <= 2 * FP_TOTAL_BITS + 3
+
+
+@pytest.mark.parametrize('caso', ['zoh_esparsa', 'hil_densa'])
+def test_agenda_zoh_e_densa_tambem_batem(caso):
+    if caso == 'zoh_esparsa':
+        d = Discretizacao('zoh', 1e-6)
+        Aq, Bq, esparsa = d.Aq, d.Bq, True
+    else:
+        (Aq, Bq), esparsa = _matrizes_hil_q(), False
+    u = _entrada_pwm(2_000)
+
+    obtido = mac.SimuladorAgenda(mac.AgendaMAC(Aq, Bq, 2, esparsa=esparsa)).avancar(u)
+
+    np.testing.assert_array_equal(obtido, ModeloLSM(Aq, Bq).avancar(u))
+
+
+def test_agenda_cobre_todos_os_termos_uma_vez():
+    Aq, Bq = _matrizes_hil_q()
+    agenda = mac.AgendaMAC(Aq, Bq, 2)
+    termos = set()
+    for _, _, linha, produto, deslocamento, _ in agenda.agenda:
+        if produto is not None:
+            termos.add((linha, produto[0], produto[1]))
+        if deslocamento is not None:
+            j, coef, _ = deslocamento
+            termos.add((linha, j, coef))
+    assert sorted(termos) == sorted(mac.termos_nao_nulos(Aq, Bq))
+    assert agenda.ciclos_por_passo <= round(mac.SIMUL_PERIOD * mac.CLK_FREQ)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""spwm_model vs uma simulação registrador a registrador do SPWM_TOP (modules/spwm_generator)."""
+
+import numpy as np
+import pytest
+
+from spwm_model import TRIANGULAR_BITS, ParametrosSPWM, bitstream_spwm, bordas_spwm
+
+
+def _spwm_out_rtl(p, num_ciclos):
+    """
+    spwm_out após cada borda de clock n = 0 .. num_ciclos - 1 (n = 0: reset),
+    atualizando todos os registradores com os valores da borda anterior como
+    nos processos do EnableGenerator, SineLUT, TriangularWave e SPWMComparator.
+    """
+    divisor = p.clk_freq // (p.sine_freq * p.table_size)
+    clk_per_step = p.clk_freq // (p.switching_freq * 2**TRIANGULAR_BITS)
+    deslocamento = min(p.data_width, 32) - TRIANGULAR_BITS
+    lut = [int(v) for v in p.lut]
+
+    counter, enable, lut_index = 0, 0, 0
+    clk_counter, clk_enable, counter_8bit, count_up = 0, 0, -2**(TRIANGULAR_BITS - 1), True
+    spwm_out = 0
+    saida = [spwm_out]
+    for _ in range(1, num_ciclos):
+        seno, tri = lut[lut_index], counter_8bit << deslocamento
+        novo_spwm = int(seno > tri)
+
+        novo_lut_index = (lut_index + 1) % p.table_size if enable else lut_index
+        if counter == divisor - 1:
+            counter, enable = 0, 1
+        else:
+            counter, enable = counter + 1, 0
+
+        if clk_enable:
+            if count_up:
+                if counter_8bit >= 2**(TRIANGULAR_BITS - 1) - 1:
+                    count_up, counter_8bit = False, counter_8bit - 1
+                else:
+                    counter_8bit += 1
+            elif counter_8bit <= -2**(TRIANGULAR_BITS - 1):
+                count_up, counter_8bit = True, counter_8bit + 1
+            else:
+                counter_8bit -= 1
+        if clk_per_step > 1:
+            if clk_counter >= clk_per_step - 1:
+                clk_counter, clk_enable = 0, 1
+            else:
+                clk_counter, clk_enable = clk_counter + 1, 0
+        else:
+            clk_enable = 1
+
+        lut_index, spwm_out = novo_lut_index, novo_spwm
+        saida.append(spwm_out)
+    return np.array(saida, dtype=np.uint8)
+
+
+def _bitstream_de_bordas(ciclos, niveis, nivel_inicial, ciclo_inicial, num_ciclos):
+    bits = np.full(num_ciclos, nivel_inicial, dtype=np.uint8)
+    for ciclo, nivel in zip(ciclos, niveis):
+        bits[ciclo - ciclo_inicial:] = nivel
+    return bits
+
+
+CASOS = {
+    # divisor 6, 17 clocks/passo: os dois divisores e as inversões caem em clocks distintos
+    'divisores_pequenos': (ParametrosSPWM(clk_freq=4_456_448, sine_freq=10_000, switching_freq=1000,
+                                          table_size=64), 40_000),
+    # clk_per_step = 1 (clk_enable fixo em '1' após o reset)
+    'um_clock_por_passo': (ParametrosSPWM(clk_freq=256_000, sine_freq=125, switching_freq=1000,
+                                          table_size=64), 20_000),
+    'padrao': (ParametrosSPWM(), 300_000),
+}
+
+
+@pytest.fixture(scope='module', params=sorted(CASOS))
+def caso(request):
+    p, num_ciclos = CASOS[request.param]
+    return p, _spwm_out_rtl(p, num_ciclos)
+
+
+def test_parametros_dos_casos():
+    assert (CASOS['divisores_pequenos'][0].divisor_seno, CASOS['divisores_pequenos'][0].clk_por_passo) == (6, 17)
+    assert CASOS['um_clock_por_passo'][0].clk_por_passo == 1
+
+
+def test_bitstream_igual_ao_rtl(caso):
+    p, rtl = caso
+    assert rtl[0] == 0  # SPWMComparator em reset
+    np.testing.assert_array_equal(bitstream_spwm(p, 0, len(rtl)), rtl)
+
+
+@pytest.mark.parametrize('inicio', [0, 1, 2, 3, 5000])
+def test_bordas_iguais_ao_rtl(caso, inicio):
+    p, rtl = caso
+    ciclos, niveis, nivel_inicial = bordas_spwm(p, inicio, len(rtl))
+    assert np.all(ciclos > inicio) and np.all(ciclos <= len(rtl))
+    np.testing.assert_array_equal(_bitstream_de_bordas(ciclos, niveis, nivel_inicial, inicio, len(rtl) - inicio),
+                                  rtl[inicio:])
+    assert np.all(np.diff(np.concatenate(([nivel_inicial], niveis)).astype(int)) != 0)
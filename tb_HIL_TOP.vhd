@@ -39,6 +39,12 @@ architecture sim of tb_HIL_TOP is
     constant CLK_FREQ_TB        : integer := 250_000_000; 
     constant CLK_PERIOD         : time    := 4 ns;
 
+    -- Solver state dump read by scripts/analysis/src/rtl_dump.py
+    constant STATE_DUMP_ENABLE  : boolean := true;
+    constant STATE_DUMP_FILE    : string  := "hil_states.txt";
+    constant N_SS_TB            : natural := 5;
+    constant DUMP_HEX_BITS      : natural := 44; -- FP_TOTAL_BITS sign-extended to whole hex digits
+
     signal clk_tb               : std_logic := '0';
     signal rst_tb               : std_logic;
 
@@ -98,6 +104,7 @@ begin
             SYSCLK_P         => sysclk_p_tb,
             SYSCLK_N         => sysclk_n_tb,
             PMOD6_PIN1_R     => pmod_in_tb,
+            FT4232_B_UART_TX => '1',
             FT4232_B_UART_RX => open,
             PMOD4_PIN1_R     => open,
             PMOD4_PIN2_R     => open,
@@ -107,6 +114,38 @@ begin
             GPIO_LED0        => open
         );
 
+    ----------------------------------------------------
+    -- Solver state dump: one line per solver step
+    -- "<step> <IL1> <ILd> <IL2> <VCf> <VCd>", fixed width,
+    -- states in hex (two's complement, Q14.28)
+    ----------------------------------------------------
+    State_Dump_Gen: if STATE_DUMP_ENABLE generate
+        state_dump_process: process
+            file dump_file      : text open write_mode is STATE_DUMP_FILE;
+            variable dump_line  : line;
+            variable step       : natural := 0;
+            -- start_signal é gerado no domínio do MMCM (clk_wiz_0): amostrar no mesmo clock
+            alias sysclk_alias is << signal .tb_HIL_TOP.UUT_HIL.sysclk_250mhz : std_logic >>;
+            alias start_alias is << signal .tb_HIL_TOP.UUT_HIL.start_signal : std_logic >>;
+            alias xvec_alias  is << signal .tb_HIL_TOP.UUT_HIL.Xvec_current_o_sig : vector_fp_t(0 to N_SS_TB - 1) >>;
+        begin
+            write(dump_line, string'("# step IL1 ILd IL2 VCf VCd (hex, Q14.28 sign-extended to 44 bits)"));
+            writeline(dump_file, dump_line);
+            loop
+                wait until rising_edge(sysclk_alias);
+                if start_alias = '1' then
+                    write(dump_line, step, right, 10);
+                    for i in 0 to N_SS_TB - 1 loop
+                        write(dump_line, ' ');
+                        hwrite(dump_line, std_logic_vector(resize(signed(xvec_alias(i)), DUMP_HEX_BITS)));
+                    end loop;
+                    writeline(dump_file, dump_line);
+                    step := step + 1;
+                end if;
+            end loop;
+        end process;
+    end generate State_Dump_Gen;
+
     ----------------------------------------------------
     -- End simulation stimulus
     ----------------------------------------------------